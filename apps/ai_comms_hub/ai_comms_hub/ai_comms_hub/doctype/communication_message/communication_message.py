@@ -332,3 +332,8 @@ def search_messages(query, hub_id=None, limit=20):
 	)
 
 	return messages
+
+
+def on_doctype_update():
+	# Conversation windows read the latest messages of a hub by timestamp
+	frappe.db.add_index("Communication Message", ["communication_hub", "timestamp"])
@@ -0,0 +1,25 @@
+# Copyright (c) 2026, VisualGraphX and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+
+
+class ContactIdentity(Document):
+	"""
+	Normalized phone/email/social identity pointing at a Customer.
+
+	Maintained from Customer and Contact doc events so inbound messages resolve
+	their customer with an indexed lookup. See ai_comms_hub.utils.contact_identity.
+	"""
+
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_unique(
+		"Contact Identity",
+		["identity_type", "identity_value", "customer", "source_doctype", "source_name"],
+		constraint_name="unique_contact_identity"
+	)
+	frappe.db.add_index("Contact Identity", ["source_doctype", "source_name"])
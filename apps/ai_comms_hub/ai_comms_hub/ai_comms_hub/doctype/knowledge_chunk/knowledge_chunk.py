@@ -0,0 +1,15 @@
+# Copyright (c) 2026, VisualGraphX and contributors
+# For license information, please see license.txt
+
+from frappe.model.document import Document
+
+
+class KnowledgeChunk(Document):
+	"""
+	Knowledge base chunk mirrored from Qdrant (named by its point ID).
+
+	Holds the chunk text for lexical search; maintained by rag.insert_document.
+	See ai_comms_hub.services.lexical_index.
+	"""
+
+	pass
@@ -0,0 +1,16 @@
+# Copyright (c) 2026, VisualGraphX and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+
+
+class KnowledgeChunkTerm(Document):
+	"""Posting of a term in a Knowledge Chunk (BM25 inverted index)."""
+
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_unique("Knowledge Chunk Term", ["term", "chunk"], constraint_name="unique_chunk_term")
+	frappe.db.add_index("Knowledge Chunk Term", ["chunk"])
@@ -0,0 +1,24 @@
+# Copyright (c) 2026, VisualGraphX and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+
+
+class MessageIdempotencyKey(Document):
+	"""
+	One row per inbound platform message that has been stored.
+
+	The unique (platform, platform_message_id) index makes duplicate webhook
+	deliveries fail at insert time. See ai_comms_hub.utils.idempotency.
+	"""
+
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_unique(
+		"Message Idempotency Key",
+		["platform", "platform_message_id"],
+		constraint_name="unique_platform_message"
+	)
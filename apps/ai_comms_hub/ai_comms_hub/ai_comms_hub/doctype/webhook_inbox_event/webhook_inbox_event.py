@@ -0,0 +1,21 @@
+# Copyright (c) 2026, VisualGraphX and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+
+
+class WebhookInboxEvent(Document):
+	"""
+	Raw webhook payload accepted by a fast-ack endpoint and waiting for background processing.
+
+	See ai_comms_hub.webhooks.inbox for the ingestion and worker logic.
+	"""
+
+	pass
+
+
+def on_doctype_update():
+	# The worker scans queued events in arrival order
+	frappe.db.add_index("Webhook Inbox Event", ["status", "received_at"])
+	frappe.db.add_index("Webhook Inbox Event", ["source", "external_id"])
@@ -14,6 +14,13 @@ from frappe import _
 from datetime import datetime
 import json
 
+from ai_comms_hub.services.conversation_memory import (
+	MAX_WINDOW_MESSAGES,
+	get_recent_messages,
+	refresh_summary
+)
+from ai_comms_hub.services.enrichment import mark_hub_for_enrichment
+
 
 # Keywords that trigger HITL escalation
 ESCALATION_TRIGGERS = [
@@ -52,22 +59,24 @@ def generate_response(hub_id, message_id):
 		if should_escalate(customer_msg.content):
 			return handle_escalation(hub, customer_msg, "Customer requested human assistance")
 
-		# Get conversation history
-		conversation = get_conversation_history(hub_id, limit=10)
+		# Get recent turns (older turns are in hub.context, the rolling summary)
+		conversation = get_conversation_history(hub_id)
 
 		# Query knowledge base
 		rag_results = []
 		if should_use_rag(customer_msg.content):
 			try:
-				from ai_comms_hub.api.rag import query_knowledge_base
-				rag_results = query_knowledge_base(customer_msg.content, top_k=3)
+				from ai_comms_hub.services.reranker import get_ranked_context
+				rag_results = get_ranked_context(customer_msg.content, hub.channel, top_k=3)
 			except Exception as e:
 				frappe.log_error(f"RAG query failed: {str(e)}", "AI Engine RAG Error")
 
 		# Check RAG confidence - escalate if too low and question seems important
 		if rag_results and is_important_question(customer_msg.content):
-			avg_confidence = sum(r.get("score", 0) for r in rag_results) / len(rag_results)
-			if avg_confidence < CONFIDENCE_THRESHOLD:
+			from ai_comms_hub.api.rag import get_confidence
+
+			avg_confidence = get_confidence(rag_results)
+			if avg_confidence is not None and avg_confidence < CONFIDENCE_THRESHOLD:
 				return handle_escalation(hub, customer_msg, f"Low confidence ({avg_confidence:.2f}) for important question")
 
 		# Generate response with function calling
@@ -166,23 +175,14 @@ def generate_response(hub_id, message_id):
 				{"id": doc.get("id", ""), "title": doc.get("title", ""), "score": doc.get("score", 0)}
 				for doc in rag_results
 			]))
-			avg_score = sum(doc.get("score", 0) for doc in rag_results) / len(rag_results)
-			hub.db_set("rag_confidence", avg_score * 100)
+			from ai_comms_hub.api.rag import get_confidence
 
-		# Analyze sentiment asynchronously
-		frappe.enqueue(
-			"ai_comms_hub.api.ai_engine.analyze_and_update_sentiment",
-			hub_id=hub_id,
-			content=customer_msg.content,
-			queue="short"
-		)
+			avg_score = get_confidence(rag_results)
+			if avg_score is not None:
+				hub.db_set("rag_confidence", avg_score * 100)
 
-		# Update conversation context summary
-		frappe.enqueue(
-			"ai_comms_hub.api.ai_engine.update_context_summary",
-			hub_id=hub_id,
-			queue="short"
-		)
+		# Sentiment and rolling summary are updated by the batched enrichment worker
+		mark_hub_for_enrichment(hub_id)
 
 		return {
 			"success": True,
@@ -221,8 +221,8 @@ def generate_ai_response(hub_id, content):
 		rag_results = []
 		if should_use_rag(content):
 			try:
-				from ai_comms_hub.api.rag import query_knowledge_base
-				rag_results = query_knowledge_base(content, top_k=3)
+				from ai_comms_hub.services.reranker import get_ranked_context
+				rag_results = get_ranked_context(content, hub.channel, top_k=3)
 			except Exception:
 				pass
 
@@ -252,6 +252,9 @@ def build_system_prompt(platform, rag_context=None, hub=None):
 	"""
 	Build comprehensive system prompt with platform guidelines and context.
 
+	The static instructions are compiled once per channel, see
+	services/prompt_builder.py.
+
 	Args:
 		platform (str): Channel name
 		rag_context (list): Knowledge base results
@@ -260,107 +263,9 @@ def build_system_prompt(platform, rag_context=None, hub=None):
 	Returns:
 		str: System prompt
 	"""
-	# Platform-specific guidelines
-	platform_guidelines = {
-		"Voice": {
-			"tone": "conversational and clear",
-			"length": "concise, 1-2 sentences per response",
-			"style": "natural speech, avoid complex words, no special characters"
-		},
-		"SMS": {
-			"tone": "friendly and brief",
-			"length": "160 characters ideal, max 320",
-			"style": "no emojis, clear and direct"
-		},
-		"WhatsApp": {
-			"tone": "friendly and conversational",
-			"length": "up to 1000 characters",
-			"style": "casual, light emoji use allowed"
-		},
-		"Chat": {
-			"tone": "helpful and professional",
-			"length": "2-4 sentences typical",
-			"style": "clear formatting, can use bullet points"
-		},
-		"Facebook": {
-			"tone": "friendly and conversational",
-			"length": "up to 2000 characters",
-			"style": "casual, emojis sparingly"
-		},
-		"Instagram": {
-			"tone": "casual and visual",
-			"length": "up to 1000 characters",
-			"style": "short paragraphs, emojis encouraged"
-		},
-		"Twitter": {
-			"tone": "concise and engaging",
-			"length": "280 characters maximum",
-			"style": "very brief, strategic emoji use"
-		},
-		"LinkedIn": {
-			"tone": "professional but warm",
-			"length": "up to 1300 characters",
-			"style": "professional, minimal emojis"
-		},
-		"Email": {
-			"tone": "professional and helpful",
-			"length": "2-3 paragraphs",
-			"style": "proper grammar, formatted with paragraphs, include greeting and sign-off"
-		}
-	}
+	from ai_comms_hub.services.prompt_builder import build_agent_prompt
 
-	guidelines = platform_guidelines.get(platform, platform_guidelines["Chat"])
-
-	# Get company info
-	company_name = frappe.db.get_single_value("AI Communications Hub Settings", "company_name") or "our company"
-
-	prompt = f"""You are an AI customer service assistant for {company_name}, communicating via {platform}.
-
-## Communication Guidelines for {platform}:
-- Tone: {guidelines['tone']}
-- Length: {guidelines['length']}
-- Style: {guidelines['style']}
-
-## Core Instructions:
-1. Be helpful, accurate, and professional
-2. Use the knowledge base context when available
-3. Never make up information - if unsure, say so
-4. For complex issues, offer to connect with a human agent
-5. Protect customer privacy - never repeat sensitive info back
-
-## Escalation Triggers (say "Let me connect you with a team member"):
-- Customer explicitly requests human help
-- Complex billing/refund issues
-- Legal or complaint matters
-- Technical issues beyond your knowledge
-- Customer expresses strong frustration
-
-"""
-
-	# Add customer context if available
-	if hub:
-		if hub.customer_name:
-			prompt += f"\n## Customer: {hub.customer_name}\n"
-		if hub.context:
-			prompt += f"\n## Conversation Context:\n{hub.context}\n"
-
-	# Add knowledge base context
-	if rag_context:
-		prompt += "\n## Knowledge Base Information:\n"
-		for i, doc in enumerate(rag_context, 1):
-			content = doc.get("content", "")[:500]  # Limit context size
-			title = doc.get("title", f"Document {i}")
-			prompt += f"\n### {title}\n{content}\n"
-
-	prompt += """
-## Response Format:
-- Answer the customer's question directly
-- Be concise but complete
-- If using knowledge base info, integrate it naturally
-- End with a helpful follow-up question or offer if appropriate
-"""
-
-	return prompt
+	return build_agent_prompt(platform, rag_context, hub).prompt
 
 
 def generate_email_response(hub_id, message_id):
@@ -453,26 +358,19 @@ def convert_to_email_html(text_content):
 	return ''.join(html_parts)
 
 
-def get_conversation_history(hub_id, limit=10):
+def get_conversation_history(hub_id, limit=MAX_WINDOW_MESSAGES, token_budget=None):
 	"""
-	Get conversation history for context.
+	Get the most recent conversation turns for context.
 
 	Args:
 		hub_id (str): Communication Hub ID
-		limit (int): Number of messages to retrieve
+		limit (int): Maximum number of messages to retrieve
+		token_budget (int, optional): Token budget for the window, defaults to settings
 
 	Returns:
-		list: Conversation messages
+		list: Latest conversation messages, oldest first
 	"""
-	messages = frappe.get_all(
-		"Communication Message",
-		filters={"communication_hub": hub_id},
-		fields=["sender_type", "sender_name", "content", "timestamp"],
-		order_by="timestamp asc",
-		limit=limit
-	)
-
-	return messages
+	return get_recent_messages(hub_id, token_budget=token_budget, max_messages=limit)
 
 
 def should_use_rag(message_content):
@@ -746,8 +644,8 @@ def execute_search_knowledge(args, hub, customer_msg):
 	query = args.get("query", "")
 
 	try:
-		from ai_comms_hub.api.rag import query_knowledge_base
-		results = query_knowledge_base(query, top_k=3)
+		from ai_comms_hub.services.reranker import get_ranked_context
+		results = get_ranked_context(query, hub.channel, top_k=3)
 
 		if results:
 			return {
@@ -1164,42 +1062,17 @@ def analyze_and_update_sentiment(hub_id, content):
 		frappe.log_error(f"Sentiment analysis failed: {str(e)}", "AI Engine")
 
 
-def update_context_summary(hub_id):
+def update_context_summary(hub_id, force=False):
 	"""
-	Update conversation context summary (background job).
+	Update the rolling conversation summary (background job).
 
 	Args:
 		hub_id (str): Communication Hub ID
+		force (bool): Summarize even if few new messages arrived
 	"""
 	try:
-		# Get recent messages
-		messages = frappe.get_all(
-			"Communication Message",
-			filters={"communication_hub": hub_id},
-			fields=["sender_type", "content"],
-			order_by="timestamp desc",
-			limit=10
-		)
-
-		if len(messages) < 3:
-			return  # Not enough for summary
-
-		# Build conversation text
-		conv_text = "\n".join([
-			f"{'Customer' if m.sender_type == 'Customer' else 'Assistant'}: {m.content[:200]}"
-			for m in reversed(messages)
-		])
-
-		# Generate summary
-		from ai_comms_hub.api.llm import generate_summary
-		summary = generate_summary(
-			conv_text,
-			"Summarize this customer service conversation in 2-3 sentences, noting the main issue and current status:"
-		)
-
-		# Update hub
-		frappe.db.set_value("Communication Hub", hub_id, "context", summary)
-		frappe.db.commit()
+		if refresh_summary(hub_id, force=force):
+			frappe.db.commit()
 
 	except Exception as e:
 		frappe.log_error(f"Context summary failed: {str(e)}", "AI Engine")
@@ -1420,8 +1293,8 @@ def generate_suggestion(hub_id):
 		rag_results = []
 		if should_use_rag(last_customer_msg):
 			try:
-				from ai_comms_hub.api.rag import query_knowledge_base
-				rag_results = query_knowledge_base(last_customer_msg, top_k=3)
+				from ai_comms_hub.services.reranker import get_ranked_context
+				rag_results = get_ranked_context(last_customer_msg, hub.channel, top_k=3)
 			except Exception:
 				pass
 
@@ -35,25 +35,23 @@ def detect_language(text, use_ai=True):
 def detect_language_ai(text, settings):
 	"""Use AI model for language detection."""
 	try:
-		from openai import OpenAI
+		from ai_comms_hub.services.llm_gateway import OPENAI, chat, get_content, get_provider
 
-		# Get API key from settings or AI Comms Hub Settings
-		api_key = settings.openai_api_key
-		if not api_key:
-			hub_settings = frappe.get_single("AI Comms Hub Settings")
-			api_key = hub_settings.openai_api_key
-
-		if not api_key:
+		# OpenAI when configured, otherwise the hub LLM
+		provider = get_provider(OPENAI)
+		if not provider.api_key:
+			provider = get_provider()
+		if not provider.api_key:
 			return detect_language_basic(text)
 
-		client = OpenAI(api_key=api_key)
-
 		# Get supported languages for context
 		supported = [l.language_code for l in settings.supported_languages if l.is_enabled]
 		supported_str = ", ".join(supported) if supported else "any language"
 
-		response = client.chat.completions.create(
+		response = chat(
+			provider=provider,
 			model=settings.detection_model or "gpt-4o-mini",
+			purpose="detection",
 			messages=[
 				{
 					"role": "system",
@@ -71,7 +69,7 @@ Use ISO 639-1 language codes."""
 			max_tokens=100
 		)
 
-		result_text = response.choices[0].message.content.strip()
+		result_text = get_content(response)
 
 		# Parse JSON from response
 		json_match = re.search(r'\{[^}]+\}', result_text)
@@ -226,29 +224,24 @@ def translate_text(text, target_language, source_language=None):
 def translate_openai(text, source_language, target_language, settings):
 	"""Translate using OpenAI."""
 	try:
-		from openai import OpenAI
-
-		api_key = settings.openai_api_key
-		if not api_key:
-			hub_settings = frappe.get_single("AI Comms Hub Settings")
-			api_key = hub_settings.openai_api_key
+		from ai_comms_hub.services.llm_gateway import OPENAI, chat, get_content, get_provider
 
-		if not api_key:
+		provider = get_provider(OPENAI)
+		if not provider.api_key:
 			return {
 				"translated_text": text,
 				"error": "OpenAI API key not configured",
 				"translated": False
 			}
 
-		client = OpenAI(api_key=api_key)
-
 		# Get language names for better prompting
 		lang_names = get_language_names()
 		source_name = lang_names.get(source_language, source_language)
 		target_name = lang_names.get(target_language, target_language)
 
-		response = client.chat.completions.create(
-			model=settings.openai_model or "gpt-4o-mini",
+		response = chat(
+			provider=provider,
+			purpose="translation",
 			messages=[
 				{
 					"role": "system",
@@ -265,7 +258,7 @@ Only output the translated text, nothing else."""
 			max_tokens=len(text) * 3  # Allow for expansion
 		)
 
-		translated_text = response.choices[0].message.content.strip()
+		translated_text = get_content(response)
 
 		return {
 			"translated_text": translated_text,
@@ -287,28 +280,23 @@ Only output the translated text, nothing else."""
 def translate_anthropic(text, source_language, target_language, settings):
 	"""Translate using Anthropic Claude."""
 	try:
-		import anthropic
-
-		api_key = settings.anthropic_api_key
-		if not api_key:
-			hub_settings = frappe.get_single("AI Comms Hub Settings")
-			api_key = hub_settings.anthropic_api_key
+		from ai_comms_hub.services.llm_gateway import ANTHROPIC, chat, get_content, get_provider
 
-		if not api_key:
+		provider = get_provider(ANTHROPIC)
+		if not provider.api_key:
 			return {
 				"translated_text": text,
 				"error": "Anthropic API key not configured",
 				"translated": False
 			}
 
-		client = anthropic.Anthropic(api_key=api_key)
-
 		lang_names = get_language_names()
 		source_name = lang_names.get(source_language, source_language)
 		target_name = lang_names.get(target_language, target_language)
 
-		response = client.messages.create(
-			model=settings.anthropic_model or "claude-3-haiku-20240307",
+		response = chat(
+			provider=provider,
+			purpose="translation",
 			max_tokens=len(text) * 3,
 			messages=[
 				{
@@ -323,7 +311,7 @@ Text to translate:
 			]
 		)
 
-		translated_text = response.content[0].text.strip()
+		translated_text = get_content(response)
 
 		return {
 			"translated_text": translated_text,
@@ -6,7 +6,6 @@ Handles communication with naga.ac (OpenAI-compatible API).
 
 import frappe
 from frappe import _
-import requests
 import json
 
 
@@ -24,49 +23,159 @@ def get_llm_settings():
 	}
 
 
-def generate_completion(messages, functions=None, max_tokens=None, temperature=None):
+FUNCTION_DEFINITIONS = [
+	{
+		"name": "getOrderStatus",
+		"description": "Get the status of a customer order by order number",
+		"parameters": {
+			"type": "object",
+			"properties": {
+				"order_number": {
+					"type": "string",
+					"description": "The order number (e.g., SO-001)"
+				}
+			},
+			"required": ["order_number"]
+		}
+	},
+	{
+		"name": "createQuote",
+		"description": "Create a quote for customer with product specifications",
+		"parameters": {
+			"type": "object",
+			"properties": {
+				"customer_name": {
+					"type": "string",
+					"description": "Customer name"
+				},
+				"product_name": {
+					"type": "string",
+					"description": "Product or service name"
+				},
+				"quantity": {
+					"type": "number",
+					"description": "Quantity requested"
+				},
+				"specifications": {
+					"type": "string",
+					"description": "Additional specifications or requirements"
+				}
+			},
+			"required": ["customer_name", "product_name"]
+		}
+	},
+	{
+		"name": "searchKnowledge",
+		"description": "Search the knowledge base for information about products, policies, or procedures",
+		"parameters": {
+			"type": "object",
+			"properties": {
+				"query": {
+					"type": "string",
+					"description": "Search query"
+				}
+			},
+			"required": ["query"]
+		}
+	},
+	{
+		"name": "scheduleAppointment",
+		"description": "Schedule an appointment or consultation",
+		"parameters": {
+			"type": "object",
+			"properties": {
+				"customer_name": {
+					"type": "string",
+					"description": "Customer name"
+				},
+				"preferred_date": {
+					"type": "string",
+					"description": "Preferred date (YYYY-MM-DD)"
+				},
+				"preferred_time": {
+					"type": "string",
+					"description": "Preferred time (HH:MM)"
+				},
+				"purpose": {
+					"type": "string",
+					"description": "Purpose of appointment"
+				}
+			},
+			"required": ["customer_name", "purpose"]
+		}
+	},
+	{
+		"name": "getProductInfo",
+		"description": "Get detailed information about a product",
+		"parameters": {
+			"type": "object",
+			"properties": {
+				"product_name": {
+					"type": "string",
+					"description": "Product name or SKU"
+				}
+			},
+			"required": ["product_name"]
+		}
+	},
+	{
+		"name": "getCustomerInfo",
+		"description": "Get information about the current customer including recent orders and outstanding balance",
+		"parameters": {
+			"type": "object",
+			"properties": {},
+			"required": []
+		}
+	},
+	{
+		"name": "checkInventory",
+		"description": "Check inventory availability for a product",
+		"parameters": {
+			"type": "object",
+			"properties": {
+				"product_name": {
+					"type": "string",
+					"description": "Product name or SKU to check"
+				}
+			},
+			"required": ["product_name"]
+		}
+	}
+]
+
+
+def generate_completion(messages, functions=None, max_tokens=None, temperature=None, purpose="chat"):
 	"""
 	Generate LLM completion using naga.ac API.
 
+	Calls go through services/llm_gateway.py (pooling, rate limits, retries
+	and failover to llm_fallback_model).
+
 	Args:
 		messages (list): List of message dicts with role and content
 		functions (list, optional): Function definitions for function calling
 		max_tokens (int, optional): Override max tokens
 		temperature (float, optional): Override temperature
+		purpose (str, optional): Label for LLM call metrics
 
 	Returns:
 		dict: API response with choices
 	"""
-	settings = get_llm_settings()
-
-	# Build request payload
-	payload = {
-		"model": settings["model"],
-		"messages": messages,
-		"max_tokens": max_tokens or settings["max_tokens"],
-		"temperature": temperature or settings["temperature"]
-	}
+	from ai_comms_hub.services.llm_gateway import LLMGatewayError, chat, get_provider
 
-	if functions:
-		payload["functions"] = functions
-		payload["function_call"] = "auto"
+	provider = get_provider()
 
-	# Make API request
 	try:
-		response = requests.post(
-			f"{settings['api_url']}/chat/completions",
-			headers={
-				"Authorization": f"Bearer {settings['api_key']}",
-				"Content-Type": "application/json"
-			},
-			json=payload,
-			timeout=30
+		return chat(
+			messages,
+			provider=provider,
+			max_tokens=max_tokens or provider.max_tokens,
+			temperature=temperature or provider.temperature,
+			functions=functions,
+			purpose=purpose
 		)
 
-		response.raise_for_status()
-		return response.json()
-
-	except requests.exceptions.RequestException as e:
+	except LLMGatewayError as e:
 		frappe.log_error(f"LLM API Error: {str(e)}", "LLM Integration")
 		raise
 
@@ -89,7 +198,7 @@ def generate_summary(text, prompt=None):
 		{"role": "user", "content": f"{prompt or default_prompt}\n\n{text}"}
 	]
 
-	response = generate_completion(messages, max_tokens=200)
+	response = generate_completion(messages, max_tokens=200, purpose="summary")
 
 	return response["choices"][0]["message"]["content"].strip()
 
@@ -109,7 +218,7 @@ def classify_sentiment(text):
 		{"role": "user", "content": f"Classify the sentiment of this text:\n\n{text}"}
 	]
 
-	response = generate_completion(messages, max_tokens=10, temperature=0.3)
+	response = generate_completion(messages, max_tokens=10, temperature=0.3, purpose="sentiment")
 	sentiment = response["choices"][0]["message"]["content"].strip()
 
 	# Validate response
@@ -163,191 +272,20 @@ def build_platform_system_prompt(platform, rag_context=None):
 	Returns:
 		str: System prompt
 	"""
-	platform_guidelines = {
-		"Voice": {
-			"tone": "conversational and clear",
-			"length": "concise, 1-2 sentences per response",
-			"style": "natural speech, avoid complex words"
-		},
-		"Facebook": {
-			"tone": "friendly and conversational",
-			"length": "up to 2000 characters",
-			"style": "casual, use emojis sparingly"
-		},
-		"Instagram": {
-			"tone": "casual and visual",
-			"length": "up to 1000 characters",
-			"style": "short paragraphs, emojis encouraged"
-		},
-		"Twitter": {
-			"tone": "concise and engaging",
-			"length": "280 characters maximum",
-			"style": "very brief, strategic emoji use"
-		},
-		"LinkedIn": {
-			"tone": "professional but warm",
-			"length": "up to 1300 characters",
-			"style": "professional, minimal emojis"
-		},
-		"Email": {
-			"tone": "professional and helpful",
-			"length": "2-3 paragraphs",
-			"style": "proper grammar, formatted with paragraphs"
-		}
-	}
-
-	guidelines = platform_guidelines.get(platform, platform_guidelines["Email"])
-
-	prompt = f"""You are a helpful AI assistant for a business, communicating via {platform}.
+	from ai_comms_hub.services.prompt_builder import build_platform_prompt
 
-Guidelines for {platform}:
-- Tone: {guidelines['tone']}
-- Length: {guidelines['length']}
-- Style: {guidelines['style']}
-
-"""
-
-	if rag_context:
-		prompt += "Knowledge Base Context:\n"
-		for doc in rag_context:
-			prompt += f"- {doc.get('content', '')}\n"
-		prompt += "\n"
-
-	prompt += """Your task is to:
-1. Understand customer needs
-2. Provide accurate information from knowledge base
-3. Be helpful and professional
-4. Escalate to human if needed (say "Let me connect you with a team member")
-
-If you need to lookup information, use function calls.
-"""
-
-	return prompt
+	return build_platform_prompt(platform, rag_context).prompt
 
 
 def build_function_definitions():
 	"""
 	Build function definitions for LLM function calling.
 
+	The list is built once per worker and shared between calls.
+
 	Returns:
 		list: Function definitions in OpenAI format
 	"""
-	return [
-		{
-			"name": "getOrderStatus",
-			"description": "Get the status of a customer order by order number",
-			"parameters": {
-				"type": "object",
-				"properties": {
-					"order_number": {
-						"type": "string",
-						"description": "The order number (e.g., SO-001)"
-					}
-				},
-				"required": ["order_number"]
-			}
-		},
-		{
-			"name": "createQuote",
-			"description": "Create a quote for customer with product specifications",
-			"parameters": {
-				"type": "object",
-				"properties": {
-					"customer_name": {
-						"type": "string",
-						"description": "Customer name"
-					},
-					"product_name": {
-						"type": "string",
-						"description": "Product or service name"
-					},
-					"quantity": {
-						"type": "number",
-						"description": "Quantity requested"
-					},
-					"specifications": {
-						"type": "string",
-						"description": "Additional specifications or requirements"
-					}
-				},
-				"required": ["customer_name", "product_name"]
-			}
-		},
-		{
-			"name": "searchKnowledge",
-			"description": "Search the knowledge base for information about products, policies, or procedures",
-			"parameters": {
-				"type": "object",
-				"properties": {
-					"query": {
-						"type": "string",
-						"description": "Search query"
-					}
-				},
-				"required": ["query"]
-			}
-		},
-		{
-			"name": "scheduleAppointment",
-			"description": "Schedule an appointment or consultation",
-			"parameters": {
-				"type": "object",
-				"properties": {
-					"customer_name": {
-						"type": "string",
-						"description": "Customer name"
-					},
-					"preferred_date": {
-						"type": "string",
-						"description": "Preferred date (YYYY-MM-DD)"
-					},
-					"preferred_time": {
-						"type": "string",
-						"description": "Preferred time (HH:MM)"
-					},
-					"purpose": {
-						"type": "string",
-						"description": "Purpose of appointment"
-					}
-				},
-				"required": ["customer_name", "purpose"]
-			}
-		},
-		{
-			"name": "getProductInfo",
-			"description": "Get detailed information about a product",
-			"parameters": {
-				"type": "object",
-				"properties": {
-					"product_name": {
-						"type": "string",
-						"description": "Product name or SKU"
-					}
-				},
-				"required": ["product_name"]
-			}
-		},
-		{
-			"name": "getCustomerInfo",
-			"description": "Get information about the current customer including recent orders and outstanding balance",
-			"parameters": {
-				"type": "object",
-				"properties": {},
-				"required": []
-			}
-		},
-		{
-			"name": "checkInventory",
-			"description": "Check inventory availability for a product",
-			"parameters": {
-				"type": "object",
-				"properties": {
-					"product_name": {
-						"type": "string",
-						"description": "Product name or SKU to check"
-					}
-				},
-				"required": ["product_name"]
-			}
-		}
-	]
+	from ai_comms_hub.services.prompt_builder import get_function_definitions
+
+	return get_function_definitions()
@@ -62,6 +62,32 @@ def validate_message(doc, method):
 		doc.content = doc.content[:max_length - 3] + "..."
 
 
+def claim_platform_message_id(doc, method):
+	"""
+	Claim the inbound platform message ID before the message is inserted.
+
+	Duplicate webhook deliveries raise frappe.DuplicateEntryError here instead of
+	creating a second Communication Message.
+
+	Args:
+		doc: Communication Message document
+		method: Event method name
+	"""
+	if not doc.platform_message_id or doc.sender_type != "Customer":
+		return
+
+	from ai_comms_hub.utils.idempotency import claim, get_message_platform
+
+	hub = frappe.db.get_value(
+		"Communication Hub",
+		doc.communication_hub,
+		["channel", "chatwoot_conversation_id"],
+		as_dict=True
+	)
+	if hub:
+		claim(get_message_platform(hub), doc.platform_message_id)
+
+
 def on_message_created(doc, method):
 	"""
 	Handle Communication Message creation.
@@ -153,6 +179,78 @@ def notify_agents_new_message(hub, message):
 		)
 
 
+def _reserve_message_names(hub_id, count):
+	"""
+	Next ``count`` names for a hub's messages.
+
+	Names come from frappe's own naming for the doctype (autoname
+	format:MSG-{communication_hub}-{#####}), so they advance the exact series
+	key a regular insert uses and the two can never hand out the same name.
+	"""
+	from frappe.model.naming import set_new_name
+
+	doc = frappe.new_doc("Communication Message")
+	doc.communication_hub = hub_id
+
+	names = []
+	for _ in range(count):
+		set_new_name(doc)
+		names.append(doc.name)
+	return names
+
+
+def bulk_insert_messages(hub_id, messages):
+	"""
+	Insert many Communication Messages for one hub in a single write.
+
+	Document hooks (delivery, AI triggers, per-message realtime events, hub
+	counter refresh) are NOT run; callers handle the aggregate side effects.
+	Inbound platform message IDs are still claimed in the idempotency store.
+
+	Args:
+		hub_id (str): Communication Hub ID
+		messages (list): Dicts with sender_type, sender_name, content, timestamp and
+			optional platform_message_id, delivery_status, content_type
+
+	Returns:
+		list: Names of the inserted messages
+	"""
+	if not messages:
+		return []
+
+	from ai_comms_hub.utils.idempotency import claim_many, get_message_platform
+
+	hub = frappe.db.get_value("Communication Hub", hub_id, ["channel", "chatwoot_conversation_id"], as_dict=True)
+	if hub:
+		claim_many(get_message_platform(hub), [
+			msg.get("platform_message_id") for msg in messages if msg["sender_type"] == "Customer"
+		])
+
+	names = _reserve_message_names(hub_id, len(messages))
+	now = frappe.utils.now_datetime()
+	user = frappe.session.user
+
+	frappe.db.bulk_insert(
+		"Communication Message",
+		fields=[
+			"name", "creation", "modified", "owner", "modified_by", "docstatus",
+			"communication_hub", "sender_type", "sender_name", "content", "content_type",
+			"timestamp", "delivery_status", "platform_message_id"
+		],
+		values=[
+			(
+				name, now, now, user, user, 0,
+				hub_id, msg["sender_type"], msg.get("sender_name"), msg.get("content"),
+				msg.get("content_type") or "text", msg.get("timestamp") or now,
+				msg.get("delivery_status") or "Pending", msg.get("platform_message_id")
+			)
+			for name, msg in zip(names, messages)
+		]
+	)
+
+	return names
+
+
 def deliver_message(message_id):
 	"""
 	Deliver message via appropriate channel.
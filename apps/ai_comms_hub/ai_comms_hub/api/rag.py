@@ -2,12 +2,36 @@
 RAG (Retrieval-Augmented Generation) Module
 
 Handles knowledge base search using Qdrant vector database.
+
+Documents are stored as chunks (utils.chunking): one point per chunk with a
+parent_id, chunk_index and chunk_hash in the payload. Re-inserting a document
+only embeds chunks whose hash is new, and search results from adjacent chunks
+of the same document are merged back together.
+
+Search is hybrid: the Qdrant vector search (in a worker thread) and the local
+BM25 index (services.lexical_index) run side by side within a latency budget
+and their rankings are combined with reciprocal rank fusion.
 """
 
 import frappe
 from frappe import _
+from frappe.utils import cint
 import requests
 import json
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+from ai_comms_hub.utils.chunking import html_to_text, merge_adjacent, split_document
+
+
+# Chunks fetched per requested result, so adjacent chunks can be merged
+CHUNK_OVERSAMPLE = 3
+RRF_K = 60
+DEFAULT_LATENCY_BUDGET_MS = 1500
+EMBEDDING_BATCH_SIZE = 64
+# Sources whose legacy whole-document points cannot be rebuilt from Frappe
+UNSYNCED_SOURCES = ["Custom Knowledge"]
 
 
 def get_qdrant_settings():
@@ -35,59 +59,180 @@ def get_qdrant_headers(settings):
 	return headers
 
 
-def query_knowledge_base(query, top_k=5, score_threshold=0.7):
+# Vector searches run here so they can be abandoned when the latency budget is spent
+_vector_search_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="rag-vector")
+
+
+def get_latency_budget():
+	"""Search latency budget in milliseconds."""
+	return cint(frappe.db.get_single_value(
+		"AI Communications Hub Settings", "rag_latency_budget_ms"
+	)) or DEFAULT_LATENCY_BUDGET_MS
+
+
+def query_knowledge_base(query, top_k=5, score_threshold=0.7, latency_budget_ms=None):
 	"""
-	Query knowledge base using semantic search.
+	Query knowledge base using hybrid (vector + BM25) search.
 
 	Args:
 		query (str): Search query
 		top_k (int): Number of results to return
-		score_threshold (float): Minimum similarity score (0-1)
+		score_threshold (float): Minimum similarity score (0-1) for vector hits
+		latency_budget_ms (int): Time allowed for the search (defaults to settings)
 
 	Returns:
-		list: List of matching documents with scores
+		list: List of matching documents with scores. "score" is the best of the
+			vector similarity and the lexical code match (queries with product
+			codes only); results are ordered by "rrf_score". Use get_confidence
+			to summarise them.
 	"""
-	try:
-		# Get query embedding
-		embedding = get_embedding(query)
+	from ai_comms_hub.api.llm import get_llm_settings
+	from ai_comms_hub.services import lexical_index
 
-		# Search Qdrant
-		settings = get_qdrant_settings()
+	try:
+		budget = (latency_budget_ms or get_latency_budget()) / 1000.0
+		deadline = time.monotonic() + budget
+		limit = top_k * CHUNK_OVERSAMPLE
 
-		response = requests.post(
-			f"{settings['url']}/collections/{settings['collection']}/points/search",
-			headers=get_qdrant_headers(settings),
-			json={
-				"vector": embedding,
-				"limit": top_k,
-				"score_threshold": score_threshold,
-				"with_payload": True
-			},
-			timeout=10
+		future = _vector_search_pool.submit(
+			vector_search, query, limit, score_threshold,
+			get_qdrant_settings(), get_llm_settings(), budget
 		)
+		lexical = lexical_index.search(query, limit, max_time=budget)
 
-		response.raise_for_status()
-		results = response.json()
-
-		# Format results
-		documents = []
-		for hit in results.get("result", []):
-			documents.append({
-				"id": hit["id"],
-				"score": hit["score"],
-				"title": hit["payload"].get("title", ""),
-				"content": hit["payload"].get("content", ""),
-				"source": hit["payload"].get("source", ""),
-				"metadata": hit["payload"].get("metadata", {})
-			})
-
-		return documents
+		try:
+			vector = future.result(timeout=max(deadline - time.monotonic(), 0))
+		except FutureTimeoutError:
+			vector = []
+			frappe.logger().warning(f"Vector search exceeded {budget:.2f}s budget, using lexical results")
+		except Exception:
+			vector = []
+			frappe.log_error(frappe.get_traceback(), "Qdrant Query Error")
+
+		fused = reciprocal_rank_fusion(vector, lexical)
+		return merge_adjacent(fused, score_keys=("rrf_score", "score", "vector_score"))[:top_k]
 
 	except Exception as e:
 		frappe.log_error(frappe.get_traceback(), "Qdrant Query Error")
 		return []
 
 
+def vector_search(query, limit, score_threshold, settings, llm_settings, timeout=10):
+	"""
+	Semantic search in Qdrant returning raw chunk hits.
+
+	Takes pre-loaded settings and does no database access, so it can run in a
+	worker thread.
+	"""
+	embedding = request_embeddings(query, llm_settings, timeout)[0]
+
+	response = requests.post(
+		f"{settings['url']}/collections/{settings['collection']}/points/search",
+		headers=get_qdrant_headers(settings),
+		json={
+			"vector": embedding,
+			"limit": limit,
+			"score_threshold": score_threshold,
+			"with_payload": True
+		},
+		timeout=timeout
+	)
+	response.raise_for_status()
+
+	return [{
+		"id": str(hit["id"]),
+		"score": hit["score"],
+		"vector_score": hit["score"],
+		"title": hit["payload"].get("title", ""),
+		"content": hit["payload"].get("content", ""),
+		"source": hit["payload"].get("source", ""),
+		"metadata": hit["payload"].get("metadata", {}),
+		"parent_id": hit["payload"].get("parent_id"),
+		"chunk_index": hit["payload"].get("chunk_index"),
+		"overlap_chars": hit["payload"].get("overlap_chars", 0)
+	} for hit in response.json().get("result", [])]
+
+
+def get_confidence(results):
+	"""
+	Average confidence of knowledge base results.
+
+	Only hits that carry a confidence signal count: hits found by vector
+	search, hits scored by the cross-encoder, and lexical hits matching the
+	query's codes. Lexical-only hits (including every hit when vector search
+	timed out or failed) only contributed their rank.
+
+	Args:
+		results (list): query_knowledge_base or reranker results
+
+	Returns:
+		float: Average score, or None when no hit carries a confidence signal
+	"""
+	from ai_comms_hub.services.reranker import CROSS_ENCODER
+
+	scores = [
+		hit.get("score") or 0
+		for hit in results or []
+		if hit.get("vector_score")
+		or hit.get("reranker") == CROSS_ENCODER
+		or (not hit.get("reranker") and hit.get("score"))
+	]
+	return sum(scores) / len(scores) if scores else None
+
+
+def reciprocal_rank_fusion(*rankings, k=RRF_K):
+	"""
+	Combine ranked hit lists with reciprocal rank fusion.
+
+	Hits are matched by point ID; each list contributes 1 / (k + rank).
+
+	Returns:
+		list: Hits with rrf_score, best score and the fields of the first list
+			that contained them, ordered by rrf_score
+	"""
+	fused = {}
+	for ranking in rankings:
+		for rank, hit in enumerate(ranking, start=1):
+			entry = fused.get(hit["id"])
+			if entry is None:
+				entry = fused[hit["id"]] = dict(hit, rrf_score=0.0)
+			else:
+				entry.update({key: value for key, value in hit.items() if key not in entry})
+				entry["score"] = max(entry["score"], hit["score"])
+			entry["rrf_score"] += 1.0 / (k + rank)
+
+	return sorted(fused.values(), key=lambda hit: hit["rrf_score"], reverse=True)
+
+
+def request_embeddings(texts, settings, timeout=10):
+	"""
+	Call the embeddings API (no database access).
+
+	Args:
+		texts (str|list): Text or texts to embed
+		settings (dict): get_llm_settings() result
+
+	Returns:
+		list: Embedding vectors in input order
+	"""
+	response = requests.post(
+		f"{settings['api_url']}/embeddings",
+		headers={
+			"Authorization": f"Bearer {settings['api_key']}",
+			"Content-Type": "application/json"
+		},
+		json={
+			"model": "text-embedding-3-small",
+			"input": texts
+		},
+		timeout=timeout
+	)
+	response.raise_for_status()
+
+	data = sorted(response.json()["data"], key=lambda item: item["index"])
+	return [item["embedding"] for item in data]
+
+
 def get_embedding(text):
 	"""
 	Get text embedding from naga.ac API.
@@ -100,81 +245,190 @@ def get_embedding(text):
 	"""
 	from ai_comms_hub.api.llm import get_llm_settings
 
+	try:
+		return request_embeddings(text, get_llm_settings())[0]
+
+	except Exception as e:
+		frappe.log_error(f"Embedding Error: {str(e)}", "RAG")
+		raise
+
+
+def get_embeddings(texts):
+	"""
+	Get embeddings for several texts, EMBEDDING_BATCH_SIZE per request.
+
+	Args:
+		texts (list): Texts to embed
+
+	Returns:
+		list: Embedding vectors in input order
+	"""
+	from ai_comms_hub.api.llm import get_llm_settings
+
 	settings = get_llm_settings()
+	embeddings = []
+
+	for start in range(0, len(texts), EMBEDDING_BATCH_SIZE):
+		embeddings.extend(request_embeddings(texts[start:start + EMBEDDING_BATCH_SIZE], settings, timeout=30))
+
+	return embeddings
+
+
+def get_parent_id(content, title="", source="", metadata=None):
+	"""Stable ID of the document a set of chunks belongs to."""
+	metadata = metadata or {}
+	if metadata.get("doctype"):
+		return f"{metadata['doctype']}:{metadata.get('name') or metadata['doctype']}"
+	if title:
+		return f"{source}:{title}"
+
+	import hashlib
+	return f"{source}:{hashlib.md5(content.encode()).hexdigest()}"
+
+
+def get_chunk_point_id(parent_id, chunk_hash, occurrence=0):
+	"""Qdrant point ID for a chunk (identical chunks of a document are numbered)."""
+	return str(uuid.uuid5(uuid.NAMESPACE_URL, f"{parent_id}#{chunk_hash}#{occurrence}"))
+
+
+def get_document_chunks(parent_id, settings=None):
+	"""
+	Stored chunks of a document, without vectors.
+
+	Returns:
+		dict: point ID -> payload
+	"""
+	settings = settings or get_qdrant_settings()
+	points = {}
+	offset = None
+
+	while True:
+		body = {
+			"filter": {"must": [{"key": "parent_id", "match": {"value": parent_id}}]},
+			"limit": 256,
+			"with_payload": ["chunk_index", "chunk_hash"],
+			"with_vector": False
+		}
+		if offset is not None:
+			body["offset"] = offset
 
-	try:
 		response = requests.post(
-			f"{settings['api_url']}/embeddings",
-			headers={
-				"Authorization": f"Bearer {settings['api_key']}",
-				"Content-Type": "application/json"
-			},
-			json={
-				"model": "text-embedding-3-small",
-				"input": text
-			},
+			f"{settings['url']}/collections/{settings['collection']}/points/scroll",
+			headers=get_qdrant_headers(settings),
+			json=body,
 			timeout=10
 		)
-
 		response.raise_for_status()
-		result = response.json()
+		result = response.json().get("result", {})
 
-		return result["data"][0]["embedding"]
+		for point in result.get("points", []):
+			points[str(point["id"])] = point.get("payload") or {}
 
-	except Exception as e:
-		frappe.log_error(f"Embedding Error: {str(e)}", "RAG")
-		raise
+		offset = result.get("next_page_offset")
+		if offset is None:
+			return points
 
 
-def insert_document(content, title="", source="", metadata=None):
+def insert_document(content, title="", source="", metadata=None, parent_id=None):
 	"""
-	Insert document into Qdrant knowledge base.
+	Insert or update a document in the Qdrant knowledge base.
+
+	The document is split into chunks; only chunks not already stored for the
+	document are embedded, unchanged chunks just get their position updated and
+	chunks that disappeared are deleted. The lexical index is updated the same way.
 
 	Args:
 		content (str): Document content
 		title (str): Document title
 		source (str): Source reference
 		metadata (dict): Additional metadata
+		parent_id (str): Document ID (defaults to doctype:name from metadata)
 
 	Returns:
 		dict: Insertion result
 	"""
-	try:
-		# Get embedding
-		embedding = get_embedding(content)
+	from ai_comms_hub.services import lexical_index
 
-		# Insert into Qdrant
+	try:
 		settings = get_qdrant_settings()
+		headers = get_qdrant_headers(settings)
+		parent_id = parent_id or get_parent_id(content, title, source, metadata)
+
+		chunks = split_document(content, title=title)
+		existing = get_document_chunks(parent_id, settings)
+
+		occurrences = {}
+		new_points = []
+		moved = []
+		indexed = []
+		now = frappe.utils.now()
+
+		for chunk in chunks:
+			occurrence = occurrences.get(chunk["hash"], 0)
+			occurrences[chunk["hash"]] = occurrence + 1
+			point_id = get_chunk_point_id(parent_id, chunk["hash"], occurrence)
+
+			payload = {
+				"title": title,
+				"content": chunk["text"],
+				"source": source,
+				"metadata": metadata or {},
+				"heading": chunk["heading"],
+				"parent_id": parent_id,
+				"chunk_index": chunk["index"],
+				"chunk_count": len(chunks),
+				"chunk_hash": chunk["hash"],
+				"overlap_chars": chunk["overlap_chars"]
+			}
+			indexed.append(dict(chunk, point_id=point_id, title=title, source=source, metadata=metadata))
+
+			if point_id in existing:
+				moved.append((point_id, payload))
+			else:
+				payload["created_at"] = now
+				new_points.append((point_id, chunk["embed_text"], payload))
+
+		if new_points:
+			embeddings = get_embeddings([text for _, text, _ in new_points])
+			response = requests.put(
+				f"{settings['url']}/collections/{settings['collection']}/points",
+				headers=headers,
+				json={
+					"points": [
+						{"id": point_id, "vector": vector, "payload": payload}
+						for (point_id, _, payload), vector in zip(new_points, embeddings)
+					]
+				},
+				timeout=30
+			)
+			response.raise_for_status()
+
+		operations = [
+			{"set_payload": {"payload": payload, "points": [point_id]}}
+			for point_id, payload in moved
+		]
+		kept = {point_id for point_id, _ in moved} | {point_id for point_id, _, _ in new_points}
+		stale = [point_id for point_id in existing if point_id not in kept]
+		if stale:
+			operations.append({"delete": {"points": stale}})
+
+		if operations:
+			response = requests.post(
+				f"{settings['url']}/collections/{settings['collection']}/points/batch",
+				headers=headers,
+				json={"operations": operations},
+				timeout=30
+			)
+			response.raise_for_status()
 
-		import hashlib
-		doc_id = hashlib.md5(content.encode()).hexdigest()
-
-		response = requests.put(
-			f"{settings['url']}/collections/{settings['collection']}/points",
-			headers=get_qdrant_headers(settings),
-			json={
-				"points": [
-					{
-						"id": doc_id,
-						"vector": embedding,
-						"payload": {
-							"title": title,
-							"content": content,
-							"source": source,
-							"metadata": metadata or {},
-							"created_at": frappe.utils.now()
-						}
-					}
-				]
-			},
-			timeout=10
-		)
-
-		response.raise_for_status()
+		lexical_index.sync_document(parent_id, indexed)
 
 		return {
 			"status": "success",
-			"doc_id": doc_id
+			"doc_id": parent_id,
+			"chunks": len(chunks),
+			"embedded": len(new_points),
+			"deleted": len(stale)
 		}
 
 	except Exception as e:
@@ -214,10 +468,45 @@ def create_collection_if_not_exists():
 			create_response.raise_for_status()
 			frappe.log("Qdrant collection created successfully")
 
+		# Chunk lookups filter on parent_id
+		requests.put(
+			f"{settings['url']}/collections/{settings['collection']}/index",
+			headers=get_qdrant_headers(settings),
+			json={"field_name": "parent_id", "field_schema": "keyword"},
+			timeout=10
+		).raise_for_status()
+
 	except Exception as e:
 		frappe.log_error(f"Qdrant Collection Error: {str(e)}")
 
 
+def delete_unchunked_points():
+	"""
+	Delete whole-document points stored before chunking.
+
+	They have no parent_id and are re-created as chunks by the next sync;
+	points from sources that are not synced from Frappe are kept.
+	"""
+	settings = get_qdrant_settings()
+
+	try:
+		response = requests.post(
+			f"{settings['url']}/collections/{settings['collection']}/points/delete",
+			headers=get_qdrant_headers(settings),
+			json={
+				"filter": {
+					"must": [{"is_empty": {"key": "parent_id"}}],
+					"must_not": [{"key": "source", "match": {"any": UNSYNCED_SOURCES}}]
+				}
+			},
+			timeout=30
+		)
+		response.raise_for_status()
+
+	except Exception as e:
+		frappe.log_error(f"Qdrant Legacy Cleanup Error: {str(e)}", "RAG")
+
+
 def sync_erpnext_knowledge():
 	"""
 	Sync ERPNext knowledge base to Qdrant.
@@ -230,6 +519,7 @@ def sync_erpnext_knowledge():
 	"""
 	try:
 		create_collection_if_not_exists()
+		delete_unchunked_points()
 
 		# Sync products
 		sync_products()
@@ -304,8 +594,8 @@ def sync_help_articles():
 
 		synced_count = 0
 		for article in articles:
-			# Clean HTML content
-			clean_content = frappe.utils.strip_html_tags(article.content or "")
+			# Convert HTML, keeping headings and paragraphs for chunking
+			clean_content = html_to_text(article.content or "")
 
 			if not clean_content.strip():
 				continue
@@ -318,7 +608,8 @@ def sync_help_articles():
 
 			content = f"""Help Article: {article.title}
 Category: {category_name}
-Content: {clean_content}
+
+{clean_content}
 """
 
 			insert_document(
@@ -342,6 +633,52 @@ Content: {clean_content}
 		frappe.log_error(frappe.get_traceback(), "Help Article Sync Error")
 
 
+def get_article_document(article):
+	"""
+	Knowledge base document for a Knowledge Base Article.
+
+	Args:
+		article: Knowledge Base Article doc or row with name, title, category and content
+
+	Returns:
+		dict: insert_document keyword arguments
+	"""
+	return {
+		"content": f"""Knowledge Base Article: {article.title}
+Category: {article.category or 'General'}
+
+{html_to_text(article.content or "")}
+""",
+		"title": article.title,
+		"source": "Knowledge Base Article",
+		"metadata": {
+			"doctype": "Knowledge Base Article",
+			"name": article.name,
+			"category": article.category
+		}
+	}
+
+
+def index_knowledge_base_article(article_name):
+	"""
+	Insert/update a Knowledge Base Article's chunks and record the embedding status.
+
+	Returns:
+		dict: insert_document result
+	"""
+	article = frappe.get_doc("Knowledge Base Article", article_name)
+	result = insert_document(**get_article_document(article))
+
+	frappe.db.set_value(
+		"Knowledge Base Article",
+		article_name,
+		"embedding_status",
+		"Completed" if result.get("status") == "success" else "Failed",
+		update_modified=False
+	)
+	return result
+
+
 def sync_faqs():
 	"""
 	Sync FAQs to knowledge base.
@@ -510,7 +847,7 @@ Email: {getattr(company, 'email', 'Not specified') or 'Not specified'}
 			about_us = frappe.get_single("About Us Settings")
 
 			if about_us.company_introduction:
-				clean_intro = frappe.utils.strip_html_tags(about_us.company_introduction)
+				clean_intro = html_to_text(about_us.company_introduction)
 
 				content = f"""About Us:
 {clean_intro}
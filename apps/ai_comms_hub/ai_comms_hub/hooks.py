@@ -103,7 +103,15 @@ required_apps = ["frappe", "erpnext"]
 doc_events = {
 	"Customer": {
 		"after_insert": "ai_comms_hub.api.customer.create_default_communication_settings",
-		"on_update": "ai_comms_hub.api.customer.sync_customer_to_channels",
+		"on_update": [
+			"ai_comms_hub.api.customer.sync_customer_to_channels",
+			"ai_comms_hub.utils.contact_identity.index_customer",
+		],
+		"on_trash": "ai_comms_hub.utils.contact_identity.remove_identities",
+	},
+	"Contact": {
+		"on_update": "ai_comms_hub.utils.contact_identity.index_contact",
+		"on_trash": "ai_comms_hub.utils.contact_identity.remove_identities",
 	},
 	"Communication Hub": {
 		"after_insert": "ai_comms_hub.api.communication.on_hub_created",
@@ -111,6 +119,7 @@ doc_events = {
 		"before_submit": "ai_comms_hub.api.communication.before_hub_closed",
 	},
 	"Communication Message": {
+		"before_insert": "ai_comms_hub.api.message.claim_platform_message_id",
 		"after_insert": "ai_comms_hub.api.message.on_message_created",
 		"validate": "ai_comms_hub.api.message.validate_message",
 	},
@@ -125,7 +134,9 @@ doc_events = {
 # ---------------
 scheduler_events = {
 	"all": [
-		"ai_comms_hub.tasks.all.cleanup_old_sessions"
+		"ai_comms_hub.tasks.all.cleanup_old_sessions",
+		"ai_comms_hub.webhooks.inbox.retry_pending_events",
+		"ai_comms_hub.services.enrichment.drain_pending"
 	],
 	"hourly": [
 		"ai_comms_hub.tasks.hourly.sync_pending_messages",
@@ -135,7 +146,14 @@ scheduler_events = {
 		"ai_comms_hub.tasks.daily.generate_analytics_report",
 		"ai_comms_hub.tasks.daily.cleanup_old_conversations",
 		"ai_comms_hub.tasks.daily.sync_knowledge_base",
-		"ai_comms_hub.services.qdrant_faq_sync.verify_sync_integrity"
+		"ai_comms_hub.services.qdrant_faq_sync.verify_sync_integrity",
+		"ai_comms_hub.webhooks.inbox.purge_processed_events",
+		"ai_comms_hub.utils.idempotency.purge_expired_keys",
+		"ai_comms_hub.utils.attachments.purge_stale_spool"
+	],
+	"daily_long": [
+		"ai_comms_hub.utils.contact_identity.rebuild_contact_identities",
+		"ai_comms_hub.tasks.daily.cleanup.cleanup_vector_database"
 	],
 	"weekly": [
 		"ai_comms_hub.tasks.weekly.generate_weekly_summary"
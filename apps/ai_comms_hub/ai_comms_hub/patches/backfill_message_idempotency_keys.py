@@ -0,0 +1,10 @@
+# Copyright (c) 2026, VisualGraphX and contributors
+# For license information, please see license.txt
+
+"""Claim idempotency keys for inbound messages stored before the key table existed."""
+
+from ai_comms_hub.utils.idempotency import backfill_keys
+
+
+def execute():
+	backfill_keys()
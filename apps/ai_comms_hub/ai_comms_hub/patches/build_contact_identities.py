@@ -0,0 +1,10 @@
+# Copyright (c) 2026, VisualGraphX and contributors
+# For license information, please see license.txt
+
+"""Index phone numbers, emails and social IDs of existing Customers and Contacts."""
+
+from ai_comms_hub.utils.contact_identity import rebuild_contact_identities
+
+
+def execute():
+	rebuild_contact_identities()
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# Copyright (c) 2026, VisualGraphX and contributors
+# For license information, please see license.txt
+
+"""
+Conversation memory for the AI engine.
+
+The LLM sees two things about a conversation:
+- a sliding window of the most recent turns, trimmed to a token budget
+  (AI Communications Hub Settings.context_token_budget)
+- a rolling summary of everything before it, stored in Communication Hub.context
+  and injected into the system prompt by build_system_prompt
+
+The summary is updated incrementally: only messages newer than
+Communication Hub.context_summarized_until are folded into the previous summary,
+and only once summary_interval new messages have accumulated (checked by the
+enrichment worker, see services/enrichment.py).
+"""
+
+import frappe
+from frappe.utils import cint
+
+
+DEFAULT_TOKEN_BUDGET = 1500
+DEFAULT_SUMMARY_INTERVAL = 6
+MAX_WINDOW_MESSAGES = 40
+MAX_FOLD_MESSAGES = 50
+MESSAGE_TOKEN_OVERHEAD = 4  # role/separator tokens per chat message
+DIALOGUE_SENDERS = ("Customer", "AI", "Agent")
+
+SUMMARY_PROMPT = (
+	"You maintain a running summary of a customer service conversation. "
+	"Update the summary below with the new messages. Keep it to 3-5 sentences, "
+	"noting the customer's main issue, details they provided and the current status."
+)
+
+
+def estimate_tokens(text):
+	"""
+	Approximate token count of a text (~4 characters per token).
+
+	Args:
+		text (str): Text to measure
+
+	Returns:
+		int: Estimated tokens
+	"""
+	return (len(text or "") + 3) // 4
+
+
+def get_token_budget():
+	"""Token budget for the recent-message window."""
+	budget = frappe.db.get_single_value("AI Communications Hub Settings", "context_token_budget")
+	return cint(budget) or DEFAULT_TOKEN_BUDGET
+
+
+def get_summary_interval():
+	"""Number of new messages between summary refreshes."""
+	interval = frappe.db.get_single_value("AI Communications Hub Settings", "summary_interval")
+	return cint(interval) or DEFAULT_SUMMARY_INTERVAL
+
+
+def get_recent_messages(hub_id, token_budget=None, max_messages=MAX_WINDOW_MESSAGES):
+	"""
+	Latest dialogue messages of a conversation that fit in the token budget.
+
+	The newest message is always included. System notes (escalations,
+	function call markers) are left out.
+
+	Args:
+		hub_id (str): Communication Hub ID
+		token_budget (int, optional): Token budget, defaults to the settings value
+		max_messages (int): Upper bound on messages read
+
+	Returns:
+		list: Messages in chronological order
+	"""
+	budget = token_budget or get_token_budget()
+
+	latest = frappe.get_all(
+		"Communication Message",
+		filters={
+			"communication_hub": hub_id,
+			"sender_type": ["in", DIALOGUE_SENDERS]
+		},
+		fields=["sender_type", "sender_name", "content", "timestamp"],
+		order_by="timestamp desc",
+		limit=max_messages
+	)
+
+	window = []
+	used = 0
+	for msg in latest:
+		cost = estimate_tokens(msg.content) + MESSAGE_TOKEN_OVERHEAD
+		if window and used + cost > budget:
+			break
+		window.append(msg)
+		used += cost
+
+	window.reverse()
+	return window
+
+
+def summary_due(hub_id, summarized_until=None):
+	"""
+	Check whether enough new messages arrived since the last summary.
+
+	Args:
+		hub_id (str): Communication Hub ID
+		summarized_until (datetime, optional): Current watermark, read from the hub if omitted
+
+	Returns:
+		bool: True if the summary should be refreshed
+	"""
+	if summarized_until is None:
+		summarized_until = frappe.db.get_value("Communication Hub", hub_id, "context_summarized_until")
+
+	filters = {
+		"communication_hub": hub_id,
+		"sender_type": ["in", DIALOGUE_SENDERS]
+	}
+	if summarized_until:
+		filters["timestamp"] = [">", summarized_until]
+
+	return frappe.db.count("Communication Message", filters) >= get_summary_interval()
+
+
+def get_hubs_due_for_summary(hub_ids):
+	"""
+	Batch version of summary_due.
+
+	Args:
+		hub_ids (list): Communication Hub IDs
+
+	Returns:
+		list: IDs of hubs with at least summary_interval messages since their last summary
+	"""
+	if not hub_ids:
+		return []
+
+	return frappe.db.sql_list("""
+		SELECT h.name
+		FROM `tabCommunication Hub` h
+		JOIN `tabCommunication Message` m
+			ON m.communication_hub = h.name
+			AND m.sender_type IN %(senders)s
+			AND (h.context_summarized_until IS NULL OR m.timestamp > h.context_summarized_until)
+		WHERE h.name IN %(hubs)s
+		GROUP BY h.name
+		HAVING COUNT(*) >= %(interval)s
+	""", {"senders": DIALOGUE_SENDERS, "hubs": hub_ids, "interval": get_summary_interval()})
+
+
+def refresh_summary(hub_id, force=False):
+	"""
+	Fold messages newer than the watermark into the rolling summary.
+
+	Args:
+		hub_id (str): Communication Hub ID
+		force (bool): Summarize even if fewer than summary_interval messages are new
+
+	Returns:
+		str: Updated summary, or None if nothing changed
+	"""
+	hub = frappe.db.get_value(
+		"Communication Hub", hub_id,
+		["context", "context_summarized_until"],
+		as_dict=True
+	)
+	if not hub:
+		return None
+
+	filters = {
+		"communication_hub": hub_id,
+		"sender_type": ["in", DIALOGUE_SENDERS]
+	}
+	if hub.context_summarized_until:
+		filters["timestamp"] = [">", hub.context_summarized_until]
+
+	new_messages = frappe.get_all(
+		"Communication Message",
+		filters=filters,
+		fields=["sender_type", "content", "timestamp"],
+		order_by="timestamp asc",
+		limit=MAX_FOLD_MESSAGES
+	)
+	if not new_messages or (not force and len(new_messages) < get_summary_interval()):
+		return None
+
+	conv_text = "\n".join([
+		f"{'Customer' if m.sender_type == 'Customer' else 'Assistant'}: {(m.content or '')[:500]}"
+		for m in new_messages
+	])
+	text = f"Current summary:\n{hub.context or '(none yet)'}\n\nNew messages:\n{conv_text}"
+
+	from ai_comms_hub.api.llm import generate_summary
+	summary = generate_summary(text, SUMMARY_PROMPT)
+
+	frappe.db.set_value(
+		"Communication Hub", hub_id,
+		{
+			"context": summary,
+			"context_summarized_until": new_messages[-1].timestamp
+		},
+		update_modified=False
+	)
+	return summary
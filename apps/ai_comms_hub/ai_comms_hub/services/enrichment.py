@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# Copyright (c) 2026, VisualGraphX and contributors
+# For license information, please see license.txt
+
+"""
+Conversation enrichment worker.
+
+After an AI reply the engine only marks the hub as pending (a Redis set) and
+wakes a single deduplicated worker. The worker waits a short collection window
+so bursts of replies coalesce, then for each batch of pending hubs:
+- scores sentiment locally (api.sentiment rule-based analyzer) on the latest
+  customer messages, loaded for all hubs in one query, and writes the results
+  with one UPDATE per sentiment value
+- refreshes the rolling context summary only for hubs whose transcript grew by
+  at least summary_interval messages since the last summary
+
+The scheduler drains anything left behind (e.g. hubs marked while a worker was
+finishing). Only one worker runs at a time; its lock (utils.locks) is refreshed
+after every batch.
+"""
+
+import time
+
+import frappe
+from frappe.utils import cint
+
+from ai_comms_hub.services.conversation_memory import get_hubs_due_for_summary, refresh_summary
+from ai_comms_hub.utils.locks import acquire_lock, refresh_lock, release_lock
+
+
+PENDING_KEY = "ai_comms_hub:enrichment:pending"
+WORKER_JOB_ID = "ai_comms_hub_enrichment"
+LOCK_KEY = "ai_comms_hub:enrichment:lock"
+LOCK_TTL = 600  # seconds; refreshed after every batch
+COLLECT_WINDOW = 5  # seconds to let a burst of replies accumulate
+BATCH_SIZE = 200
+SENTIMENT_MESSAGES = 3  # latest customer messages scored per hub
+SENTIMENTS = ("Positive", "Neutral", "Negative")
+
+
+def mark_hub_for_enrichment(hub_id):
+	"""
+	Queue a hub for sentiment/summary enrichment.
+
+	Args:
+		hub_id (str): Communication Hub ID
+	"""
+	frappe.cache().sadd(PENDING_KEY, hub_id)
+	wake_worker()
+
+
+def wake_worker():
+	"""Enqueue the enrichment worker unless one is already queued or running."""
+	frappe.enqueue(
+		"ai_comms_hub.services.enrichment.process_pending",
+		queue="short",
+		job_id=WORKER_JOB_ID,
+		deduplicate=True,
+		enqueue_after_commit=True
+	)
+
+
+def _take_pending(limit):
+	"""Remove and return up to ``limit`` pending hub IDs."""
+	cache = frappe.cache()
+	members = [frappe.safe_decode(m) for m in (cache.smembers(PENDING_KEY) or [])][:limit]
+	if members:
+		cache.srem(PENDING_KEY, *members)
+	return members
+
+
+def _latest_customer_messages(hub_ids):
+	"""
+	Latest customer messages for each hub, in one query.
+
+	Returns:
+		dict: hub ID -> combined text of its latest SENTIMENT_MESSAGES customer messages
+	"""
+	rows = frappe.db.sql("""
+		SELECT communication_hub, content
+		FROM (
+			SELECT
+				communication_hub,
+				content,
+				ROW_NUMBER() OVER (PARTITION BY communication_hub ORDER BY timestamp DESC) AS rn
+			FROM `tabCommunication Message`
+			WHERE communication_hub IN %(hubs)s AND sender_type = 'Customer'
+		) latest
+		WHERE rn <= %(limit)s
+	""", {"hubs": hub_ids, "limit": SENTIMENT_MESSAGES}, as_dict=True)
+
+	texts = {}
+	for row in rows:
+		texts.setdefault(row.communication_hub, []).append(row.content or "")
+	return {hub_id: " ".join(parts) for hub_id, parts in texts.items()}
+
+
+def update_sentiments(hub_ids):
+	"""
+	Score and store sentiment for a batch of hubs.
+
+	Returns:
+		dict: hub ID -> sentiment
+	"""
+	from ai_comms_hub.api.sentiment import analyze_sentiment
+
+	results = {
+		hub_id: analyze_sentiment(text)["sentiment"]
+		for hub_id, text in _latest_customer_messages(hub_ids).items()
+	}
+
+	for sentiment in SENTIMENTS:
+		names = [hub_id for hub_id, value in results.items() if value == sentiment]
+		if names:
+			frappe.db.sql("""
+				UPDATE `tabCommunication Hub`
+				SET sentiment = %(sentiment)s
+				WHERE name IN %(names)s AND IFNULL(sentiment, '') != %(sentiment)s
+			""", {"sentiment": sentiment, "names": names})
+
+	return results
+
+
+def process_batch(hub_ids):
+	"""
+	Enrich one batch of hubs.
+
+	Args:
+		hub_ids (list): Communication Hub IDs
+	"""
+	hub_ids = frappe.get_all("Communication Hub", filters={"name": ["in", hub_ids]}, pluck="name")
+	if not hub_ids:
+		return
+
+	try:
+		update_sentiments(hub_ids)
+		frappe.db.commit()
+	except Exception:
+		frappe.db.rollback()
+		frappe.log_error(frappe.get_traceback(), "Enrichment Sentiment Error")
+
+	for hub_id in get_hubs_due_for_summary(hub_ids):
+		try:
+			refresh_summary(hub_id)
+			frappe.db.commit()
+		except Exception:
+			frappe.db.rollback()
+			frappe.log_error(frappe.get_traceback(), f"Enrichment Summary Error: {hub_id}")
+
+
+def process_pending(batch_size=BATCH_SIZE, collect_window=COLLECT_WINDOW):
+	"""Drain pending hubs. Only one worker runs at a time (Redis lock)."""
+	token = acquire_lock(LOCK_KEY, LOCK_TTL)
+	if not token:
+		return
+
+	try:
+		if collect_window:
+			time.sleep(collect_window)
+
+		while True:
+			hub_ids = _take_pending(cint(batch_size) or BATCH_SIZE)
+			if not hub_ids:
+				break
+			process_batch(hub_ids)
+			if not refresh_lock(LOCK_KEY, token, LOCK_TTL):
+				# Lapsed mid-drain; another worker may be draining the set now
+				frappe.logger().warning("Enrichment: worker lock lost, stopping")
+				break
+	finally:
+		release_lock(LOCK_KEY, token)
+
+
+def drain_pending():
+	"""Scheduler safety net: process hubs marked while no worker was queued."""
+	if frappe.cache().scard(PENDING_KEY):
+		process_pending(collect_window=0)
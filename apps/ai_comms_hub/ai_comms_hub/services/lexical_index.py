@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+# Copyright (c) 2026, VisualGraphX and contributors
+# For license information, please see license.txt
+
+"""
+Lexical (BM25) index over knowledge base chunks.
+
+Every chunk stored in Qdrant by rag.insert_document is mirrored as a Knowledge
+Chunk (named by its Qdrant point ID) with its term frequencies in Knowledge
+Chunk Term. The tokenizer keeps codes such as "BC-500" or "13oz" intact and
+also indexes their parts ("bc", "500", "bc500"), which is what embedding search
+handles poorly.
+
+The index is maintained per document by the sync jobs: chunks that are new get
+their postings inserted, chunks that disappeared are deleted, and unchanged
+chunks are left alone. Scoring happens in one SQL statement bounded by a
+statement time limit.
+"""
+
+import json
+import re
+from math import log
+
+import frappe
+from frappe.utils import cint, flt, now_datetime
+
+
+K1 = 1.2
+B = 0.75
+STATS_CACHE_KEY = "ai_comms_hub:lexical_index:stats"
+STATS_TTL = 300  # seconds
+MAX_TERM_LENGTH = 64
+# Confidence reported for a chunk containing every code in the query (rag "score"
+# is 0-1). Plain word overlap only contributes its rank to the fusion: matching
+# common words says little about whether a chunk answers the question.
+CODE_MATCH_CONFIDENCE = 0.9
+
+TOKEN_RE = re.compile(r"[a-z0-9]+(?:[-./][a-z0-9]+)*")
+STOPWORDS = frozenset("""
+a an and are as at be but by can do does for from has have how i if in is it
+me my no not of on or our so that the their there this to was we what when
+where which who will with you your
+""".split())
+
+
+def tokenize(text):
+	"""
+	Index terms for a text.
+
+	Returns:
+		list: terms, compound tokens followed by their parts and joined form
+	"""
+	terms = []
+	for token in TOKEN_RE.findall((text or "").lower()):
+		if token in STOPWORDS or len(token) > MAX_TERM_LENGTH:
+			continue
+		terms.append(token)
+
+		parts = re.split(r"[-./]", token)
+		if len(parts) > 1:
+			terms.extend(part for part in parts if part not in STOPWORDS)
+			terms.append("".join(parts))
+	return terms
+
+
+def _query_terms(query):
+	"""(all terms, code terms) for a query; codes are tokens with a digit, e.g. "bc-500", "13oz"."""
+	codes = {
+		token for token in TOKEN_RE.findall((query or "").lower())
+		if len(token) <= MAX_TERM_LENGTH and any(char.isdigit() for char in token)
+	}
+	return set(tokenize(query)), codes
+
+
+def _term_frequencies(terms):
+	frequencies = {}
+	for term in terms:
+		frequencies[term] = frequencies.get(term, 0) + 1
+	return frequencies
+
+
+def sync_document(document_id, chunks):
+	"""
+	Bring the index for one document in line with its current chunks.
+
+	Args:
+		document_id (str): rag parent_id
+		chunks (list): dicts with point_id, index, text, embed_text, title,
+			source, metadata and overlap_chars
+	"""
+	existing = {
+		row.name: row for row in frappe.get_all(
+			"Knowledge Chunk",
+			filters={"document_id": document_id},
+			fields=["name", "chunk_index", "title", "source", "metadata"]
+		)
+	}
+	current = {chunk["point_id"]: chunk for chunk in chunks}
+
+	stale = [point_id for point_id in existing if point_id not in current]
+	if stale:
+		_delete_chunks(stale)
+
+	for point_id, chunk in current.items():
+		row = existing.get(point_id)
+		if not row:
+			continue
+		values = {
+			"chunk_index": chunk["index"],
+			"title": chunk.get("title") or "",
+			"source": chunk.get("source") or "",
+			"metadata": json.dumps(chunk.get("metadata") or {})
+		}
+		stored = (cint(row.chunk_index), row.title or "", row.source or "", row.metadata or "{}")
+		if stored != tuple(values.values()):
+			frappe.db.set_value("Knowledge Chunk", point_id, values, update_modified=False)
+
+	new = [chunk for point_id, chunk in current.items() if point_id not in existing]
+	if new:
+		_insert_chunks(document_id, new)
+
+	if stale or new:
+		frappe.cache().delete_value(STATS_CACHE_KEY)
+
+
+def _insert_chunks(document_id, chunks):
+	now = now_datetime()
+	user = frappe.session.user
+	chunk_rows = []
+	term_rows = []
+
+	for chunk in chunks:
+		terms = tokenize(chunk["embed_text"])
+		chunk_rows.append((
+			chunk["point_id"], now, now, user, user,
+			document_id, chunk["index"], chunk.get("title"), chunk.get("source"),
+			chunk["text"], json.dumps(chunk.get("metadata") or {}), chunk.get("overlap_chars") or 0, len(terms)
+		))
+		term_rows.extend(
+			(frappe.generate_hash(length=12), now, now, user, user, term, chunk["point_id"], tf)
+			for term, tf in _term_frequencies(terms).items()
+		)
+
+	frappe.db.bulk_insert(
+		"Knowledge Chunk",
+		fields=[
+			"name", "creation", "modified", "owner", "modified_by",
+			"document_id", "chunk_index", "title", "source",
+			"content", "metadata", "overlap_chars", "token_count"
+		],
+		values=chunk_rows,
+		ignore_duplicates=True
+	)
+	frappe.db.bulk_insert(
+		"Knowledge Chunk Term",
+		fields=["name", "creation", "modified", "owner", "modified_by", "term", "chunk", "tf"],
+		values=term_rows,
+		ignore_duplicates=True
+	)
+
+
+def _delete_chunks(point_ids):
+	frappe.db.delete("Knowledge Chunk Term", {"chunk": ["in", point_ids]})
+	frappe.db.delete("Knowledge Chunk", {"name": ["in", point_ids]})
+
+
+def delete_document(document_id):
+	"""Remove a document's chunks from the index."""
+	point_ids = frappe.get_all("Knowledge Chunk", filters={"document_id": document_id}, pluck="name")
+	if point_ids:
+		_delete_chunks(point_ids)
+		frappe.cache().delete_value(STATS_CACHE_KEY)
+
+
+def get_corpus_stats():
+	"""
+	Chunk count and average chunk length (cached briefly).
+
+	Returns:
+		dict: chunks, avg_length
+	"""
+	stats = frappe.cache().get_value(STATS_CACHE_KEY)
+	if stats:
+		return stats
+
+	row = frappe.db.sql("""
+		SELECT COUNT(*) AS chunks, AVG(token_count) AS avg_length
+		FROM `tabKnowledge Chunk`
+	""", as_dict=True)[0]
+	stats = {"chunks": cint(row.chunks), "avg_length": flt(row.avg_length) or 1.0}
+	frappe.cache().set_value(STATS_CACHE_KEY, stats, expires_in_sec=STATS_TTL)
+	return stats
+
+
+def search(query, limit=10, max_time=None):
+	"""
+	BM25 search over knowledge chunks.
+
+	Args:
+		query (str): Search query
+		limit (int): Maximum chunks to return
+		max_time (float): Statement time limit in seconds (search returns [] when exceeded)
+
+	Returns:
+		list: Hits ranked by BM25 with lexical_score and score (share of the
+			query's codes found in the chunk, scaled to CODE_MATCH_CONFIDENCE;
+			0 for queries without codes)
+	"""
+	terms, codes = _query_terms(query)
+	if not terms:
+		return []
+
+	stats = get_corpus_stats()
+	if not stats["chunks"]:
+		return []
+
+	document_frequencies = dict(frappe.db.sql("""
+		SELECT term, COUNT(*) FROM `tabKnowledge Chunk Term`
+		WHERE term IN %(terms)s
+		GROUP BY term
+	""", {"terms": list(terms)}))
+	if not document_frequencies:
+		return []
+
+	values = {"limit": cint(limit), "avg_length": stats["avg_length"], "codes": list(codes) or [""]}
+	idf_cases = []
+	for i, (term, df) in enumerate(document_frequencies.items()):
+		values[f"term_{i}"] = term
+		values[f"idf_{i}"] = log(1 + (stats["chunks"] - df + 0.5) / (df + 0.5))
+		idf_cases.append(f"WHEN %(term_{i})s THEN %(idf_{i})s")
+	values["terms"] = list(document_frequencies)
+
+	time_limit = f"SET STATEMENT max_statement_time={flt(max_time):.3f} FOR " if max_time else ""
+
+	try:
+		rows = frappe.db.sql(f"""
+			{time_limit}SELECT
+				c.name, c.document_id, c.chunk_index, c.title, c.source,
+				c.content, c.metadata, c.overlap_chars,
+				SUM(
+					(CASE t.term {" ".join(idf_cases)} ELSE 0 END)
+					* t.tf * {K1 + 1}
+					/ (t.tf + {K1} * (1 - {B} + {B} * c.token_count / %(avg_length)s))
+				) AS bm25,
+				COUNT(DISTINCT CASE WHEN t.term IN %(codes)s THEN t.term END) AS matched_codes
+			FROM `tabKnowledge Chunk Term` t
+			INNER JOIN `tabKnowledge Chunk` c ON c.name = t.chunk
+			WHERE t.term IN %(terms)s
+			GROUP BY c.name
+			ORDER BY bm25 DESC
+			LIMIT %(limit)s
+		""", values, as_dict=True)
+	except Exception:
+		frappe.log_error(frappe.get_traceback(), "Lexical Search Error")
+		return []
+
+	return [{
+		"id": row.name,
+		"score": CODE_MATCH_CONFIDENCE * cint(row.matched_codes) / len(codes) if codes else 0,
+		"lexical_score": flt(row.bm25),
+		"title": row.title or "",
+		"content": row.content or "",
+		"source": row.source or "",
+		"metadata": json.loads(row.metadata or "{}"),
+		"parent_id": row.document_id,
+		"chunk_index": row.chunk_index,
+		"overlap_chars": cint(row.overlap_chars)
+	} for row in rows]
@@ -0,0 +1,525 @@
+#!/usr/bin/env python3
+# Copyright (c) 2026, VisualGraphX and contributors
+# For license information, please see license.txt
+
+"""
+Gateway for every LLM chat call made by the app.
+
+- Providers: the hub LLM (OpenAI-compatible, AI Communications Hub Settings)
+  and the OpenAI / Anthropic translation providers (Language Settings). All
+  calls return an OpenAI-shaped response, whatever the provider.
+- Pooling: one keep-alive HTTP session per provider endpoint per worker, and at
+  most MAX_CONCURRENT in-flight requests per provider per worker.
+- Rate limits: a token bucket per provider for requests and tokens per minute,
+  shared by all workers through Redis. Every attempt, retries included, waits
+  up to MAX_QUEUE_WAIT for capacity, then the call fails over.
+- Retries: 429, 5xx, timeouts, connection errors and unreadable (non-JSON)
+  responses are retried with full jitter exponential backoff (Retry-After is
+  honoured).
+- Failover: when a model keeps failing, the call moves on to the fallback
+  models (get_fallbacks).
+
+Latency, token usage and estimated cost of every call are sampled for
+get_llm_metrics.
+"""
+
+import json
+import random
+import threading
+import time
+
+import frappe
+import requests
+from requests.adapters import HTTPAdapter
+
+from ai_comms_hub.services.conversation_memory import estimate_tokens
+from ai_comms_hub.utils.metrics import get_samples, percentile, record_sample
+
+
+HUB = "Hub"
+OPENAI = "OpenAI"
+ANTHROPIC = "Anthropic"
+
+OPENAI_API_URL = "https://api.openai.com/v1"
+ANTHROPIC_API_URL = "https://api.anthropic.com/v1"
+ANTHROPIC_VERSION = "2023-06-01"
+
+MAX_CONCURRENT = 8  # in-flight requests per provider per worker
+MAX_RETRIES = 3
+BACKOFF_BASE = 0.5  # seconds
+BACKOFF_CAP = 8.0  # seconds
+MAX_QUEUE_WAIT = 10.0  # seconds waiting for rate limit capacity
+RETRYABLE_STATUS = frozenset((408, 409, 429, 500, 502, 503, 504, 529))
+
+BUCKET_KEY = "ai_comms_hub:llm:bucket"
+METRICS_KEY = "ai_comms_hub:llm:calls"
+METRICS_SAMPLES = 1000
+
+# USD per million (input, output) tokens, matched by longest model name prefix
+MODEL_PRICING = {
+	"gpt-4o-mini": (0.15, 0.60),
+	"gpt-4o": (2.50, 10.00),
+	"gpt-4.1-nano": (0.10, 0.40),
+	"gpt-4.1-mini": (0.40, 1.60),
+	"gpt-4.1": (2.00, 8.00),
+	"gpt-3.5-turbo": (0.50, 1.50),
+	"claude-3-haiku": (0.25, 1.25),
+	"claude-3-5-haiku": (0.80, 4.00),
+	"claude-3-5-sonnet": (3.00, 15.00),
+	"claude-3-7-sonnet": (3.00, 15.00),
+	"claude-sonnet-4": (3.00, 15.00)
+}
+
+# Refills and takes from the request and token buckets of a provider, all or
+# nothing. Returns the seconds to wait when either bucket is short.
+TOKEN_BUCKET_SCRIPT = """
+local now = tonumber(ARGV[1])
+local wait = 0
+local levels = {}
+for i = 1, 2 do
+	local capacity = tonumber(ARGV[i * 2])
+	local cost = tonumber(ARGV[i * 2 + 1])
+	if capacity > 0 then
+		local state = redis.call('HMGET', KEYS[i], 'level', 'ts')
+		local level = tonumber(state[1]) or capacity
+		local ts = tonumber(state[2]) or now
+		local rate = capacity / 60
+		level = math.min(capacity, level + math.max(0, now - ts) * rate)
+		cost = math.min(cost, capacity)
+		if level < cost then
+			wait = math.max(wait, (cost - level) / rate)
+		end
+		levels[i] = {level, cost}
+	end
+end
+if wait > 0 then
+	return tostring(wait)
+end
+for i, entry in pairs(levels) do
+	redis.call('HSET', KEYS[i], 'level', entry[1] - entry[2], 'ts', now)
+	redis.call('EXPIRE', KEYS[i], 120)
+end
+return '0'
+"""
+
+
+class LLMGatewayError(requests.exceptions.RequestException):
+	"""An LLM call failed after retries and failover."""
+
+	def __init__(self, message, status_code=None, retryable=False):
+		super().__init__(message)
+		self.status_code = status_code
+		self.retryable = retryable
+		self.provider = None
+		self.attempts = 0
+
+
+class RateLimited(LLMGatewayError):
+	"""No rate limit capacity for the provider within MAX_QUEUE_WAIT."""
+
+	def __init__(self, message):
+		super().__init__(message, status_code=429, retryable=True)
+
+
+_sessions = {}
+_semaphores = {}
+_lock = threading.Lock()
+_bucket_script = None
+
+
+# ============================================
+# Providers
+# ============================================
+
+def get_provider(name=HUB):
+	"""
+	Connection and rate limit settings of a provider.
+
+	Args:
+		name (str): HUB, OPENAI or ANTHROPIC
+
+	Returns:
+		frappe._dict: name, kind ("openai" or "anthropic"), api_url, api_key,
+			model, rpm, tpm (and fallback_model, max_tokens, temperature for the hub)
+	"""
+	if name == HUB:
+		settings = frappe.get_cached_doc("AI Communications Hub Settings")
+		return frappe._dict(
+			name=HUB,
+			kind="openai",
+			api_url=settings.get("llm_api_url") or "https://api.naga.ac/v1",
+			api_key=settings.get_password("llm_api_key", raise_exception=False),
+			model=settings.get("llm_model") or "gpt-4o-mini",
+			fallback_model=settings.get("llm_fallback_model"),
+			max_tokens=settings.get("llm_max_tokens") or 500,
+			temperature=settings.get("llm_temperature") or 0.7,
+			rpm=settings.get("llm_requests_per_minute") or 0,
+			tpm=settings.get("llm_tokens_per_minute") or 0
+		)
+
+	settings = frappe.get_cached_doc("Language Settings")
+	if name == ANTHROPIC:
+		return frappe._dict(
+			name=ANTHROPIC,
+			kind="anthropic",
+			api_url=ANTHROPIC_API_URL,
+			api_key=settings.get_password("anthropic_api_key", raise_exception=False),
+			model=settings.get("anthropic_model") or "claude-3-haiku-20240307",
+			rpm=settings.get("provider_requests_per_minute") or 0,
+			tpm=settings.get("provider_tokens_per_minute") or 0
+		)
+	return frappe._dict(
+		name=OPENAI,
+		kind="openai",
+		api_url=OPENAI_API_URL,
+		api_key=settings.get_password("openai_api_key", raise_exception=False),
+		model=settings.get("openai_model") or "gpt-4o-mini",
+		rpm=settings.get("provider_requests_per_minute") or 0,
+		tpm=settings.get("provider_tokens_per_minute") or 0
+	)
+
+
+def get_fallbacks(provider, model):
+	"""
+	Routes tried in order when a model keeps failing.
+
+	The hub falls back to its fallback model; the translation providers fall
+	back to the hub model, then its fallback model.
+
+	Returns:
+		list: (provider, model) tuples
+	"""
+	hub = provider if provider.name == HUB else get_provider(HUB)
+	routes = []
+	if provider.name != HUB and hub.api_key:
+		routes.append((hub, hub.model))
+	if hub.fallback_model and hub.api_key:
+		routes.append((hub, hub.fallback_model))
+	return [(p, m) for p, m in routes if not (p.name == provider.name and m == model)]
+
+
+def _get_session(api_url):
+	with _lock:
+		if api_url not in _sessions:
+			session = requests.Session()
+			adapter = HTTPAdapter(pool_connections=1, pool_maxsize=MAX_CONCURRENT)
+			session.mount("https://", adapter)
+			session.mount("http://", adapter)
+			_sessions[api_url] = session
+		return _sessions[api_url]
+
+
+def _get_semaphore(provider_name):
+	with _lock:
+		if provider_name not in _semaphores:
+			_semaphores[provider_name] = threading.BoundedSemaphore(MAX_CONCURRENT)
+		return _semaphores[provider_name]
+
+
+# ============================================
+# Rate limiting
+# ============================================
+
+def acquire(provider, tokens):
+	"""
+	Take one request and the given tokens from the provider's buckets.
+
+	Waits up to MAX_QUEUE_WAIT for capacity. Redis errors let the call through.
+
+	Raises:
+		RateLimited: If capacity does not free up in time
+	"""
+	global _bucket_script
+
+	if not provider.rpm and not provider.tpm:
+		return
+
+	deadline = time.monotonic() + MAX_QUEUE_WAIT
+	cache = frappe.cache()
+	keys = [cache.make_key(f"{BUCKET_KEY}:{provider.name}:{kind}") for kind in ("requests", "tokens")]
+
+	while True:
+		try:
+			if _bucket_script is None:
+				_bucket_script = cache.register_script(TOKEN_BUCKET_SCRIPT)
+			wait = float(_bucket_script(keys=keys, args=[time.time(), provider.rpm, 1, provider.tpm, tokens]))
+		except Exception:
+			frappe.log_error(frappe.get_traceback(), "LLM Rate Limiter Error")
+			return
+
+		if wait <= 0:
+			return
+		if time.monotonic() + wait > deadline:
+			raise RateLimited(f"{provider.name} rate limit reached")
+		time.sleep(wait + random.uniform(0, 0.1))
+
+
+# ============================================
+# Requests
+# ============================================
+
+def _to_anthropic(payload):
+	"""Convert an OpenAI chat payload to an Anthropic messages payload."""
+	system = "\n\n".join(m["content"] for m in payload["messages"] if m["role"] == "system")
+	body = {
+		"model": payload["model"],
+		"max_tokens": payload.get("max_tokens") or 1024,
+		"messages": [
+			{"role": m["role"], "content": m["content"]}
+			for m in payload["messages"] if m["role"] in ("user", "assistant")
+		]
+	}
+	if system:
+		body["system"] = system
+	if payload.get("temperature") is not None:
+		body["temperature"] = payload["temperature"]
+	return body
+
+
+def _from_anthropic(data):
+	"""Convert an Anthropic messages response to an OpenAI chat response."""
+	usage = data.get("usage") or {}
+	prompt_tokens = usage.get("input_tokens", 0)
+	completion_tokens = usage.get("output_tokens", 0)
+	return {
+		"id": data.get("id"),
+		"model": data.get("model"),
+		"choices": [{
+			"index": 0,
+			"message": {
+				"role": "assistant",
+				"content": "".join(b.get("text", "") for b in data.get("content") or [] if b.get("type") == "text")
+			},
+			"finish_reason": data.get("stop_reason")
+		}],
+		"usage": {
+			"prompt_tokens": prompt_tokens,
+			"completion_tokens": completion_tokens,
+			"total_tokens": prompt_tokens + completion_tokens
+		}
+	}
+
+
+def _backoff(attempt, response=None):
+	"""Full jitter backoff, or Retry-After when the provider sends one."""
+	retry_after = response.headers.get("Retry-After") if response is not None else None
+	try:
+		return min(float(retry_after), BACKOFF_CAP)
+	except (TypeError, ValueError):
+		return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+
+def _parse_response(provider, response):
+	"""OpenAI-shaped body of a successful response."""
+	try:
+		data = response.json()
+	except ValueError:
+		# Truncated or non-JSON body (e.g. an HTML error page from a proxy)
+		raise LLMGatewayError(
+			f"{provider.name} returned an invalid response: {response.text[:200]}",
+			status_code=response.status_code,
+			retryable=True
+		)
+	return _from_anthropic(data) if provider.kind == "anthropic" else data
+
+
+def _send(provider, payload, timeout, tokens=0):
+	"""
+	One provider request with retries, each attempt taking rate limit capacity.
+
+	Args:
+		tokens (int): Estimated tokens of one attempt, for the token bucket
+
+	Returns:
+		tuple: (OpenAI-shaped response, attempts)
+
+	Raises:
+		RateLimited: If capacity for an attempt does not free up in time
+	"""
+	if provider.kind == "anthropic":
+		url = f"{provider.api_url}/messages"
+		headers = {
+			"x-api-key": provider.api_key,
+			"anthropic-version": ANTHROPIC_VERSION,
+			"Content-Type": "application/json"
+		}
+		body = _to_anthropic(payload)
+	else:
+		url = f"{provider.api_url}/chat/completions"
+		headers = {
+			"Authorization": f"Bearer {provider.api_key}",
+			"Content-Type": "application/json"
+		}
+		body = payload
+
+	session = _get_session(provider.api_url)
+	attempt = 0
+	while True:
+		attempt += 1
+		response = None
+		try:
+			acquire(provider, tokens)
+		except RateLimited as e:
+			e.attempts = attempt - 1
+			raise
+
+		try:
+			with _get_semaphore(provider.name):
+				response = session.post(url, headers=headers, json=body, timeout=timeout)
+			if response.status_code < 400:
+				return _parse_response(provider, response), attempt
+
+			error = LLMGatewayError(
+				f"{provider.name} returned HTTP {response.status_code}: {response.text[:200]}",
+				status_code=response.status_code,
+				retryable=response.status_code in RETRYABLE_STATUS
+			)
+		except LLMGatewayError as e:
+			error = e
+		except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+			error = LLMGatewayError(f"{provider.name} request failed: {e}", retryable=True)
+
+		if not error.retryable or attempt > MAX_RETRIES:
+			error.attempts = attempt
+			raise error
+		time.sleep(_backoff(attempt - 1, response))
+
+
+def chat(messages, provider=None, model=None, max_tokens=None, temperature=None, functions=None,
+		purpose="chat", fallbacks=None, timeout=30):
+	"""
+	Chat completion through the gateway.
+
+	Args:
+		messages (list): OpenAI-style messages
+		provider (frappe._dict): get_provider() result (defaults to the hub)
+		model (str): Model (defaults to the provider's model)
+		max_tokens (int): Completion token limit
+		temperature (float): Sampling temperature
+		functions (list): Function definitions (OpenAI-compatible providers only)
+		purpose (str): Label for metrics (chat, translation, detection, ...)
+		fallbacks (list): (provider, model) routes; defaults to get_fallbacks()
+		timeout (int): Seconds per attempt
+
+	Returns:
+		dict: OpenAI-shaped chat completion response
+
+	Raises:
+		LLMGatewayError: If every route failed
+	"""
+	provider = provider or get_provider(HUB)
+	model = model or provider.model
+	routes = [(provider, model)] + (get_fallbacks(provider, model) if fallbacks is None else fallbacks)
+
+	last_error = None
+	for route_provider, route_model in routes:
+		if not route_provider.api_key:
+			last_error = LLMGatewayError(f"{route_provider.name} API key not configured")
+			continue
+		if isinstance(last_error, RateLimited) and route_provider.name == last_error.provider:
+			continue  # same bucket, still empty
+
+		payload = {"model": route_model, "messages": messages}
+		if max_tokens:
+			payload["max_tokens"] = max_tokens
+		if temperature is not None:
+			payload["temperature"] = temperature
+		if functions and route_provider.kind == "openai":
+			payload["functions"] = functions
+			payload["function_call"] = "auto"
+
+		prompt_estimate = estimate_tokens(json.dumps(messages)) + (estimate_tokens(json.dumps(functions)) if functions else 0)
+		started = time.monotonic()
+		try:
+			response, attempts = _send(route_provider, payload, timeout, prompt_estimate + (max_tokens or 0))
+		except LLMGatewayError as e:
+			e.provider = route_provider.name
+			record_call(route_provider.name, route_model, purpose, time.monotonic() - started, e.attempts, error=e)
+			last_error = e
+			if not e.retryable:
+				raise
+			continue
+
+		record_call(
+			route_provider.name, route_model, purpose, time.monotonic() - started, attempts,
+			usage=response.get("usage") or {}, failover=route_provider is not provider or route_model != model
+		)
+		return response
+
+	raise last_error
+
+
+def get_content(response):
+	"""Text of the first choice of a chat response."""
+	return (response["choices"][0]["message"].get("content") or "").strip()
+
+
+# ============================================
+# Metrics
+# ============================================
+
+def get_cost(model, prompt_tokens, completion_tokens):
+	"""Estimated USD cost of a call, or None for models without pricing."""
+	name = (model or "").split("/")[-1]
+	prefix = max((p for p in MODEL_PRICING if name.startswith(p)), key=len, default=None)
+	if not prefix:
+		return None
+
+	input_price, output_price = MODEL_PRICING[prefix]
+	return round((prompt_tokens * input_price + completion_tokens * output_price) / 1e6, 6)
+
+
+def record_call(provider, model, purpose, duration, attempts, usage=None, error=None, failover=False):
+	"""Keep the latest METRICS_SAMPLES calls for get_llm_metrics."""
+	usage = usage or {}
+	prompt_tokens = usage.get("prompt_tokens", 0)
+	completion_tokens = usage.get("completion_tokens", 0)
+	sample = {
+		"provider": provider,
+		"model": model,
+		"purpose": purpose,
+		"latency_ms": round(duration * 1000, 1),
+		"attempts": attempts,
+		"prompt_tokens": prompt_tokens,
+		"completion_tokens": completion_tokens,
+		"cost": get_cost(model, prompt_tokens, completion_tokens) if not error else 0,
+		"status": "error" if error else ("failover" if failover else "ok"),
+		"error": str(error)[:200] if error else None
+	}
+
+	record_sample(METRICS_KEY, sample, METRICS_SAMPLES)
+
+
+@frappe.whitelist()
+def get_llm_metrics(purpose=None):
+	"""
+	LLM call statistics per provider and model from the latest samples.
+
+	Returns:
+		dict: "provider / model" -> calls, errors, failovers, retries,
+			avg/p95 latency, tokens and estimated cost
+	"""
+	frappe.only_for("System Manager")
+
+	samples = get_samples(METRICS_KEY)
+	groups = {}
+	for sample in samples:
+		if purpose and sample["purpose"] != purpose:
+			continue
+		groups.setdefault(f"{sample['provider']} / {sample['model']}", []).append(sample)
+
+	metrics = {}
+	for name, calls in groups.items():
+		latencies = sorted(c["latency_ms"] for c in calls)
+		metrics[name] = {
+			"calls": len(calls),
+			"errors": sum(1 for c in calls if c["status"] == "error"),
+			"failovers": sum(1 for c in calls if c["status"] == "failover"),
+			"retries": sum(c["attempts"] - 1 for c in calls if c["attempts"]),
+			"avg_latency_ms": round(sum(latencies) / len(latencies), 1),
+			"p95_latency_ms": percentile(latencies, 0.95),
+			"prompt_tokens": sum(c["prompt_tokens"] for c in calls),
+			"completion_tokens": sum(c["completion_tokens"] for c in calls),
+			"cost": round(sum(c["cost"] or 0 for c in calls), 4)
+		}
+	return metrics
@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+# Copyright (c) 2026, VisualGraphX and contributors
+# For license information, please see license.txt
+
+"""
+System prompt assembly for the AI engine.
+
+Everything in a system prompt that does not depend on the conversation (the
+instructions, channel guidelines and company name) is compiled once per worker
+for each (template, channel) and reused; per message only the customer and
+knowledge base sections are formatted. The function schemas sent with
+completions are built once as well, with their token count.
+
+Compiled templates are tied to the settings' modified timestamp, so saving AI
+Communications Hub Settings recompiles them on the next prompt.
+
+Every assembled prompt reports its estimated tokens per stage (instructions,
+customer, knowledge), sampled per channel for get_prompt_metrics.
+"""
+
+import json
+
+import frappe
+
+from ai_comms_hub.services.conversation_memory import estimate_tokens
+from ai_comms_hub.utils.metrics import channel_key, get_channel_samples, percentile, record_sample
+
+
+AGENT = "agent"  # ai_engine.build_system_prompt
+PLATFORM = "platform"  # llm.build_platform_system_prompt
+KNOWLEDGE_CONTENT_CHARS = 500  # per document in agent prompts
+
+METRICS_KEY = "ai_comms_hub:prompt:tokens"
+METRICS_SAMPLES = 500
+
+AGENT_GUIDELINES = {
+	"Voice": {
+		"tone": "conversational and clear",
+		"length": "concise, 1-2 sentences per response",
+		"style": "natural speech, avoid complex words, no special characters"
+	},
+	"SMS": {
+		"tone": "friendly and brief",
+		"length": "160 characters ideal, max 320",
+		"style": "no emojis, clear and direct"
+	},
+	"WhatsApp": {
+		"tone": "friendly and conversational",
+		"length": "up to 1000 characters",
+		"style": "casual, light emoji use allowed"
+	},
+	"Chat": {
+		"tone": "helpful and professional",
+		"length": "2-4 sentences typical",
+		"style": "clear formatting, can use bullet points"
+	},
+	"Facebook": {
+		"tone": "friendly and conversational",
+		"length": "up to 2000 characters",
+		"style": "casual, emojis sparingly"
+	},
+	"Instagram": {
+		"tone": "casual and visual",
+		"length": "up to 1000 characters",
+		"style": "short paragraphs, emojis encouraged"
+	},
+	"Twitter": {
+		"tone": "concise and engaging",
+		"length": "280 characters maximum",
+		"style": "very brief, strategic emoji use"
+	},
+	"LinkedIn": {
+		"tone": "professional but warm",
+		"length": "up to 1300 characters",
+		"style": "professional, minimal emojis"
+	},
+	"Email": {
+		"tone": "professional and helpful",
+		"length": "2-3 paragraphs",
+		"style": "proper grammar, formatted with paragraphs, include greeting and sign-off"
+	}
+}
+
+PLATFORM_GUIDELINES = {
+	"Voice": {
+		"tone": "conversational and clear",
+		"length": "concise, 1-2 sentences per response",
+		"style": "natural speech, avoid complex words"
+	},
+	"Facebook": {
+		"tone": "friendly and conversational",
+		"length": "up to 2000 characters",
+		"style": "casual, use emojis sparingly"
+	},
+	"Instagram": {
+		"tone": "casual and visual",
+		"length": "up to 1000 characters",
+		"style": "short paragraphs, emojis encouraged"
+	},
+	"Twitter": {
+		"tone": "concise and engaging",
+		"length": "280 characters maximum",
+		"style": "very brief, strategic emoji use"
+	},
+	"LinkedIn": {
+		"tone": "professional but warm",
+		"length": "up to 1300 characters",
+		"style": "professional, minimal emojis"
+	},
+	"Email": {
+		"tone": "professional and helpful",
+		"length": "2-3 paragraphs",
+		"style": "proper grammar, formatted with paragraphs"
+	}
+}
+
+AGENT_HEADER = """You are an AI customer service assistant for {company_name}, communicating via {platform}.
+
+## Communication Guidelines for {platform}:
+- Tone: {tone}
+- Length: {length}
+- Style: {style}
+
+## Core Instructions:
+1. Be helpful, accurate, and professional
+2. Use the knowledge base context when available
+3. Never make up information - if unsure, say so
+4. For complex issues, offer to connect with a human agent
+5. Protect customer privacy - never repeat sensitive info back
+
+## Escalation Triggers (say "Let me connect you with a team member"):
+- Customer explicitly requests human help
+- Complex billing/refund issues
+- Legal or complaint matters
+- Technical issues beyond your knowledge
+- Customer expresses strong frustration
+
+"""
+
+AGENT_FOOTER = """
+## Response Format:
+- Answer the customer's question directly
+- Be concise but complete
+- If using knowledge base info, integrate it naturally
+- End with a helpful follow-up question or offer if appropriate
+"""
+
+PLATFORM_HEADER = """You are a helpful AI assistant for a business, communicating via {platform}.
+
+Guidelines for {platform}:
+- Tone: {tone}
+- Length: {length}
+- Style: {style}
+
+"""
+
+PLATFORM_FOOTER = """Your task is to:
+1. Understand customer needs
+2. Provide accurate information from knowledge base
+3. Be helpful and professional
+4. Escalate to human if needed (say "Let me connect you with a team member")
+
+If you need to lookup information, use function calls.
+"""
+
+_compiled = {"version": None, "templates": {}, "functions": None}
+
+
+# ============================================
+# Compilation
+# ============================================
+
+def _get_state():
+	"""Compiled templates for the current settings, reset when they change."""
+	settings = frappe.get_cached_doc("AI Communications Hub Settings")
+	version = str(settings.modified)
+
+	if _compiled["version"] != version:
+		_compiled["version"] = version
+		_compiled["templates"] = {}
+		_compiled["functions"] = None
+		_compiled["company_name"] = settings.get("company_name") or "our company"
+	return _compiled
+
+
+def clear_cache():
+	"""Drop this worker's compiled templates and function schemas."""
+	_compiled["version"] = None
+
+
+def get_template(kind, platform):
+	"""
+	Compiled static parts of a system prompt.
+
+	Args:
+		kind (str): AGENT or PLATFORM
+		platform (str): Channel name
+
+	Returns:
+		frappe._dict: header, footer and tokens (static instruction tokens)
+	"""
+	state = _get_state()
+	key = (kind, platform)
+	if key not in state["templates"]:
+		if kind == AGENT:
+			guidelines = AGENT_GUIDELINES.get(platform, AGENT_GUIDELINES["Chat"])
+			header = AGENT_HEADER.format(company_name=state["company_name"], platform=platform, **guidelines)
+			footer = AGENT_FOOTER
+		else:
+			guidelines = PLATFORM_GUIDELINES.get(platform, PLATFORM_GUIDELINES["Email"])
+			header = PLATFORM_HEADER.format(platform=platform, **guidelines)
+			footer = PLATFORM_FOOTER
+
+		state["templates"][key] = frappe._dict(
+			header=header,
+			footer=footer,
+			tokens=estimate_tokens(header) + estimate_tokens(footer)
+		)
+	return state["templates"][key]
+
+
+def get_function_definitions():
+	"""
+	Function schemas for LLM function calling, built once per worker.
+
+	Returns:
+		list: Function definitions in OpenAI format (shared, do not modify)
+	"""
+	state = _get_state()
+	if state["functions"] is None:
+		from ai_comms_hub.api.llm import FUNCTION_DEFINITIONS
+
+		state["functions"] = frappe._dict(
+			definitions=FUNCTION_DEFINITIONS,
+			tokens=estimate_tokens(json.dumps(FUNCTION_DEFINITIONS))
+		)
+	return state["functions"].definitions
+
+
+# ============================================
+# Assembly
+# ============================================
+
+def build_agent_prompt(platform, rag_context=None, hub=None):
+	"""
+	System prompt for the AI engine with customer and knowledge base context.
+
+	Args:
+		platform (str): Channel name
+		rag_context (list): Knowledge base results
+		hub (Document): Communication Hub document
+
+	Returns:
+		frappe._dict: prompt and tokens per stage
+	"""
+	template = get_template(AGENT, platform)
+
+	customer = ""
+	if hub:
+		if hub.customer_name:
+			customer += f"\n## Customer: {hub.customer_name}\n"
+		if hub.context:
+			customer += f"\n## Conversation Context:\n{hub.context}\n"
+
+	knowledge = ""
+	if rag_context:
+		knowledge = "\n## Knowledge Base Information:\n" + "".join(
+			f"\n### {doc.get('title', f'Document {i}')}\n{doc.get('content', '')[:KNOWLEDGE_CONTENT_CHARS]}\n"
+			for i, doc in enumerate(rag_context, 1)
+		)
+
+	return _assemble(platform, template, customer, knowledge)
+
+
+def build_platform_prompt(platform, rag_context=None):
+	"""
+	Platform-specific system prompt with knowledge base context.
+
+	Args:
+		platform (str): Channel name
+		rag_context (list): Knowledge base context
+
+	Returns:
+		frappe._dict: prompt and tokens per stage
+	"""
+	template = get_template(PLATFORM, platform)
+
+	knowledge = ""
+	if rag_context:
+		knowledge = "Knowledge Base Context:\n" + "".join(
+			f"- {doc.get('content', '')}\n" for doc in rag_context
+		) + "\n"
+
+	return _assemble(platform, template, "", knowledge)
+
+
+def _assemble(platform, template, customer, knowledge):
+	tokens = {
+		"instructions": template.tokens,
+		"customer": estimate_tokens(customer),
+		"knowledge": estimate_tokens(knowledge)
+	}
+	tokens["total"] = sum(tokens.values())
+	record_prompt_tokens(platform, tokens)
+
+	return frappe._dict(
+		prompt=template.header + customer + knowledge + template.footer,
+		tokens=tokens
+	)
+
+
+# ============================================
+# Metrics
+# ============================================
+
+def record_prompt_tokens(platform, tokens):
+	"""Keep the latest METRICS_SAMPLES prompt token breakdowns per channel."""
+	record_sample(channel_key(METRICS_KEY, platform), tokens, METRICS_SAMPLES)
+
+
+@frappe.whitelist()
+def get_prompt_metrics(channel=None):
+	"""
+	System prompt token usage per stage from the latest samples.
+
+	Returns:
+		dict: function_schema_tokens, and per channel the sample count with
+			average tokens per stage and p95 of the total
+	"""
+	frappe.only_for("System Manager")
+
+	get_function_definitions()
+	metrics = {"function_schema_tokens": _compiled["functions"].tokens, "channels": {}}
+
+	for name, samples in get_channel_samples(METRICS_KEY, channel).items():
+		totals = sorted(s["total"] for s in samples)
+		stages = {
+			stage: round(sum(s.get(stage, 0) for s in samples) / len(samples), 1)
+			for stage in ("instructions", "customer", "knowledge", "total")
+		}
+		metrics["channels"][name] = {
+			"count": len(samples),
+			"avg_tokens": stages,
+			"p95_total": percentile(totals, 0.95)
+		}
+	return metrics
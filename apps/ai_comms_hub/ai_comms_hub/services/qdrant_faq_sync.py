@@ -10,6 +10,7 @@ Collection: chatwoot_knowledge_v2
 import frappe
 from frappe import _
 from frappe.utils import now_datetime
+import hashlib
 import requests
 import uuid
 from typing import Dict, List, Any, Optional
@@ -18,6 +19,16 @@ from typing import Dict, List, Any, Optional
 # Collection configuration - shared with n8n workflows
 COLLECTION_NAME = "chatwoot_knowledge_v2"
 VECTOR_SIZE = 512  # text-embedding-3-small with dimensions=512
+# FAQs per embeddings request / Qdrant upsert (faq_sync_batch_size setting)
+MIN_BATCH_SIZE = 64
+MAX_BATCH_SIZE = 256
+DEFAULT_BATCH_SIZE = 128
+CHECKPOINT_KEY = "ai_comms_hub:faq_sync:checkpoint"
+BULK_SYNC_JOB_ID = "ai_comms_hub_faq_bulk_sync"
+FAQ_FIELDS = [
+    "name", "question", "answer", "category", "priority", "tags",
+    "enabled", "creation", "modified", "qdrant_point_id"
+]
 
 
 def get_settings() -> Dict[str, Any]:
@@ -116,14 +127,56 @@ def generate_embedding(text: str) -> List[float]:
         raise
 
 
+def generate_embeddings(texts: List[str]) -> List[List[float]]:
+    """Generate embeddings for several texts in one request (input order preserved)."""
+    settings = get_settings()
+
+    response = requests.post(
+        f"{settings['llm_api_url']}/embeddings",
+        headers={
+            "Authorization": f"Bearer {settings['llm_api_key']}",
+            "Content-Type": "application/json"
+        },
+        json={
+            "model": "text-embedding-3-small",
+            "input": texts,
+            "dimensions": VECTOR_SIZE
+        },
+        timeout=60
+    )
+    response.raise_for_status()
+    data = sorted(response.json()["data"], key=lambda item: item["index"])
+    return [item["embedding"] for item in data]
+
+
 def generate_point_id(doc_name: str) -> str:
     """Generate a deterministic UUID from document name."""
     namespace = uuid.UUID("6ba7b810-9dad-11d1-80b4-00c04fd430c8")  # URL namespace
     return str(uuid.uuid5(namespace, f"chatwoot_faq:{doc_name}"))
 
 
-def build_faq_content(faq_doc) -> str:
-    """Build the text content to be embedded."""
+def get_point_id(faq_doc):
+    """Point ID of a FAQ: the imported point's ID if it has one, else derived from the name."""
+    point_id = faq_doc.qdrant_point_id
+    if not point_id:
+        return generate_point_id(faq_doc.name)
+    # Legacy points use integer IDs
+    return int(point_id) if point_id.isdigit() else point_id
+
+
+def get_content_hash(content: str) -> str:
+    """Hash of the embedded FAQ text, stored in the payload to detect drift."""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def build_faq_content(faq_doc, category_names: Optional[Dict[str, str]] = None) -> str:
+    """
+    Build the text content to be embedded.
+
+    Args:
+        faq_doc: Chatwoot FAQ document or row
+        category_names: Preloaded category -> category_name map (avoids a query per FAQ)
+    """
     clean_answer = frappe.utils.strip_html_tags(faq_doc.answer or "")
 
     parts = [
@@ -132,7 +185,10 @@ def build_faq_content(faq_doc) -> str:
     ]
 
     if faq_doc.category:
-        category_name = frappe.db.get_value("Chatwoot FAQ Category", faq_doc.category, "category_name")
+        if category_names is not None:
+            category_name = category_names.get(faq_doc.category)
+        else:
+            category_name = frappe.db.get_value("Chatwoot FAQ Category", faq_doc.category, "category_name")
         if category_name:
             parts.append(f"Category: {category_name}")
 
@@ -179,15 +235,10 @@ def sync_faq(faq_doc) -> Dict[str, Any]:
         embedding = generate_embedding(content)
 
         # Use existing point_id if available (for imported FAQs), otherwise generate new
-        if faq_doc.qdrant_point_id:
-            point_id = faq_doc.qdrant_point_id
-            # Convert to int if it's a numeric string (legacy points use integer IDs)
-            if point_id.isdigit():
-                point_id = int(point_id)
-        else:
-            point_id = generate_point_id(faq_doc.name)
+        point_id = get_point_id(faq_doc)
 
         payload = build_faq_payload(faq_doc)
+        payload["content_hash"] = get_content_hash(content)
 
         settings = get_settings()
         url = f"{settings['qdrant_url']}/collections/{COLLECTION_NAME}/points"
@@ -256,6 +307,109 @@ def delete_faq(doc_name: str) -> Dict[str, Any]:
         }
 
 
+def get_batch_size() -> int:
+    """Configured FAQ sync batch size, clamped to MIN_BATCH_SIZE..MAX_BATCH_SIZE."""
+    size = frappe.utils.cint(frappe.db.get_single_value(
+        "AI Communications Hub Settings", "faq_sync_batch_size"
+    )) or DEFAULT_BATCH_SIZE
+    return min(max(size, MIN_BATCH_SIZE), MAX_BATCH_SIZE)
+
+
+def _mark_synced(faqs, point_ids) -> None:
+    """Mark a batch as synced with one statement, storing newly generated point IDs."""
+    values = {"names": [faq.name for faq in faqs], "now": now_datetime()}
+    cases = []
+    for i, (faq, point_id) in enumerate(zip(faqs, point_ids)):
+        if not faq.qdrant_point_id:
+            values[f"name_{i}"] = faq.name
+            values[f"point_{i}"] = str(point_id)
+            cases.append(f"WHEN %(name_{i})s THEN %(point_{i})s")
+
+    point_id_update = f", qdrant_point_id = CASE name {' '.join(cases)} ELSE qdrant_point_id END" if cases else ""
+    frappe.db.sql(f"""
+        UPDATE `tabChatwoot FAQ`
+        SET sync_status = 'Synced', last_synced = %(now)s, sync_error = ''{point_id_update}
+        WHERE name IN %(names)s
+    """, values)
+
+
+def _mark_failed(names: List[str], error: str) -> None:
+    """Mark a batch as failed with one statement."""
+    frappe.db.sql("""
+        UPDATE `tabChatwoot FAQ`
+        SET sync_status = 'Failed', sync_error = %(error)s
+        WHERE name IN %(names)s
+    """, {"error": error[:500], "names": names})
+
+
+def upsert_faqs(doc_names: List[str], batch_size: Optional[int] = None, on_batch=None) -> Dict[str, Any]:
+    """
+    Embed and upsert FAQs in batches.
+
+    Each batch is loaded with one query, embedded with one request, upserted
+    with one Qdrant request and marked with one status update, then committed.
+
+    Args:
+        doc_names: Chatwoot FAQ document names
+        batch_size: FAQs per batch (defaults to get_batch_size())
+        on_batch: Called as on_batch(last_name, synced, failed) after each batch
+
+    Returns:
+        dict: Counts of synced and failed FAQs
+    """
+    ensure_collection_exists()
+    settings = get_settings()
+    url = f"{settings['qdrant_url']}/collections/{COLLECTION_NAME}/points"
+    batch_size = batch_size or get_batch_size()
+    category_names = dict(frappe.get_all(
+        "Chatwoot FAQ Category", fields=["name", "category_name"], as_list=True
+    ))
+    synced = 0
+    failed = 0
+
+    for start in range(0, len(doc_names), batch_size):
+        names = doc_names[start:start + batch_size]
+
+        try:
+            faqs = frappe.get_all(
+                "Chatwoot FAQ",
+                filters={"name": ["in", names]},
+                fields=FAQ_FIELDS,
+                order_by="name asc"
+            )
+            contents = [build_faq_content(faq, category_names) for faq in faqs]
+            embeddings = generate_embeddings(contents) if faqs else []
+
+            points = []
+            for faq, content, embedding in zip(faqs, contents, embeddings):
+                payload = build_faq_payload(faq)
+                payload["content_hash"] = get_content_hash(content)
+                points.append({"id": get_point_id(faq), "vector": embedding, "payload": payload})
+
+            if points:
+                response = requests.put(
+                    url,
+                    headers=get_qdrant_headers(settings),
+                    json={"points": points},
+                    timeout=120
+                )
+                response.raise_for_status()
+                _mark_synced(faqs, [point["id"] for point in points])
+            synced += len(points)
+
+        except Exception as e:
+            frappe.db.rollback()
+            frappe.log_error(f"FAQ batch sync failed: {str(e)}", "Qdrant FAQ Sync")
+            _mark_failed(names, str(e))
+            failed += len(names)
+
+        frappe.db.commit()
+        if on_batch:
+            on_batch(names[-1], synced, failed)
+
+    return {"synced": synced, "failed": failed}
+
+
 # Background job functions
 
 def sync_faq_by_name(doc_name: str):
@@ -342,27 +496,15 @@ def on_faq_delete(doc, method):
 # Scheduled tasks
 
 def verify_sync_integrity():
-    """Daily job to verify all enabled FAQs are synced."""
-    faqs_to_sync = frappe.get_all(
-        "Chatwoot FAQ",
-        filters={
-            "enabled": 1,
-            "sync_status": ["in", ["Not Synced", "Failed", "Pending"]]
-        },
-        fields=["name"]
+    """Daily job: reconcile the FAQ collection against enabled Chatwoot FAQs."""
+    frappe.enqueue(
+        "ai_comms_hub.services.vector_reconciliation.reconcile_faqs",
+        queue="long",
+        timeout=1800,
+        job_id="ai_comms_hub_reconcile_faqs",
+        deduplicate=True
     )
 
-    for faq in faqs_to_sync:
-        frappe.enqueue(
-            "ai_comms_hub.services.qdrant_faq_sync.sync_faq_by_name",
-            doc_name=faq.name,
-            queue="long",
-            timeout=120
-        )
-
-    if faqs_to_sync:
-        frappe.logger().info(f"Queued {len(faqs_to_sync)} FAQs for sync verification")
-
 
 # API endpoints
 
@@ -421,37 +563,77 @@ def search_faqs(query: str, limit: int = 5, score_threshold: float = 0.7) -> Lis
 
 
 @frappe.whitelist()
-def manual_sync_all_faqs():
-    """API endpoint to manually trigger full FAQ sync."""
+def manual_sync_all_faqs(resume: int = 1):
+    """
+    API endpoint to manually trigger full FAQ sync.
+
+    Args:
+        resume: Continue from the last checkpoint of an interrupted run (0 restarts)
+    """
+    if not frappe.utils.cint(resume):
+        frappe.cache().delete_value(CHECKPOINT_KEY)
+
     frappe.enqueue(
         "ai_comms_hub.services.qdrant_faq_sync._bulk_sync_all",
         queue="long",
-        timeout=1800
+        timeout=1800,
+        job_id=BULK_SYNC_JOB_ID,
+        deduplicate=True
     )
-    return {"status": "started", "message": "Bulk FAQ sync started in background"}
+    return {
+        "status": "started",
+        "message": "Bulk FAQ sync started in background",
+        "checkpoint": frappe.cache().get_value(CHECKPOINT_KEY)
+    }
+
+
+@frappe.whitelist()
+def get_bulk_sync_progress() -> Optional[Dict[str, Any]]:
+    """Checkpoint of the running (or interrupted) bulk FAQ sync, None when idle."""
+    return frappe.cache().get_value(CHECKPOINT_KEY)
 
 
 def _bulk_sync_all():
-    """Internal bulk sync function."""
-    ensure_collection_exists()
+    """
+    Bulk sync of all enabled FAQs in name order, in batches.
 
-    faqs = frappe.get_all(
+    After every batch the last synced name and running counts are saved as a
+    checkpoint and published as "faq_sync_progress"; a run that is interrupted
+    (timeout, worker restart) resumes after the checkpoint.
+    """
+    checkpoint = frappe.cache().get_value(CHECKPOINT_KEY) or {
+        "last_name": "",
+        "synced": 0,
+        "failed": 0,
+        "started_at": str(now_datetime())
+    }
+
+    names = frappe.get_all(
         "Chatwoot FAQ",
-        filters={"enabled": 1},
-        fields=["name"]
+        filters={"enabled": 1, "name": [">", checkpoint["last_name"]]},
+        order_by="name asc",
+        pluck="name"
     )
+    checkpoint["total"] = checkpoint["synced"] + checkpoint["failed"] + len(names)
+    base_synced, base_failed = checkpoint["synced"], checkpoint["failed"]
 
-    success_count = 0
-    error_count = 0
+    def save_checkpoint(last_name, synced, failed):
+        checkpoint.update(last_name=last_name, synced=base_synced + synced, failed=base_failed + failed)
+        frappe.cache().set_value(CHECKPOINT_KEY, checkpoint)
+        frappe.publish_realtime("faq_sync_progress", checkpoint, user=frappe.session.user)
 
-    for faq in faqs:
-        try:
-            sync_faq_by_name(faq.name)
-            success_count += 1
-        except Exception:
-            error_count += 1
+    upsert_faqs(names, on_batch=save_checkpoint)
+    frappe.cache().delete_value(CHECKPOINT_KEY)
+
+    message = f"Bulk FAQ sync complete: {checkpoint['synced']} synced, {checkpoint['failed']} failed"
+    frappe.logger().info(message)
+    frappe.publish_realtime(
+        "msgprint",
+        {"message": message, "title": "FAQ Sync Complete"},
+        user=frappe.session.user
+    )
 
-    frappe.logger().info(f"Bulk FAQ sync complete: {success_count} success, {error_count} errors")
+    return checkpoint
 
 
 @frappe.whitelist()
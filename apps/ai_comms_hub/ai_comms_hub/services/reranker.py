@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+# Copyright (c) 2026, VisualGraphX and contributors
+# For license information, please see license.txt
+
+"""
+Second-stage reranking of knowledge base results.
+
+For channels listed in rerank_enabled_channels, retrieval fetches
+rerank_candidates results (default 20) with a relaxed vector threshold and
+rescores them all in one pass on CPU. The rerank score replaces the fused
+retrieval score (the escalation check compares it with
+ai_engine.CONFIDENCE_THRESHOLD):
+
+- Lexical: weighted sum of query term coverage, bigram overlap, title match
+  and the raw vector similarity of the candidate. No dependencies.
+- ONNX Cross-Encoder: a small cross-encoder (e.g. ms-marco-MiniLM) exported to
+  ONNX, loaded once per worker from reranker_model_path (model.onnx +
+  tokenizer.json). Requires the "reranker" extra (onnxruntime, tokenizers,
+  numpy); falls back to Lexical when unavailable.
+
+Raw scores are mapped to 0-1 by Platt scaling, sigmoid(scale * raw + bias).
+The parameters per backend are stored in reranker_calibration and fitted by
+calibrate() from labelled query/document pairs. A backend without fitted
+parameters reports a plain sigmoid of its raw score, which is not a
+probability of relevance.
+
+Latency of every rerank is recorded per channel (get_rerank_metrics).
+"""
+
+import json
+import math
+import os
+import time
+
+import frappe
+from frappe import _
+from frappe.utils import cint
+
+from ai_comms_hub.services.lexical_index import tokenize
+from ai_comms_hub.utils.metrics import channel_key, get_channel_samples, percentile, record_sample
+
+
+LEXICAL = "Lexical"
+CROSS_ENCODER = "ONNX Cross-Encoder"
+DEFAULT_CANDIDATES = 20
+CANDIDATE_SCORE_THRESHOLD = 0.3  # vector threshold while gathering candidates
+MAX_SEQUENCE_LENGTH = 256
+
+# Lexical feature weights (hand-set; calibration maps the sum to a probability):
+# intercept, coverage, bigrams, title, vector similarity
+LEXICAL_WEIGHTS = (-4.0, 4.5, 1.5, 1.0, 2.5)
+UNCALIBRATED = (1.0, 0.0)  # Platt (scale, bias) for backends without fitted parameters
+PLATT_ITERATIONS = 100
+
+METRICS_KEY = "ai_comms_hub:rerank:latency"
+METRICS_SAMPLES = 500
+
+_cross_encoders = {}
+
+
+def _sigmoid(value):
+	return 1.0 / (1.0 + math.exp(-max(min(value, 500.0), -500.0)))
+
+
+def _parse_calibration(value):
+	"""{backend: (scale, bias)} from the reranker_calibration setting."""
+	try:
+		return {backend: (float(params[0]), float(params[1])) for backend, params in json.loads(value or "{}").items()}
+	except (TypeError, ValueError, IndexError, AttributeError):
+		frappe.logger().warning("Reranker: ignoring invalid reranker_calibration")
+		return {}
+
+
+def get_rerank_settings(channel):
+	"""
+	Reranker settings for a channel.
+
+	Returns:
+		frappe._dict: enabled, backend, model_path, candidates, calibration
+	"""
+	settings = frappe.get_cached_doc("AI Communications Hub Settings")
+	channels = {
+		c.strip().lower()
+		for c in (settings.get("rerank_enabled_channels") or "").replace(",", "\n").split("\n")
+		if c.strip()
+	}
+	return frappe._dict(
+		enabled=bool(channel) and channel.lower() in channels,
+		backend=settings.get("reranker_backend") or LEXICAL,
+		model_path=settings.get("reranker_model_path"),
+		candidates=cint(settings.get("rerank_candidates")) or DEFAULT_CANDIDATES,
+		calibration=_parse_calibration(settings.get("reranker_calibration"))
+	)
+
+
+# ============================================
+# Scorers
+# ============================================
+
+def _bigrams(terms):
+	return set(zip(terms, terms[1:]))
+
+
+def lexical_logits(query, candidates):
+	"""
+	Raw lexical relevance of each candidate.
+
+	Uses the candidate's vector similarity rather than its fused retrieval
+	score, which for lexical-only hits is the lexical index's own estimate.
+
+	Returns:
+		list: Raw scores in candidate order
+	"""
+	query_terms = tokenize(query)
+	query_set = set(query_terms)
+	query_bigrams = _bigrams(query_terms)
+	intercept, w_coverage, w_bigrams, w_title, w_vector = LEXICAL_WEIGHTS
+
+	scores = []
+	for candidate in candidates:
+		terms = tokenize(candidate.get("content"))
+		title_terms = set(tokenize(candidate.get("title")))
+
+		coverage = len(query_set & set(terms)) / len(query_set) if query_set else 0
+		bigrams = len(query_bigrams & _bigrams(terms)) / len(query_bigrams) if query_bigrams else 0
+		title = len(query_set & title_terms) / len(query_set) if query_set else 0
+		vector = candidate.get("vector_score") or 0
+
+		scores.append(intercept + w_coverage * coverage + w_bigrams * bigrams + w_title * title + w_vector * vector)
+	return scores
+
+
+def _load_cross_encoder(model_path):
+	"""ONNX session and tokenizer for a model directory (cached per worker)."""
+	if model_path not in _cross_encoders:
+		import onnxruntime
+		from tokenizers import Tokenizer
+
+		tokenizer = Tokenizer.from_file(os.path.join(model_path, "tokenizer.json"))
+		tokenizer.enable_truncation(MAX_SEQUENCE_LENGTH)
+		tokenizer.enable_padding()
+
+		options = onnxruntime.SessionOptions()
+		options.intra_op_num_threads = 1
+		session = onnxruntime.InferenceSession(
+			os.path.join(model_path, "model.onnx"), options, providers=["CPUExecutionProvider"]
+		)
+		_cross_encoders[model_path] = (session, tokenizer)
+	return _cross_encoders[model_path]
+
+
+def cross_encoder_logits(query, candidates, model_path):
+	"""
+	Raw cross-encoder relevance of each candidate, in one batch.
+
+	Returns:
+		list: Logits in candidate order
+	"""
+	import numpy
+
+	session, tokenizer = _load_cross_encoder(model_path)
+	encodings = tokenizer.encode_batch([
+		(query, f"{c.get('title') or ''}\n{c.get('content') or ''}") for c in candidates
+	])
+
+	inputs = {
+		"input_ids": numpy.array([e.ids for e in encodings], dtype=numpy.int64),
+		"attention_mask": numpy.array([e.attention_mask for e in encodings], dtype=numpy.int64),
+		"token_type_ids": numpy.array([e.type_ids for e in encodings], dtype=numpy.int64)
+	}
+	expected = {i.name for i in session.get_inputs()}
+	logits = session.run(None, {name: value for name, value in inputs.items() if name in expected})[0]
+
+	return [float(row[-1]) for row in logits]
+
+
+def platt(raw_scores, scale, bias):
+	"""Map raw scores to 0-1 with Platt scaling."""
+	return [_sigmoid(scale * raw + bias) for raw in raw_scores]
+
+
+def fit_platt(raw_scores, labels, iterations=PLATT_ITERATIONS):
+	"""
+	Fit Platt scaling by logistic regression of relevance labels on raw scores.
+
+	Uses Platt's smoothed targets and Newton steps.
+
+	Args:
+		raw_scores (list): Scorer outputs
+		labels (list): 1 for relevant, 0 for not relevant
+
+	Returns:
+		tuple: (scale, bias)
+	"""
+	positives = sum(1 for label in labels if label)
+	negatives = len(labels) - positives
+	high = (positives + 1.0) / (positives + 2.0)
+	low = 1.0 / (negatives + 2.0)
+	targets = [high if label else low for label in labels]
+
+	scale, bias = 0.0, math.log((positives + 1.0) / (negatives + 1.0))
+	for _ in range(iterations):
+		grad_scale = grad_bias = 0.0
+		h_ss = h_bb = 1e-12
+		h_sb = 0.0
+		for raw, target in zip(raw_scores, targets):
+			p = _sigmoid(scale * raw + bias)
+			weight = p * (1.0 - p)
+			grad_scale += (p - target) * raw
+			grad_bias += p - target
+			h_ss += weight * raw * raw
+			h_sb += weight * raw
+			h_bb += weight
+
+		determinant = h_ss * h_bb - h_sb * h_sb
+		if determinant <= 0:
+			break
+		step_scale = (h_bb * grad_scale - h_sb * grad_bias) / determinant
+		step_bias = (h_ss * grad_bias - h_sb * grad_scale) / determinant
+		scale -= step_scale
+		bias -= step_bias
+		if abs(step_scale) < 1e-6 and abs(step_bias) < 1e-6:
+			break
+	return scale, bias
+
+
+# ============================================
+# Reranking
+# ============================================
+
+def rerank(query, candidates, top_k=3, backend=LEXICAL, model_path=None, channel=None, calibration=None):
+	"""
+	Rescore candidates and keep the best top_k.
+
+	Args:
+		query (str): Customer query
+		candidates (list): query_knowledge_base results
+		top_k (int): Results to keep
+		backend (str): LEXICAL or CROSS_ENCODER
+		model_path (str): ONNX model directory for CROSS_ENCODER
+		channel (str): Channel for latency metrics
+		calibration (dict): backend -> Platt (scale, bias)
+
+	Returns:
+		list: Top results with "score" set to the rerank score and the
+			original kept as "retrieval_score"
+	"""
+	if not candidates:
+		return []
+
+	started = time.monotonic()
+	used = backend
+	raw_scores = None
+
+	if backend == CROSS_ENCODER and model_path:
+		try:
+			raw_scores = cross_encoder_logits(query, candidates, model_path)
+		except Exception:
+			frappe.log_error(frappe.get_traceback(), "Cross-Encoder Rerank Error")
+	if raw_scores is None:
+		used = LEXICAL
+		raw_scores = lexical_logits(query, candidates)
+
+	scores = platt(raw_scores, *(calibration or {}).get(used, UNCALIBRATED))
+
+	reranked = [
+		dict(candidate, retrieval_score=candidate.get("score", 0), score=score, reranker=used)
+		for candidate, score in zip(candidates, scores)
+	]
+	reranked.sort(key=lambda hit: hit["score"], reverse=True)
+
+	record_latency(channel, used, len(candidates), (time.monotonic() - started) * 1000)
+	return reranked[:top_k]
+
+
+def get_ranked_context(query, channel=None, top_k=3):
+	"""
+	Knowledge base results for a query, reranked when enabled for the channel.
+
+	Args:
+		query (str): Customer query
+		channel (str): Communication Hub channel
+		top_k (int): Results to return
+
+	Returns:
+		list: query_knowledge_base-style results
+	"""
+	from ai_comms_hub.api.rag import query_knowledge_base
+
+	settings = get_rerank_settings(channel)
+	if not settings.enabled:
+		return query_knowledge_base(query, top_k=top_k)
+
+	candidates = query_knowledge_base(
+		query,
+		top_k=max(settings.candidates, top_k),
+		score_threshold=CANDIDATE_SCORE_THRESHOLD
+	)
+	return rerank(
+		query, candidates, top_k=top_k, backend=settings.backend,
+		model_path=settings.model_path, channel=channel, calibration=settings.calibration
+	)
+
+
+@frappe.whitelist()
+def calibrate(examples, backend=None):
+	"""
+	Fit and store the Platt parameters of a reranker backend.
+
+	Args:
+		examples (list): Labelled pairs, dicts with query, title, content,
+			vector_score (optional) and relevant (1/0)
+		backend (str): LEXICAL or CROSS_ENCODER (defaults to the configured backend)
+
+	Returns:
+		dict: backend, scale, bias and the number of examples
+	"""
+	frappe.only_for("System Manager")
+
+	examples = frappe.parse_json(examples) if isinstance(examples, str) else examples
+	if len({bool(example.get("relevant")) for example in examples}) < 2:
+		frappe.throw(_("Calibration needs both relevant and non-relevant examples"))
+
+	settings = get_rerank_settings(None)
+	backend = backend or settings.backend
+
+	by_query = {}
+	for example in examples:
+		by_query.setdefault(example["query"], []).append(example)
+
+	raw_scores, labels = [], []
+	for query, group in by_query.items():
+		if backend == CROSS_ENCODER:
+			raw_scores.extend(cross_encoder_logits(query, group, settings.model_path))
+		else:
+			raw_scores.extend(lexical_logits(query, group))
+		labels.extend(1 if example.get("relevant") else 0 for example in group)
+
+	scale, bias = fit_platt(raw_scores, labels)
+	calibration = {name: list(params) for name, params in settings.calibration.items()}
+	calibration[backend] = [round(scale, 6), round(bias, 6)]
+	frappe.db.set_single_value(
+		"AI Communications Hub Settings", "reranker_calibration", json.dumps(calibration, indent=1)
+	)
+
+	return {"backend": backend, "scale": scale, "bias": bias, "examples": len(labels)}
+
+
+# ============================================
+# Metrics
+# ============================================
+
+def record_latency(channel, backend, candidates, duration_ms):
+	"""Keep the latest METRICS_SAMPLES rerank latencies per channel."""
+	record_sample(
+		channel_key(METRICS_KEY, channel),
+		{"backend": backend, "candidates": candidates, "duration_ms": round(duration_ms, 1)},
+		METRICS_SAMPLES
+	)
+
+
+@frappe.whitelist()
+def get_rerank_metrics(channel=None):
+	"""
+	Rerank latency statistics from the latest samples.
+
+	Returns:
+		dict: channel -> count, avg_ms, p50_ms, p95_ms, max_ms, backends
+	"""
+	frappe.only_for("System Manager")
+
+	metrics = {}
+	for name, samples in get_channel_samples(METRICS_KEY, channel).items():
+		durations = sorted(s["duration_ms"] for s in samples)
+		backends = {}
+		for s in samples:
+			backends[s["backend"]] = backends.get(s["backend"], 0) + 1
+
+		metrics[name] = {
+			"count": len(durations),
+			"avg_ms": round(sum(durations) / len(durations), 1),
+			"p50_ms": percentile(durations, 0.5),
+			"p95_ms": percentile(durations, 0.95),
+			"max_ms": durations[-1],
+			"backends": backends
+		}
+	return metrics
@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+# Copyright (c) 2026, VisualGraphX and contributors
+# For license information, please see license.txt
+
+"""
+Reconciliation between the Qdrant collections and their Frappe sources.
+
+Each run pages through the entire collection with ``next_page_offset``
+(payload fields only, no vectors) and diffs it against the source doctype in
+memory:
+
+- knowledge collection (api.rag): chunk sets per parent document. Chunks whose
+  parent document was deleted are orphaned. Knowledge Base Articles that are
+  published and AI-enabled are expected, and their current chunk hashes are
+  compared with the stored ones.
+- FAQ collection (qdrant_faq_sync): one point per enabled Chatwoot FAQ, with
+  the content hash compared against the current FAQ text.
+
+Orphaned points are deleted in batches; missing and stale documents are
+re-upserted, at most MAX_REPAIRS per run, so a run finishes in bounded time.
+Anything left over is picked up by the next run. Documents are only reported
+missing when the scan covered the whole collection.
+
+The drift report of the last run of each collection is kept in the cache
+(get_drift_report).
+"""
+
+import time
+
+import frappe
+import requests
+from frappe.utils import now
+
+
+SCROLL_PAGE_SIZE = 1000
+DELETE_BATCH_SIZE = 1000
+MAX_REPAIRS = 500  # re-upserted documents per run
+MAX_RUNTIME = 1200  # seconds
+REPORT_CACHE_KEY = "ai_comms_hub:vector_reconciliation:report"
+KB_ARTICLE = "Knowledge Base Article"
+
+
+class ScanIncomplete(Exception):
+	"""The collection scan ran out of time before the last page."""
+
+
+def scroll_points(base_url, collection, headers, with_payload, scroll_filter=None, deadline=None):
+	"""
+	Page through every point of a collection.
+
+	Yields:
+		dict: Qdrant point (id, payload)
+
+	Raises:
+		ScanIncomplete: If the deadline passes before the last page
+	"""
+	offset = None
+	while True:
+		body = {"limit": SCROLL_PAGE_SIZE, "with_payload": with_payload, "with_vector": False}
+		if scroll_filter:
+			body["filter"] = scroll_filter
+		if offset is not None:
+			body["offset"] = offset
+
+		response = requests.post(
+			f"{base_url}/collections/{collection}/points/scroll",
+			headers=headers,
+			json=body,
+			timeout=30
+		)
+		response.raise_for_status()
+		result = response.json().get("result", {})
+
+		yield from result.get("points", [])
+
+		offset = result.get("next_page_offset")
+		if offset is None:
+			return
+		if deadline and time.monotonic() > deadline:
+			raise ScanIncomplete
+
+
+def delete_points(base_url, collection, headers, point_ids):
+	"""Delete points by ID, DELETE_BATCH_SIZE per request."""
+	for start in range(0, len(point_ids), DELETE_BATCH_SIZE):
+		response = requests.post(
+			f"{base_url}/collections/{collection}/points/delete",
+			headers=headers,
+			json={"points": point_ids[start:start + DELETE_BATCH_SIZE]},
+			timeout=60
+		)
+		response.raise_for_status()
+
+
+def _missing_parents(parent_ids):
+	"""Parent IDs ("DocType:name") whose document no longer exists."""
+	by_doctype = {}
+	for parent_id in parent_ids:
+		doctype, _, name = parent_id.partition(":")
+		by_doctype.setdefault(doctype, set()).add(name)
+
+	missing = set()
+	for doctype, names in by_doctype.items():
+		# Non-doctype sources (Custom Knowledge) and singles cannot be checked
+		if not frappe.db.exists("DocType", doctype) or frappe.get_meta(doctype).issingle:
+			continue
+
+		names = list(names)
+		found = set()
+		for start in range(0, len(names), DELETE_BATCH_SIZE):
+			found.update(frappe.get_all(
+				doctype,
+				filters={"name": ["in", names[start:start + DELETE_BATCH_SIZE]]},
+				pluck="name"
+			))
+		missing.update(f"{doctype}:{name}" for name in names if name not in found)
+
+	return missing
+
+
+def _expected_articles():
+	"""
+	Chunk hashes of every published, AI-enabled Knowledge Base Article.
+
+	Returns:
+		dict: parent ID -> (article name, set of chunk hashes)
+	"""
+	from ai_comms_hub.api.rag import get_article_document, get_parent_id
+	from ai_comms_hub.utils.chunking import split_document
+
+	expected = {}
+	last_name = ""
+	while True:
+		articles = frappe.get_all(
+			KB_ARTICLE,
+			filters={"status": "Published", "is_ai_enabled": 1, "name": [">", last_name]},
+			fields=["name", "title", "category", "content"],
+			order_by="name asc",
+			limit=500
+		)
+		if not articles:
+			return expected
+
+		for article in articles:
+			document = get_article_document(article)
+			parent_id = get_parent_id(**document)
+			hashes = {chunk["hash"] for chunk in split_document(document["content"], title=document["title"])}
+			expected[parent_id] = (article.name, hashes)
+		last_name = articles[-1].name
+
+
+def _save_report(key, report):
+	reports = frappe.cache().get_value(REPORT_CACHE_KEY) or {}
+	reports[key] = report
+	frappe.cache().set_value(REPORT_CACHE_KEY, reports)
+	frappe.logger().info(f"Vector reconciliation ({key}): {report}")
+
+
+def reconcile_knowledge_base(dry_run=False):
+	"""
+	Reconcile the RAG knowledge collection.
+
+	Args:
+		dry_run (bool): Only produce the drift report
+
+	Returns:
+		dict: Drift report
+	"""
+	from ai_comms_hub.api.rag import get_qdrant_headers, get_qdrant_settings, index_knowledge_base_article
+	from ai_comms_hub.services import lexical_index
+
+	started = time.monotonic()
+	deadline = started + MAX_RUNTIME
+	settings = get_qdrant_settings()
+	headers = get_qdrant_headers(settings)
+
+	stored = {}  # parent ID -> {point ID: chunk hash}
+	scanned = 0
+	unchunked = 0
+	complete = True
+	try:
+		for point in scroll_points(settings["url"], settings["collection"], headers, ["parent_id", "chunk_hash"], deadline=deadline):
+			scanned += 1
+			payload = point.get("payload") or {}
+			if not payload.get("parent_id"):
+				unchunked += 1
+				continue
+			stored.setdefault(payload["parent_id"], {})[str(point["id"])] = payload.get("chunk_hash")
+	except ScanIncomplete:
+		complete = False
+
+	expected = _expected_articles()
+	orphaned = _missing_parents(stored)
+	orphaned.update(
+		parent_id for parent_id in stored
+		if parent_id.startswith(f"{KB_ARTICLE}:") and parent_id not in expected
+	)
+	missing = [name for parent_id, (name, _) in expected.items() if parent_id not in stored] if complete else []
+	stale = [
+		name for parent_id, (name, hashes) in expected.items()
+		if parent_id in stored and set(stored[parent_id].values()) != hashes
+	]
+	orphaned_points = [point_id for parent_id in orphaned for point_id in stored[parent_id]]
+
+	report = {
+		"collection": settings["collection"],
+		"points": scanned,
+		"documents": len(stored),
+		"unchunked_points": unchunked,
+		"scan_complete": complete,
+		"expected_articles": len(expected),
+		"missing": len(missing),
+		"stale": len(stale),
+		"orphaned_documents": len(orphaned),
+		"orphaned_points": len(orphaned_points),
+		"deleted": 0,
+		"repaired": 0,
+		"failed": 0,
+		"dry_run": bool(dry_run)
+	}
+
+	if not dry_run:
+		if orphaned_points:
+			delete_points(settings["url"], settings["collection"], headers, orphaned_points)
+			for parent_id in orphaned:
+				lexical_index.delete_document(parent_id)
+			frappe.db.commit()
+			report["deleted"] = len(orphaned_points)
+
+		for name in (missing + stale)[:MAX_REPAIRS]:
+			if time.monotonic() > deadline:
+				break
+			if index_knowledge_base_article(name).get("status") == "success":
+				report["repaired"] += 1
+			else:
+				report["failed"] += 1
+			frappe.db.commit()
+
+	report["duration"] = round(time.monotonic() - started, 1)
+	report["finished_at"] = now()
+	_save_report("knowledge_base", report)
+	return report
+
+
+def reconcile_faqs(dry_run=False):
+	"""
+	Reconcile the Chatwoot FAQ collection.
+
+	Args:
+		dry_run (bool): Only produce the drift report
+
+	Returns:
+		dict: Drift report
+	"""
+	from ai_comms_hub.services import qdrant_faq_sync as faq_sync
+
+	started = time.monotonic()
+	deadline = started + MAX_RUNTIME
+	settings = faq_sync.get_settings()
+	headers = faq_sync.get_qdrant_headers(settings)
+
+	stored = {}  # point ID -> content hash
+	complete = True
+	try:
+		for point in scroll_points(
+			settings["qdrant_url"], faq_sync.COLLECTION_NAME, headers, ["content_hash"],
+			scroll_filter={"must": [{"key": "doctype", "match": {"value": "Chatwoot FAQ"}}]},
+			deadline=deadline
+		):
+			stored[str(point["id"])] = (point.get("payload") or {}).get("content_hash")
+	except ScanIncomplete:
+		complete = False
+
+	category_names = dict(frappe.get_all(
+		"Chatwoot FAQ Category", fields=["name", "category_name"], as_list=True
+	))
+	faqs = frappe.get_all(
+		"Chatwoot FAQ",
+		filters={"enabled": 1},
+		fields=["name", "question", "answer", "category", "tags", "qdrant_point_id", "sync_status"]
+	)
+	expected = {
+		str(faq_sync.get_point_id(faq)): (faq, faq_sync.get_content_hash(faq_sync.build_faq_content(faq, category_names)))
+		for faq in faqs
+	}
+
+	orphaned = [point_id for point_id in stored if point_id not in expected]
+	missing = [faq.name for point_id, (faq, _) in expected.items() if point_id not in stored] if complete else []
+	stale = [
+		faq.name for point_id, (faq, content_hash) in expected.items()
+		if point_id in stored and stored[point_id] != content_hash
+	]
+	mislabelled = [
+		faq.name for point_id, (faq, content_hash) in expected.items()
+		if stored.get(point_id) == content_hash and faq.sync_status != "Synced"
+	]
+
+	report = {
+		"collection": faq_sync.COLLECTION_NAME,
+		"points": len(stored),
+		"scan_complete": complete,
+		"expected": len(expected),
+		"missing": len(missing),
+		"stale": len(stale),
+		"orphaned_points": len(orphaned),
+		"status_corrected": len(mislabelled),
+		"deleted": 0,
+		"repaired": 0,
+		"failed": 0,
+		"dry_run": bool(dry_run)
+	}
+
+	if not dry_run:
+		if orphaned:
+			delete_points(
+				settings["qdrant_url"], faq_sync.COLLECTION_NAME, headers,
+				[int(point_id) if point_id.isdigit() else point_id for point_id in orphaned]
+			)
+			report["deleted"] = len(orphaned)
+
+		if mislabelled:
+			frappe.db.sql("""
+				UPDATE `tabChatwoot FAQ`
+				SET sync_status = 'Synced', sync_error = ''
+				WHERE name IN %(names)s
+			""", {"names": mislabelled})
+			frappe.db.commit()
+
+		repairs = (missing + stale)[:MAX_REPAIRS]
+		if repairs:
+			result = faq_sync.upsert_faqs(repairs)
+			report["repaired"] = result["synced"]
+			report["failed"] = result["failed"]
+
+	report["duration"] = round(time.monotonic() - started, 1)
+	report["finished_at"] = now()
+	_save_report("faqs", report)
+	return report
+
+
+@frappe.whitelist()
+def get_drift_report():
+	"""Drift reports of the last reconciliation run of each collection."""
+	frappe.only_for("System Manager")
+	return frappe.cache().get_value(REPORT_CACHE_KEY) or {}
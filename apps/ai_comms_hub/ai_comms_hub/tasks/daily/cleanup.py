@@ -113,48 +113,16 @@ def cleanup_temporary_files():
 
 def cleanup_vector_database():
 	"""
-	Remove orphaned vectors from Qdrant (vectors without corresponding documents).
-	"""
-	from ai_comms_hub.api.rag import get_qdrant_settings
-	import requests
+	Reconcile the Qdrant knowledge collection with its Frappe sources.
 
-	settings = get_qdrant_settings()
+	Removes vectors of deleted documents and re-indexes missing or changed
+	Knowledge Base Articles (see services.vector_reconciliation).
+	"""
+	from ai_comms_hub.services.vector_reconciliation import reconcile_knowledge_base
 
 	try:
-		# Get all vector IDs from Qdrant
-		response = requests.post(
-			f"{settings['url']}/collections/{settings['collection']}/points/scroll",
-			json={
-				"limit": 1000,
-				"with_payload": False,
-				"with_vector": False
-			},
-			timeout=10
-		)
-
-		if response.status_code != 200:
-			return
-
-		points = response.json().get("result", {}).get("points", [])
-
-		# Check which Knowledge Base documents still exist
-		orphaned_ids = []
-
-		for point in points:
-			kb_id = point["id"]
-
-			if not frappe.db.exists("Knowledge Base Article", kb_id):
-				orphaned_ids.append(kb_id)
-
-		# Delete orphaned vectors
-		if orphaned_ids:
-			requests.post(
-				f"{settings['url']}/collections/{settings['collection']}/points/delete",
-				json={"points": orphaned_ids},
-				timeout=30
-			)
-
-			print(f"Deleted {len(orphaned_ids)} orphaned vectors from Qdrant")
+		report = reconcile_knowledge_base()
+		print(f"Deleted {report['deleted']} orphaned vectors, re-indexed {report['repaired']} articles")
 
 	except Exception as e:
 		frappe.log_error(f"Error cleaning vector database: {str(e)}", "Vector DB Cleanup")
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# Copyright (c) 2026, VisualGraphX and contributors
+# For license information, please see license.txt
+
+"""
+Unit tests for content-addressed attachment storage.
+"""
+
+import base64
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import frappe
+from ai_comms_hub.utils import attachments
+
+
+class TestAttachments(unittest.TestCase):
+	"""Test chunked spooling, hashing, size cap and blob dedup."""
+
+	def setUp(self):
+		self.site_dir = tempfile.mkdtemp()
+		self.site_patch = patch.object(frappe, "get_site_path", side_effect=lambda *parts: os.path.join(self.site_dir, *parts))
+		self.site_patch.start()
+
+	def tearDown(self):
+		self.site_patch.stop()
+		shutil.rmtree(self.site_dir)
+
+	def test_file_object_hashed_over_full_content(self):
+		"""Test that files sharing their first bytes get different addresses."""
+		prefix = b"x" * 5000
+		first = attachments.spool_attachment(io.BytesIO(prefix + b"A"))
+		second = attachments.spool_attachment(io.BytesIO(prefix + b"B"))
+
+		self.assertEqual(first["sha256"], hashlib.sha256(prefix + b"A").hexdigest())
+		self.assertNotEqual(first["sha256"], second["sha256"])
+		self.assertEqual(first["size"], 5001)
+
+	def test_base64_decoded_in_chunks(self):
+		"""Test that a multi-chunk base64 string decodes to the original bytes."""
+		content = os.urandom(attachments.CHUNK_SIZE * 3 + 17)
+		encoded = base64.encodebytes(content).decode()  # includes line breaks
+
+		spooled = attachments.spool_attachment(encoded)
+
+		with open(spooled["path"], "rb") as f:
+			self.assertEqual(f.read(), content)
+
+	def test_plain_text_fallback(self):
+		"""Test that non-base64 strings are stored as UTF-8 text."""
+		spooled = attachments.spool_attachment("hello world!")
+
+		with open(spooled["path"], "rb") as f:
+			self.assertEqual(f.read(), b"hello world!")
+
+	def test_size_cap_removes_spool(self):
+		"""Test that oversized attachments are rejected and leave no spool file."""
+		with self.assertRaises(attachments.AttachmentTooLargeError):
+			attachments.spool_attachment(b"x" * 2048, max_size=1024)
+
+		spool_dir = os.path.join(self.site_dir, "private", "files", attachments.ATTACHMENT_FOLDER, attachments.SPOOL_FOLDER)
+		self.assertEqual(os.listdir(spool_dir), [])
+
+	def test_identical_content_stored_once(self):
+		"""Test that the same blob received twice is written once and shares its URL."""
+		first_url = attachments.store_spooled(attachments.spool_attachment(b"logo"), "logo.PNG")
+		second = attachments.spool_attachment(b"logo")
+		second_url = attachments.store_spooled(second, "signature.png")
+
+		self.assertEqual(first_url, second_url)
+		self.assertTrue(first_url.endswith(".png"))
+		self.assertFalse(os.path.exists(second["path"]))
+
+
+if __name__ == "__main__":
+	unittest.main()
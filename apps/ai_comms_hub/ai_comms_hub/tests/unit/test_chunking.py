@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# Copyright (c) 2026, VisualGraphX and contributors
+# For license information, please see license.txt
+
+"""
+Unit tests for RAG document chunking.
+"""
+
+import unittest
+
+from ai_comms_hub.services.conversation_memory import estimate_tokens
+from ai_comms_hub.utils import chunking
+
+
+def _paragraph(word, sentences=5):
+	return " ".join(f"{word} sentence number {i} has a few words." for i in range(sentences))
+
+
+class TestChunking(unittest.TestCase):
+	"""Test heading-aware splitting, overlap, hashing and merging."""
+
+	def test_chunks_respect_token_limit(self):
+		"""Test that no chunk exceeds max_tokens, including oversized paragraphs."""
+		text = "\n\n".join(_paragraph(w, 20) for w in ("alpha", "beta", "gamma"))
+
+		chunks = chunking.split_document(text, max_tokens=60, overlap_tokens=15)
+
+		self.assertGreater(len(chunks), 3)
+		for chunk in chunks:
+			self.assertLessEqual(estimate_tokens(chunk["text"]), 60)
+
+	def test_headings_start_new_chunks(self):
+		"""Test that sections are never mixed and keep their heading."""
+		text = "# Shipping\n\nWe ship daily.\n\n## Returns\n\nReturns within 30 days."
+
+		chunks = chunking.split_document(text, title="Policies")
+
+		self.assertEqual([c["heading"] for c in chunks], ["Shipping", "Returns"])
+		self.assertEqual(chunks[1]["text"], "Returns within 30 days.")
+		self.assertTrue(chunks[1]["embed_text"].startswith("Policies - Returns"))
+
+	def test_edit_only_changes_affected_chunk_hashes(self):
+		"""Test that editing one section leaves the other chunk hashes unchanged."""
+		before = "# A\n\n" + _paragraph("alpha") + "\n\n# B\n\n" + _paragraph("beta")
+		after = "# A\n\n" + _paragraph("alpha") + "\n\n# B\n\n" + _paragraph("beta").replace("number 3", "no. 3")
+
+		old = chunking.split_document(before, title="Doc")
+		new = chunking.split_document(after, title="Doc")
+
+		self.assertEqual(old[0]["hash"], new[0]["hash"])
+		self.assertNotEqual(old[1]["hash"], new[1]["hash"])
+
+	def test_merge_adjacent_drops_overlap(self):
+		"""Test that adjacent chunks of a parent merge without repeating overlap text."""
+		chunks = chunking.split_document(_paragraph("alpha", 12), max_tokens=50, overlap_tokens=15)
+		self.assertGreater(chunks[1]["overlap_chars"], 0)
+
+		hits = [
+			{"parent_id": "Doc:1", "chunk_index": c["index"], "overlap_chars": c["overlap_chars"],
+				"content": c["text"], "score": 0.8 + c["index"] / 100}
+			for c in chunks[:2]
+		]
+		hits.append({"parent_id": None, "content": "legacy", "score": 0.5})
+
+		merged = chunking.merge_adjacent(hits)
+
+		self.assertEqual(len(merged), 2)
+		self.assertEqual(merged[0]["chunk_indexes"], [0, 1])
+		self.assertEqual(merged[0]["score"], 0.81)
+		self.assertEqual(merged[0]["content"].count("sentence number 0 "), 1)
+
+	def test_html_to_text_keeps_structure(self):
+		"""Test that HTML headings and paragraphs survive conversion."""
+		text = chunking.html_to_text("<h2>Hours</h2><p>Mon&ndash;Fri</p><p>9 to 5</p>")
+
+		self.assertEqual(text, "## Hours\n\nMon–Fri\n\n9 to 5")
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# Copyright (c) 2026, VisualGraphX and contributors
+# For license information, please see license.txt
+
+"""
+Unit tests for the contact identity index.
+"""
+
+import unittest
+from unittest.mock import patch
+
+import frappe
+from ai_comms_hub.utils import contact_identity
+
+
+class TestContactIdentity(unittest.TestCase):
+	"""Test identity normalization and the in-request memo."""
+
+	def setUp(self):
+		frappe.local.contact_identity_memo = {}
+
+	def test_normalize_phone(self):
+		"""Test that common phone formats map to the same E.164 number."""
+		for raw in ("(555) 123-4567", "555.123.4567", "+1 555 123 4567", "15551234567", "whatsapp:+15551234567"):
+			self.assertEqual(contact_identity.normalize_phone(raw), "+15551234567", raw)
+		self.assertEqual(contact_identity.normalize_phone("+44 20 7946 0958"), "+442079460958")
+		self.assertEqual(contact_identity.normalize_phone("0044 20 7946 0958"), "+442079460958")
+		self.assertIsNone(contact_identity.normalize_phone("12345"))
+		self.assertIsNone(contact_identity.normalize_phone(None))
+
+	def test_normalize_email(self):
+		"""Test that addresses are stripped of display names and lowercased."""
+		self.assertEqual(contact_identity.normalize_email("Jane Doe <Jane.Doe@Example.COM>"), "jane.doe@example.com")
+		self.assertIsNone(contact_identity.normalize_email("not an address"))
+
+	def test_lookups_are_memoized(self):
+		"""Test that repeated lookups in one request query the index once."""
+		with patch.object(frappe.db, "sql", return_value=[("CUST-0001",)]) as sql:
+			self.assertEqual(contact_identity.find_customer_by_phone("555-123-4567"), "CUST-0001")
+			self.assertEqual(contact_identity.find_customer_by_phone("+1 (555) 123-4567"), "CUST-0001")
+
+		self.assertEqual(sql.call_count, 1)
+
+	def test_national_number_keeps_its_digits(self):
+		"""Test that non-US national numbers are not given the default country code."""
+		self.assertEqual(contact_identity.normalize_phone("020 7946 0958"), "+02079460958")
+		self.assertEqual(contact_identity.normalize_phone("07700 900123"), "+07700900123")
+
+	def test_national_number_matches_international_form(self):
+		"""Test that a UK national number finds the customer stored in E.164 by its trailing digits."""
+		with patch.object(frappe.db, "sql", side_effect=[[], [("CUST-UK",)]]) as sql:
+			self.assertEqual(contact_identity.find_customer_by_phone("020 7946 0958"), "CUST-UK")
+
+		self.assertEqual(sql.call_args_list[0][0][1], (contact_identity.PHONE, "+02079460958"))
+		self.assertEqual(sql.call_args_list[1][0][1], (contact_identity.PHONE, "%2079460958"))
+
+	def test_short_number_skips_suffix_match(self):
+		"""Test that numbers shorter than the suffix are only matched exactly."""
+		with patch.object(frappe.db, "sql", return_value=[]) as sql:
+			self.assertIsNone(contact_identity.find_customer_by_phone("946 0958"))
+
+		self.assertEqual(sql.call_count, 1)
+
+	def test_remembered_customer_skips_query(self):
+		"""Test that a customer created in this request is found without a query."""
+		contact_identity.remember(contact_identity.EMAIL, "new@example.com", "CUST-0002")
+		with patch.object(frappe.db, "sql") as sql:
+			self.assertEqual(contact_identity.find_customer_by_email("New@Example.com"), "CUST-0002")
+		sql.assert_not_called()
+
+
+if __name__ == "__main__":
+	unittest.main()
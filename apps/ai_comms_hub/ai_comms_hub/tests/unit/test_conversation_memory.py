@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# Copyright (c) 2026, VisualGraphX and contributors
+# For license information, please see license.txt
+
+"""
+Unit tests for the AI engine conversation memory.
+"""
+
+import unittest
+from unittest.mock import patch
+
+import frappe
+from ai_comms_hub.services import conversation_memory
+
+
+def _msg(i, content):
+	return frappe._dict(sender_type="Customer" if i % 2 else "AI", sender_name="", content=content, timestamp=i)
+
+
+class TestConversationMemory(unittest.TestCase):
+	"""Test the token-budgeted window and summary scheduling."""
+
+	def test_estimate_tokens(self):
+		"""Test the character-based token estimate."""
+		self.assertEqual(conversation_memory.estimate_tokens(""), 0)
+		self.assertEqual(conversation_memory.estimate_tokens(None), 0)
+		self.assertEqual(conversation_memory.estimate_tokens("abcd" * 10), 10)
+
+	def test_window_keeps_latest_messages_within_budget(self):
+		"""Test that the newest messages are kept, oldest first, within the budget."""
+		newest_first = [_msg(i, "x" * 40) for i in range(20, 0, -1)]  # 10 + 4 tokens each
+
+		with patch.object(frappe, "get_all", return_value=newest_first):
+			window = conversation_memory.get_recent_messages("HUB-1", token_budget=50)
+
+		self.assertEqual([m.timestamp for m in window], [18, 19, 20])
+
+	def test_window_always_includes_newest_message(self):
+		"""Test that a single oversized message still makes it into the window."""
+		with patch.object(frappe, "get_all", return_value=[_msg(1, "x" * 4000)]):
+			window = conversation_memory.get_recent_messages("HUB-1", token_budget=10)
+
+		self.assertEqual(len(window), 1)
+
+	def test_summary_due_after_interval(self):
+		"""Test that the summary is only refreshed every summary_interval messages."""
+		with patch.object(conversation_memory, "get_summary_interval", return_value=6):
+			with patch.object(frappe.db, "count", return_value=5):
+				self.assertFalse(conversation_memory.summary_due("HUB-1", summarized_until="2026-01-01"))
+			with patch.object(frappe.db, "count", return_value=6) as count:
+				self.assertTrue(conversation_memory.summary_due("HUB-1", summarized_until="2026-01-01"))
+				filters = count.call_args[0][1]
+				self.assertEqual(filters["timestamp"], [">", "2026-01-01"])
+
+
+if __name__ == "__main__":
+	unittest.main()
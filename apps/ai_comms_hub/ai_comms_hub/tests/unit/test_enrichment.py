@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# Copyright (c) 2026, VisualGraphX and contributors
+# For license information, please see license.txt
+
+"""
+Unit tests for the batched conversation enrichment worker.
+"""
+
+import unittest
+from unittest.mock import patch
+
+import frappe
+from ai_comms_hub.services import enrichment
+
+
+class TestEnrichment(unittest.TestCase):
+	"""Test batched sentiment updates and pending-hub coalescing."""
+
+	def tearDown(self):
+		frappe.cache().delete_value(enrichment.PENDING_KEY)
+
+	def test_sentiments_written_once_per_value(self):
+		"""Test that hubs sharing a sentiment are updated with a single statement."""
+		texts = {
+			"HUB-1": "thanks, great and helpful",
+			"HUB-2": "terrible, awful service",
+			"HUB-3": "thank you, excellent work",
+		}
+		with patch.object(enrichment, "_latest_customer_messages", return_value=texts), \
+				patch.object(frappe.db, "sql") as sql:
+			results = enrichment.update_sentiments(list(texts))
+
+		self.assertEqual(results, {"HUB-1": "Positive", "HUB-2": "Negative", "HUB-3": "Positive"})
+		self.assertEqual(sql.call_count, 2)
+		updated = {call[0][1]["sentiment"]: sorted(call[0][1]["names"]) for call in sql.call_args_list}
+		self.assertEqual(updated, {"Positive": ["HUB-1", "HUB-3"], "Negative": ["HUB-2"]})
+
+	def test_repeated_marks_coalesce(self):
+		"""Test that marking a hub several times queues it once."""
+		with patch.object(enrichment, "wake_worker") as wake:
+			for _ in range(3):
+				enrichment.mark_hub_for_enrichment("HUB-1")
+			enrichment.mark_hub_for_enrichment("HUB-2")
+
+		self.assertEqual(wake.call_count, 4)
+		self.assertEqual(sorted(enrichment._take_pending(10)), ["HUB-1", "HUB-2"])
+		self.assertEqual(enrichment._take_pending(10), [])
+
+	def test_lock_refreshed_per_batch_and_released_by_owner(self):
+		"""Test that the worker extends its lock after each batch and releases its own token."""
+		with patch.object(enrichment, "acquire_lock", return_value="token-1"), \
+				patch.object(enrichment, "refresh_lock", return_value=True) as refresh, \
+				patch.object(enrichment, "release_lock") as release, \
+				patch.object(enrichment, "_take_pending", side_effect=[["HUB-1"], ["HUB-2"], []]), \
+				patch.object(enrichment, "process_batch") as process_batch:
+			enrichment.process_pending(collect_window=0)
+
+		self.assertEqual(process_batch.call_count, 2)
+		self.assertEqual(refresh.call_count, 2)
+		release.assert_called_once_with(enrichment.LOCK_KEY, "token-1")
+
+	def test_lost_lock_stops_worker(self):
+		"""Test that a worker whose lock was taken over stops after the current batch."""
+		with patch.object(enrichment, "acquire_lock", return_value="token-1"), \
+				patch.object(enrichment, "refresh_lock", return_value=False), \
+				patch.object(enrichment, "release_lock"), \
+				patch.object(enrichment, "_take_pending", side_effect=[["HUB-1"], ["HUB-2"], []]), \
+				patch.object(enrichment, "process_batch") as process_batch:
+			enrichment.process_pending(collect_window=0)
+
+		process_batch.assert_called_once_with(["HUB-1"])
+
+
+if __name__ == "__main__":
+	unittest.main()
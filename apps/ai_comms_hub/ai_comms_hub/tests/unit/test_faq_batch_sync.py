@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# Copyright (c) 2026, VisualGraphX and contributors
+# For license information, please see license.txt
+
+"""
+Unit tests for batched Chatwoot FAQ sync.
+"""
+
+import unittest
+from unittest.mock import MagicMock, patch
+
+import frappe
+from ai_comms_hub.services import qdrant_faq_sync
+
+
+def _faqs(names):
+	return [
+		frappe._dict(name=name, question=f"Q {name}", answer="A", category=None, priority=None,
+			tags=None, enabled=1, creation=None, modified=None, qdrant_point_id=None)
+		for name in names
+	]
+
+
+class TestFAQBatchSync(unittest.TestCase):
+	"""Test batch sizing, bulk upserts and per-batch status updates."""
+
+	def _run(self, names, batch_size, on_batch=None):
+		def get_all(doctype, filters=None, **kwargs):
+			return _faqs(filters["name"][1]) if doctype == "Chatwoot FAQ" else []
+
+		with patch.object(qdrant_faq_sync, "ensure_collection_exists"), \
+				patch.object(qdrant_faq_sync, "get_settings", return_value={"qdrant_url": "http://qdrant"}), \
+				patch.object(qdrant_faq_sync, "generate_embeddings", side_effect=lambda texts: [[0.0]] * len(texts)) as embed, \
+				patch.object(qdrant_faq_sync.requests, "put", return_value=MagicMock()) as put, \
+				patch.object(frappe, "get_all", side_effect=get_all), \
+				patch.object(frappe.db, "sql") as sql, \
+				patch.object(frappe.db, "commit"):
+			result = qdrant_faq_sync.upsert_faqs(names, batch_size=batch_size, on_batch=on_batch)
+		return result, embed, put, sql
+
+	def test_one_request_and_statement_per_batch(self):
+		"""Test that 150 FAQs in batches of 64 make 3 embedding calls, upserts and updates."""
+		names = [f"FAQ-{i:03d}" for i in range(150)]
+		progress = []
+
+		result, embed, put, sql = self._run(names, 64, on_batch=lambda *args: progress.append(args))
+
+		self.assertEqual(result, {"synced": 150, "failed": 0})
+		self.assertEqual([len(call[0][0]) for call in embed.call_args_list], [64, 64, 22])
+		self.assertEqual(put.call_count, 3)
+		self.assertEqual(sql.call_count, 3)
+		self.assertEqual(progress[-1], ("FAQ-149", 150, 0))
+
+	def test_batch_size_is_clamped(self):
+		"""Test that the configured batch size stays within 64-256."""
+		with patch.object(frappe.db, "get_single_value", return_value=1000):
+			self.assertEqual(qdrant_faq_sync.get_batch_size(), qdrant_faq_sync.MAX_BATCH_SIZE)
+		with patch.object(frappe.db, "get_single_value", return_value=8):
+			self.assertEqual(qdrant_faq_sync.get_batch_size(), qdrant_faq_sync.MIN_BATCH_SIZE)
+
+
+if __name__ == "__main__":
+	unittest.main()
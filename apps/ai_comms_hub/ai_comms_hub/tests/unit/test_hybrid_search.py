@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# Copyright (c) 2026, VisualGraphX and contributors
+# For license information, please see license.txt
+
+"""
+Unit tests for hybrid (BM25 + vector) knowledge base search.
+"""
+
+import time
+import unittest
+from unittest.mock import patch
+
+import frappe
+from ai_comms_hub.api import rag
+from ai_comms_hub.services import lexical_index
+
+
+def _hit(point_id, score, **extra):
+	return dict({"id": point_id, "score": score, "content": point_id, "parent_id": None}, **extra)
+
+
+class TestHybridSearch(unittest.TestCase):
+	"""Test code-aware tokenization, rank fusion and the latency budget."""
+
+	def test_tokenize_keeps_codes_and_parts(self):
+		"""Test that product codes are indexed whole, by part and joined."""
+		terms = lexical_index.tokenize("Do you have BC-500 in 13oz vinyl?")
+
+		for term in ("bc-500", "bc", "500", "bc500", "13oz", "vinyl"):
+			self.assertIn(term, terms)
+		self.assertNotIn("you", terms)
+
+	def _search(self, query, matched_codes):
+		row = frappe._dict(name="c1", document_id="d1", chunk_index=0, bm25=4.2, matched_codes=matched_codes)
+		with patch.object(lexical_index, "get_corpus_stats", return_value={"chunks": 10, "avg_length": 50.0}), \
+				patch.object(frappe.db, "sql", side_effect=[[("banner", 3), ("bc-500", 1)], [row]]):
+			return lexical_index.search(query)
+
+	def test_common_word_matches_report_no_confidence(self):
+		"""Test that plain word overlap ranks a chunk without lending it confidence."""
+		hits = self._search("how much is a vinyl banner", matched_codes=0)
+
+		self.assertEqual(hits[0]["lexical_score"], 4.2)
+		self.assertEqual(hits[0]["score"], 0)
+
+	def test_code_match_reports_confidence(self):
+		"""Test that a chunk containing the query's product code is reported as confident."""
+		self.assertEqual(self._search("BC-500 banner price", matched_codes=1)[0]["score"], lexical_index.CODE_MATCH_CONFIDENCE)
+		self.assertEqual(self._search("BC-500 or 13oz banner", matched_codes=1)[0]["score"], lexical_index.CODE_MATCH_CONFIDENCE / 2)
+
+	def test_rank_fusion_rewards_agreement(self):
+		"""Test that a hit found by both retrievers ranks above single-list hits."""
+		vector = [_hit("a", 0.82), _hit("b", 0.80)]
+		lexical = [_hit("c", 0.9), _hit("b", 0.45)]
+
+		fused = rag.reciprocal_rank_fusion(vector, lexical)
+
+		self.assertEqual(fused[0]["id"], "b")
+		self.assertEqual(fused[0]["score"], 0.80)
+		self.assertEqual({hit["id"] for hit in fused}, {"a", "b", "c"})
+
+	def test_slow_vector_search_falls_back_to_lexical(self):
+		"""Test that vector results arriving after the budget are dropped."""
+		def slow_vector_search(*args):
+			time.sleep(0.5)
+			return [_hit("late", 0.99)]
+
+		with patch.object(rag, "vector_search", side_effect=slow_vector_search), \
+				patch.object(rag, "get_qdrant_settings", return_value={}), \
+				patch("ai_comms_hub.api.llm.get_llm_settings", return_value={}), \
+				patch.object(lexical_index, "search", return_value=[_hit("bc-500", 0.9)]):
+			results = rag.query_knowledge_base("BC-500", top_k=3, latency_budget_ms=50)
+
+		self.assertEqual([hit["id"] for hit in results], ["bc-500"])
+
+	def test_confidence_ignores_lexical_only_hits(self):
+		"""Test that word-overlap hits neither lower nor provide confidence."""
+		vector = [_hit("a", 0.82, vector_score=0.82)]
+		lexical = [_hit("b", 0), _hit("c", 0)]
+
+		fused = rag.reciprocal_rank_fusion(vector, lexical)
+
+		self.assertEqual(rag.get_confidence(fused), 0.82)
+		self.assertIsNone(rag.get_confidence(lexical))
+		self.assertEqual(rag.get_confidence([_hit("code", 0.9), _hit("word", 0)]), 0.9)
+
+	def test_vector_timeout_gives_no_confidence_signal(self):
+		"""Test that a timed out vector search is not read as zero confidence."""
+		def slow_vector_search(*args):
+			time.sleep(0.5)
+			return [_hit("late", 0.99, vector_score=0.99)]
+
+		with patch.object(rag, "vector_search", side_effect=slow_vector_search), \
+				patch.object(rag, "get_qdrant_settings", return_value={}), \
+				patch("ai_comms_hub.api.llm.get_llm_settings", return_value={}), \
+				patch.object(lexical_index, "search", return_value=[_hit("banner", 0), _hit("sizes", 0)]):
+			results = rag.query_knowledge_base("banner sizes", top_k=3, latency_budget_ms=50)
+
+		self.assertEqual(len(results), 2)
+		self.assertIsNone(rag.get_confidence(results))
+
+
+if __name__ == "__main__":
+	unittest.main()
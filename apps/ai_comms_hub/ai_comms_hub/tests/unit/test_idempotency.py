@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# Copyright (c) 2026, VisualGraphX and contributors
+# For license information, please see license.txt
+
+"""
+Unit tests for the inbound message idempotency store.
+"""
+
+import unittest
+from unittest.mock import patch
+
+import frappe
+from ai_comms_hub.utils.idempotency import already_processed, backfill_keys, claim, get_message_platform
+
+
+class TestIdempotency(unittest.TestCase):
+	"""Test duplicate detection for platform message IDs."""
+
+	def tearDown(self):
+		frappe.db.rollback()
+		frappe.db.delete("Message Idempotency Key", {"platform": "Test"})
+		frappe.cache().delete_keys("ai_comms_hub:idempotency:Test:")
+		frappe.db.commit()
+
+	def test_claim_rejects_duplicate(self):
+		"""Test that the unique key rejects a second claim for the same ID."""
+		claim("Test", "msg-1")
+		with self.assertRaises(frappe.DuplicateEntryError):
+			claim("Test", "msg-1")
+
+	def test_same_id_on_other_platform_is_allowed(self):
+		"""Test that keys are namespaced by platform."""
+		claim("Test", "msg-2")
+		try:
+			claim("Other Test", "msg-2")
+			platforms = frappe.get_all(
+				"Message Idempotency Key",
+				filters={"platform_message_id": "msg-2"},
+				pluck="platform"
+			)
+			self.assertEqual(sorted(platforms), ["Other Test", "Test"])
+		finally:
+			frappe.db.delete("Message Idempotency Key", {"platform": "Other Test"})
+
+	def test_already_processed_after_commit(self):
+		"""Test that committed claims are reported as processed."""
+		self.assertFalse(already_processed("Test", "msg-3"))
+		claim("Test", "msg-3")
+		frappe.db.commit()
+		self.assertTrue(already_processed("Test", "msg-3"))
+
+	def test_backfill_claims_existing_messages(self):
+		"""Test that stored inbound messages get keys in their platform namespace."""
+		rows = [
+			frappe._dict(platform_message_id="wamid-1", creation="2026-10-01", channel="WhatsApp", chatwoot_conversation_id=None),
+			frappe._dict(platform_message_id=42, creation="2026-10-02", channel="Chat", chatwoot_conversation_id="7"),
+		]
+		with patch.object(frappe.db, "sql", return_value=rows), \
+				patch.object(frappe.db, "bulk_insert") as bulk_insert, \
+				patch.object(frappe.db, "commit"):
+			self.assertEqual(backfill_keys(), 2)
+
+		args, kwargs = bulk_insert.call_args
+		self.assertEqual([(row[-2], row[-1]) for row in args[2]], [("Twilio", "wamid-1"), ("Chatwoot", "42")])
+		self.assertTrue(kwargs["ignore_duplicates"])
+
+	def test_message_platform(self):
+		"""Test platform namespace derivation from the hub."""
+		self.assertEqual(get_message_platform(frappe._dict(channel="WhatsApp", chatwoot_conversation_id="5")), "Chatwoot")
+		self.assertEqual(get_message_platform(frappe._dict(channel="WhatsApp")), "Twilio")
+		self.assertEqual(get_message_platform(frappe._dict(channel="Facebook")), "Facebook")
+
+
+if __name__ == "__main__":
+	unittest.main()
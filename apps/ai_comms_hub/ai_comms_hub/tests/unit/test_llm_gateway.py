@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# Copyright (c) 2026, VisualGraphX and contributors
+# For license information, please see license.txt
+
+"""
+Unit tests for the LLM gateway.
+"""
+
+import unittest
+from unittest.mock import MagicMock, patch
+
+import frappe
+
+from ai_comms_hub.services import llm_gateway
+
+
+def _response(status_code, data=None, headers=None):
+	response = MagicMock(status_code=status_code, headers=headers or {}, text="error")
+	response.json.return_value = data or {}
+	return response
+
+
+def _completion(content="Hello", model="gpt-4o-mini"):
+	return {
+		"model": model,
+		"choices": [{"message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+		"usage": {"prompt_tokens": 1000, "completion_tokens": 200}
+	}
+
+
+def _provider(**extra):
+	return frappe._dict(dict(
+		name=llm_gateway.HUB, kind="openai", api_url="https://llm.test/v1", api_key="key",
+		model="gpt-4o-mini", fallback_model="gpt-3.5-turbo", rpm=0, tpm=0
+	), **extra)
+
+
+class TestLLMGateway(unittest.TestCase):
+	"""Test retries, failover, provider translation and cost accounting."""
+
+	def setUp(self):
+		self.session = MagicMock()
+		patchers = [
+			patch.object(llm_gateway, "_get_session", return_value=self.session),
+			patch.object(llm_gateway, "record_call"),
+			patch.object(llm_gateway.time, "sleep"),
+		]
+		self.record_call = patchers[1].start()
+		self.sleep = patchers[2].start()
+		patchers[0].start()
+		for p in patchers:
+			self.addCleanup(p.stop)
+
+	def test_retries_rate_limit_with_backoff(self):
+		"""Test that a 429 is retried, honouring Retry-After."""
+		self.session.post.side_effect = [
+			_response(429, headers={"Retry-After": "2"}),
+			_response(200, _completion())
+		]
+
+		response = llm_gateway.chat([{"role": "user", "content": "Hi"}], provider=_provider(), fallbacks=[])
+
+		self.assertEqual(llm_gateway.get_content(response), "Hello")
+		self.sleep.assert_called_once_with(2.0)
+		self.assertEqual(self.record_call.call_args[0][4], 2)
+
+	def test_fails_over_to_secondary_model(self):
+		"""Test that exhausted retries on the primary model move to the fallback model."""
+		provider = _provider()
+		failures = [_response(503)] * (llm_gateway.MAX_RETRIES + 1)
+		self.session.post.side_effect = failures + [_response(200, _completion("From fallback", "gpt-3.5-turbo"))]
+
+		response = llm_gateway.chat([{"role": "user", "content": "Hi"}], provider=provider)
+
+		self.assertEqual(llm_gateway.get_content(response), "From fallback")
+		self.assertEqual(self.session.post.call_args.kwargs["json"]["model"], "gpt-3.5-turbo")
+		self.assertTrue(self.record_call.call_args.kwargs["failover"])
+
+	def test_every_attempt_takes_rate_limit_capacity(self):
+		"""Test that retries go through the token bucket like the first attempt."""
+		self.session.post.side_effect = [_response(503), _response(503), _response(200, _completion())]
+
+		with patch.object(llm_gateway, "acquire") as acquire:
+			llm_gateway.chat([{"role": "user", "content": "Hi"}], provider=_provider(rpm=60), max_tokens=100, fallbacks=[])
+
+		self.assertEqual(acquire.call_count, 3)
+		self.assertGreater(acquire.call_args[0][1], 100)
+
+	def test_invalid_json_is_retried_then_fails_over(self):
+		"""Test that an unreadable success body counts as a retryable failure."""
+		bad = _response(200)
+		bad.json.side_effect = ValueError("Expecting value")
+		self.session.post.side_effect = [bad] * (llm_gateway.MAX_RETRIES + 1) + [
+			_response(200, _completion("From fallback", "gpt-3.5-turbo"))
+		]
+
+		response = llm_gateway.chat([{"role": "user", "content": "Hi"}], provider=_provider())
+
+		self.assertEqual(llm_gateway.get_content(response), "From fallback")
+		error = self.record_call.call_args_list[0].kwargs["error"]
+		self.assertIn("invalid response", str(error))
+
+	def test_client_error_is_not_retried(self):
+		"""Test that a 400 raises immediately without retries or failover."""
+		self.session.post.return_value = _response(400)
+
+		with self.assertRaises(llm_gateway.LLMGatewayError) as ctx:
+			llm_gateway.chat([{"role": "user", "content": "Hi"}], provider=_provider())
+
+		self.assertEqual(ctx.exception.status_code, 400)
+		self.assertEqual(self.session.post.call_count, 1)
+
+	def test_anthropic_requests_are_translated(self):
+		"""Test that Anthropic calls take OpenAI messages and return OpenAI responses."""
+		provider = _provider(name=llm_gateway.ANTHROPIC, kind="anthropic", model="claude-3-haiku-20240307")
+		self.session.post.return_value = _response(200, {
+			"content": [{"type": "text", "text": " Hola "}],
+			"stop_reason": "end_turn",
+			"usage": {"input_tokens": 12, "output_tokens": 3}
+		})
+
+		response = llm_gateway.chat(
+			[{"role": "system", "content": "Translate"}, {"role": "user", "content": "Hello"}],
+			provider=provider, max_tokens=50, fallbacks=[]
+		)
+
+		body = self.session.post.call_args.kwargs["json"]
+		self.assertEqual(body["system"], "Translate")
+		self.assertEqual(body["messages"], [{"role": "user", "content": "Hello"}])
+		self.assertEqual(llm_gateway.get_content(response), "Hola")
+		self.assertEqual(response["usage"]["total_tokens"], 15)
+
+	def test_rate_limit_wait_beyond_queue_limit(self):
+		"""Test that a long wait for bucket capacity raises RateLimited."""
+		cache = MagicMock()
+		cache.register_script.return_value = MagicMock(return_value=str(llm_gateway.MAX_QUEUE_WAIT + 5))
+
+		with patch.object(frappe, "cache", return_value=cache), \
+				patch.object(llm_gateway, "_bucket_script", None):
+			with self.assertRaises(llm_gateway.RateLimited):
+				llm_gateway.acquire(_provider(rpm=60), 100)
+
+	def test_cost_uses_longest_model_prefix(self):
+		"""Test that pricing picks the most specific model entry."""
+		self.assertEqual(llm_gateway.get_cost("gpt-4o-mini-2024-07-18", 1_000_000, 0), 0.15)
+		self.assertEqual(llm_gateway.get_cost("openai/gpt-4o", 0, 1_000_000), 10.0)
+		self.assertIsNone(llm_gateway.get_cost("unknown-model", 10, 10))
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# Copyright (c) 2026, VisualGraphX and contributors
+# For license information, please see license.txt
+
+"""
+Unit tests for the rolling metric samples.
+"""
+
+import unittest
+from unittest.mock import MagicMock, patch
+
+import frappe
+from ai_comms_hub.utils import metrics
+
+
+class FakeCache:
+	"""Just enough of RedisWrapper for capped lists."""
+
+	def __init__(self):
+		self.lists = {}
+
+	def lpush(self, key, value):
+		self.lists.setdefault(key, []).insert(0, value.encode())
+
+	def ltrim(self, key, start, end):
+		self.lists[key] = self.lists[key][start:end + 1]
+
+	def lrange(self, key, start, end):
+		return list(self.lists.get(key, []))
+
+	def get_keys(self, prefix):
+		return [key.encode() for key in self.lists if key.startswith(prefix)]
+
+
+class TestMetrics(unittest.TestCase):
+	"""Test sample recording, channel grouping and percentiles."""
+
+	def setUp(self):
+		self.cache = FakeCache()
+		patcher = patch.object(frappe, "cache", return_value=self.cache)
+		patcher.start()
+		self.addCleanup(patcher.stop)
+
+	def test_window_keeps_latest_samples(self):
+		"""Test that only the newest max_samples are kept, newest first."""
+		for i in range(5):
+			metrics.record_sample("m:calls", {"i": i}, 3)
+
+		self.assertEqual([s["i"] for s in metrics.get_samples("m:calls")], [4, 3, 2])
+
+	def test_samples_grouped_by_channel(self):
+		"""Test that channels are discovered from their list keys."""
+		metrics.record_sample(metrics.channel_key("m:latency", "WhatsApp"), {"ms": 1}, 10)
+		metrics.record_sample(metrics.channel_key("m:latency", None), {"ms": 2}, 10)
+
+		self.assertEqual(
+			metrics.get_channel_samples("m:latency"),
+			{"WhatsApp": [{"ms": 1}], "default": [{"ms": 2}]}
+		)
+		self.assertEqual(metrics.get_channel_samples("m:latency", "Email"), {})
+
+	def test_legacy_samples_are_skipped(self):
+		"""Test that entries from the old pipe-separated format do not break reads."""
+		self.cache.lists["m:latency:Chat"] = [b"cross-encoder|20|12.5"]
+		metrics.record_sample("m:latency:Chat", {"ms": 3}, 10)
+
+		self.assertEqual(metrics.get_samples("m:latency:Chat"), [{"ms": 3}])
+
+	def test_recording_never_raises(self):
+		"""Test that a Redis error is swallowed."""
+		with patch.object(frappe, "cache", return_value=MagicMock(lpush=MagicMock(side_effect=ConnectionError))):
+			metrics.record_sample("m:calls", {"i": 1}, 3)
+
+	def test_percentile(self):
+		"""Test nearest-rank percentiles."""
+		values = list(range(1, 101))
+		self.assertEqual(metrics.percentile(values, 0.95), 96)
+		self.assertEqual(metrics.percentile(values, 0.5), 51)
+		self.assertEqual(metrics.percentile([7], 0.95), 7)
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# Copyright (c) 2026, VisualGraphX and contributors
+# For license information, please see license.txt
+
+"""
+Unit tests for cached system prompt assembly.
+"""
+
+import unittest
+from unittest.mock import patch
+
+import frappe
+
+from ai_comms_hub.services import prompt_builder
+
+
+class TestPromptBuilder(unittest.TestCase):
+	"""Test template compilation, invalidation and per-stage token counts."""
+
+	def setUp(self):
+		prompt_builder.clear_cache()
+		self.settings = frappe._dict(modified="2026-10-01 10:00:00", company_name="Acme Signs")
+
+		patchers = [
+			patch.object(frappe, "get_cached_doc", create=True, return_value=self.settings),
+			patch.object(prompt_builder, "record_prompt_tokens"),
+		]
+		self.get_cached_doc, self.record = [p.start() for p in patchers]
+		for p in patchers:
+			self.addCleanup(p.stop)
+
+	def test_template_compiled_once_per_channel(self):
+		"""Test that repeated prompts reuse the compiled channel template."""
+		first = prompt_builder.get_template(prompt_builder.AGENT, "SMS")
+		prompt_builder.build_agent_prompt("SMS", [{"title": "Hours", "content": "9 to 5"}])
+
+		self.assertIs(prompt_builder.get_template(prompt_builder.AGENT, "SMS"), first)
+		self.assertIn("Acme Signs", first.header)
+		self.assertIn("160 characters ideal", first.header)
+
+	def test_settings_change_recompiles(self):
+		"""Test that a new settings modified timestamp invalidates templates."""
+		prompt_builder.get_template(prompt_builder.AGENT, "Chat")
+
+		self.settings.update(modified="2026-10-02 09:00:00", company_name="Beta Print")
+		template = prompt_builder.get_template(prompt_builder.AGENT, "Chat")
+
+		self.assertIn("Beta Print", template.header)
+
+	def test_tokens_reported_per_stage(self):
+		"""Test that stage token counts add up to the total and are recorded."""
+		hub = frappe._dict(customer_name="Jane", context="Asked about banner sizes.")
+		result = prompt_builder.build_agent_prompt("Email", [{"title": "Sizes", "content": "2x4 to 4x8"}], hub)
+
+		tokens = result.tokens
+		self.assertGreater(tokens["instructions"], tokens["customer"])
+		self.assertGreater(tokens["knowledge"], 0)
+		self.assertEqual(tokens["total"], tokens["instructions"] + tokens["customer"] + tokens["knowledge"])
+		self.assertIn("## Customer: Jane", result.prompt)
+		self.record.assert_called_once_with("Email", tokens)
+
+	def test_function_definitions_built_once(self):
+		"""Test that function schemas are shared between calls."""
+		first = prompt_builder.get_function_definitions()
+
+		self.assertIs(prompt_builder.get_function_definitions(), first)
+		self.assertIn("searchKnowledge", [f["name"] for f in first])
+
+
+if __name__ == "__main__":
+	unittest.main()
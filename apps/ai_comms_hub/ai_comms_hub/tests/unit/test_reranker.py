@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# Copyright (c) 2026, VisualGraphX and contributors
+# For license information, please see license.txt
+
+"""
+Unit tests for second-stage reranking of knowledge base results.
+"""
+
+import unittest
+from unittest.mock import patch
+
+import frappe
+
+from ai_comms_hub.services import reranker
+
+
+def _candidate(point_id, score, title, content, vector_score=None):
+	vector_score = score if vector_score is None else vector_score
+	return {"id": point_id, "score": score, "vector_score": vector_score, "title": title, "content": content}
+
+
+class TestReranker(unittest.TestCase):
+	"""Test lexical scoring, Platt calibration, backend fallback and the per-channel toggle."""
+
+	def setUp(self):
+		patcher = patch.object(reranker, "record_latency")
+		self.record_latency = patcher.start()
+		self.addCleanup(patcher.stop)
+
+	def test_lexical_full_match_beats_near_miss(self):
+		"""Test that a full lexical match outscores a candidate with a similar vector score."""
+		candidates = [
+			_candidate("a", 0.72, "Shipping", "Standard shipping takes five business days."),
+			_candidate("b", 0.70, "Vinyl banners", "The BC-500 banner is printed on 13oz vinyl."),
+		]
+
+		scores = reranker.platt(reranker.lexical_logits("Is the BC-500 banner 13oz vinyl?", candidates), *reranker.UNCALIBRATED)
+
+		self.assertTrue(all(0 < score < 1 for score in scores))
+		self.assertGreater(scores[1], 0.8)
+		self.assertLess(scores[0], 0.3)
+
+	def test_lexical_uses_vector_similarity_not_fused_score(self):
+		"""Test that a lexical-only hit's own confidence does not feed back into its rerank score."""
+		content = "Banner sizes range from 2x4 to 4x8 feet."
+		lexical_only = _candidate("a", 0.9, "Banner sizes", content, vector_score=0)
+		vector_hit = _candidate("b", 0.5, "Banner sizes", content, vector_score=0.5)
+
+		scores = reranker.lexical_logits("banner sizes", [lexical_only, vector_hit])
+
+		self.assertLess(scores[0], scores[1])
+
+	def test_calibration_from_settings_is_applied(self):
+		"""Test that rerank applies the Platt parameters stored for the backend used."""
+		candidates = [_candidate("a", 0.7, "Hours", "We are open 9 to 5.")]
+
+		flat = reranker.rerank("opening hours", candidates, calibration={reranker.LEXICAL: (0.0, 0.0)})
+		other = reranker.rerank("opening hours", candidates, calibration={reranker.CROSS_ENCODER: (0.0, 0.0)})
+
+		self.assertEqual(flat[0]["score"], 0.5)
+		self.assertNotEqual(other[0]["score"], 0.5)
+
+	def test_fit_platt_orders_and_centres_probabilities(self):
+		"""Test that fitted parameters map higher raw scores to higher probabilities near the label rate."""
+		raw_scores = [-3, -2, -1.5, -1, 0, 0.5, 1, 2, 2.5, 3]
+		labels = [0, 0, 0, 1, 0, 1, 0, 1, 1, 1]
+
+		scale, bias = reranker.fit_platt(raw_scores, labels)
+		probabilities = reranker.platt(raw_scores, scale, bias)
+
+		self.assertGreater(scale, 0)
+		self.assertEqual(probabilities, sorted(probabilities))
+		self.assertAlmostEqual(sum(probabilities) / len(probabilities), 0.5, delta=0.05)
+
+	def test_settings_calibration_parsed(self):
+		"""Test that stored calibration JSON is read per backend and bad values are ignored."""
+		self.assertEqual(reranker._parse_calibration('{"Lexical": [1.5, -0.5]}'), {"Lexical": (1.5, -0.5)})
+		self.assertEqual(reranker._parse_calibration("not json"), {})
+
+	def test_rerank_reorders_and_keeps_retrieval_score(self):
+		"""Test that rerank keeps top_k by rerank score and the original score."""
+		candidates = [
+			_candidate("a", 0.80, "Returns", "Returns are accepted within 30 days."),
+			_candidate("b", 0.60, "Banner sizes", "Banner sizes range from 2x4 to 4x8 feet."),
+			_candidate("c", 0.55, "Payment", "We accept cards and bank transfer."),
+		]
+
+		results = reranker.rerank("what banner sizes do you offer", candidates, top_k=2)
+
+		self.assertEqual([r["id"] for r in results], ["b", "a"])
+		self.assertEqual(results[0]["retrieval_score"], 0.60)
+		self.assertEqual(results[0]["reranker"], reranker.LEXICAL)
+		self.record_latency.assert_called_once()
+
+	def test_cross_encoder_scores_all_candidates_in_one_call(self):
+		"""Test that the cross-encoder is called once with every candidate."""
+		candidates = [_candidate(str(i), 0.5, "t", "c") for i in range(20)]
+
+		with patch.object(reranker, "cross_encoder_logits", return_value=[-2.0] * 19 + [3.0]) as scorer:
+			results = reranker.rerank("q", candidates, top_k=3, backend=reranker.CROSS_ENCODER, model_path="/m")
+
+		scorer.assert_called_once_with("q", candidates, "/m")
+		self.assertEqual(results[0]["id"], "19")
+		self.assertEqual(results[0]["reranker"], reranker.CROSS_ENCODER)
+
+	def test_cross_encoder_failure_falls_back_to_lexical(self):
+		"""Test that a missing runtime or model falls back to the lexical scorer."""
+		candidates = [_candidate("a", 0.7, "Hours", "We are open 9 to 5.")]
+
+		with patch.object(reranker, "cross_encoder_logits", side_effect=ImportError), \
+				patch.object(frappe, "log_error"):
+			results = reranker.rerank("opening hours", candidates, backend=reranker.CROSS_ENCODER, model_path="/m")
+
+		self.assertEqual(results[0]["reranker"], reranker.LEXICAL)
+
+	@patch("ai_comms_hub.api.rag.query_knowledge_base")
+	@patch.object(reranker, "get_rerank_settings")
+	def test_channel_toggle(self, get_settings, query):
+		"""Test that only enabled channels fetch and rerank extra candidates."""
+		query.return_value = [_candidate("a", 0.8, "Hours", "Open 9 to 5.")]
+
+		get_settings.return_value = frappe._dict(enabled=False)
+		reranker.get_ranked_context("hours", "Voice", top_k=3)
+		query.assert_called_with("hours", top_k=3)
+
+		get_settings.return_value = frappe._dict(
+			enabled=True, backend=reranker.LEXICAL, model_path=None, candidates=20, calibration={}
+		)
+		results = reranker.get_ranked_context("hours", "Chat", top_k=3)
+		query.assert_called_with("hours", top_k=20, score_threshold=reranker.CANDIDATE_SCORE_THRESHOLD)
+		self.assertIn("retrieval_score", results[0])
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# Copyright (c) 2026, VisualGraphX and contributors
+# For license information, please see license.txt
+
+"""
+Unit tests for Qdrant/Frappe reconciliation.
+"""
+
+import unittest
+from unittest.mock import MagicMock, patch
+
+import frappe
+from ai_comms_hub.services import qdrant_faq_sync, vector_reconciliation
+
+
+def _page(points, next_offset):
+	response = MagicMock()
+	response.json.return_value = {"result": {"points": points, "next_page_offset": next_offset}}
+	return response
+
+
+def _faq(name, question, point_id=None, sync_status="Synced"):
+	return frappe._dict(
+		name=name, question=question, answer="Answer", category=None, tags=None,
+		qdrant_point_id=point_id, sync_status=sync_status
+	)
+
+
+def _point(name, content_hash):
+	return {"id": qdrant_faq_sync.generate_point_id(name), "payload": {"content_hash": content_hash}}
+
+
+class TestVectorReconciliation(unittest.TestCase):
+	"""Test full-collection scrolling and FAQ drift detection."""
+
+	def test_scroll_follows_next_page_offset(self):
+		"""Test that every page is fetched until next_page_offset is empty."""
+		pages = [_page([{"id": 1}, {"id": 2}], 3), _page([{"id": 3}], None)]
+
+		with patch.object(vector_reconciliation.requests, "post", side_effect=pages) as post:
+			points = list(vector_reconciliation.scroll_points("http://qdrant", "kb", {}, False))
+
+		self.assertEqual([p["id"] for p in points], [1, 2, 3])
+		self.assertEqual(post.call_args_list[1][1]["json"]["offset"], 3)
+
+	def test_faq_drift_report(self):
+		"""Test that missing, stale, orphaned and mislabelled FAQs are classified in one pass."""
+		faqs = [
+			_faq("FAQ-1", "Current"),
+			_faq("FAQ-2", "Edited"),
+			_faq("FAQ-3", "New"),
+			_faq("FAQ-4", "Unmarked", sync_status="Failed"),
+		]
+		hashes = {
+			faq.name: qdrant_faq_sync.get_content_hash(qdrant_faq_sync.build_faq_content(faq, {}))
+			for faq in faqs
+		}
+		stored = [
+			_point("FAQ-1", hashes["FAQ-1"]),
+			_point("FAQ-2", "outdated"),
+			_point("FAQ-4", hashes["FAQ-4"]),
+			_point("FAQ-DELETED", "x"),
+		]
+
+		def get_all(doctype, **kwargs):
+			return faqs if doctype == "Chatwoot FAQ" else []
+
+		with patch.object(qdrant_faq_sync, "get_settings", return_value={"qdrant_url": "http://qdrant"}), \
+				patch.object(vector_reconciliation, "scroll_points", return_value=iter(stored)), \
+				patch.object(vector_reconciliation, "_save_report"), \
+				patch.object(frappe, "get_all", side_effect=get_all):
+			report = vector_reconciliation.reconcile_faqs(dry_run=True)
+
+		self.assertEqual(report["missing"], 1)
+		self.assertEqual(report["stale"], 1)
+		self.assertEqual(report["orphaned_points"], 1)
+		self.assertEqual(report["status_corrected"], 1)
+		self.assertTrue(report["scan_complete"])
+
+
+if __name__ == "__main__":
+	unittest.main()
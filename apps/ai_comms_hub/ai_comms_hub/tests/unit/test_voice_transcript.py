@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# Copyright (c) 2026, VisualGraphX and contributors
+# For license information, please see license.txt
+
+"""
+Unit tests for bulk post-call transcript ingestion.
+"""
+
+import unittest
+from unittest.mock import patch
+
+import frappe
+from ai_comms_hub.api import message
+from ai_comms_hub.webhooks import voice
+
+
+TRANSCRIPT = [
+	{"role": "agent", "message": "Hi, how can I help?", "time_in_call_secs": 0},
+	{"role": "user", "message": "Where is my order?", "time_in_call_secs": 3},
+	{"role": "agent", "message": "", "time_in_call_secs": 5},
+	{"role": "agent", "message": "Let me check.", "time_in_call_secs": 5},
+]
+
+
+class TestVoiceTranscript(unittest.TestCase):
+	"""Test transcript turn dedupe and batching."""
+
+	def _ingest(self, existing):
+		with patch.object(frappe.db, "sql"), \
+				patch.object(frappe, "get_all", return_value=existing), \
+				patch.object(voice, "bulk_insert_messages", side_effect=lambda hub, msgs: msgs) as bulk:
+			inserted = voice.ingest_transcript("HUB-1", "conv1", TRANSCRIPT, start_time=1700000000)
+		return inserted, bulk
+
+	def test_turns_inserted_in_one_batch(self):
+		"""Test that all non-empty turns go into a single bulk insert, keyed by turn index."""
+		inserted, bulk = self._ingest(existing=[])
+
+		bulk.assert_called_once()
+		self.assertEqual([m["platform_message_id"] for m in inserted], ["conv1:0", "conv1:1", "conv1:3"])
+		self.assertEqual([m["sender_type"] for m in inserted], ["AI", "Customer", "AI"])
+		self.assertLess(inserted[0]["timestamp"], inserted[1]["timestamp"])
+
+	def test_redelivery_skips_stored_turns(self):
+		"""Test that turns already stored for the call are not inserted again."""
+		inserted, _ = self._ingest(existing=["conv1:0", "conv1:1"])
+
+		self.assertEqual([m["platform_message_id"] for m in inserted], ["conv1:3"])
+
+
+class TestBulkInsertMessages(unittest.TestCase):
+	"""Test naming and idempotency keys of bulk-inserted messages."""
+
+	def test_names_from_doctype_autoname_and_keys_claimed(self):
+		"""Test that names come from frappe naming and customer turns are claimed."""
+		counter = iter(range(7, 10))
+
+		def set_new_name(doc):
+			doc.name = f"MSG-{doc.communication_hub}-{next(counter):05d}"
+
+		messages = [
+			{"sender_type": "AI", "content": "Hi", "platform_message_id": "conv1:0"},
+			{"sender_type": "Customer", "content": "Order?", "platform_message_id": "conv1:1"},
+		]
+		with patch("frappe.model.naming.set_new_name", side_effect=set_new_name), \
+				patch.object(frappe, "new_doc", return_value=frappe._dict()), \
+				patch.object(frappe.db, "get_value", return_value=frappe._dict(channel="Voice")), \
+				patch.object(frappe.db, "bulk_insert") as bulk_insert, \
+				patch("ai_comms_hub.utils.idempotency.claim_many") as claim_many:
+			names = message.bulk_insert_messages("HUB-1", messages)
+
+		self.assertEqual(names, ["MSG-HUB-1-00007", "MSG-HUB-1-00008"])
+		claim_many.assert_called_once_with("Voice", ["conv1:1"])
+		self.assertEqual([row[0] for row in bulk_insert.call_args.kwargs["values"]], names)
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# Copyright (c) 2026, VisualGraphX and contributors
+# For license information, please see license.txt
+
+"""
+Unit tests for the webhook inbox (fast-ack ingestion + background worker).
+"""
+
+import unittest
+from unittest.mock import patch
+
+import frappe
+from ai_comms_hub.utils import locks
+from ai_comms_hub.webhooks import inbox
+
+
+class TestWebhookInbox(unittest.TestCase):
+	"""Test webhook inbox ingestion and ordering."""
+
+	def setUp(self):
+		frappe.db.delete("Webhook Inbox Event")
+
+	def tearDown(self):
+		frappe.db.delete("Webhook Inbox Event")
+		frappe.db.commit()
+		frappe.cache().delete(frappe.cache().make_key(inbox.LOCK_KEY))
+
+	def _accept(self, key, external_id=None, text="hi"):
+		with patch.object(inbox, "wake_worker"):
+			return inbox.accept_event(
+				"Facebook",
+				{"sender": {"id": key}, "message": {"mid": external_id, "text": text}},
+				event_type="message",
+				ordering_key=key,
+				external_id=external_id
+			)
+
+	def test_redelivered_event_is_dropped(self):
+		"""Test that an upstream retry with the same message ID is not stored twice."""
+		self.assertIsNotNone(self._accept("psid-1", external_id="mid-1"))
+		self.assertIsNone(self._accept("psid-1", external_id="mid-1"))
+		self.assertEqual(frappe.db.count("Webhook Inbox Event"), 1)
+
+	def test_failed_event_blocks_later_events_for_same_key(self):
+		"""Test per-conversation ordering when a handler fails."""
+		first = self._accept("psid-1", text="first")
+		second = self._accept("psid-1", text="second")
+		other = self._accept("psid-2", text="other")
+
+		seen = []
+
+		def handler(payload):
+			seen.append(payload["message"]["text"])
+			if payload["message"]["text"] == "first":
+				raise Exception("boom")
+
+		with patch.object(inbox, "get_handler", return_value=handler):
+			inbox.process_batch()
+			inbox.process_batch()
+
+		self.assertEqual(seen, ["first", "other"])
+		self.assertEqual(frappe.db.get_value("Webhook Inbox Event", first, "status"), "Failed")
+		self.assertEqual(frappe.db.get_value("Webhook Inbox Event", second, "status"), "Queued")
+		self.assertEqual(frappe.db.get_value("Webhook Inbox Event", second, "attempts"), 0)
+		self.assertEqual(frappe.db.get_value("Webhook Inbox Event", other, "status"), "Processed")
+
+	def test_lapsed_owner_cannot_touch_new_lock(self):
+		"""Test that a worker whose lock expired cannot refresh or release its successor's lock."""
+		stale = locks.acquire_lock(inbox.LOCK_KEY, inbox.LOCK_TTL)
+		frappe.cache().delete(frappe.cache().make_key(inbox.LOCK_KEY))  # TTL lapsed
+		current = locks.acquire_lock(inbox.LOCK_KEY, inbox.LOCK_TTL)
+
+		self.assertIsNotNone(current)
+		self.assertFalse(locks.refresh_lock(inbox.LOCK_KEY, stale, inbox.LOCK_TTL))
+		locks.release_lock(inbox.LOCK_KEY, stale)
+		self.assertIsNone(locks.acquire_lock(inbox.LOCK_KEY, inbox.LOCK_TTL))
+
+		self.assertTrue(locks.refresh_lock(inbox.LOCK_KEY, current, inbox.LOCK_TTL))
+		locks.release_lock(inbox.LOCK_KEY, current)
+		self.assertIsNotNone(locks.acquire_lock(inbox.LOCK_KEY, inbox.LOCK_TTL))
+
+	def test_processing_events_requeued_only_by_lock_owner(self):
+		"""Test that in-flight events of a running drain are left alone by the scheduler."""
+		name = self._accept("psid-1")
+		frappe.db.set_value("Webhook Inbox Event", name, "status", "Processing")
+		running = locks.acquire_lock(inbox.LOCK_KEY, inbox.LOCK_TTL)
+
+		with patch.object(inbox, "process_batch", return_value=0):
+			inbox.retry_pending_events()
+			self.assertEqual(frappe.db.get_value("Webhook Inbox Event", name, "status"), "Processing")
+
+			locks.release_lock(inbox.LOCK_KEY, running)
+			inbox.retry_pending_events()
+			self.assertEqual(frappe.db.get_value("Webhook Inbox Event", name, "status"), "Queued")
+
+	def test_chatwoot_routing(self):
+		"""Test that Chatwoot events are routed to the existing handlers."""
+		from ai_comms_hub.webhooks import chatwoot
+
+		self.assertIs(inbox.get_handler("Chatwoot", "message_created"), chatwoot.handle_message_created)
+		self.assertIsNone(inbox.get_handler("Chatwoot", "contact_created"))
+
+
+if __name__ == "__main__":
+	unittest.main()
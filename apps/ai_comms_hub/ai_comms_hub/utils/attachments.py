@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# Copyright (c) 2026, VisualGraphX and contributors
+# For license information, please see license.txt
+
+"""
+Content-addressed storage for inbound message attachments.
+
+Attachments are streamed in fixed-size chunks (file objects are read
+incrementally, base64 strings are decoded block by block) into a spool file
+under the site's private files while their SHA-256 is computed, and rejected
+once they exceed MAX_ATTACHMENT_SIZE. A background job then moves each spool
+file to ``ai_comms_attachments/<sha[:2]>/<sha><ext>``. Identical content (logos,
+signature images) is stored once and shared by the File records of every
+message it arrived with.
+"""
+
+import base64
+import binascii
+import hashlib
+import os
+import tempfile
+import time
+
+import frappe
+from frappe import _
+
+
+ATTACHMENT_FOLDER = "ai_comms_attachments"
+SPOOL_FOLDER = ".incoming"
+CHUNK_SIZE = 64 * 1024
+B64_CHUNK_SIZE = 4 * CHUNK_SIZE // 3  # base64 characters decoding to ~CHUNK_SIZE bytes
+MAX_ATTACHMENT_SIZE = 25 * 1024 * 1024  # bytes
+SPOOL_RETENTION = 24 * 3600  # seconds
+
+
+class AttachmentTooLargeError(frappe.ValidationError):
+	pass
+
+
+def _storage_dir(*parts):
+	path = frappe.get_site_path("private", "files", ATTACHMENT_FOLDER, *parts)
+	os.makedirs(path, exist_ok=True)
+	return path
+
+
+def _iter_file(fileobj):
+	if hasattr(fileobj, "seek"):
+		fileobj.seek(0)
+	while True:
+		chunk = fileobj.read(CHUNK_SIZE)
+		if not chunk:
+			break
+		yield chunk if isinstance(chunk, bytes) else chunk.encode("utf-8")
+
+
+def _iter_bytes(data):
+	view = memoryview(data)
+	for start in range(0, len(view), CHUNK_SIZE):
+		yield bytes(view[start:start + CHUNK_SIZE])
+
+
+def _iter_text(text):
+	for start in range(0, len(text), CHUNK_SIZE):
+		yield text[start:start + CHUNK_SIZE].encode("utf-8")
+
+
+def _iter_base64(text):
+	"""Decode a base64 string block by block (raises binascii.Error if it is not base64)."""
+	carry = ""
+	for start in range(0, len(text), B64_CHUNK_SIZE):
+		block = carry + "".join(text[start:start + B64_CHUNK_SIZE].split())
+		usable = len(block) - len(block) % 4
+		carry = block[usable:]
+		if usable:
+			yield base64.b64decode(block[:usable], validate=True)
+	if carry:
+		raise binascii.Error("Incomplete base64 data")
+
+
+def _write_spool(chunks, max_size):
+	"""Write chunks to a new spool file, hashing as we go."""
+	digest = hashlib.sha256()
+	size = 0
+	spool = tempfile.NamedTemporaryFile(dir=_storage_dir(SPOOL_FOLDER), delete=False)
+	try:
+		with spool:
+			for chunk in chunks:
+				size += len(chunk)
+				if size > max_size:
+					raise AttachmentTooLargeError(
+						_("Attachment exceeds the {0} MB limit").format(max_size // (1024 * 1024))
+					)
+				digest.update(chunk)
+				spool.write(chunk)
+	except BaseException:
+		os.remove(spool.name)
+		raise
+
+	return {"path": spool.name, "sha256": digest.hexdigest(), "size": size}
+
+
+def spool_attachment(source, max_size=MAX_ATTACHMENT_SIZE):
+	"""
+	Stream an attachment to a spool file.
+
+	Args:
+		source: File object (e.g. werkzeug FileStorage), bytes, or str (base64 or plain text)
+		max_size (int): Size cap in bytes
+
+	Returns:
+		dict: path, sha256 and size of the spooled content
+
+	Raises:
+		AttachmentTooLargeError: If the content exceeds max_size
+	"""
+	if hasattr(source, "read"):
+		return _write_spool(_iter_file(source), max_size)
+	if isinstance(source, str):
+		try:
+			return _write_spool(_iter_base64(source), max_size)
+		except (binascii.Error, ValueError):
+			return _write_spool(_iter_text(source), max_size)
+	return _write_spool(_iter_bytes(source), max_size)
+
+
+def store_spooled(spooled, filename):
+	"""
+	Move a spool file to its content address (or drop it if the blob already exists).
+
+	Args:
+		spooled (dict): Result of spool_attachment
+		filename (str): Original filename (its extension is kept for serving)
+
+	Returns:
+		str: file_url of the stored blob
+	"""
+	sha = spooled["sha256"]
+	extension = os.path.splitext(filename or "")[1].lower()[:10]
+	blob_name = f"{sha}{extension}"
+	blob_path = os.path.join(_storage_dir(sha[:2]), blob_name)
+
+	if os.path.exists(blob_path):
+		os.remove(spooled["path"])
+	else:
+		os.replace(spooled["path"], blob_path)
+
+	return f"/private/files/{ATTACHMENT_FOLDER}/{sha[:2]}/{blob_name}"
+
+
+def attach_file(file_url, filename, size, doctype, name):
+	"""
+	Create a private File record pointing at a stored blob.
+
+	Returns:
+		Document: File
+	"""
+	file_doc = frappe.get_doc({
+		"doctype": "File",
+		"file_name": filename,
+		"file_url": file_url,
+		"file_size": size,
+		"attached_to_doctype": doctype,
+		"attached_to_name": name,
+		"is_private": 1
+	})
+	file_doc.insert(ignore_permissions=True)
+	return file_doc
+
+
+def discard_spooled(spooled):
+	"""Delete a spool file that will not be stored."""
+	try:
+		os.remove(spooled["path"])
+	except FileNotFoundError:
+		pass
+
+
+def purge_stale_spool(max_age=SPOOL_RETENTION):
+	"""Delete spool files left behind by failed jobs (daily)."""
+	spool_dir = _storage_dir(SPOOL_FOLDER)
+	cutoff = time.time() - max_age
+	for entry in os.scandir(spool_dir):
+		if entry.is_file() and entry.stat().st_mtime < cutoff:
+			os.remove(entry.path)
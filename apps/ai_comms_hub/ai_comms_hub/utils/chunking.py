@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+# Copyright (c) 2026, VisualGraphX and contributors
+# For license information, please see license.txt
+
+"""
+Document chunking for RAG ingestion.
+
+Documents are split at headings first, then packed paragraph by paragraph into
+chunks of at most ``max_tokens`` (estimated). Paragraphs that are too long are
+split by sentence, then by word. Consecutive chunks of the same section share
+up to ``overlap_tokens`` of trailing sentences so an answer spanning a chunk
+boundary is still retrievable; the overlap length is recorded so merged
+retrieval results can drop the repeated text.
+
+Each chunk carries a hash of its text (plus title/heading) so re-ingesting an
+edited document only re-embeds the chunks whose text actually changed.
+"""
+
+import hashlib
+import html
+import re
+
+import frappe
+
+from ai_comms_hub.services.conversation_memory import estimate_tokens
+
+
+DEFAULT_MAX_TOKENS = 350
+DEFAULT_OVERLAP_TOKENS = 50
+
+HEADING_RE = re.compile(r"^\s{0,3}(#{1,6})\s+(.+?)\s*#*\s*$")
+SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+def html_to_text(content):
+	"""
+	Convert HTML to plain text keeping block structure.
+
+	Headings become markdown headings and block elements become paragraph
+	breaks, so the splitter can still see the document structure.
+	"""
+	if not content:
+		return ""
+
+	content = re.sub(
+		r"<h([1-6])[^>]*>(.*?)</h\1\s*>",
+		lambda m: "\n\n" + "#" * int(m.group(1)) + " " + m.group(2) + "\n\n",
+		content,
+		flags=re.IGNORECASE | re.DOTALL
+	)
+	content = re.sub(r"<br\s*/?>", "\n", content, flags=re.IGNORECASE)
+	content = re.sub(r"<li[^>]*>", "\n- ", content, flags=re.IGNORECASE)
+	content = re.sub(r"</(p|div|ul|ol|table|tr|blockquote|pre|section)\s*>", "\n\n", content, flags=re.IGNORECASE)
+	content = html.unescape(frappe.utils.strip_html_tags(content))
+
+	content = re.sub(r"[ \t]+", " ", content)
+	return re.sub(r"\n\s*\n\s*", "\n\n", content).strip()
+
+
+def _sections(text):
+	"""Split text into (heading, [paragraphs]) sections."""
+	sections = []
+	heading, paragraphs = "", []
+
+	for block in re.split(r"\n\s*\n", text):
+		block = block.strip()
+		if not block:
+			continue
+
+		lines = block.split("\n")
+		match = HEADING_RE.match(lines[0])
+		if match:
+			if paragraphs:
+				sections.append((heading, paragraphs))
+			heading, paragraphs = match.group(2).strip(), []
+			block = "\n".join(lines[1:]).strip()
+			if not block:
+				continue
+		paragraphs.append(block)
+
+	if paragraphs:
+		sections.append((heading, paragraphs))
+	return sections
+
+
+def _split_long(text, max_tokens):
+	"""Split an oversized paragraph by sentence, then by word."""
+	pieces = []
+	for sentence in SENTENCE_RE.split(text):
+		if estimate_tokens(sentence) <= max_tokens:
+			pieces.append(sentence)
+			continue
+
+		words, current = sentence.split(), []
+		for word in words:
+			if current and estimate_tokens(" ".join(current + [word])) > max_tokens:
+				pieces.append(" ".join(current))
+				current = []
+			current.append(word)
+		if current:
+			pieces.append(" ".join(current))
+	return pieces
+
+
+def _overlap_tail(text, overlap_tokens):
+	"""Trailing sentences of a chunk totalling at most overlap_tokens."""
+	if overlap_tokens <= 0:
+		return ""
+
+	tail = []
+	for sentence in reversed(SENTENCE_RE.split(text)):
+		if estimate_tokens(" ".join([sentence] + tail)) > overlap_tokens:
+			break
+		tail.insert(0, sentence)
+	return " ".join(tail)
+
+
+def chunk_hash(text, title="", heading=""):
+	"""Stable hash identifying a chunk's embedded text."""
+	return hashlib.sha256(f"{title}\n{heading}\n{text}".encode("utf-8")).hexdigest()
+
+
+def split_document(text, title="", max_tokens=DEFAULT_MAX_TOKENS, overlap_tokens=DEFAULT_OVERLAP_TOKENS):
+	"""
+	Split a document into heading-aware, overlapping chunks.
+
+	Args:
+		text (str): Plain text (markdown headings are recognised)
+		title (str): Document title, included in each chunk's embedding text
+		max_tokens (int): Maximum estimated tokens per chunk
+		overlap_tokens (int): Estimated tokens carried over between chunks of a section
+
+	Returns:
+		list: dicts with index, heading, text, embed_text, overlap_chars and hash
+	"""
+	chunks = []
+
+	for heading, paragraphs in _sections(text or ""):
+		pieces = []
+		for paragraph in paragraphs:
+			if estimate_tokens(paragraph) > max_tokens:
+				pieces.extend(_split_long(paragraph, max_tokens))
+			else:
+				pieces.append(paragraph)
+
+		current, overlap = [], ""
+		for piece in pieces:
+			candidate = "\n\n".join(([overlap] if overlap else []) + current + [piece])
+			if current and estimate_tokens(candidate) > max_tokens:
+				body = "\n\n".join(current)
+				chunks.append((heading, overlap, body))
+				overlap = _overlap_tail(body, overlap_tokens)
+				if estimate_tokens("\n\n".join([overlap, piece])) > max_tokens:
+					overlap = ""
+				current = []
+			current.append(piece)
+
+		if current:
+			chunks.append((heading, overlap, "\n\n".join(current)))
+
+	result = []
+	for index, (heading, overlap, body) in enumerate(chunks):
+		chunk_text = f"{overlap}\n\n{body}" if overlap else body
+		context = " - ".join(part for part in (title, heading) if part)
+		result.append({
+			"index": index,
+			"heading": heading,
+			"text": chunk_text,
+			"embed_text": f"{context}\n\n{chunk_text}" if context else chunk_text,
+			"overlap_chars": len(overlap) + 2 if overlap else 0,
+			"hash": chunk_hash(chunk_text, title, heading)
+		})
+
+	return result
+
+
+def merge_adjacent(hits, score_keys=("score",)):
+	"""
+	Merge retrieved chunks that are adjacent in the same parent document.
+
+	Args:
+		hits (list): Result dicts with parent_id, chunk_index, overlap_chars,
+			content and scores (legacy hits without parent_id are kept as is)
+		score_keys (tuple): Scores kept at their best value across a merged
+			run; results are ordered by the first
+
+	Returns:
+		list: Merged results ordered by best score
+	"""
+	groups = {}
+	merged = []
+
+	for hit in hits:
+		if not hit.get("parent_id") or hit.get("chunk_index") is None:
+			merged.append(hit)
+			continue
+		groups.setdefault(hit["parent_id"], {})[hit["chunk_index"]] = hit
+
+	for parent_hits in groups.values():
+		run = None
+		for index in sorted(parent_hits):
+			hit = parent_hits[index]
+			if run and index == run["chunk_indexes"][-1] + 1:
+				run["content"] += "\n\n" + (hit.get("content") or "")[hit.get("overlap_chars") or 0:]
+				run["chunk_indexes"].append(index)
+				for key in score_keys:
+					run[key] = max(run.get(key) or 0, hit.get(key) or 0)
+				continue
+
+			if run:
+				merged.append(run)
+			run = dict(hit, chunk_indexes=[index])
+		if run:
+			merged.append(run)
+
+	return sorted(merged, key=lambda hit: hit.get(score_keys[0]) or 0, reverse=True)
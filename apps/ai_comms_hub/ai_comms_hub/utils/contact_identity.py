@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+# Copyright (c) 2026, VisualGraphX and contributors
+# For license information, please see license.txt
+
+"""
+Contact identity index for resolving inbound senders to Customers.
+
+Every phone number (E.164), email address (lowercase) and social sender ID
+(``Platform:sender_id``) found on a Customer or on a Contact linked to a
+Customer is stored as a Contact Identity row. Resolvers look senders up by the
+(identity_type, identity_value) index instead of scanning Customer with LIKE,
+and memoize results for the rest of the request/job so bursts from the same
+sender hit the database once.
+
+Rows are rebuilt per source document from Customer/Contact on_update (which
+also runs on insert), and fully by ``rebuild_contact_identities`` (patch +
+daily_long).
+"""
+
+import re
+from email.utils import parseaddr
+
+import frappe
+from frappe.utils import now_datetime
+
+
+PHONE = "Phone"
+EMAIL = "Email"
+SOCIAL = "Social"
+
+# Customer fields holding platform sender IDs (custom fields, may not exist)
+SOCIAL_FIELDS = {
+	"facebook_psid": "Facebook",
+	"instagram_id": "Instagram",
+	"twitter_id": "Twitter",
+	"linkedin_profile": "LinkedIn",
+	"chatwoot_contact_id": "Chatwoot"
+}
+REBUILD_CHUNK = 500
+# Trailing digits compared when a phone number has no exact match
+PHONE_SUFFIX_DIGITS = 10
+
+
+def normalize_phone(phone, default_country_code="1"):
+	"""
+	Normalize a phone number to E.164.
+
+	Numbers without a leading + or country code are treated as national
+	numbers of the default country (10 digits, US). Other national numbers
+	("020 7946 0958") keep their digits as-is; find_customer_by_phone matches
+	them to the international form by their trailing digits.
+
+	Args:
+		phone (str): Raw phone number (may include "whatsapp:" prefix, spaces, dashes)
+
+	Returns:
+		str: E.164 number, or None if there are too few digits
+	"""
+	if not phone:
+		return None
+
+	phone = str(phone).strip()
+	if phone.lower().startswith("whatsapp:"):
+		phone = phone[len("whatsapp:"):].strip()
+
+	digits = re.sub(r"\D", "", phone)
+	if len(digits) < 7:
+		return None
+
+	if not phone.startswith("+"):
+		if digits.startswith("00"):
+			digits = digits[2:]
+		elif len(digits) == 10:
+			digits = default_country_code + digits
+
+	return f"+{digits}"
+
+
+def normalize_email(email):
+	"""Lowercase bare address from an email string ("Name <a@b.com>" -> "a@b.com")."""
+	if not email:
+		return None
+	address = parseaddr(str(email))[1].strip().lower()
+	return address if "@" in address else None
+
+
+def social_key(platform, sender_id):
+	"""Identity value for a platform sender ID."""
+	if not platform or not sender_id:
+		return None
+	return f"{platform}:{sender_id}"
+
+
+def _memo():
+	if not hasattr(frappe.local, "contact_identity_memo"):
+		frappe.local.contact_identity_memo = {}
+	return frappe.local.contact_identity_memo
+
+
+def find_customer(identity_type, identity_value):
+	"""
+	Customer for a normalized identity.
+
+	Args:
+		identity_type (str): Phone, Email or Social
+		identity_value (str): Normalized value
+
+	Returns:
+		str: Customer name or None
+	"""
+	if not identity_value:
+		return None
+
+	memo = _memo()
+	key = (identity_type, identity_value)
+	if key in memo:
+		return memo[key]
+
+	rows = frappe.db.sql("""
+		SELECT customer FROM `tabContact Identity`
+		WHERE identity_type = %s AND identity_value = %s
+		ORDER BY creation ASC
+		LIMIT 1
+	""", (identity_type, identity_value))
+	memo[key] = rows[0][0] if rows else None
+	return memo[key]
+
+
+def remember(identity_type, identity_value, customer):
+	"""Record a just-created customer in the request memo."""
+	if identity_value:
+		_memo()[(identity_type, identity_value)] = customer
+
+
+def find_customer_by_phone(phone):
+	"""
+	Customer for a raw phone number, or None.
+
+	Without an exact match, falls back to the last PHONE_SUFFIX_DIGITS digits,
+	so a national number ("020 7946 0958") still finds the number stored with
+	its country code ("+44 20 7946 0958") and vice versa. The suffix lookup
+	cannot use the index, but only runs for senders the index does not know.
+	"""
+	number = normalize_phone(phone)
+	customer = find_customer(PHONE, number)
+	if customer or not number or len(number) - 1 < PHONE_SUFFIX_DIGITS:
+		return customer
+
+	suffix = number[-PHONE_SUFFIX_DIGITS:]
+	memo = _memo()
+	key = ("Phone Suffix", suffix)
+	if key not in memo:
+		rows = frappe.db.sql("""
+			SELECT customer FROM `tabContact Identity`
+			WHERE identity_type = %s AND identity_value LIKE %s
+			ORDER BY creation ASC
+			LIMIT 1
+		""", (PHONE, f"%{suffix}"))
+		memo[key] = rows[0][0] if rows else None
+	return memo[key]
+
+
+def find_customer_by_email(email):
+	"""Customer for a raw email address, or None."""
+	return find_customer(EMAIL, normalize_email(email))
+
+
+def find_customer_by_social(platform, sender_id):
+	"""Customer for a platform sender ID, or None."""
+	return find_customer(SOCIAL, social_key(platform, sender_id))
+
+
+# ============================================
+# Index maintenance
+# ============================================
+
+def _customer_identities(doc):
+	identities = set()
+	for field in ("mobile_no", "phone"):
+		identities.add((PHONE, normalize_phone(doc.get(field))))
+	identities.add((EMAIL, normalize_email(doc.get("email_id"))))
+	for field, platform in SOCIAL_FIELDS.items():
+		identities.add((SOCIAL, social_key(platform, doc.get(field))))
+	return {i for i in identities if i[1]}
+
+
+def _contact_identities(doc):
+	identities = {
+		(PHONE, normalize_phone(doc.get("mobile_no"))),
+		(PHONE, normalize_phone(doc.get("phone"))),
+		(EMAIL, normalize_email(doc.get("email_id")))
+	}
+	for row in doc.get("phone_nos") or []:
+		identities.add((PHONE, normalize_phone(row.get("phone"))))
+	for row in doc.get("email_ids") or []:
+		identities.add((EMAIL, normalize_email(row.get("email_id"))))
+	return {i for i in identities if i[1]}
+
+
+def _replace_identities(source_doctype, source_name, rows):
+	"""
+	Replace the identities derived from one source document.
+
+	Args:
+		rows (iterable): (identity_type, identity_value, customer) tuples
+	"""
+	frappe.db.delete("Contact Identity", {"source_doctype": source_doctype, "source_name": source_name})
+
+	rows = sorted(set(rows))
+	if not rows:
+		return
+
+	now = now_datetime()
+	user = frappe.session.user
+	frappe.db.bulk_insert(
+		"Contact Identity",
+		fields=[
+			"name", "creation", "modified", "owner", "modified_by",
+			"identity_type", "identity_value", "customer", "source_doctype", "source_name"
+		],
+		values=[
+			(frappe.generate_hash(length=10), now, now, user, user,
+				identity_type, identity_value, customer, source_doctype, source_name)
+			for identity_type, identity_value, customer in rows
+		],
+		ignore_duplicates=True
+	)
+
+
+def index_customer(doc, method=None):
+	"""Customer on_update: re-index the customer's own fields."""
+	_replace_identities("Customer", doc.name, [
+		(identity_type, value, doc.name) for identity_type, value in _customer_identities(doc)
+	])
+
+
+def index_contact(doc, method=None):
+	"""Contact on_update: index its numbers/addresses for every linked Customer."""
+	customers = [link.link_name for link in doc.get("links") or [] if link.link_doctype == "Customer"]
+	_replace_identities("Contact", doc.name, [
+		(identity_type, value, customer)
+		for customer in customers
+		for identity_type, value in _contact_identities(doc)
+	])
+
+
+def link_identity(identity_type, identity_value, customer):
+	"""
+	Attach an identity observed on an inbound message to a customer.
+
+	Used when the identity has no field on Customer (e.g. a social sender ID
+	without the matching custom field). Rows without a source document survive
+	re-indexing of the customer.
+	"""
+	if not identity_value or not customer:
+		return
+	remember(identity_type, identity_value, customer)
+	if frappe.db.exists("Contact Identity", {
+		"identity_type": identity_type,
+		"identity_value": identity_value,
+		"customer": customer
+	}):
+		return
+
+	frappe.get_doc({
+		"doctype": "Contact Identity",
+		"identity_type": identity_type,
+		"identity_value": identity_value,
+		"customer": customer
+	}).insert(ignore_permissions=True)
+
+
+def remove_identities(doc, method=None):
+	"""Customer/Contact on_trash: drop identities derived from the document or pointing at the customer."""
+	frappe.db.delete("Contact Identity", {"source_doctype": doc.doctype, "source_name": doc.name})
+	if doc.doctype == "Customer":
+		frappe.db.delete("Contact Identity", {"customer": doc.name})
+
+
+def rebuild_contact_identities():
+	"""Re-index all Customers and Contacts (patch + daily repair of rows missed by direct writes)."""
+	for doctype, indexer in (("Customer", index_customer), ("Contact", index_contact)):
+		last_name = ""
+		while True:
+			names = frappe.get_all(
+				doctype,
+				filters={"name": [">", last_name]},
+				order_by="name asc",
+				limit=REBUILD_CHUNK,
+				pluck="name"
+			)
+			if not names:
+				break
+
+			for name in names:
+				indexer(frappe.get_doc(doctype, name))
+			frappe.db.commit()
+			last_name = names[-1]
+
+	# Identities left behind by customers deleted without hooks
+	frappe.db.sql("""
+		DELETE i FROM `tabContact Identity` i
+		LEFT JOIN `tabCustomer` c ON c.name = i.customer
+		WHERE c.name IS NULL
+	""")
+	frappe.db.commit()
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+# Copyright (c) 2026, VisualGraphX and contributors
+# For license information, please see license.txt
+
+"""
+Idempotency store for inbound platform messages.
+
+Duplicate detection is keyed by (platform, platform_message_id):
+- Redis holds recently committed keys (SETNX with TTL) so repeated webhook
+  deliveries are rejected without touching the database.
+- Message Idempotency Key has a unique index on the pair, and a key is claimed
+  in the same transaction as the Communication Message insert, so concurrent
+  deliveries cannot both create a message.
+"""
+
+import frappe
+from frappe.utils import add_days, now_datetime
+
+
+CACHE_TTL = 7 * 24 * 3600  # seconds
+KEY_RETENTION_DAYS = 90
+BACKFILL_BATCH_SIZE = 1000
+KEY_FIELDS = ["name", "creation", "modified", "owner", "modified_by", "docstatus", "platform", "platform_message_id"]
+
+
+def _cache_key(platform, message_id):
+	return frappe.cache().make_key(f"ai_comms_hub:idempotency:{platform}:{message_id}")
+
+
+def _remember(platform, message_id):
+	frappe.cache().set(_cache_key(platform, message_id), 1, nx=True, ex=CACHE_TTL)
+
+
+def get_message_platform(hub):
+	"""
+	Platform namespace for a hub's inbound message IDs.
+
+	Args:
+		hub: Communication Hub document (or dict with channel/chatwoot fields)
+
+	Returns:
+		str: Chatwoot, Twilio, or the hub channel
+	"""
+	if hub.get("chatwoot_conversation_id"):
+		return "Chatwoot"
+	if hub.get("channel") in ("SMS", "WhatsApp"):
+		return "Twilio"
+	return hub.get("channel") or "Unknown"
+
+
+def already_processed(platform, message_id):
+	"""
+	Check if a platform message has already been stored.
+
+	Args:
+		platform (str): Platform namespace (Chatwoot, Twilio, Facebook, ...)
+		message_id (str): Platform message ID
+
+	Returns:
+		bool: True if already processed
+	"""
+	if not message_id:
+		return False
+
+	message_id = str(message_id)
+	if frappe.cache().get(_cache_key(platform, message_id)):
+		return True
+
+	exists = frappe.db.exists(
+		"Message Idempotency Key",
+		{"platform": platform, "platform_message_id": message_id}
+	)
+	if exists:
+		_remember(platform, message_id)
+	return bool(exists)
+
+
+def claim(platform, message_id):
+	"""
+	Claim a platform message ID in the current transaction.
+
+	The claim is rolled back with the transaction if the message insert fails,
+	and is only published to Redis once committed.
+
+	Raises:
+		frappe.DuplicateEntryError: If the ID was already claimed
+	"""
+	if not message_id:
+		return
+
+	message_id = str(message_id)
+	now = now_datetime()
+	try:
+		frappe.db.sql("""
+			INSERT INTO `tabMessage Idempotency Key`
+				(name, creation, modified, owner, modified_by, docstatus, platform, platform_message_id)
+			VALUES (%(name)s, %(now)s, %(now)s, %(user)s, %(user)s, 0, %(platform)s, %(message_id)s)
+		""", {
+			"name": frappe.generate_hash(length=10),
+			"now": now,
+			"user": frappe.session.user,
+			"platform": platform,
+			"message_id": message_id
+		})
+	except Exception as e:
+		if frappe.db.is_unique_key_violation(e) or frappe.db.is_duplicate_entry(e):
+			_remember(platform, message_id)
+			raise frappe.DuplicateEntryError("Message Idempotency Key", f"{platform}:{message_id}", e)
+		raise
+
+	frappe.db.after_commit.add(lambda: _remember(platform, message_id))
+
+
+def claim_many(platform, message_ids):
+	"""
+	Claim several platform message IDs in the current transaction with one insert.
+
+	Used for messages written with a bulk insert, which skips the per-document claim.
+
+	Raises:
+		frappe.DuplicateEntryError: If any of the IDs was already claimed
+	"""
+	message_ids = [str(message_id) for message_id in message_ids if message_id]
+	if not message_ids:
+		return
+
+	now = now_datetime()
+	user = frappe.session.user
+	try:
+		frappe.db.bulk_insert(
+			"Message Idempotency Key",
+			KEY_FIELDS,
+			[
+				[frappe.generate_hash(length=10), now, now, user, user, 0, platform, message_id]
+				for message_id in message_ids
+			]
+		)
+	except Exception as e:
+		if frappe.db.is_unique_key_violation(e) or frappe.db.is_duplicate_entry(e):
+			raise frappe.DuplicateEntryError("Message Idempotency Key", f"{platform}:{message_ids[0]}", e)
+		raise
+
+	def remember_all():
+		for message_id in message_ids:
+			_remember(platform, message_id)
+
+	frappe.db.after_commit.add(remember_all)
+
+
+def backfill_keys(days=KEY_RETENTION_DAYS, batch_size=BACKFILL_BATCH_SIZE):
+	"""
+	Claim the platform message IDs of inbound messages stored before keys existed.
+
+	Only messages inside the retention window are indexed; older keys would be
+	purged right away. IDs that are already claimed are skipped.
+
+	Returns:
+		int: Number of messages scanned
+	"""
+	rows = frappe.db.sql("""
+		SELECT m.platform_message_id, m.creation, h.channel, h.chatwoot_conversation_id
+		FROM `tabCommunication Message` m
+		INNER JOIN `tabCommunication Hub` h ON h.name = m.communication_hub
+		WHERE m.sender_type = 'Customer'
+			AND IFNULL(m.platform_message_id, '') != ''
+			AND m.creation >= %(since)s
+	""", {"since": add_days(now_datetime(), -days)}, as_dict=True)
+
+	user = frappe.session.user
+	for start in range(0, len(rows), batch_size):
+		frappe.db.bulk_insert(
+			"Message Idempotency Key",
+			KEY_FIELDS,
+			[
+				[
+					frappe.generate_hash(length=10), row.creation, row.creation, user, user, 0,
+					get_message_platform(row), str(row.platform_message_id)
+				]
+				for row in rows[start:start + batch_size]
+			],
+			ignore_duplicates=True
+		)
+		frappe.db.commit()
+
+	return len(rows)
+
+
+def purge_expired_keys(days=KEY_RETENTION_DAYS):
+	"""Delete idempotency keys older than the retention window (upstream retries stop long before)."""
+	frappe.db.delete("Message Idempotency Key", {
+		"creation": ["<", add_days(now_datetime(), -days)]
+	})
+	frappe.db.commit()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# Copyright (c) 2026, VisualGraphX and contributors
+# For license information, please see license.txt
+
+"""
+Single-worker locks in Redis.
+
+Each acquisition stores a random token, and refresh/release only act while the
+key still holds that token (compare-and-set in Lua). A worker whose lock expired
+during a long run can therefore neither extend nor delete the lock a newer
+worker has taken since. Workers draining a queue refresh the TTL after every
+batch, so the lock only lapses when its owner stops making progress.
+"""
+
+import frappe
+from frappe.utils import cint
+
+
+RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+	return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+REFRESH_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+	return redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+_scripts = {}
+
+
+def _run(script, key, *args):
+	cache = frappe.cache()
+	if script not in _scripts:
+		_scripts[script] = cache.register_script(script)
+	return _scripts[script](keys=[cache.make_key(key)], args=list(args))
+
+
+def acquire_lock(key, ttl):
+	"""
+	Take a lock unless another worker holds it.
+
+	Args:
+		key (str): Lock name
+		ttl (int): Seconds until the lock lapses unless refreshed
+
+	Returns:
+		str: Owner token for refresh_lock/release_lock, or None if the lock is taken
+	"""
+	token = frappe.generate_hash(length=20)
+	cache = frappe.cache()
+	if cache.set(cache.make_key(key), token, nx=True, ex=ttl):
+		return token
+	return None
+
+
+def refresh_lock(key, token, ttl):
+	"""
+	Extend a lock we still own.
+
+	Returns:
+		bool: False if the lock lapsed or was taken by another worker
+	"""
+	return bool(cint(_run(REFRESH_SCRIPT, key, token, ttl)))
+
+
+def release_lock(key, token):
+	"""Release a lock, unless it has since been taken by another worker."""
+	_run(RELEASE_SCRIPT, key, token)
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# Copyright (c) 2026, VisualGraphX and contributors
+# For license information, please see license.txt
+
+"""
+Rolling metric samples in Redis.
+
+Each metric keeps its latest samples as JSON in a capped Redis list, one list
+per channel (``<key>:<channel>``) or a single list for the whole metric. The
+get_*_metrics endpoints of the services summarize these windows.
+"""
+
+import json
+
+import frappe
+
+
+def channel_key(key, channel):
+	"""List key holding the samples of one channel."""
+	return f"{key}:{channel or 'default'}"
+
+
+def record_sample(key, sample, max_samples):
+	"""
+	Push a sample and keep only the latest max_samples of the list.
+
+	Recording is best effort: a Redis error never fails the caller.
+	"""
+	try:
+		cache = frappe.cache()
+		cache.lpush(key, json.dumps(sample))
+		cache.ltrim(key, 0, max_samples - 1)
+	except Exception:
+		pass
+
+
+def get_samples(key):
+	"""
+	Samples of one list, newest first.
+
+	Entries that are not JSON (written by an older format) are skipped.
+	"""
+	samples = []
+	for raw in frappe.cache().lrange(key, 0, -1):
+		try:
+			samples.append(json.loads(frappe.safe_decode(raw)))
+		except ValueError:
+			continue
+	return samples
+
+
+def get_channel_samples(key, channel=None):
+	"""
+	Samples per channel for lists recorded under channel_key(key, ...).
+
+	Args:
+		key (str): Metric key prefix
+		channel (str): Only this channel (default: every channel with samples)
+
+	Returns:
+		dict: channel -> samples, newest first (channels without samples left out)
+	"""
+	if channel:
+		channels = [channel]
+	else:
+		channels = [
+			frappe.safe_decode(list_key).rsplit(":", 1)[-1]
+			for list_key in frappe.cache().get_keys(f"{key}:")
+		]
+
+	result = {}
+	for name in channels:
+		samples = get_samples(channel_key(key, name))
+		if samples:
+			result[name] = samples
+	return result
+
+
+def percentile(values, fraction):
+	"""Nearest-rank percentile of a non-empty, ascending list (fraction 0..1)."""
+	return values[min(len(values) - 1, int(len(values) * fraction))]
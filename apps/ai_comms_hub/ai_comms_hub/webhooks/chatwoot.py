@@ -15,6 +15,8 @@ import hmac
 import hashlib
 from datetime import datetime
 
+from ai_comms_hub.utils import contact_identity
+
 
 @frappe.whitelist(allow_guest=True)
 def handle_chatwoot_webhook():
@@ -30,6 +32,9 @@ def handle_chatwoot_webhook():
 	- account: Account information
 
 	Webhook signature is in X-Chatwoot-Signature header (HMAC SHA256).
+
+	The payload is stored in the webhook inbox and processed in the background
+	(see ai_comms_hub.webhooks.inbox), so this returns as soon as it is persisted.
 	"""
 	try:
 		# Verify webhook signature
@@ -46,22 +51,26 @@ def handle_chatwoot_webhook():
 
 		frappe.logger().info(f"Chatwoot webhook received: {event_type}")
 
-		# Route to appropriate handler
-		if event_type == "message_created":
-			return handle_message_created(data)
-		elif event_type == "message_updated":
-			return handle_message_updated(data)
-		elif event_type == "conversation_created":
-			return handle_conversation_created(data)
-		elif event_type == "conversation_status_changed":
-			return handle_conversation_status_changed(data)
-		elif event_type == "conversation_updated":
-			return handle_conversation_updated(data)
-		elif event_type == "webwidget_triggered":
-			return handle_webwidget_triggered(data)
+		# Persist and acknowledge - handlers run in the webhook inbox worker
+		from ai_comms_hub.webhooks.inbox import accept_event
+
+		conversation = data.get("conversation") or {}
+		if event_type and event_type.startswith("message_"):
+			ordering_key = conversation.get("id")
 		else:
-			frappe.logger().info(f"Unhandled Chatwoot event: {event_type}")
-			return {"status": "success", "message": f"Event {event_type} acknowledged"}
+			ordering_key = conversation.get("id") or data.get("id")
+
+		event_name = accept_event(
+			"Chatwoot",
+			dict(data),
+			event_type=event_type,
+			ordering_key=ordering_key,
+			external_id=data.get("id") if event_type == "message_created" else None
+		)
+
+		if not event_name:
+			return {"status": "duplicate", "message_id": data.get("id")}
+		return {"status": "accepted", "event": event_name}
 
 	except Exception as e:
 		frappe.log_error(frappe.get_traceback(), "Chatwoot Webhook Error")
@@ -200,7 +209,12 @@ def handle_message_created(data):
 		if attachments:
 			msg.attachments_json = json.dumps(attachments)
 
-		msg.insert()
+		try:
+			msg.insert()
+		except frappe.DuplicateEntryError:
+			# Lost a race with a concurrent delivery of the same message
+			frappe.db.rollback()
+			return {"status": "duplicate", "message_id": message_id}
 		frappe.db.commit()
 
 		frappe.logger().info(f"Chatwoot message created: {msg.name} from hub {hub.name}")
@@ -429,13 +443,9 @@ def message_already_processed(message_id):
 	Returns:
 		bool: True if already processed
 	"""
-	if not message_id:
-		return False
+	from ai_comms_hub.utils.idempotency import already_processed
 
-	return frappe.db.exists(
-		"Communication Message",
-		{"platform_message_id": str(message_id)}
-	)
+	return already_processed("Chatwoot", message_id)
 
 
 def get_or_create_chatwoot_hub(conversation_id, account_id, inbox_id=None, channel="Chat",
@@ -554,36 +564,14 @@ def get_or_create_customer_from_chatwoot(sender_id=None, name=None, email=None,
 	Returns:
 		Document: Customer or None
 	"""
-	# Try to find by email first
-	if email:
-		customer_name = frappe.db.get_value(
-			"Customer",
-			{"email_id": email},
-			"name"
-		)
-		if customer_name:
-			return frappe.get_doc("Customer", customer_name)
-
-	# Try to find by phone
-	if phone:
-		clean_phone = phone.replace("+", "").replace("-", "").replace(" ", "")
-		customer_name = frappe.db.get_value(
-			"Customer",
-			{"mobile_no": ["like", f"%{clean_phone[-10:]}%"]},
-			"name"
-		)
-		if customer_name:
-			return frappe.get_doc("Customer", customer_name)
-
-	# Try to find by Chatwoot contact ID (custom field)
-	if sender_id and frappe.db.has_column("Customer", "chatwoot_contact_id"):
-		customer_name = frappe.db.get_value(
-			"Customer",
-			{"chatwoot_contact_id": str(sender_id)},
-			"name"
-		)
-		if customer_name:
-			return frappe.get_doc("Customer", customer_name)
+	# Indexed lookups: email first, then phone, then Chatwoot contact ID
+	customer_name = (
+		contact_identity.find_customer_by_email(email)
+		or contact_identity.find_customer_by_phone(phone)
+		or contact_identity.find_customer_by_social("Chatwoot", sender_id)
+	)
+	if customer_name:
+		return frappe.get_doc("Customer", customer_name)
 
 	# Create new customer
 	display_name = name or email or phone or f"Chatwoot Contact {sender_id}"
@@ -607,7 +595,10 @@ def get_or_create_customer_from_chatwoot(sender_id=None, name=None, email=None,
 		customer.chatwoot_contact_id = str(sender_id)
 
 	customer.insert(ignore_permissions=True)
+	contact_identity.link_identity(contact_identity.SOCIAL, contact_identity.social_key("Chatwoot", sender_id), customer.name)
 	frappe.db.commit()
+	contact_identity.remember(contact_identity.EMAIL, contact_identity.normalize_email(email), customer.name)
+	contact_identity.remember(contact_identity.PHONE, contact_identity.normalize_phone(phone), customer.name)
 
 	frappe.logger().info(f"Created customer from Chatwoot: {customer.name}")
 
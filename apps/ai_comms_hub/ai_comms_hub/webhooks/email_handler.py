@@ -11,6 +11,8 @@ from datetime import datetime
 import re
 from email.utils import parseaddr
 
+from ai_comms_hub.utils import attachments, contact_identity
+
 
 @frappe.whitelist(allow_guest=True)
 def handle_sendgrid_webhook():
@@ -66,8 +68,17 @@ def handle_sendgrid_webhook():
 		msg.insert()
 		frappe.db.commit()
 
-		# Process attachments
-		process_email_attachments(data, hub.name, msg.name)
+		# Spool attachments now (the request body is only available here);
+		# storage and File records are created in the background
+		spooled = spool_email_attachments(data)
+		if spooled:
+			frappe.enqueue(
+				"ai_comms_hub.webhooks.email_handler.process_email_attachments",
+				hub_id=hub.name,
+				message_id=msg.name,
+				spooled=spooled,
+				queue="short"
+			)
 
 		# Trigger AI response
 		if hub.ai_mode == "Autonomous":
@@ -288,148 +299,99 @@ def classify_email_intent(subject):
 	return "General Inquiry"
 
 
-def process_email_attachments(data, hub_id, message_id):
+def spool_email_attachments(data):
 	"""
-	Process email attachments from SendGrid.
+	Stream SendGrid attachments to spool files during the webhook request.
+
+	SendGrid sends attachment-info (JSON metadata) plus attachment1..N as
+	uploaded files (or base64 strings). Each is copied in chunks with its
+	SHA-256 computed on the way; attachments over the size cap are skipped.
 
 	Args:
 		data (dict): Form data from SendGrid
-		hub_id (str): Communication Hub ID
-		message_id (str): Message ID
-	"""
-	import os
-	import base64
-
-	# SendGrid sends attachment info in different formats:
-	# - attachment-info: JSON with metadata
-	# - attachment1, attachment2, etc.: File content
 
-	attachment_info = data.get("attachment-info")
-	if attachment_info:
+	Returns:
+		list: Spooled attachments (path, sha256, size, filename, content_type)
+	"""
+	attachment_info = data.get("attachment-info") or {}
+	if isinstance(attachment_info, str):
 		try:
-			attachment_info = json.loads(attachment_info) if isinstance(attachment_info, str) else attachment_info
-		except (json.JSONDecodeError, TypeError):
+			attachment_info = json.loads(attachment_info)
+		except json.JSONDecodeError:
 			attachment_info = {}
 
-	# Get attachment keys
-	attachment_keys = [k for k in data.keys() if k.startswith("attachment") and k != "attachment-info"]
+	sources = {k: v for k, v in data.items() if k.startswith("attachment") and k != "attachment-info"}
+	request = getattr(frappe, "request", None)
+	if request is not None and getattr(request, "files", None):
+		sources.update({k: v for k, v in request.files.items() if k.startswith("attachment")})
 
-	saved_attachments = []
+	spooled = []
+	for key, attachment in sources.items():
+		if not attachment:
+			continue
+
+		metadata = attachment_info.get(key, {})
+		attachment_num = key.replace("attachment", "")
+		filename = metadata.get("filename", metadata.get("name", getattr(attachment, "filename", None) or f"attachment_{attachment_num}"))
+		content_type = metadata.get("type", metadata.get("content-type", "application/octet-stream"))
 
-	for key in attachment_keys:
 		try:
-			# Get attachment content
-			attachment = data.get(key)
-			if not attachment:
-				continue
-
-			# Get metadata for this attachment
-			# Key format: attachment1, attachment2, etc.
-			attachment_num = key.replace("attachment", "")
-			metadata = attachment_info.get(f"attachment{attachment_num}", {})
-
-			filename = metadata.get("filename", metadata.get("name", f"attachment_{attachment_num}"))
-			content_type = metadata.get("type", metadata.get("content-type", "application/octet-stream"))
-
-			# Handle file content
-			if hasattr(attachment, 'read'):
-				# It's a file object
-				file_content = attachment.read()
-			elif isinstance(attachment, str):
-				# It might be base64 encoded
-				try:
-					file_content = base64.b64decode(attachment)
-				except Exception:
-					file_content = attachment.encode('utf-8')
-			else:
-				file_content = attachment
-
-			# Save to Frappe File doctype
-			file_doc = frappe.get_doc({
-				"doctype": "File",
-				"file_name": filename,
-				"attached_to_doctype": "Communication Message",
-				"attached_to_name": message_id,
-				"content": file_content,
-				"is_private": 1
-			})
+			entry = attachments.spool_attachment(attachment)
+		except attachments.AttachmentTooLargeError as e:
+			frappe.log_error(f"Skipped attachment {filename}: {str(e)}", "Email Attachment Error")
+			continue
+		except Exception as e:
+			frappe.log_error(f"Error spooling attachment {key}: {str(e)}", "Email Attachment Error")
+			continue
 
-			# Use save_file method for proper file handling
-			file_url = save_attachment_file(filename, file_content, message_id)
+		entry.update({"filename": filename, "content_type": content_type})
+		spooled.append(entry)
 
-			if file_url:
-				saved_attachments.append({
-					"filename": filename,
-					"content_type": content_type,
-					"file_url": file_url
-				})
+	return spooled
 
-				frappe.logger().info(f"Saved email attachment: {filename}")
 
+def process_email_attachments(hub_id, message_id, spooled):
+	"""
+	Store spooled attachments and attach them to the message (background job).
+
+	Blobs are content-addressed, so an attachment already received with
+	another message (logos, signature images) is not written again; each
+	message still gets its own File record pointing at the shared blob.
+
+	Args:
+		hub_id (str): Communication Hub ID
+		message_id (str): Communication Message ID
+		spooled (list): Output of spool_email_attachments
+	"""
+	saved_attachments = []
+
+	for entry in spooled:
+		try:
+			file_url = attachments.store_spooled(entry, entry["filename"])
+			attachments.attach_file(file_url, entry["filename"], entry["size"], "Communication Message", message_id)
+			saved_attachments.append({
+				"filename": entry["filename"],
+				"content_type": entry["content_type"],
+				"file_url": file_url,
+				"sha256": entry["sha256"],
+				"size": entry["size"]
+			})
 		except Exception as e:
-			frappe.log_error(f"Error processing attachment {key}: {str(e)}", "Email Attachment Error")
+			attachments.discard_spooled(entry)
+			frappe.log_error(f"Error storing attachment {entry.get('filename')} for {hub_id}: {str(e)}", "Email Attachment Error")
 
-	# Update message with attachment info
-	if saved_attachments:
+	if saved_attachments and frappe.db.has_column("Communication Message", "attachments_json"):
 		frappe.db.set_value(
 			"Communication Message",
 			message_id,
 			"attachments_json",
 			json.dumps(saved_attachments)
 		)
-		frappe.db.commit()
+	frappe.db.commit()
 
 	return saved_attachments
 
 
-def save_attachment_file(filename, content, attached_to):
-	"""
-	Save attachment file to Frappe file system.
-
-	Args:
-		filename (str): Original filename
-		content (bytes): File content
-		attached_to (str): Document name to attach to
-
-	Returns:
-		str: File URL or None
-	"""
-	import os
-
-	try:
-		# Create temp directory if not exists
-		temp_dir = frappe.get_site_path("private", "files", "ai_comms_attachments")
-		os.makedirs(temp_dir, exist_ok=True)
-
-		# Generate unique filename
-		import hashlib
-		file_hash = hashlib.md5(content[:1000] if len(content) > 1000 else content).hexdigest()[:8]
-		safe_filename = f"{file_hash}_{filename}"
-
-		# Save file
-		file_path = os.path.join(temp_dir, safe_filename)
-		with open(file_path, 'wb') as f:
-			f.write(content if isinstance(content, bytes) else content.encode())
-
-		# Create File record
-		file_doc = frappe.get_doc({
-			"doctype": "File",
-			"file_name": filename,
-			"attached_to_doctype": "Communication Message",
-			"attached_to_name": attached_to,
-			"file_url": f"/private/files/ai_comms_attachments/{safe_filename}",
-			"is_private": 1
-		})
-		file_doc.insert(ignore_permissions=True)
-		frappe.db.commit()
-
-		return file_doc.file_url
-
-	except Exception as e:
-		frappe.log_error(f"Error saving attachment {filename}: {str(e)}", "Attachment Save Error")
-		return None
-
-
 def get_or_create_customer_by_email(email):
 	"""
 	Find or create customer from email address.
@@ -443,8 +405,8 @@ def get_or_create_customer_by_email(email):
 	# Parse email
 	name, email_addr = parseaddr(email)
 
-	# Try to find existing customer
-	customer_name = frappe.db.get_value("Customer", {"email_id": email_addr}, "name")
+	# Indexed lookup by lowercase address (Customer email and linked Contacts)
+	customer_name = contact_identity.find_customer_by_email(email_addr)
 
 	if customer_name:
 		return frappe.get_doc("Customer", customer_name)
@@ -460,5 +422,6 @@ def get_or_create_customer_by_email(email):
 	})
 	customer.insert(ignore_permissions=True)
 	frappe.db.commit()
+	contact_identity.remember(contact_identity.EMAIL, contact_identity.normalize_email(email_addr), customer.name)
 
 	return customer
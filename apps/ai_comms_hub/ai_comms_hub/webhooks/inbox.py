@@ -0,0 +1,268 @@
+"""
+Webhook Inbox
+
+Fast-ack ingestion for Chatwoot, Twilio and social webhooks.
+
+The HTTP endpoints only verify the request and persist the raw payload as a
+Webhook Inbox Event, so they can return 200 immediately even during bursts
+(campaign replies). Customer/hub lookups, message inserts and AI triggers happen
+in a background worker that drains the inbox in batches.
+
+Ordering: every event carries an ``ordering_key`` (conversation or sender). Events
+sharing a key are processed strictly in arrival order, and a failed event blocks
+later events for the same key until it is retried or gives up.
+
+Only one worker drains the inbox at a time (utils.locks). Events left in
+"Processing" are only requeued by a worker holding that lock, so they can never
+belong to a drain that is still running.
+"""
+
+import json
+
+import frappe
+from frappe.utils import add_to_date, cint, now_datetime
+
+from ai_comms_hub.utils.locks import acquire_lock, refresh_lock, release_lock
+
+
+WORKER_JOB_ID = "ai_comms_hub_webhook_inbox"
+LOCK_KEY = "ai_comms_hub:webhook_inbox:lock"
+LOCK_TTL = 600  # seconds; refreshed after every batch
+BATCH_SIZE = 100
+MAX_ATTEMPTS = 5
+RETENTION_DAYS = 7
+
+
+def accept_event(source, payload, event_type=None, ordering_key=None, external_id=None):
+	"""
+	Persist a raw webhook payload and wake the inbox worker.
+
+	Args:
+		source (str): Webhook source (Chatwoot, Twilio, Facebook, ...)
+		payload (dict): Raw payload as received
+		event_type (str): Event type used to route the payload to its handler
+		ordering_key (str): Conversation/sender key; events sharing it are processed in order
+		external_id (str): Upstream message ID; redeliveries with the same ID are dropped
+
+	Returns:
+		str: Webhook Inbox Event name, or None if the event was a redelivery
+	"""
+	external_id = str(external_id) if external_id else None
+	if external_id and frappe.db.exists("Webhook Inbox Event", {"source": source, "external_id": external_id}):
+		return None
+
+	event = frappe.get_doc({
+		"doctype": "Webhook Inbox Event",
+		"source": source,
+		"event_type": event_type,
+		"ordering_key": f"{source}:{ordering_key}" if ordering_key else None,
+		"external_id": external_id,
+		"payload": json.dumps(payload, default=str),
+		"status": "Queued",
+		"received_at": now_datetime()
+	})
+	event.insert(ignore_permissions=True)
+	frappe.db.commit()
+
+	wake_worker()
+	return event.name
+
+
+def wake_worker():
+	"""Enqueue the inbox worker unless one is already queued or running."""
+	frappe.enqueue(
+		"ai_comms_hub.webhooks.inbox.process_inbox",
+		queue="short",
+		job_id=WORKER_JOB_ID,
+		deduplicate=True
+	)
+
+
+def get_handler(source, event_type):
+	"""
+	Map an inbox event to the existing synchronous handler.
+
+	Returns:
+		callable: Handler taking the decoded payload, or None for events we only acknowledge
+	"""
+	from ai_comms_hub.webhooks import chatwoot, messaging, social
+
+	if source == "Chatwoot":
+		return {
+			"message_created": chatwoot.handle_message_created,
+			"message_updated": chatwoot.handle_message_updated,
+			"conversation_created": chatwoot.handle_conversation_created,
+			"conversation_status_changed": chatwoot.handle_conversation_status_changed,
+			"conversation_updated": chatwoot.handle_conversation_updated,
+			"webwidget_triggered": chatwoot.handle_webwidget_triggered
+		}.get(event_type)
+
+	if source == "Twilio":
+		return messaging.handle_whatsapp_message if event_type == "whatsapp" else messaging.handle_sms_message
+
+	return {
+		"Facebook": social.process_facebook_message,
+		"Instagram": social.process_instagram_message,
+		"Twitter": social.process_twitter_dm,
+		"LinkedIn": social.process_linkedin_message
+	}.get(source)
+
+
+def _fetch_batch(batch_size):
+	"""Oldest queued events, skipping keys blocked behind a failed event that will be retried."""
+	return frappe.db.sql("""
+		SELECT name, source, event_type, ordering_key, payload
+		FROM `tabWebhook Inbox Event` e
+		WHERE e.status = 'Queued'
+			AND (
+				e.ordering_key IS NULL
+				OR e.ordering_key NOT IN (
+					SELECT f.ordering_key FROM `tabWebhook Inbox Event` f
+					WHERE f.status = 'Failed' AND f.attempts < %(max_attempts)s
+						AND f.ordering_key IS NOT NULL
+				)
+			)
+		ORDER BY e.received_at ASC, e.creation ASC
+		LIMIT %(limit)s
+	""", {"max_attempts": MAX_ATTEMPTS, "limit": batch_size}, as_dict=True)
+
+
+def _set_status(names, status, **extra):
+	if not names:
+		return
+	assignments = ", ".join(f"`{field}` = %({field})s" for field in extra)
+	frappe.db.sql(
+		f"""
+		UPDATE `tabWebhook Inbox Event`
+		SET status = %(status)s{', ' + assignments if assignments else ''}
+		WHERE name IN %(names)s
+		""",
+		dict(extra, status=status, names=names)
+	)
+
+
+def _process_event(event):
+	handler = get_handler(event.source, event.event_type)
+	if not handler:
+		frappe.logger().info(f"Webhook inbox: no handler for {event.source} {event.event_type}, acknowledged")
+		return
+
+	result = handler(frappe._dict(json.loads(event.payload or "{}")))
+	if isinstance(result, dict) and result.get("status") == "error":
+		raise Exception(result.get("message") or "Handler reported an error")
+
+
+def process_batch(batch_size=BATCH_SIZE):
+	"""
+	Process one batch of queued events.
+
+	Returns:
+		int: Number of events fetched (0 means the inbox is drained)
+	"""
+	events = _fetch_batch(batch_size)
+	if not events:
+		return 0
+
+	frappe.db.sql("""
+		UPDATE `tabWebhook Inbox Event`
+		SET status = 'Processing', attempts = attempts + 1, modified = %(now)s
+		WHERE name IN %(names)s
+	""", {"names": [e.name for e in events], "now": now_datetime()})
+	frappe.db.commit()
+
+	processed = []
+	deferred = []
+	blocked_keys = set()
+
+	for event in events:
+		if event.ordering_key and event.ordering_key in blocked_keys:
+			deferred.append(event.name)
+			continue
+
+		try:
+			_process_event(event)
+			processed.append(event.name)
+		except frappe.DuplicateEntryError:
+			# Message was already stored by an earlier delivery
+			frappe.db.rollback()
+			processed.append(event.name)
+		except Exception:
+			frappe.db.rollback()
+			if event.ordering_key:
+				blocked_keys.add(event.ordering_key)
+			_set_status([event.name], "Failed", error=frappe.get_traceback()[-2000:])
+			frappe.db.commit()
+
+	_set_status(processed, "Processed", processed_at=now_datetime())
+	if deferred:
+		# Never attempted in this batch - give the attempt back
+		frappe.db.sql("""
+			UPDATE `tabWebhook Inbox Event`
+			SET status = 'Queued', attempts = attempts - 1
+			WHERE name IN %(names)s
+		""", {"names": deferred})
+	frappe.db.commit()
+
+	return len(events)
+
+
+def _requeue_abandoned():
+	"""Requeue events left in "Processing" by a worker that died. Caller must hold the lock."""
+	frappe.db.sql("""
+		UPDATE `tabWebhook Inbox Event`
+		SET status = 'Queued'
+		WHERE status = 'Processing'
+	""")
+	frappe.db.commit()
+
+
+def process_inbox(batch_size=BATCH_SIZE, requeue_abandoned=False):
+	"""
+	Drain the webhook inbox. Only one worker runs at a time (Redis lock).
+
+	Args:
+		batch_size (int): Events per batch
+		requeue_abandoned (bool): Requeue "Processing" events first (no other drain is running)
+	"""
+	token = acquire_lock(LOCK_KEY, LOCK_TTL)
+	if not token:
+		return
+
+	try:
+		if requeue_abandoned:
+			_requeue_abandoned()
+
+		while process_batch(cint(batch_size) or BATCH_SIZE):
+			if not refresh_lock(LOCK_KEY, token, LOCK_TTL):
+				# Lapsed mid-drain; another worker may own the inbox now
+				frappe.logger().warning("Webhook inbox: drain lock lost, stopping")
+				break
+	finally:
+		release_lock(LOCK_KEY, token)
+
+
+def retry_pending_events():
+	"""
+	Scheduler safety net.
+
+	Requeues retryable failures, then drains the inbox (covers events accepted while
+	a worker was finishing). Events left in "Processing" by a crashed worker are
+	requeued once this run holds the drain lock.
+	"""
+	frappe.db.sql("""
+		UPDATE `tabWebhook Inbox Event`
+		SET status = 'Queued'
+		WHERE status = 'Failed' AND attempts < %(max_attempts)s
+	""", {"max_attempts": MAX_ATTEMPTS})
+	frappe.db.commit()
+
+	process_inbox(requeue_abandoned=True)
+
+
+def purge_processed_events(days=RETENTION_DAYS):
+	"""Delete processed inbox events older than the retention window."""
+	frappe.db.delete("Webhook Inbox Event", {
+		"status": "Processed",
+		"received_at": ["<", add_to_date(now_datetime(), days=-cint(days))]
+	})
+	frappe.db.commit()
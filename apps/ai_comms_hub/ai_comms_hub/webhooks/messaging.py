@@ -13,6 +13,8 @@ import base64
 from datetime import datetime
 from urllib.parse import urlencode
 
+from ai_comms_hub.utils import contact_identity
+
 
 @frappe.whitelist(allow_guest=True)
 def handle_twilio_webhook():
@@ -28,6 +30,8 @@ def handle_twilio_webhook():
 	- MediaUrl0, MediaContentType0, etc.: Media attachments
 
 	For WhatsApp, 'From' and 'To' are prefixed with 'whatsapp:'
+
+	Messages are stored in the webhook inbox and processed in the background.
 	"""
 	try:
 		# Verify Twilio signature
@@ -40,12 +44,24 @@ def handle_twilio_webhook():
 
 		# Determine if SMS or WhatsApp
 		from_number = data.get("From", "")
-		to_number = data.get("To", "")
+		event_type = "whatsapp" if from_number.startswith("whatsapp:") else "sms"
+
+		# Persist and acknowledge - handle_sms_message / handle_whatsapp_message
+		# run in the webhook inbox worker
+		from ai_comms_hub.webhooks.inbox import accept_event
+
+		accept_event(
+			"Twilio",
+			dict(data),
+			event_type=event_type,
+			ordering_key=from_number.replace("whatsapp:", ""),
+			external_id=data.get("MessageSid")
+		)
 
-		if from_number.startswith("whatsapp:"):
-			return handle_whatsapp_message(data)
-		else:
-			return handle_sms_message(data)
+		# Return TwiML empty response (no auto-reply, we handle it async)
+		frappe.local.response['http_status_code'] = 200
+		frappe.local.response['content_type'] = 'text/xml'
+		return '<?xml version="1.0" encoding="UTF-8"?><Response></Response>'
 
 	except Exception as e:
 		frappe.log_error(frappe.get_traceback(), "Twilio Webhook Error")
@@ -327,13 +343,9 @@ def message_already_processed(message_sid):
 	Returns:
 		bool: True if already processed
 	"""
-	if not message_sid:
-		return False
+	from ai_comms_hub.utils.idempotency import already_processed
 
-	return frappe.db.exists(
-		"Communication Message",
-		{"platform_message_id": message_sid}
-	)
+	return already_processed("Twilio", message_sid)
 
 
 def get_or_create_sms_hub(from_number, to_number):
@@ -448,25 +460,8 @@ def get_or_create_customer_by_phone(phone_number, name=None):
 	Returns:
 		Document: Customer
 	"""
-	# Clean phone number
-	clean_phone = phone_number.replace("+", "").replace("-", "").replace(" ", "")
-
-	# Try to find existing customer by mobile
-	customer_name = frappe.db.get_value(
-		"Customer",
-		{"mobile_no": ["like", f"%{clean_phone[-10:]}%"]},
-		"name"
-	)
-
-	if customer_name:
-		return frappe.get_doc("Customer", customer_name)
-
-	# Try alternate phone field
-	customer_name = frappe.db.get_value(
-		"Customer",
-		{"phone": ["like", f"%{clean_phone[-10:]}%"]},
-		"name"
-	)
+	# Indexed lookup by E.164 number (Customer mobile/phone and linked Contacts)
+	customer_name = contact_identity.find_customer_by_phone(phone_number)
 
 	if customer_name:
 		return frappe.get_doc("Customer", customer_name)
@@ -483,6 +478,7 @@ def get_or_create_customer_by_phone(phone_number, name=None):
 	})
 	customer.insert(ignore_permissions=True)
 	frappe.db.commit()
+	contact_identity.remember(contact_identity.PHONE, contact_identity.normalize_phone(phone_number), customer.name)
 
 	frappe.logger().info(f"Created new customer: {customer.name} for phone {phone_number}")
 
@@ -6,6 +6,9 @@ Handles webhooks from social media platforms:
 - Instagram DMs (Meta Graph API)
 - Twitter/X DMs (Twitter API v2)
 - LinkedIn Messages (LinkedIn API)
+
+POST endpoints only persist events to the webhook inbox; the process_* functions
+below run in the inbox worker (see ai_comms_hub.webhooks.inbox).
 """
 
 import frappe
@@ -13,6 +16,9 @@ from frappe import _
 import json
 from datetime import datetime, timedelta
 
+from ai_comms_hub.utils import contact_identity
+from ai_comms_hub.webhooks.inbox import accept_event
+
 
 @frappe.whitelist(allow_guest=True)
 def handle_facebook_webhook():
@@ -35,7 +41,13 @@ def handle_facebook_webhook():
 		# Process each entry
 		for entry in data.get("entry", []):
 			for messaging_event in entry.get("messaging", []):
-				process_facebook_message(messaging_event)
+				accept_event(
+					"Facebook",
+					messaging_event,
+					event_type="message",
+					ordering_key=messaging_event.get("sender", {}).get("id"),
+					external_id=messaging_event.get("message", {}).get("mid")
+				)
 
 		return {"status": "success"}
 
@@ -126,7 +138,13 @@ def handle_instagram_webhook():
 
 		for entry in data.get("entry", []):
 			for messaging_event in entry.get("messaging", []):
-				process_instagram_message(messaging_event)
+				accept_event(
+					"Instagram",
+					messaging_event,
+					event_type="message",
+					ordering_key=messaging_event.get("sender", {}).get("id"),
+					external_id=messaging_event.get("message", {}).get("mid")
+				)
 
 		return {"status": "success"}
 
@@ -211,7 +229,13 @@ def handle_twitter_webhook():
 
 		# Process direct message events
 		for event in data.get("direct_message_events", []):
-			process_twitter_dm(event)
+			accept_event(
+				"Twitter",
+				event,
+				event_type=event.get("type"),
+				ordering_key=event.get("message_create", {}).get("sender_id"),
+				external_id=event.get("id")
+			)
 
 		return {"status": "success"}
 
@@ -407,7 +431,14 @@ def handle_linkedin_webhook():
 		event_type = data.get("eventType")
 
 		if event_type == "MESSAGING":
-			process_linkedin_message(data)
+			message_event = data.get("eventData", {}).get("messageEvent", {})
+			accept_event(
+				"LinkedIn",
+				dict(data),
+				event_type=event_type,
+				ordering_key=message_event.get("from"),
+				external_id=message_event.get("id")
+			)
 		elif event_type == "SHARE_MENTION":
 			# Handle @mentions - could create leads
 			frappe.logger().info(f"LinkedIn mention received")
@@ -511,18 +542,10 @@ def get_or_create_customer_by_social(platform, sender_id):
 
 	field = field_map.get(platform)
 
-	# Try to find existing customer by social ID
-	if field and frappe.db.has_column("Customer", field):
-		existing = frappe.get_all(
-			"Customer",
-			filters={field: sender_id},
-			limit=1
-		)
-		if existing:
-			return frappe.get_doc("Customer", existing[0].name)
-
-	# Try to find by partial match or contact info
-	# This is a placeholder for more sophisticated matching
+	# Indexed lookup by (platform, sender ID)
+	customer_name = contact_identity.find_customer_by_social(platform, sender_id)
+	if customer_name:
+		return frappe.get_doc("Customer", customer_name)
 
 	# Create new guest customer
 	customer = frappe.get_doc({
@@ -538,6 +561,8 @@ def get_or_create_customer_by_social(platform, sender_id):
 		customer.set(field, sender_id)
 
 	customer.insert(ignore_permissions=True)
+	# Also covers platforms without a Customer field for the sender ID
+	contact_identity.link_identity(contact_identity.SOCIAL, contact_identity.social_key(platform, sender_id), customer.name)
 	frappe.db.commit()
 
 	return customer
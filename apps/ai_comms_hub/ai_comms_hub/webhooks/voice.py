@@ -9,7 +9,11 @@ from frappe import _
 import json
 import hmac
 import hashlib
-from datetime import datetime
+from datetime import datetime, timedelta
+
+from ai_comms_hub.api.message import bulk_insert_messages
+from ai_comms_hub.services.enrichment import mark_hub_for_enrichment
+from ai_comms_hub.utils import contact_identity
 
 
 @frappe.whitelist(allow_guest=True)
@@ -190,6 +194,9 @@ def handle_post_call_transcription(data):
 			})
 			hub.insert()
 
+		# Store transcript turns in one write (before hub.save() so its counters include them)
+		inserted = ingest_transcript(hub.name, conversation_id, transcript, start_time)
+
 		# Update hub with call details
 		hub.call_duration = call_duration
 		hub.call_status = "Completed" if status == "done" else status
@@ -206,44 +213,28 @@ def handle_post_call_transcription(data):
 
 		hub.save()
 
-		# Create individual message records from transcript
-		for turn in transcript:
-			role = turn.get("role")
-			message = turn.get("message", "")
-
-			if not message:
-				continue
-
-			sender_type = "Customer" if role == "user" else "AI"
-			sender_name = "Customer" if role == "user" else "Eleven Labs AI"
-
-			# Check if message already exists (avoid duplicates)
-			existing_msg = frappe.db.exists(
-				"Communication Message",
-				{
-					"communication_hub": hub.name,
-					"content": message[:140],  # First 140 chars for matching
-					"sender_type": sender_type
-				}
+		if inserted:
+			# One aggregate notification and one enrichment job per call
+			frappe.publish_realtime(
+				event="new_message",
+				message={
+					"hub_id": hub.name,
+					"sender_type": "Transcript",
+					"message_count": len(inserted)
+				},
+				doctype="Communication Hub",
+				docname=hub.name,
+				after_commit=True
 			)
-
-			if not existing_msg:
-				msg = frappe.get_doc({
-					"doctype": "Communication Message",
-					"communication_hub": hub.name,
-					"sender_type": sender_type,
-					"sender_name": sender_name,
-					"content": message,
-					"timestamp": datetime.now()
-				})
-				msg.insert()
+			mark_hub_for_enrichment(hub.name)
 
 		frappe.db.commit()
 
 		return {
 			"status": "success",
 			"hub_id": hub.name,
-			"conversation_id": conversation_id
+			"conversation_id": conversation_id,
+			"messages_created": len(inserted)
 		}
 
 	except Exception as e:
@@ -251,6 +242,64 @@ def handle_post_call_transcription(data):
 		return {"status": "error", "message": str(e)}
 
 
+def ingest_transcript(hub_id, conversation_id, transcript, start_time=None):
+	"""
+	Store post-call transcript turns as Communication Messages in one batched write.
+
+	Turns are keyed by (conversation_id, turn index) in platform_message_id, so
+	webhook redeliveries only add turns that are not stored yet. Message hooks
+	are bypassed: the call is over, so there is nothing to deliver or reply to.
+
+	Args:
+		hub_id (str): Communication Hub ID
+		conversation_id (str): Eleven Labs conversation ID
+		transcript (list): Transcript turns (role, message, time_in_call_secs)
+		start_time (int, optional): Call start as a Unix timestamp
+
+	Returns:
+		list: Names of the inserted messages
+	"""
+	turns = [
+		(f"{conversation_id}:{index}", index, turn)
+		for index, turn in enumerate(transcript or [])
+		if turn.get("message")
+	]
+	if not turns:
+		return []
+
+	# Serialize concurrent deliveries of the same call
+	frappe.db.sql("SELECT name FROM `tabCommunication Hub` WHERE name = %s FOR UPDATE", (hub_id,))
+
+	existing = set(frappe.get_all(
+		"Communication Message",
+		filters={
+			"communication_hub": hub_id,
+			"platform_message_id": ["in", [key for key, _, _ in turns]]
+		},
+		pluck="platform_message_id"
+	))
+
+	call_start = datetime.fromtimestamp(start_time) if start_time else datetime.now()
+	messages = []
+	for key, index, turn in turns:
+		if key in existing:
+			continue
+
+		is_customer = turn.get("role") == "user"
+		messages.append({
+			"sender_type": "Customer" if is_customer else "AI",
+			"sender_name": "Customer" if is_customer else "Eleven Labs AI",
+			"content": turn.get("message"),
+			# Turn index as microseconds keeps transcript order for turns in the same second
+			"timestamp": call_start + timedelta(seconds=turn.get("time_in_call_secs") or 0, microseconds=index),
+			"platform_message_id": key,
+			# AI turns were spoken during the call
+			"delivery_status": "Pending" if is_customer else "Delivered"
+		})
+
+	return bulk_insert_messages(hub_id, messages)
+
+
 def handle_post_call_audio(data):
 	"""
 	Handle post-call audio webhook.
@@ -524,15 +573,8 @@ def get_or_create_customer_by_phone(phone_number):
 	Returns:
 		Document: Customer document
 	"""
-	# Clean phone number
-	clean_phone = phone_number.replace("+", "").replace("-", "").replace(" ", "")
-
-	# Try to find existing customer
-	customer_name = frappe.db.get_value(
-		"Customer",
-		{"mobile_no": ["like", f"%{clean_phone[-10:]}%"]},
-		"name"
-	)
+	# Indexed lookup by E.164 number (Customer mobile/phone and linked Contacts)
+	customer_name = contact_identity.find_customer_by_phone(phone_number)
 
 	if customer_name:
 		return frappe.get_doc("Customer", customer_name)
@@ -548,6 +590,7 @@ def get_or_create_customer_by_phone(phone_number):
 	})
 	customer.insert(ignore_permissions=True)
 	frappe.db.commit()
+	contact_identity.remember(contact_identity.PHONE, contact_identity.normalize_phone(phone_number), customer.name)
 
 	return customer
 
@@ -189,9 +189,20 @@ class ChatwootAPI:
 			f'/api/v1/accounts/{self.account_id}/conversations/{conversation_id}/labels', data=data)
 	
 	# Message operations
-	def get_messages(self, conversation_id: int, page: int = 1, per_page: int = 200) -> Dict:
-		"""Get messages for a conversation"""
+	def get_messages(self, conversation_id: int, page: int = 1, per_page: int = 200,
+	                 after: Optional[int] = None, before: Optional[int] = None) -> Dict:
+		"""
+		Get messages for a conversation
+
+		Args:
+			after: Only return messages with an ID greater than this one (incremental sync)
+			before: Only return messages with an ID lower than this one (history paging)
+		"""
 		params = {'page': page, 'per_page': per_page}
+		if after:
+			params['after'] = after
+		if before:
+			params['before'] = before
 		return self._make_request('GET', 
 			f'/api/v1/accounts/{self.account_id}/conversations/{conversation_id}/messages', params=params)
 	
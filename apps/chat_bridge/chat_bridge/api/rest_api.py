@@ -2,9 +2,14 @@
 REST API endpoints for Chat integration
 Provides API endpoints for Vue components and external integrations
 """
+import hashlib
+import json
+
 import frappe
 from frappe import _
 from frappe.utils import cint
+from werkzeug.wrappers import Response
+
 from .chat import ChatwootAPI, ChatwootAPIError
 
 def _check_api_enabled():
@@ -38,73 +43,258 @@ def get_conversations(status=None, inbox_id=None, page=1, per_page=20, user=None
 		frappe.logger().error(f"Error getting conversations: {str(e)}")
 		return {"success": False, "error": str(e)}
 
-@frappe.whitelist()
-def get_conversation(conversation_id, include_messages=1, messages_page=1, messages_per_page=100, user=None):
-	"""Get a specific conversation with messages"""
-	_check_permission()
-	_check_api_enabled()
-	try:
-		conversation_id = int(conversation_id)
-		messages_page = frappe.utils.cint(messages_page) or 1
-		messages_per_page = min(max(frappe.utils.cint(messages_per_page) or 500, 50), 1000)
+MESSAGE_PAGE_CACHE_TTL = 30  # seconds
+MESSAGE_PAGE_MAX = 200
 
-		api = ChatwootAPI.get_api_for_user(user=user)
-		conversation_response = api.get_conversation(conversation_id)
 
-		messages_payload = []
-		messages_meta = {}
+def _serialize_local_message(row):
+	return {
+		"id": frappe.utils.cint(row.message_id),
+		"content": row.content,
+		"created_at": str(row.sent_at) if row.sent_at else None,
+		"sender_name": row.sender_name,
+		"sender_type": row.sender_type,
+		"direction": row.direction,
+		"private": bool(row.is_private),
+	}
 
-		if frappe.utils.cint(include_messages):
-			current_page = messages_page
-			page_guard = 0
 
-			while True:
-				messages_response = api.get_messages(
-					conversation_id,
-					page=current_page,
-					per_page=messages_per_page,
-				)
+def _get_local_conversation(conversation_id):
+	return frappe.db.get_value(
+		"Chat Conversation",
+		{"chat_conversation_id": conversation_id},
+		[
+			"name", "chat_conversation_id", "account_id", "inbox_id", "status", "priority",
+			"assigned_to", "contact", "contact_display", "channel", "last_message_preview",
+			"last_message_at", "external_url", "history_complete", "modified",
+		],
+		as_dict=True,
+	)
+
+
+def _get_local_message_page(parent, before, limit):
+	"""Latest ``limit`` mirrored messages older than ``before`` (keyset on numeric message_id)."""
+	conditions = ""
+	values = {"parent": parent, "limit": limit}
+	if before:
+		conditions = "AND CAST(message_id AS UNSIGNED) < %(before)s"
+		values["before"] = before
+
+	rows = frappe.db.sql(
+		f"""
+		SELECT message_id, sent_at, sender_name, sender_type, direction, content, is_private
+		FROM `tabChat Message`
+		WHERE parent = %(parent)s AND parenttype = 'Chat Conversation' AND parentfield = 'messages'
+			{conditions}
+		ORDER BY CAST(message_id AS UNSIGNED) DESC
+		LIMIT %(limit)s
+		""",
+		values,
+		as_dict=True,
+	)
+	return [_serialize_local_message(row) for row in rows]
+
+
+def _get_remote_message_page(conversation_id, before, limit, user=None):
+	"""Fill gaps in the local mirror from Chat (newest first, same shape as local rows)."""
+	from chat_bridge.customer_support.doctype.chat_conversation.sync import (
+		_convert_message_payload,
+		_extract_conversation_list,
+	)
 
-				batch = []
-				if isinstance(messages_response, dict):
-					if isinstance(messages_response.get("data"), list):
-						batch = messages_response.get("data")
-					elif isinstance(messages_response.get("payload"), list):
-						batch = messages_response.get("payload")
-					messages_meta = messages_response.get("meta") or {}
-				elif isinstance(messages_response, list):
-					batch = messages_response
-
-				if batch:
-					messages_payload.extend(batch)
-
-				next_page = messages_meta.get("next_page") if isinstance(messages_meta, dict) else None
-
-				page_guard += 1
-				if not next_page or next_page == current_page or page_guard > 200:
-					break
-
-				current_page = int(next_page)
-
-		if isinstance(conversation_response, dict):
-			target = conversation_response.get("data", conversation_response)
-			if isinstance(target, dict):
-				target["messages"] = messages_payload
-				target["messages_meta"] = messages_meta
-		else:
-			conversation_response = {
-				"data": conversation_response,
-				"messages": messages_payload,
-				"messages_meta": messages_meta,
+	api = ChatwootAPI.get_api_for_user(user=user)
+	response = api.get_messages(conversation_id, before=before or None, per_page=limit)
+	messages = []
+	for message in _extract_conversation_list(response):
+		if before and cint(message.get("id")) >= before:
+			continue
+		payload = _convert_message_payload(message)
+		messages.append(
+			{
+				"id": cint(payload["message_id"]),
+				"content": payload["content"],
+				"created_at": payload["sent_at"],
+				"sender_name": payload["sender_name"],
+				"sender_type": payload["sender_type"],
+				"direction": payload["direction"],
+				"private": bool(payload["is_private"]),
 			}
+		)
+	messages.sort(key=lambda message: message["id"], reverse=True)
+	return messages[:limit]
+
+
+def _build_message_page(conversation_id, local, before, limit, user=None):
+	messages = _get_local_message_page(local.name, before, limit) if local else []
+	source = "local"
+
+	if len(messages) < limit and not (local and local.history_complete):
+		# The mirror may not hold the full history (sync caps per-thread pulls) - ask Chat
+		# for whatever is older than the oldest row we have.
+		remote_before = messages[-1]["id"] if messages else before
+		try:
+			remote = _get_remote_message_page(conversation_id, remote_before, limit - len(messages), user=user)
+		except (ChatwootAPIError, frappe.ValidationError):
+			remote = None
+		if remote:
+			messages.extend(remote)
+			source = "remote" if len(remote) == len(messages) else "mixed"
+		elif remote is not None and local and messages:
+			# Chat has nothing older than our oldest row: later pages stay local
+			frappe.db.set_value("Chat Conversation", local.name, "history_complete", 1, update_modified=False)
+			local.history_complete = 1
+
+	next_cursor = messages[-1]["id"] if len(messages) >= limit else None
+	messages.reverse()
+	return {
+		"messages": messages,
+		"messages_meta": {
+			"limit": limit,
+			"before": before or None,
+			"next_cursor": next_cursor,
+			"has_more": bool(next_cursor),
+			"source": source,
+		},
+	}
+
+
+def _get_cached_message_page(conversation_id, before=None, limit=50, user=None):
+	"""
+	Return ``(page, etag)`` for a cursor page of a conversation.
 
-		return {"success": True, "data": conversation_response}
+	Pages of mirrored conversations are cached briefly in Redis. The key includes the
+	local conversation's ``modified`` timestamp, which the sync bumps whenever messages
+	change, so stale pages are never served after a sync writes new rows. Pages can
+	include messages fetched with the user's own Chat token, so the key is per user.
+	Conversations without a local mirror have no such version and are not cached.
+
+	The ETag hashes the page itself, so it changes whenever the messages do.
+	"""
+	conversation_id = int(conversation_id)
+	before = cint(before) or None
+	limit = min(max(cint(limit) or 50, 1), MESSAGE_PAGE_MAX)
+	user = user or frappe.session.user
+
+	local = _get_local_conversation(conversation_id)
+	cache_key = None
+	page = None
+	if local:
+		cache_key = f"chat_bridge:conversation_page:{user}:{conversation_id}:{before}:{limit}:{local.modified}"
+		page = frappe.cache().get_value(cache_key)
+
+	if page is None:
+		page = _build_message_page(conversation_id, local, before, limit, user=user)
+		if local:
+			page["conversation"] = {key: value for key, value in local.items() if key != "modified"}
+		if cache_key:
+			frappe.cache().set_value(cache_key, page, expires_in_sec=MESSAGE_PAGE_CACHE_TTL)
+
+	content = json.dumps(page, sort_keys=True, default=str)
+	etag = hashlib.md5(f"{user}:{content}".encode()).hexdigest()
+	return page, etag
+
+
+def _not_modified(etag):
+	"""
+	Set the ETag header; return an empty 304 response if the client's copy is still
+	current (If-None-Match), else None.
+	"""
+	response_headers = getattr(frappe.local, "response_headers", None)
+	if response_headers is not None:
+		response_headers["ETag"] = f'"{etag}"'
+
+	if_none_match = (frappe.get_request_header("If-None-Match") or "").strip('"')
+	if if_none_match and if_none_match == etag:
+		# Returned as-is by the request handler, so no JSON body is attached
+		return Response(status=304, headers={"ETag": f'"{etag}"'})
+	return None
+
+
+def _legacy_page_cursor(conversation_id, page_number, limit, user=None):
+	"""Translate a numbered ``messages_page`` into the ``before`` cursor of that page."""
+	before = None
+	for _ in range(page_number - 1):
+		page = _get_cached_message_page(conversation_id, before=before, limit=limit, user=user)[0]
+		meta = page["messages_meta"]
+		if not meta["next_cursor"]:
+			# Past the last page: ask for anything older than the oldest message
+			return page["messages"][0]["id"] if page["messages"] else before
+		before = meta["next_cursor"]
+	return before
+
+
+@frappe.whitelist()
+def get_conversation(
+	conversation_id,
+	include_messages=1,
+	before=None,
+	limit=50,
+	user=None,
+	messages_page=None,
+	messages_per_page=None,
+):
+	"""
+	Get a conversation with the latest page of messages.
+
+	Messages come from the locally mirrored Chat Conversation (falling back to Chat only
+	for gaps) and are paginated by cursor: pass ``messages_meta.next_cursor`` back as
+	``before`` (or use ``get_conversation_messages``) to lazy-load older history.
+
+	``messages_page``/``messages_per_page`` are still accepted for older clients and are
+	mapped onto the cursor (page 1 is the newest ``messages_per_page`` messages).
+	"""
+	_check_permission()
+	_check_api_enabled()
+	try:
+		conversation_id = int(conversation_id)
+		if cint(messages_per_page):
+			limit = cint(messages_per_page)
+		if cint(messages_page) > 1 and not before:
+			before = _legacy_page_cursor(conversation_id, cint(messages_page), limit, user=user)
+		page, etag = _get_cached_message_page(conversation_id, before=before, limit=limit, user=user)
+		not_modified = _not_modified(etag)
+		if not_modified:
+			return not_modified
+
+		conversation = page.get("conversation")
+		if not conversation:
+			conversation_response = ChatwootAPI.get_api_for_user(user=user).get_conversation(conversation_id)
+			conversation = conversation_response.get("data", conversation_response) if isinstance(conversation_response, dict) else conversation_response
+
+		data = dict(conversation) if isinstance(conversation, dict) else {"data": conversation}
+		if cint(include_messages):
+			data["messages"] = page["messages"]
+			data["messages_meta"] = page["messages_meta"]
+
+		return {"success": True, "data": data, "etag": etag}
 	except ChatwootAPIError as e:
 		return {"success": False, "error": str(e)}
 	except Exception as e:
 		frappe.logger().error(f"Error getting conversation: {str(e)}")
 		return {"success": False, "error": str(e)}
 
+
+@frappe.whitelist()
+def get_conversation_messages(conversation_id, before=None, limit=50, user=None):
+	"""Cursor-paginated message history for a conversation (newest page first)."""
+	_check_permission()
+	_check_api_enabled()
+	try:
+		page, etag = _get_cached_message_page(conversation_id, before=before, limit=limit, user=user)
+		not_modified = _not_modified(etag)
+		if not_modified:
+			return not_modified
+		return {
+			"success": True,
+			"data": {"messages": page["messages"], "messages_meta": page["messages_meta"]},
+			"etag": etag,
+		}
+	except ChatwootAPIError as e:
+		return {"success": False, "error": str(e)}
+	except Exception as e:
+		frappe.logger().error(f"Error getting conversation messages: {str(e)}")
+		return {"success": False, "error": str(e)}
+
 @frappe.whitelist()
 def send_message(conversation_id, content, message_type='outgoing'):
 	"""Send a message in a conversation"""
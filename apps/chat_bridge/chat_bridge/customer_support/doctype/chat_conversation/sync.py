@@ -1,6 +1,7 @@
 import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Any, Dict, Iterable, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 import frappe
 from frappe.utils import cint, get_datetime, now_datetime
@@ -9,6 +10,11 @@ from chat_bridge.api.chat import ChatwootAPI, ChatwootAPIError
 
 logger = frappe.logger("chat_sync")
 
+# Upper bound of messages pulled for a single conversation per sync run
+MESSAGE_LIMIT = 1000
+# Threads used to fetch messages from Chatwoot in parallel (HTTP only, no DB access)
+SYNC_WORKERS = 4
+
 
 def _get_service_api() -> Optional[ChatwootAPI]:
 	"""
@@ -209,41 +215,6 @@ def _map_status(value: Optional[str]) -> str:
 	return "Open"
 
 
-def _get_conversation_snapshot(doc) -> Dict[str, Any]:
-	"""Get a snapshot of key fields for change detection."""
-	snapshot = {
-		"status": doc.status or "",
-		"priority": doc.priority or "",
-		"assigned_to": doc.assigned_to or "",
-		"contact": doc.contact or "",
-		"contact_display": doc.contact_display or "",
-		"last_message_preview": (doc.last_message_preview or "")[:200],
-		"last_message_at": str(doc.last_message_at) if doc.last_message_at else "",
-		"channel": doc.channel or "",
-	}
-	# Include message count
-	if hasattr(doc, "messages") and doc.messages:
-		snapshot["message_count"] = len(doc.messages)
-		snapshot["message_ids"] = sorted([str(m.message_id) for m in doc.messages if m.message_id])[:50]
-	else:
-		snapshot["message_count"] = 0
-		snapshot["message_ids"] = []
-	return snapshot
-
-
-def _has_conversation_changed(doc, before_snapshot: Dict[str, Any]) -> bool:
-	"""Check if conversation has meaningful changes after field mapping."""
-	after_snapshot = _get_conversation_snapshot(doc)
-
-	for key, before_val in before_snapshot.items():
-		after_val = after_snapshot.get(key)
-		if before_val != after_val:
-			logger.debug(f"[Chatwoot] Change detected in {key}: {before_val} -> {after_val}")
-			return True
-
-	return False
-
-
 def _map_priority(value: Optional[str]) -> str:
 	value = (value or "").strip().lower()
 	if value in {"low", "medium", "high", "urgent"}:
@@ -307,91 +278,123 @@ def _convert_message_payload(message: Dict[str, Any]) -> Dict[str, Any]:
 	}
 
 
-def _sync_messages(doc, api: Optional[ChatwootAPI], limit: int = 1000) -> None:
-	"""Fetch Chat messages and mirror them into the child table."""
-	if not api or not doc.chat_conversation_id:
-		return
+def _message_id_key(value: Any) -> int:
+	try:
+		return int(value)
+	except (TypeError, ValueError):
+		return 0
 
-	existing = {child.message_id: child for child in (doc.get("messages") or []) if child.message_id}
-	seen = set(existing.keys())
-	new_rows = 0
-	page = 1
+
+def _fetch_messages(
+	api: ChatwootAPI, conversation_id: Any, after: int = 0, limit: int = MESSAGE_LIMIT
+) -> List[Dict[str, Any]]:
+	"""
+	Pull raw Chat messages for a conversation.
+
+	With ``after`` set only messages newer than that message ID are requested, so an
+	unchanged thread costs a single empty request instead of paging its full history.
+	Runs inside worker threads: it must not touch the database or ``frappe.local``.
+	"""
+	collected: List[Dict[str, Any]] = []
 	per_page = 100
 
-	while len(seen) < limit:
-		try:
+	if after:
+		cursor = after
+		while len(collected) < limit:
 			response = api.get_messages(
-				doc.chat_conversation_id,
-				page=page,
-				per_page=min(per_page, limit - len(seen)),
+				conversation_id,
+				after=cursor,
+				per_page=min(per_page, limit - len(collected)),
 			)
-		except ChatwootAPIError as exc:
-			logger.error("[Chatwoot] Unable to pull messages for %s: %s", doc.chat_conversation_id, exc)
-			break
-
-		messages = list(_extract_conversation_list(response))
-		if not messages:
-			break
-
-		for message in messages:
-			payload = _convert_message_payload(message)
-			message_id = payload["message_id"]
-			if message_id in existing:
-				child = existing[message_id]
-				updated = False
-				for key, value in payload.items():
-					if child.get(key) != value:
-						child.set(key, value)
-						updated = True
-				if updated:
-					child.flags.dirty = True
-				continue
-
-			if len(seen) >= limit:
+			batch = [
+				message
+				for message in _extract_conversation_list(response)
+				if _message_id_key(message.get("id")) > cursor
+			]
+			if not batch:
 				break
-			doc.append("messages", payload)
-			seen.add(message_id)
-			new_rows += 1
+			collected.extend(batch)
+			cursor = max(_message_id_key(message.get("id")) for message in batch)
+		return collected[:limit]
 
-		if len(messages) < per_page:
+	page = 1
+	while len(collected) < limit:
+		response = api.get_messages(
+			conversation_id,
+			page=page,
+			per_page=min(per_page, limit - len(collected)),
+		)
+		batch = list(_extract_conversation_list(response))
+		if not batch:
+			break
+		collected.extend(batch)
+		if len(batch) < per_page:
 			break
 		page += 1
+	return collected[:limit]
+
+
+def _get_last_message_id(doc) -> int:
+	return max((_message_id_key(child.message_id) for child in (doc.get("messages") or [])), default=0)
+
+
+def _sync_messages(
+	doc,
+	api: Optional[ChatwootAPI],
+	limit: int = MESSAGE_LIMIT,
+	messages: Optional[List[Dict[str, Any]]] = None,
+) -> bool:
+	"""
+	Mirror Chat messages into the child table.
+
+	``messages`` may be prefetched by the caller (see ``sync_chat_conversations``);
+	otherwise only messages newer than the last stored ``message_id`` are fetched.
+	Returns False when the thread could not be mirrored completely (fetch failed or
+	hit ``limit``), in which case the caller must not advance ``last_message_at``.
+	"""
+	if messages is None:
+		if not api or not doc.chat_conversation_id:
+			return False
+		try:
+			messages = _fetch_messages(api, doc.chat_conversation_id, after=_get_last_message_id(doc), limit=limit)
+		except ChatwootAPIError as exc:
+			logger.error("[Chatwoot] Unable to pull messages for %s: %s", doc.chat_conversation_id, exc)
+			return False
+
+	existing = {child.message_id: child for child in (doc.get("messages") or []) if child.message_id}
+	new_rows = 0
+
+	for message in messages:
+		payload = _convert_message_payload(message)
+		message_id = payload["message_id"]
+		if message_id in existing:
+			child = existing[message_id]
+			updated = False
+			for key, value in payload.items():
+				if child.get(key) != value:
+					child.set(key, value)
+					updated = True
+			if updated:
+				child.flags.dirty = True
+			continue
+
+		existing[message_id] = doc.append("messages", payload)
+		new_rows += 1
 
 	if new_rows:
 		logger.info("[Chatwoot] Synced %s messages for conversation %s", new_rows, doc.chat_conversation_id)
+	return _is_complete(messages, limit)
 
 
-def _upsert_conversation(payload: Dict[str, Any], settings, api: Optional[ChatwootAPI]) -> None:
-	cw_id = payload.get("id")
-	if not cw_id:
-		return
+def _is_complete(messages: Optional[List[Dict[str, Any]]], limit: int = MESSAGE_LIMIT) -> bool:
+	"""A fetch is complete when it succeeded and was not cut off at ``limit``."""
+	return messages is not None and len(messages) < limit
 
-	name = frappe.db.get_value(
-		"Chat Conversation", {"chat_conversation_id": cw_id}
-	)
-	is_new = not name
 
-	if name:
-		doc = frappe.get_doc("Chat Conversation", name)
-		# Take snapshot BEFORE mapping fields for change detection
-		before_snapshot = _get_conversation_snapshot(doc)
-	else:
-		doc = frappe.new_doc("Chat Conversation")
-		doc.chat_conversation_id = cw_id
-		before_snapshot = None
-
-	doc.account_id = payload.get("account_id") or settings.default_account_id
-	doc.inbox_id = payload.get("inbox_id")
-	doc.status = _map_status(payload.get("status"))
-	doc.priority = _map_priority(payload.get("priority"))
+def _map_conversation_fields(payload: Dict[str, Any], settings) -> Dict[str, Any]:
+	"""Translate a Chat conversation payload into Chat Conversation parent field values."""
+	account_id = payload.get("account_id") or settings.default_account_id
 	meta = payload.get("meta") or {}
-	doc.assigned_to = _resolve_assignee(meta)
-	doc.channel = payload.get("channel")
-	contact_name, display_name = _ensure_contact_link(payload, doc.account_id)
-	if contact_name and not doc.contact:
-		doc.contact = contact_name
-	if display_name:
-		doc.contact_display = display_name
 
 	preview = payload.get("message") or payload.get("last_non_activity_message")
 	if isinstance(preview, dict):
@@ -400,46 +403,340 @@ def _upsert_conversation(payload: Dict[str, Any], settings, api: Optional[Chatwo
 		preview = preview[-1].get("content")
 	elif not preview and payload.get("messages"):
 		preview = payload["messages"][-1].get("content")
-	doc.last_message_preview = preview
-	doc.last_message_at = _map_timestamp(payload.get("last_activity_at"))
-	doc.external_url = f"{settings.chat_base_url.rstrip('/')}/app/accounts/{doc.account_id}/conversations/{cw_id}"
 
-	labels = payload.get("labels") or []
-	doc.set("labels", [])
-	for label in labels:
-		label_name = _ensure_label(label)
-		if label_name:
-			doc.append("labels", {"crm_label": label_name})
+	values = {
+		"account_id": account_id,
+		"inbox_id": payload.get("inbox_id"),
+		"status": _map_status(payload.get("status")),
+		"priority": _map_priority(payload.get("priority")),
+		"assigned_to": _resolve_assignee(meta),
+		"channel": payload.get("channel"),
+		"last_message_preview": preview,
+		"last_message_at": _map_timestamp(payload.get("last_activity_at")),
+		"external_url": f"{settings.chat_base_url.rstrip('/')}/app/accounts/{account_id}/conversations/{payload.get('id')}",
+	}
 
 	tags = payload.get("tags") or payload.get("additional_attributes", {}).get("tags")
 	if tags:
-		doc.tags_json = json.dumps(tags)
+		values["tags_json"] = json.dumps(tags)
+	return values
+
+
+def _map_labels(payload: Dict[str, Any]) -> List[str]:
+	labels = []
+	for label in payload.get("labels") or []:
+		label_name = _ensure_label(label)
+		if label_name:
+			labels.append(label_name)
+	return labels
+
+
+def _values_differ(current: Any, new: Any) -> bool:
+	if current in (None, "") and new in (None, ""):
+		return False
+	if current is None or new is None:
+		return True
+	if isinstance(current, datetime):
+		return current != get_datetime(new)
+	return str(current) != str(new)
+
+
+def _child_row(parent: str, parentfield: str, idx: int, values: Dict[str, Any], now) -> Dict[str, Any]:
+	row = {
+		"name": frappe.generate_hash(length=10),
+		"parent": parent,
+		"parenttype": "Chat Conversation",
+		"parentfield": parentfield,
+		"idx": idx,
+		"docstatus": 0,
+		"owner": frappe.session.user,
+		"modified_by": frappe.session.user,
+		"creation": now,
+		"modified": now,
+	}
+	row.update(values)
+	return row
+
+
+def _bulk_insert_rows(doctype: str, rows: List[Dict[str, Any]]) -> None:
+	if not rows:
+		return
+	fields = list(rows[0].keys())
+	frappe.db.bulk_insert(doctype, fields, [[row.get(field) for field in fields] for row in rows])
+
+
+def _bulk_sync_messages(name: str, messages: List[Dict[str, Any]], now) -> int:
+	"""
+	Append new Chat Message rows with one batched INSERT and update changed rows in place.
+	Returns the number of rows inserted or updated.
+
+	Only rows whose ``message_id`` appears in ``messages`` are read back, so the cost is
+	proportional to the number of incoming messages rather than the thread length.
+	"""
+	payloads = {}
+	for message in messages:
+		payload = _convert_message_payload(message)
+		if payload["message_id"] and payload["message_id"] != "None":
+			payloads[payload["message_id"]] = payload
+	if not payloads:
+		return 0
+
+	fields = ["name", *next(iter(payloads.values())).keys()]
+	existing = {
+		row.message_id: row
+		for row in frappe.get_all(
+			"Chat Message",
+			filters={
+				"parent": name,
+				"parenttype": "Chat Conversation",
+				"parentfield": "messages",
+				"message_id": ["in", list(payloads)],
+			},
+			fields=fields,
+		)
+	}
 
-	_sync_messages(doc, api)
+	updated = 0
+	for message_id, payload in payloads.items():
+		row = existing.get(message_id)
+		if not row:
+			continue
+		changes = {key: value for key, value in payload.items() if _values_differ(row.get(key), value)}
+		if changes:
+			frappe.db.set_value("Chat Message", row.name, changes, update_modified=False)
+			updated += 1
+
+	new_payloads = [payload for message_id, payload in payloads.items() if message_id not in existing]
+	if not new_payloads:
+		return updated
+
+	next_idx = cint(
+		frappe.db.sql(
+			"""
+			SELECT MAX(idx) FROM `tabChat Message`
+			WHERE parent = %s AND parenttype = 'Chat Conversation' AND parentfield = 'messages'
+			""",
+			name,
+		)[0][0]
+	)
+	new_payloads.sort(key=lambda payload: _message_id_key(payload["message_id"]))
+	_bulk_insert_rows(
+		"Chat Message",
+		[_child_row(name, "messages", next_idx + i, payload, now) for i, payload in enumerate(new_payloads, start=1)],
+	)
+	return updated + len(new_payloads)
+
+
+def _bulk_sync_labels(name: str, labels: List[str], now) -> bool:
+	current = frappe.get_all(
+		"Chat Conversation Label",
+		filters={"parent": name, "parenttype": "Chat Conversation", "parentfield": "labels"},
+		pluck="crm_label",
+		order_by="idx asc",
+	)
+	if current == labels:
+		return False
+
+	frappe.db.delete(
+		"Chat Conversation Label",
+		{"parent": name, "parenttype": "Chat Conversation", "parentfield": "labels"},
+	)
+	_bulk_insert_rows(
+		"Chat Conversation Label",
+		[_child_row(name, "labels", i, {"crm_label": label}, now) for i, label in enumerate(labels, start=1)],
+	)
+	return True
+
+
+def _update_existing_conversation(
+	name: str,
+	payload: Dict[str, Any],
+	settings,
+	api: Optional[ChatwootAPI],
+	messages: Optional[List[Dict[str, Any]]],
+) -> None:
+	"""
+	Apply a Chat payload to an existing conversation without ``doc.save()``.
+
+	Saving the document would reload, re-validate and rewrite every child row and store a
+	Version diff, which makes long-running threads slower to sync every time.
+	"""
+	meta = frappe.get_meta("Chat Conversation")
+	values = _map_conversation_fields(payload, settings)
+	current = frappe.db.get_value(
+		"Chat Conversation",
+		name,
+		["chat_conversation_id", "contact", "contact_display", *[f for f in values if meta.has_field(f)]],
+		as_dict=True,
+	)
+
+	contact_name, display_name = _ensure_contact_link(payload, values["account_id"])
+	if contact_name and not current.contact:
+		values["contact"] = contact_name
+	if display_name:
+		values["contact_display"] = display_name
+
+	if messages is None and api:
+		try:
+			messages = _fetch_messages(
+				api,
+				current.chat_conversation_id,
+				after=_get_stored_watermarks([name]).get(name, 0),
+			)
+		except ChatwootAPIError as exc:
+			logger.error("[Chatwoot] Unable to pull messages for %s: %s", current.chat_conversation_id, exc)
+
+	if not _is_complete(messages):
+		# Keep the previous activity watermark so the next run pulls this thread again
+		values.pop("last_message_at", None)
+
+	now = now_datetime()
+	changed_rows = _bulk_sync_messages(name, messages or [], now)
+	labels_changed = _bulk_sync_labels(name, _map_labels(payload), now)
+
+	changes = {
+		field: value
+		for field, value in values.items()
+		if meta.has_field(field) and _values_differ(current.get(field), value)
+	}
+
+	if not (changes or changed_rows or labels_changed):
+		frappe.db.set_value("Chat Conversation", name, "last_synced", now, update_modified=False)
+		return
 
-	# Check if there are actual changes (skip save if no changes)
-	if not is_new and before_snapshot:
-		has_changes = _has_conversation_changed(doc, before_snapshot)
-		if not has_changes:
-			# No changes - just update last_synced without creating a version
-			frappe.db.set_value("Chat Conversation", doc.name, "last_synced", now_datetime(), update_modified=False)
-			return
+	changes["last_synced"] = now
+	frappe.db.set_value("Chat Conversation", name, changes)
+	if changed_rows:
+		logger.info("[Chatwoot] Synced %s messages for conversation %s", changed_rows, current.chat_conversation_id)
+	logger.info(f"[Chatwoot] Updated conversation {name} with changes")
+
+
+def _upsert_conversation(
+	payload: Dict[str, Any],
+	settings,
+	api: Optional[ChatwootAPI],
+	messages: Optional[List[Dict[str, Any]]] = None,
+) -> None:
+	cw_id = payload.get("id")
+	if not cw_id:
+		return
+
+	name = frappe.db.get_value(
+		"Chat Conversation", {"chat_conversation_id": cw_id}
+	)
+	if name:
+		_update_existing_conversation(name, payload, settings, api, messages)
+		return
+
+	doc = frappe.new_doc("Chat Conversation")
+	doc.chat_conversation_id = cw_id
+	doc.update(_map_conversation_fields(payload, settings))
+	contact_name, display_name = _ensure_contact_link(payload, doc.account_id)
+	if contact_name:
+		doc.contact = contact_name
+	if display_name:
+		doc.contact_display = display_name
+
+	for label_name in _map_labels(payload):
+		doc.append("labels", {"crm_label": label_name})
+
+	# A new conversation pulls its history from the first message
+	doc.history_complete = int(_sync_messages(doc, api, messages=messages))
+	if not doc.history_complete:
+		# Leave the watermark empty so the next run pulls this thread again
+		doc.last_message_at = None
 
-	# Save only if new or has changes
 	doc.last_synced = now_datetime()
-	doc.save(ignore_permissions=True)
+	doc.insert(ignore_permissions=True)
+	logger.info(f"[Chatwoot] Created new conversation {doc.name} (CW ID: {cw_id})")
+
+
+def _get_stored_watermarks(names: List[str]) -> Dict[str, int]:
+	"""Highest mirrored Chat ``message_id`` per Chat Conversation."""
+	if not names:
+		return {}
+	rows = frappe.db.sql(
+		"""
+		SELECT parent, MAX(CAST(message_id AS UNSIGNED)) AS last_message_id
+		FROM `tabChat Message`
+		WHERE parenttype = 'Chat Conversation' AND parentfield = 'messages' AND parent IN %(parents)s
+		GROUP BY parent
+		""",
+		{"parents": names},
+		as_dict=True,
+	)
+	return {row.parent: cint(row.last_message_id) for row in rows}
+
+
+def _get_local_state(conversation_ids: List[str]) -> Dict[str, Any]:
+	"""Load sync watermarks for a batch of Chat conversations in two queries."""
+	if not conversation_ids:
+		return {}
+
+	rows = frappe.get_all(
+		"Chat Conversation",
+		filters={"chat_conversation_id": ["in", conversation_ids]},
+		fields=["name", "chat_conversation_id", "status", "priority", "last_message_at", "last_synced"],
+	)
+	if not rows:
+		return {}
+
+	last_ids = _get_stored_watermarks([row.name for row in rows])
+
+	state = {}
+	for row in rows:
+		row.last_message_id = last_ids.get(row.name, 0)
+		state[str(row.chat_conversation_id)] = row
+	return state
 
-	if is_new:
-		logger.info(f"[Chatwoot] Created new conversation {doc.name} (CW ID: {cw_id})")
-	else:
-		logger.info(f"[Chatwoot] Updated conversation {doc.name} with changes")
 
+def _is_unchanged(record: Dict[str, Any], local) -> bool:
+	"""A conversation whose last activity matches what we stored at the previous sync has nothing new."""
+	if not local or not local.last_synced or not local.last_message_at:
+		return False
 
-def sync_chat_conversations(max_conversations: int = 200) -> None:
+	activity = _map_timestamp(record.get("last_activity_at"))
+	if not activity or get_datetime(activity) != get_datetime(local.last_message_at):
+		return False
+
+	return (
+		_map_status(record.get("status")) == local.status
+		and _map_priority(record.get("priority")) == local.priority
+	)
+
+
+def _prefetch_messages(
+	api: ChatwootAPI, pending: List[Tuple[Dict[str, Any], Any]], full_sync: bool, workers: int
+) -> Dict[str, List[Dict[str, Any]]]:
+	"""
+	Fetch messages for all changed conversations concurrently; DB writes stay on the main thread.
+
+	Conversations whose fetch failed are left out, so ``_upsert_conversation`` retries them.
+	"""
+	jobs = {}
+	with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+		for record, local in pending:
+			after = 0 if (full_sync or not local) else cint(local.last_message_id)
+			jobs[str(record["id"])] = executor.submit(_fetch_messages, api, record["id"], after)
+
+	prefetched = {}
+	for cw_id, future in jobs.items():
+		try:
+			prefetched[cw_id] = future.result()
+		except ChatwootAPIError as exc:
+			logger.error("[Chatwoot] Unable to pull messages for %s: %s", cw_id, exc)
+	return prefetched
+
+
+def sync_chat_conversations(max_conversations: int = 200, full_sync: bool = False, workers: int = SYNC_WORKERS) -> None:
 	"""
 	Pulls the latest conversations from Chat and stores/updates Chat Conversation DocTypes.
 	Honours the integration settings toggles so schedulers won't run in environments
 	where the integration is disabled.
+
+	Sync is incremental by default: conversations whose ``last_activity_at`` is unchanged
+	since the previous run are skipped, and only messages newer than the last stored
+	``message_id`` are fetched. Pass ``full_sync=True`` to re-pull every thread.
 	"""
 	settings = frappe.get_single("Chat Integration Settings")
 	if not (settings.enabled and settings.enable_api and settings.sync_conversations):
@@ -455,12 +752,13 @@ def sync_chat_conversations(max_conversations: int = 200) -> None:
 	if not api:
 		return
 
-	logger.info("[Chatwoot] Starting conversation sync (max=%s)", max_conversations)
+	max_conversations = cint(max_conversations)
+	logger.info("[Chatwoot] Starting conversation sync (max=%s, full=%s)", max_conversations, full_sync)
 	page = 1
-	fetched = 0
 	per_page = 50
+	records: List[Dict[str, Any]] = []
 
-	while fetched < max_conversations:
+	while len(records) < max_conversations:
 		try:
 			response = api.get_conversations(status="all", assignee_type="all", page=page, per_page=per_page)
 		except ChatwootAPIError as exc:
@@ -469,22 +767,42 @@ def sync_chat_conversations(max_conversations: int = 200) -> None:
 			)
 			break
 
-		records = list(_extract_conversation_list(response))
-		if not records:
+		batch = [record for record in _extract_conversation_list(response) if record.get("id")]
+		if not batch:
 			logger.info("[Chatwoot] No conversations returned on page %s", page)
 			break
 
-		for record in records:
-			_upsert_conversation(record, settings, api)
-			fetched += 1
-			if fetched >= max_conversations:
-				break
+		records.extend(batch[: max_conversations - len(records)])
 
-		if len(records) < per_page:
+		if len(batch) < per_page:
 			break
 		page += 1
 
-	logger.info("[Chatwoot] Conversation sync finished. Upserted %s records.", fetched)
+	state = _get_local_state([str(record["id"]) for record in records])
+	pending = []
+	unchanged = []
+	for record in records:
+		local = state.get(str(record["id"]))
+		if not full_sync and _is_unchanged(record, local):
+			unchanged.append(local.name)
+			continue
+		pending.append((record, local))
+
+	if unchanged:
+		frappe.db.sql(
+			"UPDATE `tabChat Conversation` SET last_synced = %(now)s WHERE name IN %(names)s",
+			{"now": now_datetime(), "names": unchanged},
+		)
+
+	prefetched = _prefetch_messages(api, pending, full_sync, workers)
+	for record, _local in pending:
+		_upsert_conversation(record, settings, api, messages=prefetched.get(str(record["id"])))
+
+	logger.info(
+		"[Chatwoot] Conversation sync finished. Upserted %s records, skipped %s unchanged.",
+		len(pending),
+		len(unchanged),
+	)
 	frappe.db.commit()
 
 
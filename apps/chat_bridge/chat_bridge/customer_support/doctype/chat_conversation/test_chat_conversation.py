@@ -9,3 +9,133 @@ class TestChatConversation(FrappeTestCase):
 		doc.account_id = 1
 		doc.insert(ignore_permissions=True)
 		self.assertIn("12345", doc.title)
+
+
+class _FakeMessagesAPI:
+	def __init__(self, messages):
+		self.messages = messages
+		self.calls = []
+
+	def get_messages(self, conversation_id, page=1, per_page=200, after=None, before=None):
+		self.calls.append({"page": page, "after": after})
+		rows = [m for m in self.messages if not after or m["id"] > after]
+		return {"payload": rows[:per_page]}
+
+
+class TestChatConversationSync(FrappeTestCase):
+	def test_fetch_messages_only_pulls_newer_than_watermark(self):
+		from chat_bridge.customer_support.doctype.chat_conversation.sync import _fetch_messages
+
+		api = _FakeMessagesAPI([{"id": i, "content": f"m{i}"} for i in range(1, 6)])
+		messages = _fetch_messages(api, 1, after=3)
+
+		self.assertEqual([m["id"] for m in messages], [4, 5])
+		self.assertTrue(all(call["after"] for call in api.calls))
+
+	def test_failed_prefetch_is_left_for_refetch(self):
+		from chat_bridge.api.chat import ChatwootAPIError
+		from chat_bridge.customer_support.doctype.chat_conversation.sync import _is_complete, _prefetch_messages
+
+		class _FailingAPI(_FakeMessagesAPI):
+			def get_messages(self, conversation_id, **kwargs):
+				if conversation_id == 2:
+					raise ChatwootAPIError("boom")
+				return super().get_messages(conversation_id, **kwargs)
+
+		api = _FailingAPI([{"id": 1, "content": "m1"}])
+		prefetched = _prefetch_messages(api, [({"id": 1}, None), ({"id": 2}, None)], False, 2)
+
+		self.assertEqual(list(prefetched), ["1"])
+		self.assertTrue(_is_complete(prefetched["1"]))
+		self.assertFalse(_is_complete(prefetched.get("2")))
+		self.assertFalse(_is_complete([{"id": i} for i in range(3)], limit=3))
+
+	def test_unchanged_conversation_is_skipped(self):
+		from chat_bridge.customer_support.doctype.chat_conversation.sync import _is_unchanged
+
+		local = frappe._dict(
+			status="Open",
+			priority="None",
+			last_message_at="2024-01-01 10:00:00",
+			last_synced="2024-01-01 10:05:00",
+		)
+		record = {"status": "open", "last_activity_at": "2024-01-01T10:00:00"}
+
+		self.assertTrue(_is_unchanged(record, local))
+		self.assertFalse(_is_unchanged(dict(record, last_activity_at="2024-01-01T11:00:00"), local))
+		self.assertFalse(_is_unchanged(dict(record, status="resolved"), local))
+		self.assertFalse(_is_unchanged(record, None))
+
+	def test_bulk_sync_messages_appends_and_updates_in_place(self):
+		from chat_bridge.customer_support.doctype.chat_conversation.sync import _bulk_sync_messages
+
+		doc = frappe.new_doc("Chat Conversation")
+		doc.chat_conversation_id = "bulk-1"
+		doc.account_id = 1
+		doc.append("messages", {"message_id": "1", "content": "hello", "direction": "Incoming"})
+		doc.insert(ignore_permissions=True)
+
+		changed_rows = _bulk_sync_messages(
+			doc.name,
+			[{"id": 1, "content": "hello (edited)"}, {"id": 2, "content": "second"}],
+			frappe.utils.now_datetime(),
+		)
+
+		rows = frappe.get_all(
+			"Chat Message",
+			filters={"parent": doc.name},
+			fields=["message_id", "content", "idx"],
+			order_by="idx asc",
+		)
+		self.assertEqual(changed_rows, 2)
+		self.assertEqual([(r.message_id, r.content, r.idx) for r in rows], [("1", "hello (edited)", 1), ("2", "second", 2)])
+
+	def test_message_page_stays_local_once_history_is_complete(self):
+		from unittest.mock import patch
+
+		from chat_bridge.api import rest_api
+
+		doc = frappe.new_doc("Chat Conversation")
+		doc.chat_conversation_id = "page-1"
+		doc.account_id = 1
+		doc.append("messages", {"message_id": "1", "content": "hello", "direction": "Incoming"})
+		doc.insert(ignore_permissions=True)
+
+		with patch.object(rest_api, "_get_remote_message_page", return_value=[]) as remote:
+			local = rest_api._get_local_conversation("page-1")
+			rest_api._build_message_page("page-1", local, None, 50)
+			self.assertEqual(remote.call_count, 1)
+			self.assertEqual(frappe.db.get_value("Chat Conversation", doc.name, "history_complete"), 1)
+
+			page = rest_api._build_message_page("page-1", rest_api._get_local_conversation("page-1"), None, 50)
+			self.assertEqual(remote.call_count, 1)
+			self.assertEqual([m["id"] for m in page["messages"]], [1])
+			self.assertEqual(page["messages_meta"]["source"], "local")
+
+	def test_remote_message_page_etag_follows_content_and_user(self):
+		from unittest.mock import patch
+
+		from chat_bridge.api import rest_api
+
+		message = {"id": 7, "content": "hi", "created_at": "2026-01-01 10:00:00"}
+		with patch.object(rest_api, "_get_remote_message_page", return_value=[message]) as remote:
+			_, etag = rest_api._get_cached_message_page(987654, limit=10, user="a@example.com")
+			_, other_user_etag = rest_api._get_cached_message_page(987654, limit=10, user="b@example.com")
+			remote.return_value = [{**message, "id": 8}, message]
+			_, newer_etag = rest_api._get_cached_message_page(987654, limit=10, user="a@example.com")
+
+		# No local mirror: every call goes to Chat instead of a shared cache entry
+		self.assertEqual(remote.call_count, 3)
+		self.assertNotEqual(etag, other_user_etag)
+		self.assertNotEqual(etag, newer_etag)
+
+	def test_not_modified_returns_empty_304(self):
+		from unittest.mock import patch
+
+		from chat_bridge.api import rest_api
+
+		with patch.object(frappe, "get_request_header", return_value='"abc"'):
+			response = rest_api._not_modified("abc")
+			self.assertEqual(response.status_code, 304)
+			self.assertEqual(response.get_data(), b"")
+			self.assertIsNone(rest_api._not_modified("def"))
@@ -17,6 +17,8 @@ from frappe import _
 from frappe.utils import add_months, nowdate
 import re
 
+from ops_ziflow.services.customer_stats import get_customer_stats
+
 
 def _get_ops_customer_id(customer_name):
     """
@@ -310,69 +312,32 @@ def get_customer_360_summary(customer_name):
     """
     Get a quick summary/count for badge display on tabs.
 
+    Counts come from the precomputed OPS Customer 360 Stat row
+    (see ops_ziflow.services.customer_stats), so this is a single-row read.
+
     Args:
         customer_name: The ERPNext Customer doctype name
 
     Returns:
-        dict with counts for orders, proofs, communications
+        dict with counts for orders, proofs, communications and lifetime_revenue
     """
+    summary = {"orders": 0, "proofs": 0, "communications": 0, "lifetime_revenue": 0}
     if not customer_name:
-        return {"orders": 0, "proofs": 0, "communications": 0}
-
-    twelve_months_ago = add_months(nowdate(), -12)
-    six_months_ago = add_months(nowdate(), -6)
-
-    # Get OPS Customer ID
-    ops_customer_id = _get_ops_customer_id(customer_name)
-
-    # Count orders (last 12 months)
-    orders_count = 0
-    if ops_customer_id and frappe.has_permission("OPS Order", "read"):
-        try:
-            orders_count = frappe.db.count(
-                "OPS Order",
-                filters={
-                    "erp_customer": ops_customer_id,
-                    "orders_date_finished": [">=", twelve_months_ago]
-                }
-            )
-        except Exception:
-            orders_count = 0
-
-    # Count proofs via orders
-    proofs_count = 0
-    if ops_customer_id and frappe.has_permission("OPS ZiFlow Proof", "read"):
-        try:
-            customer_orders = frappe.get_all(
-                "OPS Order",
-                filters={"erp_customer": ops_customer_id},
-                pluck="name"
-            )
-            if customer_orders:
-                proofs_count = frappe.db.count(
-                    "OPS ZiFlow Proof",
-                    filters={"ops_order": ["in", customer_orders]}
-                )
-        except Exception:
-            proofs_count = 0
-
-    # Count communications (last 6 months) - using standard Communication doctype
-    comms_count = 0
+        return summary
+
+    try:
+        stats = get_customer_stats(customer_name)
+    except Exception:
+        return summary
+    if not stats:
+        return summary
+
+    if frappe.has_permission("OPS Order", "read"):
+        summary["orders"] = stats.get("orders_12m") or 0
+        summary["lifetime_revenue"] = stats.get("lifetime_revenue") or 0
+    if frappe.has_permission("OPS ZiFlow Proof", "read"):
+        summary["proofs"] = stats.get("proofs") or 0
     if frappe.has_permission("Communication", "read"):
-        try:
-            comms_count = frappe.db.count(
-                "Communication",
-                filters={
-                    "reference_doctype": "Customer",
-                    "reference_name": customer_name,
-                    "communication_date": [">=", six_months_ago]
-                }
-            )
-        except Exception:
-            comms_count = 0
+        summary["communications"] = stats.get("communications_6m") or 0
 
-    return {
-        "orders": orders_count,
-        "proofs": proofs_count,
-        "communications": comms_count
-    }
+    return summary
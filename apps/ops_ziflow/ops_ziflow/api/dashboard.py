@@ -4,8 +4,11 @@ from typing import Any, Dict
 
 import frappe
 
+from ops_ziflow.utils.dashboard_cache import dashboard_cache
+
 
 @frappe.whitelist()
+@dashboard_cache("proofs", "orders")
 def get_dashboard_stats() -> Dict[str, Any]:
     """Get ZiFlow dashboard statistics for number cards and charts."""
     status_counts = frappe.db.sql("""
@@ -4,8 +4,12 @@ from typing import Any, Dict
 
 import frappe
 
+from ops_ziflow.utils.dashboard_cache import dashboard_cache
+from ops_ziflow.utils.pipeline import get_status_pipeline
+
 
 @frappe.whitelist()
+@dashboard_cache("orders", "quotes", "proofs")
 def get_dashboard_overview() -> Dict[str, Any]:
     """Get consolidated overview of all OPS entities."""
 
@@ -257,6 +261,7 @@ def get_attention_items() -> Dict[str, Any]:
 
 
 @frappe.whitelist()
+@dashboard_cache("orders", "quotes", "proofs")
 def get_charts_data(days: int = 30) -> Dict[str, Any]:
     """Get data for dashboard charts."""
     start_date = frappe.utils.add_days(frappe.utils.nowdate(), -int(days))
@@ -307,32 +312,27 @@ def get_charts_data(days: int = 30) -> Dict[str, Any]:
 
 
 @frappe.whitelist()
+@dashboard_cache("orders", "quotes")
 def get_pipeline_summary() -> Dict[str, Any]:
     """Get pipeline summary for orders and quotes."""
 
     # Order pipeline
     order_pipeline_statuses = ["New Order", "In Design", "Order Processing", "In Production", "Ready for Fulfillment"]
-    order_pipeline = {}
-    for status in order_pipeline_statuses:
-        count = frappe.db.count("OPS Order", {"order_status": status})
-        value = frappe.db.sql("""
-            SELECT COALESCE(SUM(order_amount), 0) as value
-            FROM `tabOPS Order`
-            WHERE order_status = %s
-        """, (status,), as_dict=True)[0].value or 0
-        order_pipeline[status] = {"count": count, "value": value}
+    order_pipeline = {
+        status: {"count": entry["count"], "value": entry["value"]}
+        for status, entry in get_status_pipeline(
+            "OPS Order", "order_status", order_pipeline_statuses, value_field="order_amount", limit=0
+        ).items()
+    }
 
     # Quote pipeline
     quote_pipeline_statuses = ["Draft", "Pending", "Sent", "Accepted"]
-    quote_pipeline = {}
-    for status in quote_pipeline_statuses:
-        count = frappe.db.count("OPS Quote", {"quote_status": status})
-        value = frappe.db.sql("""
-            SELECT COALESCE(SUM(quote_price), 0) as value
-            FROM `tabOPS Quote`
-            WHERE quote_status = %s
-        """, (status,), as_dict=True)[0].value or 0
-        quote_pipeline[status] = {"count": count, "value": value}
+    quote_pipeline = {
+        status: {"count": entry["count"], "value": entry["value"]}
+        for status, entry in get_status_pipeline(
+            "OPS Quote", "quote_status", quote_pipeline_statuses, value_field="quote_price", limit=0
+        ).items()
+    }
 
     return {
         "orders": order_pipeline,
@@ -6,6 +6,8 @@ import frappe
 from frappe import _
 import json
 
+from ops_ziflow.utils.master_option_cache import MASTER_DOCTYPE, get_master_options
+
 
 @frappe.whitelist()
 def get_order_enriched_data(order_name):
@@ -90,6 +92,9 @@ def get_order_enriched_data(order_name):
                 options_by_product_id[pid] = []
             options_by_product_id[pid].append(opt)
 
+    # Master options for every product in two queries (options + metadata)
+    master_options_by_product = prefetch_master_options(doc.ops_order_products)
+
     # Parse products with options
     products_enriched = []
     for product in doc.ops_order_products:
@@ -109,8 +114,7 @@ def get_order_enriched_data(order_name):
         product_data["parsed_options"] = product_options
 
         # Get master options linked to this product
-        master_options = get_master_options_for_product(product.name, product_id)
-        product_data["master_options"] = master_options
+        product_data["master_options"] = master_options_by_product.get(product.name, [])
 
         # Get proof linked to this product
         product_proofs = [p for p in proofs if p.ops_order_product == product.name]
@@ -163,33 +167,9 @@ def format_delivery_address(doc):
 
 
 def get_order_status_history(order_name):
-    """Get status change history from versions/comments"""
-    history = []
-
-    # Get version history
-    versions = frappe.get_all(
-        "Version",
-        filters={"docname": order_name, "ref_doctype": "OPS Order"},
-        fields=["creation", "data"],
-        order_by="creation desc",
-        limit=10
-    )
-
-    for v in versions:
-        try:
-            data = json.loads(v.data) if isinstance(v.data, str) else v.data
-            if "changed" in data:
-                for change in data["changed"]:
-                    if len(change) >= 3 and change[0] == "order_status":
-                        history.append({
-                            "date": v.creation,
-                            "from_status": change[1],
-                            "to_status": change[2]
-                        })
-        except Exception:
-            pass
-
-    return history
+    """Get status change history from the OPS Order Status Log"""
+    from ops_ziflow.services.order_status_log import get_status_history
+    return get_status_history(order_name)
 
 
 def get_master_options_for_product(product_name, orders_products_id):
@@ -197,73 +177,79 @@ def get_master_options_for_product(product_name, orders_products_id):
     Get master options from OPS Master Option Attribute linked to a product
     Returns list of master option attributes with their values
     """
-    master_options = []
+    product = frappe._dict(name=product_name, orders_products_id=orders_products_id)
+    return prefetch_master_options([product]).get(product_name, [])
 
-    # Try to get master options via product options child table
-    if frappe.db.exists("DocType", "OPS Master Option Attribute"):
-        try:
-            # Get options that have master_option links
-            options_with_master = frappe.get_all(
-                "OPS Order Product Option",
-                filters={
-                    "parent": product_name,
-                    "parenttype": "OPS Order Product",
-                    "master_option": ["is", "set"]
-                },
-                fields=["option_name", "option_value", "option_price", "master_option"]
-            )
 
-            for opt in options_with_master:
-                if opt.master_option:
-                    # Get master option details
-                    master_info = frappe.db.get_value(
-                        "OPS Master Option Attribute",
-                        opt.master_option,
-                        ["name", "option_name", "group_name", "display_order", "option_type"],
-                        as_dict=True
-                    )
-                    if master_info:
-                        master_options.append({
-                            "name": master_info.name,
-                            "option_name": master_info.option_name or opt.option_name,
-                            "option_value": opt.option_value,
-                            "option_price": float(opt.option_price or 0),
-                            "group_name": master_info.group_name,
-                            "option_type": master_info.option_type
-                        })
+def prefetch_master_options(products):
+    """
+    Get master options for several order products at once
+
+    Options are matched by their parent product row, falling back to
+    orders_products_id when a product has none. One query loads the option rows,
+    master attribute metadata comes from the in-process cache.
+
+    Returns: dict of product row name -> list of master options
+    """
+    products = [p for p in products if p.name]
+    if not products or not frappe.db.exists("DocType", MASTER_DOCTYPE):
+        return {}
+
+    result = {}
+    try:
+        values = {"names": [p.name for p in products]}
+        conditions = ["(parenttype = 'OPS Order Product' AND parent IN %(names)s)"]
+        product_ids = [p.orders_products_id for p in products if p.orders_products_id]
+        if product_ids:
+            conditions.append("orders_products_id IN %(product_ids)s")
+            values["product_ids"] = product_ids
+
+        options = frappe.db.sql(f"""
+            SELECT parent, parenttype, orders_products_id,
+                option_name, option_value, option_price, master_option
+            FROM `tabOPS Order Product Option`
+            WHERE IFNULL(master_option, '') != ''
+                AND ({" OR ".join(conditions)})
+            ORDER BY idx
+        """, values, as_dict=True)
+
+        by_parent = {}
+        by_product_id = {}
+        for opt in options:
+            if opt.parenttype == "OPS Order Product":
+                by_parent.setdefault(opt.parent, []).append(opt)
+            if opt.orders_products_id:
+                by_product_id.setdefault(str(opt.orders_products_id), []).append(opt)
+
+        master_info = get_master_options(opt.master_option for opt in options)
+
+        def build(opts):
+            master_options = []
+            for opt in opts:
+                info = master_info.get(opt.master_option)
+                if info:
+                    master_options.append({
+                        "name": info.name,
+                        "option_name": info.get("option_name") or opt.option_name,
+                        "option_value": opt.option_value,
+                        "option_price": float(opt.option_price or 0),
+                        "group_name": info.get("group_name"),
+                        "option_type": info.get("option_type")
+                    })
+            return master_options
+
+        for product in products:
+            master_options = build(by_parent.get(product.name, []))
 
             # Also try to get master options linked directly via orders_products_id
-            if not master_options and orders_products_id:
-                direct_master_opts = frappe.get_all(
-                    "OPS Order Product Option",
-                    filters={
-                        "orders_products_id": orders_products_id,
-                        "master_option": ["is", "set"]
-                    },
-                    fields=["option_name", "option_value", "option_price", "master_option"]
-                )
-
-                for opt in direct_master_opts:
-                    if opt.master_option:
-                        master_info = frappe.db.get_value(
-                            "OPS Master Option Attribute",
-                            opt.master_option,
-                            ["name", "option_name", "group_name", "display_order", "option_type"],
-                            as_dict=True
-                        )
-                        if master_info:
-                            master_options.append({
-                                "name": master_info.name,
-                                "option_name": master_info.option_name or opt.option_name,
-                                "option_value": opt.option_value,
-                                "option_price": float(opt.option_price or 0),
-                                "group_name": master_info.group_name,
-                                "option_type": master_info.option_type
-                            })
-        except Exception as e:
-            frappe.log_error(f"Error fetching master options: {str(e)}", "OPS Order Form")
+            if not master_options and product.orders_products_id:
+                master_options = build(by_product_id.get(str(product.orders_products_id), []))
+
+            result[product.name] = master_options
+    except Exception as e:
+        frappe.log_error(f"Error fetching master options: {str(e)}", "OPS Order Form")
 
-    return master_options
+    return result
 
 
 def get_product_options_from_child_table(product_name):
@@ -286,23 +272,12 @@ def get_product_options_from_child_table(product_name):
     groups = {}
     total_price = 0
 
-    # Cache master option lookups
-    master_options_cache = {}
+    # Master option details for all rows in one lookup
+    master_options_cache = get_master_options(opt.master_option for opt in options)
 
     for opt in options:
         # Get master option details if available
-        master_info = None
-        if opt.master_option:
-            if opt.master_option not in master_options_cache:
-                master_info = frappe.db.get_value(
-                    "OPS Master Option Attribute",
-                    opt.master_option,
-                    ["option_name", "group_name", "display_order"],
-                    as_dict=True
-                )
-                master_options_cache[opt.master_option] = master_info
-            else:
-                master_info = master_options_cache[opt.master_option]
+        master_info = master_options_cache.get(opt.master_option) if opt.master_option else None
 
         # Determine group name
         group_name = "Options"
@@ -539,6 +514,7 @@ def quick_action(order_name, action, **kwargs):
 
         old_status = doc.order_status
         doc.order_status = new_status
+        doc.flags.status_change_source = "Quick Action"
         doc.save(ignore_permissions=True)
 
         return {
@@ -548,6 +524,7 @@ def quick_action(order_name, action, **kwargs):
 
     elif action == "send_to_production":
         doc.order_status = "In Production"
+        doc.flags.status_change_source = "Quick Action"
         doc.save(ignore_permissions=True)
         return {"success": True, "message": "Order sent to production"}
 
@@ -578,6 +555,7 @@ def quick_action(order_name, action, **kwargs):
 
     elif action == "mark_complete":
         doc.order_status = "Order Completed"
+        doc.flags.status_change_source = "Quick Action"
         doc.save(ignore_permissions=True)
         return {"success": True, "message": "Order marked as complete"}
 
@@ -718,6 +696,9 @@ def update_order_proof_counts(order_name):
         "all_proofs_approved": 1 if all_approved else 0
     })
 
+    from ops_ziflow.services.order_stats import mark_order_dirty
+    mark_order_dirty(order_name)
+
 
 # =========================================
 # NEW ENDPOINTS FOR FORM REDESIGN
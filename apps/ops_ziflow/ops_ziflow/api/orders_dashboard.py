@@ -4,10 +4,128 @@ from typing import Any, Dict
 
 import frappe
 
+from ops_ziflow.utils.dashboard_cache import dashboard_cache
+from ops_ziflow.services.search_index import match_condition
+from ops_ziflow.utils.pipeline import get_status_pipeline
+
+
+ACTIVE_STATUSES = ["New Order", "In Design", "Order Processing", "Order Review",
+                   "In Production", "Ready for Fulfillment", "Materials on Order", "Reprint Order"]
+CLOSED_STATUSES = ("Order Completed", "Fulfilled", "Cancelled", "Refunded")
+NON_REVENUE_STATUSES = ("Cancelled", "Refunded")
+
+
+def _avg_order_value(total_revenue, revenue_orders) -> float:
+    """Revenue per order that is not cancelled/refunded (same definition on both paths)."""
+    return round(frappe.utils.flt(total_revenue) / revenue_orders, 2) if revenue_orders else 0
+
 
 @frappe.whitelist()
+@dashboard_cache("orders")
 def get_orders_dashboard_stats(from_date=None, to_date=None, status=None, customer=None) -> Dict[str, Any]:
-    """Get OPS Orders dashboard statistics with optional filters."""
+    """Get OPS Orders dashboard statistics with optional filters.
+
+    Date/status filters are answered from the OPS Order Daily Stat rollup; the
+    free-text customer filter has no rollup dimension and queries orders directly.
+    """
+    if customer:
+        return _get_stats_from_orders(from_date, to_date, status, customer)
+    return _get_stats_from_rollup(from_date, to_date, status)
+
+
+def _get_stats_from_rollup(from_date=None, to_date=None, status=None) -> Dict[str, Any]:
+    """Dashboard statistics from a single read of the daily rollup."""
+    today = frappe.utils.getdate(frappe.utils.nowdate())
+    conditions = []
+    values = {
+        "today": today,
+        "month_start": frappe.utils.get_first_day(today),
+    }
+
+    if from_date:
+        conditions.append("stat_date >= %(from_date)s")
+        values["from_date"] = from_date
+    if to_date:
+        conditions.append("stat_date <= %(to_date)s")
+        values["to_date"] = to_date
+    if status:
+        conditions.append("order_status = %(status)s")
+        values["status"] = status
+
+    filtered = " AND ".join(conditions) if conditions else "1=1"
+
+    # Filtered cards plus the month/today cards (which ignore filters) in one pass
+    rows = frappe.db.sql(f"""
+        SELECT
+            order_status,
+            SUM(CASE WHEN {filtered} THEN order_count ELSE 0 END) AS order_count,
+            SUM(CASE WHEN {filtered} THEN order_amount ELSE 0 END) AS order_amount,
+            SUM(CASE WHEN {filtered} THEN pending_proof_orders ELSE 0 END) AS pending_proof_orders,
+            SUM(CASE WHEN {filtered} AND due_bucket = 'Overdue' THEN order_count ELSE 0 END) AS overdue_orders,
+            SUM(CASE WHEN stat_date >= %(month_start)s THEN order_count ELSE 0 END) AS month_count,
+            SUM(CASE WHEN stat_date >= %(month_start)s THEN order_amount ELSE 0 END) AS month_amount,
+            SUM(CASE WHEN stat_date = %(today)s THEN order_count ELSE 0 END) AS today_count,
+            SUM(CASE WHEN stat_date = %(today)s THEN order_amount ELSE 0 END) AS today_amount
+        FROM `tabOPS Order Daily Stat`
+        WHERE ({filtered}) OR stat_date >= %(month_start)s
+        GROUP BY order_status
+    """, values, as_dict=True)
+
+    by_status = {}
+    pending_proofs = overdue_orders = 0
+    orders_this_month = orders_today = 0
+    revenue_orders = 0
+    total_revenue = completed_revenue = monthly_revenue = today_revenue = 0
+
+    for row in rows:
+        order_status = row.order_status or "Unknown"
+        count = frappe.utils.cint(row.order_count)
+        revenue = frappe.utils.flt(row.order_amount)
+        # NULL status never matches the NOT IN filters of the raw queries
+        is_revenue = row.order_status is not None and order_status not in NON_REVENUE_STATUSES
+
+        if count:
+            by_status[order_status] = by_status.get(order_status, 0) + count
+        pending_proofs += frappe.utils.cint(row.pending_proof_orders)
+        if row.order_status is not None and order_status not in CLOSED_STATUSES:
+            overdue_orders += frappe.utils.cint(row.overdue_orders)
+
+        orders_this_month += frappe.utils.cint(row.month_count)
+        orders_today += frappe.utils.cint(row.today_count)
+
+        if is_revenue:
+            revenue_orders += count
+            total_revenue += revenue
+            monthly_revenue += frappe.utils.flt(row.month_amount)
+            today_revenue += frappe.utils.flt(row.today_amount)
+        if order_status == "Order Completed":
+            completed_revenue += revenue
+
+    return {
+        "total_orders": sum(by_status.values()),
+        "active_orders": sum(by_status.get(s, 0) for s in ACTIVE_STATUSES),
+        "completed_orders": by_status.get("Order Completed", 0) + by_status.get("Fulfilled", 0),
+        "new_orders": by_status.get("New Order", 0),
+        "in_production": by_status.get("In Production", 0),
+        "ready_fulfillment": by_status.get("Ready for Fulfillment", 0),
+        "fulfilled": by_status.get("Fulfilled", 0),
+        "completed": by_status.get("Order Completed", 0),
+        "cancelled": by_status.get("Cancelled", 0) + by_status.get("Refunded", 0),
+        "pending_proofs": pending_proofs,
+        "overdue_orders": overdue_orders,
+        "orders_today": orders_today,
+        "today_revenue": today_revenue,
+        "orders_this_month": orders_this_month,
+        "total_revenue": total_revenue,
+        "completed_revenue": completed_revenue,
+        "avg_order_value": _avg_order_value(total_revenue, revenue_orders),
+        "monthly_revenue": monthly_revenue,
+        "by_status": by_status,
+    }
+
+
+def _get_stats_from_orders(from_date=None, to_date=None, status=None, customer=None) -> Dict[str, Any]:
+    """Dashboard statistics queried directly from OPS Order (ad-hoc filters)."""
 
     # Build date and status conditions
     conditions = []
@@ -23,8 +141,9 @@ def get_orders_dashboard_stats(from_date=None, to_date=None, status=None, custom
         conditions.append("order_status = %(status)s")
         values["status"] = status
     if customer:
-        conditions.append("(customer_name LIKE %(customer)s OR ops_order_id LIKE %(customer)s)")
-        values["customer"] = f"%{customer}%"
+        search_condition, search_values = match_condition("OPS Order", customer)
+        conditions.append(search_condition)
+        values.update(search_values)
 
     where_clause = " AND ".join(conditions) if conditions else "1=1"
 
@@ -48,9 +167,7 @@ def get_orders_dashboard_stats(from_date=None, to_date=None, status=None, custom
     cancelled = by_status.get("Cancelled", 0) + by_status.get("Refunded", 0)
 
     # Active orders (not completed/cancelled)
-    active_statuses = ["New Order", "In Design", "Order Processing", "Order Review",
-                       "In Production", "Ready for Fulfillment", "Materials on Order", "Reprint Order"]
-    active_orders = sum(by_status.get(s, 0) for s in active_statuses)
+    active_orders = sum(by_status.get(s, 0) for s in ACTIVE_STATUSES)
 
     # Completed orders count
     completed_orders = by_status.get("Order Completed", 0) + by_status.get("Fulfilled", 0)
@@ -72,7 +189,7 @@ def get_orders_dashboard_stats(from_date=None, to_date=None, status=None, custom
         SELECT
             SUM(order_amount) as total_revenue,
             SUM(CASE WHEN order_status = 'Order Completed' THEN order_amount ELSE 0 END) as completed_revenue,
-            AVG(order_amount) as avg_order_value
+            COUNT(*) as revenue_orders
         FROM `tabOPS Order`
         WHERE {where_clause}
         AND order_status NOT IN ('Cancelled', 'Refunded')
@@ -136,7 +253,7 @@ def get_orders_dashboard_stats(from_date=None, to_date=None, status=None, custom
         "orders_this_month": orders_this_month,
         "total_revenue": revenue_stats.total_revenue or 0,
         "completed_revenue": revenue_stats.completed_revenue or 0,
-        "avg_order_value": round(revenue_stats.avg_order_value or 0, 2),
+        "avg_order_value": _avg_order_value(revenue_stats.total_revenue, revenue_stats.revenue_orders),
         "monthly_revenue": monthly_revenue.revenue or 0,
         "by_status": by_status,
     }
@@ -166,6 +283,18 @@ def get_orders_timeline(days: int = 30) -> Dict[str, Any]:
     return {"created": timeline, "completed": completed}
 
 
+@frappe.whitelist()
+@dashboard_cache("orders")
+def get_status_cycle_times(from_date=None, to_date=None) -> Dict[str, Any]:
+    """Average/min/max time orders spend in each status (from the status transition log)."""
+    from ops_ziflow.services.order_status_log import get_cycle_times
+
+    rows = get_cycle_times(from_date, to_date)
+    for row in rows:
+        row["avg_hours"] = round((row.avg_seconds or 0) / 3600, 1)
+    return {"statuses": rows}
+
+
 @frappe.whitelist()
 def get_recent_orders(limit: int = 20, from_date=None, to_date=None, status=None, customer=None) -> Dict[str, Any]:
     """Get recently created orders with optional filters."""
@@ -192,8 +321,9 @@ def get_recent_orders(limit: int = 20, from_date=None, to_date=None, status=None
             conditions.append("order_status = %(status)s")
             values["status"] = status
         if customer:
-            conditions.append("(customer_name LIKE %(customer)s OR ops_order_id LIKE %(customer)s)")
-            values["customer"] = f"%{customer}%"
+            search_condition, search_values = match_condition("OPS Order", customer)
+            conditions.append(search_condition)
+            values.update(search_values)
 
         where_clause = " AND ".join(conditions)
 
@@ -219,8 +349,9 @@ def get_recent_orders(limit: int = 20, from_date=None, to_date=None, status=None
             if status:
                 conditions.append("order_status = %(status)s")
                 values["status"] = status
-            conditions.append("(customer_name LIKE %(customer)s OR ops_order_id LIKE %(customer)s)")
-            values["customer"] = f"%{customer}%"
+            search_condition, search_values = match_condition("OPS Order", customer)
+            conditions.append(search_condition)
+            values.update(search_values)
 
             where_clause = " AND ".join(conditions) if conditions else "1=1"
             orders = frappe.db.sql(f"""
@@ -305,21 +436,19 @@ def get_production_pipeline() -> Dict[str, Any]:
     pipeline_statuses = ["New Order", "In Design", "Order Processing", "Order Review",
                          "In Production", "Ready for Fulfillment"]
 
-    pipeline = {}
-    for status in pipeline_statuses:
-        orders = frappe.get_all(
-            "OPS Order",
-            filters={"order_status": status},
-            fields=["name", "ops_order_id", "customer_name", "order_amount", "production_due_date"],
-            order_by="production_due_date asc",
-            limit=10
-        )
-        pipeline[status] = {
-            "count": frappe.db.count("OPS Order", {"order_status": status}),
-            "orders": orders
-        }
-
-    return pipeline
+    pipeline = get_status_pipeline(
+        "OPS Order",
+        "order_status",
+        pipeline_statuses,
+        fields=["name", "ops_order_id", "customer_name", "order_amount", "production_due_date"],
+        order_by="production_due_date asc",
+        limit=10
+    )
+
+    return {
+        status: {"count": entry["count"], "orders": entry["rows"]}
+        for status, entry in pipeline.items()
+    }
 
 
 @frappe.whitelist()
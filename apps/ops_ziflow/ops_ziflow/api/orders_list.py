@@ -4,6 +4,24 @@ Provides backend functionality for the OPS Orders List page
 """
 import frappe
 from frappe import _
+from frappe.utils import add_days, cint, get_datetime, getdate
+
+from ops_ziflow.services.search_index import match_condition
+from ops_ziflow.utils.dashboard_cache import dashboard_cache
+
+KEYSET_SORTS = {
+    "date_purchased desc": "desc",
+    "date_purchased asc": "asc",
+}
+
+ORDER_FIELDS = """
+    name, ops_order_id, customer_name, customer_email, customer_telephone,
+    customer_company, order_status, order_amount, total_amount, date_purchased,
+    production_due_date, delivery_date, payment_status_title,
+    delivery_city, delivery_state, delivery_country, delivery_street_address,
+    pending_proof_count, all_proofs_approved, tracking_number, shipping_status,
+    shipping_amount, tax_amount, coupon_amount
+"""
 
 
 @frappe.whitelist()
@@ -31,6 +49,7 @@ def bulk_update_status(orders, status):
         try:
             doc = frappe.get_doc("OPS Order", order_name)
             doc.order_status = status
+            doc.flags.status_change_source = "Bulk Update"
             doc.save(ignore_permissions=True)
             updated += 1
         except Exception as e:
@@ -41,18 +60,21 @@ def bulk_update_status(orders, status):
 
 
 @frappe.whitelist()
-def get_orders_with_details(filters=None, limit=20, offset=0, order_by="date_purchased desc"):
+def get_orders_with_details(filters=None, limit=20, offset=0, order_by="date_purchased desc",
+                            cursor=None, with_count=1):
     """
     Get orders with expanded details including products and proofs
 
     Args:
         filters: Filter conditions (JSON)
         limit: Number of records to fetch
-        offset: Starting offset
+        offset: Starting offset (ignored when a cursor is given)
         order_by: Sort order
+        cursor: Keyset cursor from a previous page's next_cursor (date_purchased sorts only)
+        with_count: Include the total count (cached; pass 0 when paging with cursors)
 
     Returns:
-        dict with orders list and total count
+        dict with orders list, total count and next_cursor
     """
     import json
 
@@ -72,68 +94,187 @@ def get_orders_with_details(filters=None, limit=20, offset=0, order_by="date_pur
             conditions.append("order_status = %(status)s")
             values["status"] = filters["status"]
 
+    # Ranges on the raw column so the date_purchased index is usable
     if filters.get("from_date"):
-        conditions.append("DATE(date_purchased) >= %(from_date)s")
-        values["from_date"] = filters["from_date"]
+        conditions.append("date_purchased >= %(from_date)s")
+        values["from_date"] = getdate(filters["from_date"])
 
     if filters.get("to_date"):
-        conditions.append("DATE(date_purchased) <= %(to_date)s")
-        values["to_date"] = filters["to_date"]
+        conditions.append("date_purchased < %(to_date_end)s")
+        values["to_date_end"] = add_days(getdate(filters["to_date"]), 1)
 
     if filters.get("search"):
-        conditions.append("(ops_order_id LIKE %(search)s OR customer_name LIKE %(search)s)")
-        values["search"] = f"%{filters['search']}%"
+        search_condition, search_values = match_condition("OPS Order", filters["search"])
+        conditions.append(search_condition)
+        values.update(search_values)
 
-    where_clause = " AND ".join(conditions) if conditions else "1=1"
+    limit = cint(limit)
+    sort_direction = KEYSET_SORTS.get((order_by or "").strip().lower())
+    page_conditions = list(conditions)
+
+    if sort_direction:
+        order_by = f"date_purchased {sort_direction}, name {sort_direction}"
+        if cursor:
+            cursor_values = _decode_cursor(cursor)
+            page_conditions.append(_keyset_condition(sort_direction, cursor_values["cursor_date"]))
+            values.update(cursor_values)
+            offset = 0
+
+    where_clause = " AND ".join(page_conditions) if page_conditions else "1=1"
 
     # Get orders
     orders = frappe.db.sql(f"""
-        SELECT
-            name, ops_order_id, customer_name, customer_email, customer_telephone,
-            customer_company, order_status, order_amount, total_amount, date_purchased,
-            production_due_date, delivery_date, payment_status_title,
-            delivery_city, delivery_state, delivery_country, delivery_street_address,
-            pending_proof_count, all_proofs_approved, tracking_number, shipping_status,
-            shipping_amount, tax_amount, coupon_amount
+        SELECT {ORDER_FIELDS}
         FROM `tabOPS Order`
         WHERE {where_clause}
         ORDER BY {order_by}
         LIMIT %(limit)s OFFSET %(offset)s
-    """, {**values, "limit": int(limit), "offset": int(offset)}, as_dict=True)
+    """, {**values, "limit": limit, "offset": cint(offset)}, as_dict=True)
 
-    # Get total count
-    total = frappe.db.sql(f"""
-        SELECT COUNT(*) as count
-        FROM `tabOPS Order`
-        WHERE {where_clause}
-    """, values, as_dict=True)[0].count
+    _attach_products_and_proofs(orders)
 
-    # Enrich with products and proofs
-    for order in orders:
-        # Get products
-        order["products"] = frappe.db.sql("""
-            SELECT
-                products_name, products_title, products_sku, products_quantity,
-                products_price, final_price, product_width, product_height, product_size_unit
-            FROM `tabOPS Order Product`
-            WHERE parent = %s
-            ORDER BY idx
-        """, order.name, as_dict=True)
-
-        # Get proofs
-        order["proofs"] = frappe.db.sql("""
-            SELECT
-                name, proof_name, proof_status, ziflow_url, preview_url
-            FROM `tabOPS ZiFlow Proof`
-            WHERE ops_order = %s
-        """, order.name, as_dict=True)
+    next_cursor = None
+    if sort_direction and orders and len(orders) == limit:
+        next_cursor = _encode_cursor(orders[-1])
 
     return {
         "orders": orders,
-        "total": total
+        "total": _count_orders(filters) if cint(with_count) else None,
+        "next_cursor": next_cursor
     }
 
 
+def _attach_products_and_proofs(orders):
+    """Load products and proofs for a page of orders with one query each."""
+    for order in orders:
+        order["products"] = []
+        order["proofs"] = []
+
+    if not orders:
+        return
+
+    by_name = {order.name: order for order in orders}
+    names = list(by_name)
+
+    products = frappe.db.sql("""
+        SELECT
+            parent, products_name, products_title, products_sku, products_quantity,
+            products_price, final_price, product_width, product_height, product_size_unit
+        FROM `tabOPS Order Product`
+        WHERE parent IN %(names)s AND parenttype = 'OPS Order'
+        ORDER BY parent, idx
+    """, {"names": names}, as_dict=True)
+    for product in products:
+        by_name[product.pop("parent")]["products"].append(product)
+
+    proofs = frappe.db.sql("""
+        SELECT
+            ops_order, name, proof_name, proof_status, ziflow_url, preview_url
+        FROM `tabOPS ZiFlow Proof`
+        WHERE ops_order IN %(names)s
+    """, {"names": names}, as_dict=True)
+    for proof in proofs:
+        by_name[proof.pop("ops_order")]["proofs"].append(proof)
+
+
+def _keyset_condition(direction, cursor_date):
+    """Rows after the cursor in (date_purchased, name) order; NULL dates sort first ascending, last descending."""
+    if direction == "desc":
+        if cursor_date is None:
+            return "(date_purchased IS NULL AND name < %(cursor_name)s)"
+        return """(
+            date_purchased < %(cursor_date)s
+            OR (date_purchased = %(cursor_date)s AND name < %(cursor_name)s)
+            OR date_purchased IS NULL
+        )"""
+
+    if cursor_date is None:
+        return "(date_purchased IS NOT NULL OR name > %(cursor_name)s)"
+    return """(
+        date_purchased > %(cursor_date)s
+        OR (date_purchased = %(cursor_date)s AND name > %(cursor_name)s)
+    )"""
+
+
+def _encode_cursor(order):
+    import base64
+    import json
+
+    date_purchased = order.get("date_purchased")
+    payload = json.dumps([str(date_purchased) if date_purchased else None, order.name])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def _decode_cursor(cursor):
+    import base64
+    import json
+
+    try:
+        date_purchased, name = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+    except Exception:
+        frappe.throw(_("Invalid cursor"))
+
+    return {
+        "cursor_date": get_datetime(date_purchased) if date_purchased else None,
+        "cursor_name": name
+    }
+
+
+def _count_orders(filters):
+    """Total for the list filters.
+
+    Status/date filters are counted from the OPS Order Daily Stat rollup; a text
+    search falls back to a COUNT(*) that is cached briefly per normalized filters.
+    """
+    if filters.get("search"):
+        return _count_orders_by_search(
+            filters["search"], filters.get("status"), filters.get("from_date"), filters.get("to_date")
+        )
+
+    conditions = []
+    values = {}
+    if filters.get("status"):
+        if filters["status"] == "active":
+            conditions.append("order_status NOT IN ('Order Completed', 'Fulfilled', 'Cancelled', 'Refunded')")
+        else:
+            conditions.append("order_status = %(status)s")
+            values["status"] = filters["status"]
+    if filters.get("from_date"):
+        conditions.append("stat_date >= %(from_date)s")
+        values["from_date"] = getdate(filters["from_date"])
+    if filters.get("to_date"):
+        conditions.append("stat_date <= %(to_date)s")
+        values["to_date"] = getdate(filters["to_date"])
+
+    where_clause = " AND ".join(conditions) if conditions else "1=1"
+    return cint(frappe.db.sql(f"""
+        SELECT SUM(order_count) FROM `tabOPS Order Daily Stat`
+        WHERE {where_clause}
+    """, values)[0][0])
+
+
+@dashboard_cache("orders", ttl=60)
+def _count_orders_by_search(search, status=None, from_date=None, to_date=None):
+    search_condition, values = match_condition("OPS Order", search)
+    conditions = [search_condition]
+    if status == "active":
+        conditions.append("order_status NOT IN ('Order Completed', 'Fulfilled', 'Cancelled', 'Refunded')")
+    elif status:
+        conditions.append("order_status = %(status)s")
+        values["status"] = status
+    if from_date:
+        conditions.append("date_purchased >= %(from_date)s")
+        values["from_date"] = getdate(from_date)
+    if to_date:
+        conditions.append("date_purchased < %(to_date_end)s")
+        values["to_date_end"] = add_days(getdate(to_date), 1)
+
+    return frappe.db.sql(f"""
+        SELECT COUNT(*) FROM `tabOPS Order`
+        WHERE {" AND ".join(conditions)}
+    """, values)[0][0]
+
+
 @frappe.whitelist()
 def get_order_full_details(order_name):
     """
@@ -183,6 +324,7 @@ def quick_actions(order_name, action, **kwargs):
 
     if action == "update_status":
         doc.order_status = kwargs.get("status")
+        doc.flags.status_change_source = "Quick Action"
         doc.save(ignore_permissions=True)
         return {"success": True, "message": f"Status updated to {kwargs.get('status')}"}
 
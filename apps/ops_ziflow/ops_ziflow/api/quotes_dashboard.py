@@ -4,8 +4,13 @@ from typing import Any, Dict
 
 import frappe
 
+from ops_ziflow.utils.dashboard_cache import dashboard_cache
+from ops_ziflow.services.search_index import search_names
+from ops_ziflow.utils.pipeline import get_status_pipeline
+
 
 @frappe.whitelist()
+@dashboard_cache("quotes")
 def get_quotes_dashboard_stats() -> Dict[str, Any]:
     """Get OPS Quotes dashboard statistics."""
 
@@ -206,28 +211,20 @@ def get_quotes_pipeline() -> Dict[str, Any]:
     """Get quotes in sales pipeline."""
     pipeline_statuses = ["Draft", "Pending", "Sent", "Accepted"]
 
-    pipeline = {}
-    for status in pipeline_statuses:
-        quotes = frappe.get_all(
-            "OPS Quote",
-            filters={"quote_status": status},
-            fields=["name", "quote_id", "quote_title", "customer_name", "quote_price", "quote_date"],
-            order_by="quote_date desc",
-            limit=10
-        )
-        total_value = frappe.db.sql("""
-            SELECT COALESCE(SUM(quote_price), 0) as value
-            FROM `tabOPS Quote`
-            WHERE quote_status = %s
-        """, (status,), as_dict=True)[0]
-
-        pipeline[status] = {
-            "count": frappe.db.count("OPS Quote", {"quote_status": status}),
-            "value": total_value.value or 0,
-            "quotes": quotes
-        }
-
-    return pipeline
+    pipeline = get_status_pipeline(
+        "OPS Quote",
+        "quote_status",
+        pipeline_statuses,
+        fields=["name", "quote_id", "quote_title", "customer_name", "quote_price", "quote_date"],
+        order_by="quote_date desc",
+        value_field="quote_price",
+        limit=10
+    )
+
+    return {
+        status: {"count": entry["count"], "value": entry["value"], "quotes": entry["rows"]}
+        for status, entry in pipeline.items()
+    }
 
 
 @frappe.whitelist()
@@ -292,9 +289,12 @@ def get_quotes_list(
         else:
             filters["quote_date"] = ["<=", date_to]
 
-    # Customer search
+    # Customer/quote search via the full-text index
     if customer:
-        filters["customer_name"] = ["like", f"%{customer}%"]
+        matches = search_names("OPS Quote", customer)
+        if not matches:
+            return {"quotes": [], "total": 0, "limit": limit, "offset": offset, "has_more": False}
+        filters["name"] = ["in", matches]
 
     # Value range filters
     if value_min:
@@ -0,0 +1,35 @@
+"""Ranked search API for OPS Orders and Quotes."""
+
+from typing import Any, Dict
+
+import frappe
+from frappe.utils import cint
+
+from ops_ziflow.services.search_index import SEARCH_SOURCES, search as search_index
+
+
+@frappe.whitelist()
+def search(query: str, doctype: str = None, limit: int = 20) -> Dict[str, Any]:
+    """Search orders and quotes by id, customer, email, company, tracking number or product.
+
+    Args:
+        query: Search text; every word must match (prefix match; numbers, emails and
+            domains match anywhere)
+        doctype: Restrict to "OPS Order" or "OPS Quote"
+        limit: Maximum results (capped at 100)
+
+    Returns:
+        Dict with results ranked by relevance
+    """
+    if doctype and doctype not in SEARCH_SOURCES:
+        frappe.throw(f"Search is not available for {doctype}")
+
+    readable = [dt for dt in SEARCH_SOURCES if frappe.has_permission(dt, "read")]
+    if doctype:
+        readable = [dt for dt in readable if dt == doctype]
+    if not readable:
+        raise frappe.PermissionError
+
+    limit = min(cint(limit) or 20, 100)
+    results = search_index(query, doctype=readable[0] if len(readable) == 1 else None, limit=limit)
+    return {"results": results, "count": len(results)}
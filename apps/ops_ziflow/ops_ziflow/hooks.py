@@ -65,10 +65,39 @@ doc_events = {
         "on_update": [
             "ops_ziflow.services.proof_service.handle_order_status_change",
             "ops_ziflow.services.order_sync_service.push_order_to_onprintshop",
+            "ops_ziflow.services.order_stats.handle_order_update",
+            "ops_ziflow.services.search_index.handle_document_update",
+            "ops_ziflow.services.order_status_log.log_status_change",
+            "ops_ziflow.services.customer_stats.handle_order_change",
         ],
+        "after_delete": [
+            "ops_ziflow.services.order_stats.handle_order_delete",
+            "ops_ziflow.services.search_index.handle_document_delete",
+            "ops_ziflow.services.customer_stats.handle_order_change",
+        ],
+    },
+    "OPS ZiFlow Proof": {
+        "after_insert": "ops_ziflow.services.customer_stats.handle_proof_change",
+        "on_update": "ops_ziflow.services.customer_stats.handle_proof_change",
+        "after_delete": "ops_ziflow.services.customer_stats.handle_proof_change",
+    },
+    "Communication": {
+        "after_insert": "ops_ziflow.services.customer_stats.handle_communication_change",
+        "on_trash": "ops_ziflow.services.customer_stats.handle_communication_change",
+    },
+    "Customer": {
+        "on_update": "ops_ziflow.services.customer_stats.handle_customer_update",
     },
     "OPS Quote": {
-        "on_update": "ops_ziflow.services.quote_sync_service.push_quote_to_onprintshop",
+        "on_update": [
+            "ops_ziflow.services.quote_sync_service.push_quote_to_onprintshop",
+            "ops_ziflow.services.search_index.handle_document_update",
+        ],
+        "after_delete": "ops_ziflow.services.search_index.handle_document_delete",
+    },
+    "OPS Master Option Attribute": {
+        "on_update": "ops_ziflow.utils.master_option_cache.clear_master_option_cache",
+        "on_trash": "ops_ziflow.utils.master_option_cache.clear_master_option_cache",
     }
 }
 
@@ -87,7 +116,17 @@ scheduler_events = {
         "0 3,9,15,21 * * *": [
             "ops_ziflow.services.order_sync_service.poll_onprintshop_orders",
         ]
-    }
+    },
+    # Rebuild the dashboard order rollup (repairs drift from direct SQL writes)
+    # and re-count Customer 360 badges (rolling 12/6 month windows move daily)
+    "daily": [
+        "ops_ziflow.services.order_stats.rebuild_order_stats",
+        "ops_ziflow.services.customer_stats.reconcile_customer_stats",
+    ],
+    # Re-index orders/quotes for search (repairs entries missed by direct SQL writes)
+    "weekly": [
+        "ops_ziflow.services.search_index.rebuild_search_index",
+    ],
 }
 
 # Jinja environment methods
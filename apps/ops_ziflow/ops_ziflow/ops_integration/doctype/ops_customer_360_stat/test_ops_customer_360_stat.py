@@ -0,0 +1,69 @@
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import add_months, now_datetime
+
+from ops_ziflow.services import customer_stats
+
+
+def _make_customer(name, ops_customer):
+    customer = frappe.get_doc({
+        "doctype": "Customer",
+        "customer_name": name,
+        "ops_corporate_id": ops_customer,
+    })
+    customer.flags.ignore_mandatory = True
+    customer.flags.ignore_links = True
+    customer.insert(ignore_permissions=True)
+    return customer.name
+
+
+def _make_order(order_id, ops_customer, amount, status="Order Completed", finished=None):
+    order = frappe.get_doc({
+        "doctype": "OPS Order",
+        "ops_order_id": order_id,
+        "erp_customer": ops_customer,
+        "order_status": status,
+        "orders_status_id": 1,
+        "order_amount": amount,
+        "orders_date_finished": finished or now_datetime(),
+        "sync_in_progress": 1,
+    })
+    order.flags.ignore_mandatory = True
+    order.flags.ignore_links = True
+    order.insert(ignore_permissions=True)
+    return order
+
+
+class TestCustomer360Stat(FrappeTestCase):
+    def setUp(self):
+        customer_stats._discard_pending_refreshes()
+
+    def test_refresh_counts_orders_and_revenue(self):
+        customer = _make_customer("Stat Test Customer", "stat-test-ops")
+        _make_order("9910001", "stat-test-ops", 100)
+        _make_order("9910002", "stat-test-ops", 50, status="Cancelled")
+        _make_order("9910003", "stat-test-ops", 25, finished=add_months(now_datetime(), -18))
+
+        stats = customer_stats.refresh_customer(customer)
+
+        self.assertEqual(stats["orders_total"], 3)
+        self.assertEqual(stats["orders_12m"], 2)
+        self.assertEqual(stats["lifetime_revenue"], 125)
+        self.assertEqual(
+            frappe.db.get_value(customer_stats.STAT_DOCTYPE, customer, "orders_total"), 3
+        )
+
+    def test_saves_in_one_transaction_enqueue_one_job(self):
+        customer = _make_customer("Stat Fan-out Customer", "stat-fanout-ops")
+        with patch.object(frappe, "enqueue") as enqueue:
+            for i in range(5):
+                _make_order(f"992000{i}", "stat-fanout-ops", 10)
+            self.assertEqual(enqueue.call_count, 0)
+
+            customer_stats._enqueue_pending_refreshes()
+
+        enqueue.assert_called_once()
+        self.assertEqual(enqueue.call_args.kwargs["customers"], [customer])
+        self.assertIsNone(frappe.flags.get(customer_stats.PENDING_FLAG))
@@ -3,3 +3,8 @@ from frappe.model.document import Document
 
 class OPSOrder(Document):
     pass
+
+
+def on_doctype_update():
+    # Pipeline queries partition by status and rank by due date
+    frappe.db.add_index("OPS Order", ["order_status", "production_due_date"])
@@ -0,0 +1,140 @@
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from ops_ziflow.api.order_form import get_order_enriched_data
+from ops_ziflow.utils.master_option_cache import clear_master_option_cache
+
+
+def _make_order(order_id, product_count, options_per_product=5):
+    masters = []
+    for i in range(options_per_product):
+        master = frappe.get_doc({
+            "doctype": "OPS Master Option Attribute",
+            "attribute_key": f"test-{order_id}-{i}",
+            "master_attribute_id": 900000 + i,
+        })
+        master.flags.ignore_mandatory = True
+        master.insert(ignore_permissions=True)
+        masters.append(master.name)
+
+    order = frappe.get_doc({
+        "doctype": "OPS Order",
+        "ops_order_id": order_id,
+        "order_status": "Order Completed",
+        "order_amount": 100,
+        "sync_in_progress": 1,
+        "ops_order_products": [
+            {
+                "orders_products_id": int(order_id) * 100 + p,
+                "product_id": p,
+                "products_name": f"Product {p}",
+                "products_quantity": 1,
+                "final_price": 10,
+            }
+            for p in range(product_count)
+        ],
+        "order_product_options": [
+            {
+                "orders_products_id": int(order_id) * 100 + p,
+                "option_name": f"Option {i}",
+                "option_value": "Value",
+                "master_option": masters[i],
+            }
+            for p in range(product_count)
+            for i in range(options_per_product)
+        ],
+    })
+    order.flags.ignore_mandatory = True
+    order.flags.ignore_links = True
+    order.insert(ignore_permissions=True)
+    return order.name
+
+
+class TestOrderFormQueryCount(FrappeTestCase):
+    """Benchmark: loading the order form must not issue queries per product/option."""
+
+    def _count_queries(self, order_name):
+        clear_master_option_cache()
+        with patch.object(frappe.db, "sql", wraps=frappe.db.sql) as sql:
+            get_order_enriched_data(order_name)
+        return sql.call_count
+
+    def test_query_count_is_independent_of_order_size(self):
+        small = _make_order("9900001", product_count=1)
+        large = _make_order("9900002", product_count=10)
+
+        self.assertEqual(self._count_queries(small), self._count_queries(large))
+
+    def test_master_options_served_from_cache(self):
+        order = _make_order("9900003", product_count=3)
+        cold = self._count_queries(order)
+
+        with patch.object(frappe.db, "sql", wraps=frappe.db.sql) as sql:
+            result = get_order_enriched_data(order)
+
+        self.assertLess(sql.call_count, cold)
+        self.assertEqual(len(result["products"]), 3)
+
+
+class TestOrdersListPaging(FrappeTestCase):
+    """Keyset pages must add up to the offset listing, with products attached per order."""
+
+    def setUp(self):
+        # Three orders share a timestamp so the name tie-break is exercised
+        for i, purchased in enumerate(["2002-05-01 10:00:00"] * 3 + ["2002-05-02 09:00:00", "2002-05-03 08:00:00"]):
+            order = frappe.get_doc({
+                "doctype": "OPS Order",
+                "ops_order_id": f"996000{i}",
+                "order_status": "New Order",
+                "orders_status_id": 1,
+                "order_amount": 10,
+                "date_purchased": purchased,
+                "sync_in_progress": 1,
+                "ops_order_products": [
+                    {"orders_products_id": 99600000 + i, "product_id": i, "products_name": f"Paging {i}",
+                     "products_quantity": 1, "final_price": 10},
+                ],
+            })
+            order.flags.ignore_mandatory = True
+            order.flags.ignore_links = True
+            order.insert(ignore_permissions=True)
+
+    def _names(self, result):
+        return [order.name for order in result["orders"]]
+
+    def test_cursor_pages_match_offset_listing(self):
+        from ops_ziflow.api.orders_list import get_orders_with_details
+
+        filters = frappe.as_json({"from_date": "2002-05-01", "to_date": "2002-05-03"})
+        for order_by in ("date_purchased desc", "date_purchased asc"):
+            everything = get_orders_with_details(filters, limit=10, order_by=order_by, with_count=0)
+
+            paged = []
+            cursor = None
+            while True:
+                page = get_orders_with_details(filters, limit=2, order_by=order_by, cursor=cursor, with_count=0)
+                paged.extend(self._names(page))
+                cursor = page["next_cursor"]
+                if not cursor:
+                    break
+
+            self.assertEqual(len(everything["orders"]), 5)
+            self.assertEqual(paged, self._names(everything), order_by)
+
+    def test_products_are_attached_to_their_order(self):
+        from ops_ziflow.api.orders_list import get_orders_with_details
+
+        filters = frappe.as_json({"from_date": "2002-05-01", "to_date": "2002-05-03"})
+        result = get_orders_with_details(filters, limit=10, with_count=0)
+
+        for order in result["orders"]:
+            self.assertEqual([p.products_name for p in order["products"]], [f"Paging {order.name[-1]}"])
+            self.assertEqual(order["proofs"], [])
+
+    def test_invalid_cursor_is_rejected(self):
+        from ops_ziflow.api.orders_list import get_orders_with_details
+
+        with self.assertRaises(frappe.ValidationError):
+            get_orders_with_details(None, cursor="not-a-cursor")
@@ -0,0 +1,11 @@
+import frappe
+from frappe.model.document import Document
+
+
+class OPSOrderDailyStat(Document):
+    pass
+
+
+def on_doctype_update():
+    # Dashboard reads filter on purchase day and status; refreshes replace whole days
+    frappe.db.add_index("OPS Order Daily Stat", ["stat_date", "order_status"])
@@ -0,0 +1,45 @@
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from ops_ziflow.api.orders_dashboard import _get_stats_from_orders, _get_stats_from_rollup
+
+# Filtered cards; the month/today cards ignore the date filter and see the whole table
+COMPARED_KEYS = (
+    "total_orders", "active_orders", "completed_orders", "cancelled", "pending_proofs",
+    "overdue_orders", "total_revenue", "completed_revenue", "avg_order_value", "by_status",
+)
+
+
+def _make_order(order_id, status, amount, purchased, due=None, pending_proofs=0):
+    order = frappe.get_doc({
+        "doctype": "OPS Order",
+        "ops_order_id": order_id,
+        "order_status": status,
+        "orders_status_id": 1,
+        "order_amount": amount,
+        "date_purchased": purchased,
+        "production_due_date": due,
+        "pending_proof_count": pending_proofs,
+        "all_proofs_approved": 0 if pending_proofs else 1,
+        "sync_in_progress": 1,
+    })
+    order.flags.ignore_mandatory = True
+    order.flags.ignore_links = True
+    order.insert(ignore_permissions=True)
+
+
+class TestOrderDailyStat(FrappeTestCase):
+    def test_rollup_matches_raw_query(self):
+        _make_order("9940001", "Order Completed", 120, "2001-03-01 09:00:00")
+        _make_order("9940002", "In Production", 80.5, "2001-03-01 15:30:00", due="2001-03-05", pending_proofs=2)
+        _make_order("9940003", "Cancelled", 500, "2001-03-02 10:00:00")
+        _make_order("9940004", "New Order", 0, "2001-03-03 11:00:00")
+
+        raw = _get_stats_from_orders(from_date="2001-03-01", to_date="2001-03-31")
+        rollup = _get_stats_from_rollup(from_date="2001-03-01", to_date="2001-03-31")
+
+        for key in COMPARED_KEYS:
+            self.assertEqual(rollup[key], raw[key], key)
+        # Cancelled orders count as orders but not towards revenue or the average
+        self.assertEqual(raw["total_orders"], 4)
+        self.assertEqual(raw["avg_order_value"], round(200.5 / 3, 2))
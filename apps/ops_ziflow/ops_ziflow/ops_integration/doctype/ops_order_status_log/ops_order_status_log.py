@@ -0,0 +1,12 @@
+import frappe
+from frappe.model.document import Document
+
+
+class OPSOrderStatusLog(Document):
+    pass
+
+
+def on_doctype_update():
+    # Per-order history, and cycle-time analytics per status over a date range
+    frappe.db.add_index("OPS Order Status Log", ["ops_order", "changed_at"])
+    frappe.db.add_index("OPS Order Status Log", ["from_status", "changed_at"])
@@ -0,0 +1,64 @@
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import add_to_date, now_datetime
+
+from ops_ziflow.services.order_status_log import LOG_DOCTYPE, get_cycle_times, get_status_history
+
+
+def _make_order(order_id, status="New Order"):
+    order = frappe.get_doc({
+        "doctype": "OPS Order",
+        "ops_order_id": order_id,
+        "order_status": status,
+        "orders_status_id": 1,
+        "order_amount": 10,
+        "date_purchased": add_to_date(now_datetime(), hours=-2),
+        "sync_in_progress": 1,
+    })
+    order.flags.ignore_mandatory = True
+    order.flags.ignore_links = True
+    order.insert(ignore_permissions=True)
+    return order
+
+
+class TestOrderStatusLog(FrappeTestCase):
+    def test_status_changes_are_logged_with_source(self):
+        order = _make_order("9970001")
+
+        order.order_status = "In Production"
+        order.flags.status_change_source = "Quick Action"
+        order.save(ignore_permissions=True)
+
+        order.flags.status_change_source = None
+        order.order_amount = 20
+        order.save(ignore_permissions=True)  # no status change, no row
+
+        order.order_status = "Order Completed"
+        order.save(ignore_permissions=True)
+
+        history = get_status_history(order.name)
+        self.assertEqual(
+            [(h.from_status, h.to_status, h.source) for h in history],
+            [("In Production", "Order Completed", "Sync"), ("New Order", "In Production", "Quick Action")],
+        )
+        # The first transition is timed from the purchase date (about two hours earlier)
+        self.assertGreaterEqual(history[-1].seconds_in_previous, 2 * 3600 - 60)
+
+    def test_cycle_times_aggregate_across_orders(self):
+        for i, seconds in enumerate((600, 1800)):
+            frappe.get_doc({
+                "doctype": LOG_DOCTYPE,
+                "ops_order": f"99700{10 + i}",
+                "from_status": "Order Review",
+                "to_status": "In Production",
+                "changed_at": "1995-06-01 12:00:00",
+                "seconds_in_previous": seconds,
+                "source": "Manual",
+            }).db_insert()
+
+        rows = get_cycle_times("1995-06-01", "1995-06-01", statuses=["Order Review"])
+
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0].transitions, 2)
+        self.assertEqual(rows[0].avg_seconds, 1200)
+        self.assertEqual((rows[0].min_seconds, rows[0].max_seconds), (600, 1800))
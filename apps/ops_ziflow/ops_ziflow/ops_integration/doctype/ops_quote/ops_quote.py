@@ -230,3 +230,8 @@ def get_quote_summary(quote_id):
         'profit_percentage': quote.profit_percentage,
         'product_count': len(quote.quote_products or [])
     }
+
+
+def on_doctype_update():
+    # Pipeline queries partition by status and rank by quote date
+    frappe.db.add_index("OPS Quote", ["quote_status", "quote_date"])
@@ -0,0 +1,15 @@
+import frappe
+from frappe.model.document import Document
+
+
+class OPSSearchEntry(Document):
+    pass
+
+
+def on_doctype_update():
+    frappe.db.add_unique("OPS Search Entry", ["reference_doctype", "reference_name"],
+                         constraint_name="unique_search_reference")
+
+    # Frappe has no field option for FULLTEXT; create it once, like frappe's global search table
+    if not frappe.db.sql("SHOW INDEX FROM `tabOPS Search Entry` WHERE Key_name = 'content_fulltext'"):
+        frappe.db.sql("ALTER TABLE `tabOPS Search Entry` ADD FULLTEXT INDEX content_fulltext (content)")
@@ -0,0 +1,64 @@
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from ops_ziflow.api.quotes_dashboard import get_quotes_list
+from ops_ziflow.api.search import search
+from ops_ziflow.services.search_index import _parse_query
+
+
+def _make_doc(doctype, **values):
+    doc = frappe.get_doc({"doctype": doctype, "sync_in_progress": 1, **values})
+    doc.flags.ignore_mandatory = True
+    doc.flags.ignore_links = True
+    doc.insert(ignore_permissions=True)
+    return doc
+
+
+class TestSearchQueryParsing(FrappeTestCase):
+    def test_words_are_required_prefix_terms(self):
+        self.assertEqual(_parse_query("John Smith"), ("+john* +smith*", []))
+
+    def test_fragments_fall_back_to_substring_terms(self):
+        self.assertEqual(_parse_query("1234"), ("", ["1234"]))
+        self.assertEqual(_parse_query("jane@acme.co"), ("", ["jane@acme.co"]))
+        self.assertEqual(_parse_query("#ORD-1234,"), ("", ["ord-1234"]))
+        self.assertEqual(_parse_query("Mc Donald"), ("+donald*", ["mc"]))
+
+    def test_empty_query(self):
+        self.assertEqual(_parse_query("  "), ("", []))
+
+
+class TestSearchApi(FrappeTestCase):
+    # MATCH only sees committed rows, so these cases use queries served by LIKE
+
+    def test_numeric_fragment_finds_order_id(self):
+        _make_doc("OPS Order", ops_order_id="99301234", orders_status_id=1, order_amount=10,
+                  customer_name="Fragment Test")
+
+        result = search("1234", doctype="OPS Order")
+
+        self.assertIn("99301234", [row.name for row in result["results"]])
+        self.assertEqual(result["count"], len(result["results"]))
+
+    def test_partial_email_finds_quote(self):
+        quote = _make_doc("OPS Quote", quote_id=99301, quote_title="Banner",
+                          customer_email="jane@acme-print.example")
+
+        result = search("acme-print.ex", doctype="OPS Quote")
+
+        self.assertEqual([row.name for row in result["results"]], [quote.name])
+
+    def test_unknown_doctype_is_rejected(self):
+        with self.assertRaises(frappe.ValidationError):
+            search("1234", doctype="Sales Invoice")
+
+    def test_quotes_list_total_counts_every_match(self):
+        for i in range(3):
+            _make_doc("OPS Quote", quote_id=99310 + i, quote_title=f"Total test {i}",
+                      customer_email=f"buyer{i}@total-test.example")
+
+        result = get_quotes_list(customer="total-test.example", limit="2")
+
+        self.assertEqual(result["total"], 3)
+        self.assertEqual(len(result["quotes"]), 2)
+        self.assertTrue(result["has_more"])
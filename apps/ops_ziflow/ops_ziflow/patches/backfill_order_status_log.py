@@ -0,0 +1,7 @@
+"""Seed OPS Order Status Log with historical transitions recorded in Version."""
+
+from ops_ziflow.services.order_status_log import backfill_from_versions
+
+
+def execute():
+    backfill_from_versions()
@@ -0,0 +1,7 @@
+"""Populate OPS Customer 360 Stat for existing customers."""
+
+from ops_ziflow.services.customer_stats import reconcile_customer_stats
+
+
+def execute():
+    reconcile_customer_stats()
@@ -0,0 +1,7 @@
+"""Populate OPS Order Daily Stat from existing orders (dashboard rollup)."""
+
+from ops_ziflow.services.order_stats import rebuild_order_stats
+
+
+def execute():
+    rebuild_order_stats()
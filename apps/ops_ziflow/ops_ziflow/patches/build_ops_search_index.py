@@ -0,0 +1,7 @@
+"""Build the OPS Order/Quote full-text search index from existing documents."""
+
+from ops_ziflow.services.search_index import rebuild_search_index
+
+
+def execute():
+    rebuild_search_index()
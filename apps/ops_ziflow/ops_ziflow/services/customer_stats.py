@@ -0,0 +1,259 @@
+"""Precomputed Customer 360 counters (OPS Customer 360 Stat).
+
+One row per ERPNext Customer holds the tab badge counts (orders in the last 12
+months, proofs, communications in the last 6 months) plus lifetime order count
+and revenue, so opening a Customer form is a single-row read.
+
+Doc events on OPS Order, OPS ZiFlow Proof, Communication and Customer collect the
+affected customers in ``frappe.flags`` for the current transaction; one
+after-commit callback then enqueues a single job for all of them, so a sync batch
+touching many orders of one account recomputes it once. Rolling windows shift daily, and ``reconcile_customer_stats``
+(scheduled daily) recomputes every row set-based.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, Optional
+
+import frappe
+from frappe.utils import add_months, flt, cint, now_datetime, nowdate
+
+STAT_DOCTYPE = "OPS Customer 360 Stat"
+NON_REVENUE_STATUSES = ("Cancelled", "Refunded")
+PENDING_FLAG = "customer_360_stat_refresh"
+
+
+def _customers_for_ops_customer(ops_customer: Optional[str]) -> List[str]:
+    if not ops_customer:
+        return []
+    return frappe.get_all("Customer", filters={"ops_corporate_id": ops_customer}, pluck="name")
+
+
+def queue_refresh(customers) -> None:
+    """Refresh the given ERPNext Customers in the background once the transaction commits.
+
+    Customers accumulate in a per-transaction set; the first call registers the
+    callback that enqueues them all with one job, a rollback drops them.
+    """
+    customers = {c for c in customers if c}
+    if not customers:
+        return
+
+    pending = frappe.flags.get(PENDING_FLAG)
+    if pending is None:
+        pending = frappe.flags[PENDING_FLAG] = set()
+        frappe.db.after_commit.add(_enqueue_pending_refreshes)
+        frappe.db.after_rollback.add(_discard_pending_refreshes)
+    pending.update(customers)
+
+
+def _enqueue_pending_refreshes() -> None:
+    customers = frappe.flags.pop(PENDING_FLAG, None)
+    if customers:
+        frappe.enqueue(
+            "ops_ziflow.services.customer_stats.refresh_customers",
+            queue="short",
+            customers=sorted(customers),
+        )
+
+
+def _discard_pending_refreshes() -> None:
+    frappe.flags.pop(PENDING_FLAG, None)
+
+
+def queue_refresh_for_ops_customers(*ops_customers) -> None:
+    customers = []
+    for ops_customer in set(o for o in ops_customers if o):
+        customers.extend(_customers_for_ops_customer(ops_customer))
+    queue_refresh(customers)
+
+
+def _compute(customer: str, ops_customer: Optional[str]) -> Dict:
+    """Counters for one customer (all queries indexed on the customer keys)."""
+    stats = {
+        "orders_12m": 0,
+        "orders_total": 0,
+        "proofs": 0,
+        "communications_6m": 0,
+        "lifetime_revenue": 0,
+    }
+
+    if ops_customer:
+        orders = frappe.db.sql("""
+            SELECT
+                SUM(CASE WHEN orders_date_finished >= %(since)s THEN 1 ELSE 0 END) AS orders_12m,
+                COUNT(*) AS orders_total,
+                SUM(CASE WHEN order_status NOT IN %(non_revenue)s THEN order_amount ELSE 0 END) AS revenue
+            FROM `tabOPS Order`
+            WHERE erp_customer = %(ops_customer)s
+        """, {
+            "since": add_months(nowdate(), -12),
+            "non_revenue": NON_REVENUE_STATUSES,
+            "ops_customer": ops_customer,
+        }, as_dict=True)[0]
+        stats["orders_12m"] = cint(orders.orders_12m)
+        stats["orders_total"] = cint(orders.orders_total)
+        stats["lifetime_revenue"] = flt(orders.revenue)
+
+        stats["proofs"] = cint(frappe.db.sql("""
+            SELECT COUNT(*)
+            FROM `tabOPS ZiFlow Proof` p
+            JOIN `tabOPS Order` o ON o.name = p.ops_order
+            WHERE o.erp_customer = %s
+        """, (ops_customer,))[0][0])
+
+    stats["communications_6m"] = frappe.db.count("Communication", filters={
+        "reference_doctype": "Customer",
+        "reference_name": customer,
+        "communication_date": [">=", add_months(nowdate(), -6)],
+    })
+    return stats
+
+
+def _write(customer: str, ops_customer: Optional[str], stats: Dict) -> None:
+    now = now_datetime()
+    frappe.db.sql(f"""
+        INSERT INTO `tab{STAT_DOCTYPE}`
+            (name, creation, modified, owner, modified_by, docstatus, customer, ops_customer, refreshed_at,
+             orders_12m, orders_total, proofs, communications_6m, lifetime_revenue)
+        VALUES (%(customer)s, %(now)s, %(now)s, %(user)s, %(user)s, 0, %(customer)s, %(ops_customer)s, %(now)s,
+             %(orders_12m)s, %(orders_total)s, %(proofs)s, %(communications_6m)s, %(lifetime_revenue)s)
+        ON DUPLICATE KEY UPDATE
+            ops_customer = VALUES(ops_customer), refreshed_at = VALUES(refreshed_at),
+            modified = VALUES(modified), orders_12m = VALUES(orders_12m),
+            orders_total = VALUES(orders_total), proofs = VALUES(proofs),
+            communications_6m = VALUES(communications_6m), lifetime_revenue = VALUES(lifetime_revenue)
+    """, dict(stats, customer=customer, ops_customer=ops_customer, now=now, user=frappe.session.user))
+
+
+def refresh_customer(customer: str) -> Dict:
+    """Recompute and store the counters for one ERPNext Customer."""
+    if not frappe.db.exists("Customer", customer):
+        frappe.db.delete(STAT_DOCTYPE, {"customer": customer})
+        return {}
+
+    ops_customer = frappe.db.get_value("Customer", customer, "ops_corporate_id")
+    stats = _compute(customer, ops_customer)
+    _write(customer, ops_customer, stats)
+    return stats
+
+
+def refresh_customers(customers: List[str]) -> None:
+    """Background job: recompute the counters for each customer queued in one transaction."""
+    for customer in customers:
+        refresh_customer(customer)
+
+
+def get_customer_stats(customer: str) -> Dict:
+    """Counters for the Customer 360 badges; computed on first access for customers without a row."""
+    row = frappe.db.get_value(
+        STAT_DOCTYPE, customer,
+        ["orders_12m", "orders_total", "proofs", "communications_6m", "lifetime_revenue"],
+        as_dict=True,
+    )
+    return row or refresh_customer(customer)
+
+
+# ---------------------------------------------------------------------------
+# Doc events
+# ---------------------------------------------------------------------------
+
+def handle_order_change(doc, method: Optional[str] = None) -> None:
+    """OPS Order on_update/after_delete."""
+    before = doc.get_doc_before_save() if method == "on_update" else None
+    queue_refresh_for_ops_customers(doc.get("erp_customer"), before.get("erp_customer") if before else None)
+
+
+def handle_proof_change(doc, method: Optional[str] = None) -> None:
+    """OPS ZiFlow Proof after_insert/on_update/after_delete (proof counts only move when the order link does)."""
+    before = doc.get_doc_before_save() if method == "on_update" else None
+    if before and before.get("ops_order") == doc.get("ops_order"):
+        return
+
+    orders = {doc.get("ops_order"), before.get("ops_order") if before else None}
+    orders.discard(None)
+    if not orders:
+        return
+    ops_customers = frappe.get_all("OPS Order", filters={"name": ["in", list(orders)]}, pluck="erp_customer")
+    queue_refresh_for_ops_customers(*ops_customers)
+
+
+def handle_communication_change(doc, method: Optional[str] = None) -> None:
+    """Communication after_insert/on_trash for communications linked to a Customer."""
+    if doc.get("reference_doctype") == "Customer":
+        queue_refresh([doc.get("reference_name")])
+
+
+def handle_customer_update(doc, method: Optional[str] = None) -> None:
+    """Customer on_update: the OPS link decides which orders count."""
+    before = doc.get_doc_before_save()
+    if before and before.get("ops_corporate_id") != doc.get("ops_corporate_id"):
+        queue_refresh([doc.name])
+
+
+# ---------------------------------------------------------------------------
+# Reconcile
+# ---------------------------------------------------------------------------
+
+def reconcile_customer_stats() -> Dict[str, int]:
+    """Recompute all counters with a handful of grouped queries (daily scheduler job).
+
+    Covers customers linked to OPS, customers with recent communications and
+    customers that already have a row (so stale rows drop to zero).
+    """
+    twelve_months_ago = add_months(nowdate(), -12)
+    six_months_ago = add_months(nowdate(), -6)
+
+    links = frappe.db.sql("""
+        SELECT name, ops_corporate_id FROM `tabCustomer`
+        WHERE IFNULL(ops_corporate_id, '') != ''
+    """)
+    ops_customer_of = {customer: ops_customer for customer, ops_customer in links}
+
+    orders = {
+        row.erp_customer: row
+        for row in frappe.db.sql("""
+            SELECT
+                erp_customer,
+                SUM(CASE WHEN orders_date_finished >= %(since)s THEN 1 ELSE 0 END) AS orders_12m,
+                COUNT(*) AS orders_total,
+                SUM(CASE WHEN order_status NOT IN %(non_revenue)s THEN order_amount ELSE 0 END) AS revenue
+            FROM `tabOPS Order`
+            WHERE IFNULL(erp_customer, '') != ''
+            GROUP BY erp_customer
+        """, {"since": twelve_months_ago, "non_revenue": NON_REVENUE_STATUSES}, as_dict=True)
+    }
+    proofs = dict(frappe.db.sql("""
+        SELECT o.erp_customer, COUNT(*)
+        FROM `tabOPS ZiFlow Proof` p
+        JOIN `tabOPS Order` o ON o.name = p.ops_order
+        WHERE IFNULL(o.erp_customer, '') != ''
+        GROUP BY o.erp_customer
+    """))
+    communications = dict(frappe.db.sql("""
+        SELECT reference_name, COUNT(*)
+        FROM `tabCommunication`
+        WHERE reference_doctype = 'Customer' AND communication_date >= %s
+        GROUP BY reference_name
+    """, (six_months_ago,)))
+
+    existing = frappe.get_all(STAT_DOCTYPE, pluck="name")
+    valid = set(frappe.get_all("Customer", filters={"name": ["in", existing]}, pluck="name")) if existing else set()
+    orphaned = [name for name in existing if name not in valid]
+    if orphaned:
+        frappe.db.delete(STAT_DOCTYPE, {"name": ["in", orphaned]})
+
+    customers = set(ops_customer_of) | set(communications) | valid
+    for customer in customers:
+        ops_customer = ops_customer_of.get(customer)
+        order_row = orders.get(ops_customer) if ops_customer else None
+        _write(customer, ops_customer, {
+            "orders_12m": cint(order_row.orders_12m) if order_row else 0,
+            "orders_total": cint(order_row.orders_total) if order_row else 0,
+            "proofs": cint(proofs.get(ops_customer)) if ops_customer else 0,
+            "communications_6m": cint(communications.get(customer)),
+            "lifetime_revenue": flt(order_row.revenue) if order_row else 0,
+        })
+
+    frappe.db.commit()
+    return {"customers": len(customers), "removed": len(orphaned)}
@@ -4,6 +4,8 @@ from __future__ import annotations
 
 import frappe
 
+from ops_ziflow.services.order_stats import mark_order_dirty
+
 
 def update_order_proof_summary(order_name: str) -> None:
     """Update order-level proof summary fields based on linked products."""
@@ -40,3 +42,5 @@ def update_order_proof_summary(order_name: str) -> None:
         "pending_proof_count": len(pending),
         "ziflow_proofs_html": summary_html,
     })
+    # db.set_value skips doc hooks; keep the dashboard rollup's pending-proof counts current
+    mark_order_dirty(order_name)
@@ -0,0 +1,158 @@
+"""Materialized OPS Order statistics (OPS Order Daily Stat).
+
+Orders are rolled up per purchase day, status and production due bucket
+(Overdue / Due Soon / Later, relative to the day the row was refreshed) so the
+Orders dashboard cards can be answered with a single indexed read. Buckets age
+with the calendar, so the daily full rebuild also moves orders into "Overdue".
+
+Maintenance is incremental and day-granular: any change to an order marks the
+purchase day(s) it touches as dirty, and a dirty day is rebuilt from
+``tabOPS Order`` (delete + re-aggregate that day only). Interactive saves refresh
+immediately; sync batches call ``start_batch()`` so days are collected and
+refreshed once before the batch commits. ``rebuild_order_stats`` is the
+scheduled safety net for writes that bypass document hooks.
+"""
+
+from __future__ import annotations
+
+from typing import Iterable, List, Optional
+
+import frappe
+from frappe.utils import add_days, getdate, now_datetime, nowdate
+
+STAT_DOCTYPE = "OPS Order Daily Stat"
+DUE_SOON_DAYS = 7
+
+# Aggregation shared by day refreshes and full rebuilds
+_AGGREGATE_SQL = """
+    SELECT
+        DATE(date_purchased) AS stat_date,
+        order_status,
+        CASE
+            WHEN production_due_date IS NULL THEN NULL
+            WHEN production_due_date < %(today)s THEN 'Overdue'
+            WHEN production_due_date < %(due_soon)s THEN 'Due Soon'
+            ELSE 'Later'
+        END AS due_bucket,
+        COUNT(*) AS order_count,
+        COALESCE(SUM(order_amount), 0) AS order_amount,
+        SUM(CASE WHEN all_proofs_approved = 0 AND pending_proof_count > 0 THEN 1 ELSE 0 END)
+            AS pending_proof_orders
+    FROM `tabOPS Order`
+    WHERE {condition}
+    GROUP BY DATE(date_purchased), order_status, due_bucket
+"""
+
+
+def _aggregate(condition: str, **values) -> List[dict]:
+    today = getdate(nowdate())
+    values.update(today=today, due_soon=add_days(today, DUE_SOON_DAYS))
+    return frappe.db.sql(_AGGREGATE_SQL.format(condition=condition), values, as_dict=True)
+
+
+def _stat_day(value):
+    return getdate(value) if value else None
+
+
+def _insert_rows(rows: List[dict]) -> None:
+    if not rows:
+        return
+
+    now = now_datetime()
+    user = frappe.session.user
+    fields = [
+        "name", "creation", "modified", "owner", "modified_by",
+        "stat_date", "order_status", "due_bucket",
+        "order_count", "order_amount", "pending_proof_orders",
+    ]
+    values = [
+        (
+            frappe.generate_hash(length=10), now, now, user, user,
+            row.stat_date, row.order_status, row.due_bucket,
+            row.order_count, row.order_amount, row.pending_proof_orders,
+        )
+        for row in rows
+    ]
+    frappe.db.bulk_insert(STAT_DOCTYPE, fields, values)
+
+
+def refresh_days(days: Iterable) -> None:
+    """Rebuild the rollup rows for the given purchase days (None = orders without a date)."""
+    for day in set(days):
+        if day is None:
+            frappe.db.sql(f"DELETE FROM `tab{STAT_DOCTYPE}` WHERE stat_date IS NULL")
+            rows = _aggregate("date_purchased IS NULL")
+        else:
+            day = getdate(day)
+            frappe.db.sql(f"DELETE FROM `tab{STAT_DOCTYPE}` WHERE stat_date = %s", (day,))
+            # Range on the raw column so the date_purchased index is used
+            rows = _aggregate(
+                "date_purchased >= %(start)s AND date_purchased < %(end)s",
+                start=day,
+                end=add_days(day, 1),
+            )
+        _insert_rows(rows)
+
+
+def start_batch() -> None:
+    """Defer day refreshes until ``flush_dirty_days``/``finish_batch`` (used by sync jobs)."""
+    if frappe.flags.ops_order_stat_days is None:
+        frappe.flags.ops_order_stat_days = set()
+
+
+def flush_dirty_days() -> None:
+    """Refresh the days collected so far in the current batch; call before committing."""
+    days = frappe.flags.ops_order_stat_days
+    if days:
+        refresh_days(days)
+        days.clear()
+
+
+def finish_batch() -> None:
+    """Refresh remaining days and go back to immediate refreshes."""
+    flush_dirty_days()
+    frappe.flags.ops_order_stat_days = None
+
+
+def mark_days_dirty(*days) -> None:
+    """Refresh the given purchase days now, or collect them when a batch is open."""
+    batch = frappe.flags.ops_order_stat_days
+    if batch is not None:
+        batch.update(days)
+    else:
+        refresh_days(days)
+
+
+def mark_order_dirty(order_name: str) -> None:
+    """Refresh the rollup for an order updated outside document hooks (db.set_value)."""
+    if not order_name:
+        return
+    date_purchased = frappe.db.get_value("OPS Order", order_name, "date_purchased")
+    mark_days_dirty(_stat_day(date_purchased))
+
+
+def handle_order_update(doc, method: Optional[str] = None) -> None:
+    """OPS Order on_update hook: refresh the old and new purchase day."""
+    days = {_stat_day(doc.get("date_purchased"))}
+    before = doc.get_doc_before_save()
+    if before:
+        days.add(_stat_day(before.get("date_purchased")))
+    mark_days_dirty(*days)
+
+
+def handle_order_delete(doc, method: Optional[str] = None) -> None:
+    """OPS Order after_delete hook."""
+    mark_days_dirty(_stat_day(doc.get("date_purchased")))
+
+
+def rebuild_order_stats() -> dict:
+    """Rebuild the whole rollup from tabOPS Order.
+
+    Scheduled daily to repair drift from bulk SQL updates and to re-bucket due
+    dates as they pass; safe to run any time.
+    """
+    rows = _aggregate("1=1")
+    frappe.db.sql(f"DELETE FROM `tab{STAT_DOCTYPE}`")
+    _insert_rows(rows)
+    frappe.db.commit()
+    return {"rows": len(rows)}
@@ -0,0 +1,173 @@
+"""Append-only OPS Order status transition log (OPS Order Status Log).
+
+Every status change saved on an OPS Order (sync, quick actions, bulk updates,
+desk edits) is recorded with the time spent in the previous status, so order
+history is one indexed query and cycle times can be aggregated across orders
+without touching Version.
+
+Callers can tag the origin of a change with
+``doc.flags.status_change_source`` ("Quick Action", "Bulk Update", ...); orders
+saved by the OnPrintShop sync are tagged "Sync" automatically.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, List, Optional
+
+import frappe
+from frappe.utils import cint, get_datetime, now_datetime
+
+LOG_DOCTYPE = "OPS Order Status Log"
+BACKFILL_CHUNK = 1000
+
+
+def _insert_log(order_name, from_status, to_status, changed_at, seconds_in_previous, source, changed_by):
+    frappe.db.sql(f"""
+        INSERT INTO `tab{LOG_DOCTYPE}`
+            (name, creation, modified, owner, modified_by, docstatus,
+             ops_order, from_status, to_status, changed_at, seconds_in_previous, source, changed_by)
+        VALUES (%(name)s, %(now)s, %(now)s, %(user)s, %(user)s, 0,
+             %(order)s, %(from_status)s, %(to_status)s, %(changed_at)s, %(seconds)s, %(source)s, %(changed_by)s)
+    """, {
+        "name": frappe.generate_hash(length=10),
+        "now": now_datetime(),
+        "user": frappe.session.user,
+        "order": order_name,
+        "from_status": from_status,
+        "to_status": to_status,
+        "changed_at": changed_at,
+        "seconds": seconds_in_previous,
+        "source": source,
+        "changed_by": changed_by,
+    })
+
+
+def _entered_previous_status(doc) -> Optional[Any]:
+    """When the order entered its current (pre-change) status."""
+    last = frappe.db.sql(f"""
+        SELECT changed_at FROM `tab{LOG_DOCTYPE}`
+        WHERE ops_order = %s
+        ORDER BY changed_at DESC
+        LIMIT 1
+    """, (doc.name,))
+    if last:
+        return last[0][0]
+    # No transition logged yet: the order has been in this status since it was placed
+    return doc.get("date_purchased") or doc.get("creation")
+
+
+def log_status_change(doc, method: Optional[str] = None) -> None:
+    """OPS Order on_update hook: append a transition when order_status changed."""
+    before = doc.get_doc_before_save()
+    from_status = before.get("order_status") if before else None
+    to_status = doc.get("order_status")
+    if from_status == to_status:
+        return
+
+    changed_at = now_datetime()
+    seconds_in_previous = None
+    if from_status:
+        entered = _entered_previous_status(doc)
+        if entered:
+            seconds_in_previous = max(int((changed_at - get_datetime(entered)).total_seconds()), 0)
+
+    source = doc.flags.status_change_source or ("Sync" if cint(doc.get("sync_in_progress")) else "Manual")
+    _insert_log(doc.name, from_status, to_status, changed_at, seconds_in_previous, source, frappe.session.user)
+
+
+def get_status_history(order_name: str) -> List[Dict[str, Any]]:
+    """Full status history of an order, newest first."""
+    return frappe.db.sql(f"""
+        SELECT changed_at AS date, from_status, to_status, seconds_in_previous, source, changed_by
+        FROM `tab{LOG_DOCTYPE}`
+        WHERE ops_order = %s
+        ORDER BY changed_at DESC
+    """, (order_name,), as_dict=True)
+
+
+def get_cycle_times(from_date=None, to_date=None, statuses: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """Time orders spent in each status, for transitions out of it within the date range.
+
+    Returns:
+        [{"status", "transitions", "avg_seconds", "min_seconds", "max_seconds"}, ...]
+    """
+    conditions = ["from_status IS NOT NULL", "seconds_in_previous IS NOT NULL"]
+    values = {}
+    if from_date:
+        conditions.append("changed_at >= %(from_date)s")
+        values["from_date"] = get_datetime(from_date)
+    if to_date:
+        conditions.append("changed_at < DATE_ADD(%(to_date)s, INTERVAL 1 DAY)")
+        values["to_date"] = get_datetime(to_date).date()
+    if statuses:
+        conditions.append("from_status IN %(statuses)s")
+        values["statuses"] = statuses
+
+    return frappe.db.sql(f"""
+        SELECT
+            from_status AS status,
+            COUNT(*) AS transitions,
+            ROUND(AVG(seconds_in_previous)) AS avg_seconds,
+            MIN(seconds_in_previous) AS min_seconds,
+            MAX(seconds_in_previous) AS max_seconds
+        FROM `tab{LOG_DOCTYPE}`
+        WHERE {" AND ".join(conditions)}
+        GROUP BY from_status
+        ORDER BY avg_seconds DESC
+    """, values, as_dict=True)
+
+
+def backfill_from_versions() -> Dict[str, int]:
+    """One-off import of historical order_status changes from Version rows.
+
+    Orders that already have log entries are skipped, so it is safe to re-run.
+    """
+    logged = {row[0] for row in frappe.db.sql(f"SELECT DISTINCT ops_order FROM `tab{LOG_DOCTYPE}`")}
+    inserted = 0
+    last_name = ""
+
+    while True:
+        versions = frappe.db.sql("""
+            SELECT name, docname, data, creation, owner
+            FROM `tabVersion`
+            WHERE ref_doctype = 'OPS Order' AND name > %s
+            ORDER BY name
+            LIMIT %s
+        """, (last_name, BACKFILL_CHUNK), as_dict=True)
+        if not versions:
+            break
+        last_name = versions[-1].name
+
+        for v in versions:
+            if v.docname in logged:
+                continue
+            try:
+                data = json.loads(v.data) if isinstance(v.data, str) else (v.data or {})
+            except ValueError:
+                continue
+            for change in data.get("changed") or []:
+                if len(change) >= 3 and change[0] == "order_status" and change[1] != change[2]:
+                    _insert_log(v.docname, change[1], change[2], v.creation, None, "Backfill", v.owner)
+                    inserted += 1
+
+        frappe.db.commit()
+
+    _backfill_durations()
+    frappe.db.commit()
+    return {"inserted": inserted}
+
+
+def _backfill_durations() -> None:
+    """Derive seconds_in_previous for backfilled rows from the preceding transition."""
+    frappe.db.sql(f"""
+        UPDATE `tab{LOG_DOCTYPE}` l
+        JOIN (
+            SELECT name, TIMESTAMPDIFF(SECOND,
+                LAG(changed_at) OVER (PARTITION BY ops_order ORDER BY changed_at),
+                changed_at) AS seconds
+            FROM `tab{LOG_DOCTYPE}`
+        ) d ON d.name = l.name
+        SET l.seconds_in_previous = d.seconds
+        WHERE l.source = 'Backfill' AND l.seconds_in_previous IS NULL AND d.seconds IS NOT NULL
+    """)
@@ -10,7 +10,9 @@ from typing import Any, Dict, List, Optional
 import frappe
 from frappe.utils import now_datetime, cint, flt, get_datetime
 
+from ops_ziflow.services import order_stats
 from ops_ziflow.services.onprintshop_client import OnPrintShopClient
+from ops_ziflow.utils.dashboard_cache import invalidate_dashboards
 
 
 def _sanitize_date(value: str) -> str:
@@ -220,6 +222,9 @@ def poll_onprintshop_orders() -> Dict[str, Any]:
 
         frappe.logger().info(f"[OPS Order Sync] Fetched {len(order_list)} orders from OnPrintShop")
 
+        # Refresh dashboard rollup once per touched day instead of per order
+        order_stats.start_batch()
+
         for order_data in order_list:
             try:
                 orders_id = order_data.get("orders_id")
@@ -263,6 +268,8 @@ def poll_onprintshop_orders() -> Dict[str, Any]:
             SET sync_in_progress = 0
             WHERE sync_in_progress = 1
         """)
+        order_stats.finish_batch()
+        invalidate_dashboards("orders")
         frappe.db.commit()
 
         # Update last sync timestamp in cache
@@ -905,6 +912,7 @@ def sync_recent_orders(limit: int = 50) -> Dict:
         synced = 0
         errors = 0
 
+        order_stats.start_batch()
         for order_data in orders:
             try:
                 orders_id = order_data.get("orders_id")
@@ -918,6 +926,8 @@ def sync_recent_orders(limit: int = 50) -> Dict:
                     title="Sync Recent Orders Error"
                 )
 
+        order_stats.finish_batch()
+        invalidate_dashboards("orders")
         frappe.db.commit()
 
         return {
@@ -1004,6 +1014,7 @@ def full_sync_from_ops(batch_size: int = 50) -> Dict:
 
         frappe.logger().info(f"[OPS Order Full Sync] Fetched {len(all_orders)} orders")
 
+        order_stats.start_batch()
         for order_data in all_orders:
             try:
                 orders_id = order_data.get("orders_id")
@@ -1023,6 +1034,7 @@ def full_sync_from_ops(batch_size: int = 50) -> Dict:
 
                     # Commit every 50 records
                     if stats["synced"] % 50 == 0:
+                        order_stats.flush_dirty_days()
                         frappe.db.commit()
                         frappe.logger().info(f"[OPS Order Full Sync] Progress: {stats['synced']}/{len(all_orders)}")
 
@@ -1039,6 +1051,8 @@ def full_sync_from_ops(batch_size: int = 50) -> Dict:
                     auto_retry=True,
                 )
 
+        order_stats.finish_batch()
+        invalidate_dashboards("orders")
         frappe.db.commit()
         stats["end_time"] = now_datetime()
         frappe.logger().info(f"[OPS Order Full Sync] Completed: {stats}")
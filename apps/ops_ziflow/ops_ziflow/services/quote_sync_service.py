@@ -11,6 +11,7 @@ from frappe.utils import now_datetime, cint, flt
 
 from ops_ziflow.services.onprintshop_client import OnPrintShopClient
 from ops_ziflow.ops_integration.doctype.ops_quote.ops_quote import sync_quote_from_onprintshop
+from ops_ziflow.utils.dashboard_cache import invalidate_dashboards
 
 
 def _log_ops_error(
@@ -142,6 +143,7 @@ def poll_onprintshop_quotes(batch_size: int = 200) -> Dict[str, Any]:
 
         # Clear sync_in_progress flags
         frappe.db.sql("UPDATE `tabOPS Quote` SET sync_in_progress = 0 WHERE sync_in_progress = 1")
+        invalidate_dashboards("quotes")
         frappe.db.commit()
 
         # Update last synced ID
@@ -268,6 +270,7 @@ def full_import_quotes(batch_size: int = 100, delay: float = 1.0) -> Dict[str, A
                         auto_retry=True,
                     )
 
+        invalidate_dashboards("quotes")
         frappe.db.commit()
 
         # Store max quote_id for incremental sync
@@ -552,6 +555,7 @@ def full_sync_from_ops(batch_size: int = 50) -> Dict:
                     auto_retry=True,
                 )
 
+        invalidate_dashboards("quotes")
         frappe.db.commit()
         stats["end_time"] = now_datetime()
         frappe.logger().info(f"[OPS Quote Full Sync] Completed: {stats}")
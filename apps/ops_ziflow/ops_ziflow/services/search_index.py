@@ -0,0 +1,242 @@
+"""Full-text search over OPS Orders and OPS Quotes.
+
+Each order/quote has one OPS Search Entry row whose ``content`` (FULLTEXT
+indexed) holds its id, customer name/email/company, tracking number and product
+names. Rows are kept current by doc events on the parent documents and can be
+rebuilt with ``rebuild_search_index``.
+
+Queries run in boolean mode with every word required and prefix-matched, ranked
+by MATCH relevance. FULLTEXT only matches at the start of a word, so terms that
+are usually typed as fragments - anything with a digit (order ids, tracking
+numbers), an ``@`` or a ``.`` (emails, domains) - are matched as substrings with
+LIKE over the (much smaller) entry table instead, as are words shorter than the
+InnoDB minimum token size. "1234" therefore still finds "ORD001234".
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+import frappe
+from frappe.utils import now_datetime
+
+SEARCH_DOCTYPE = "OPS Search Entry"
+MIN_TOKEN_SIZE = 3  # innodb_ft_min_token_size default
+REBUILD_CHUNK = 500
+
+SEARCH_SOURCES = {
+    "OPS Order": {
+        "id_field": "ops_order_id",
+        "title_fields": ("ops_order_id", "customer_name"),
+        "fields": ("ops_order_id", "customer_name", "customer_email", "customer_company",
+                   "tracking_number"),
+        "child_doctype": "OPS Order Product",
+        "child_table": "ops_order_products",
+        "child_fields": ("products_name", "products_title", "products_sku"),
+    },
+    "OPS Quote": {
+        "id_field": "quote_id",
+        "title_fields": ("quote_id", "quote_title"),
+        "fields": ("quote_id", "quote_title", "customer_name", "customer_email", "customer_company"),
+        "child_doctype": "OPS Quote Product",
+        "child_table": "quote_products",
+        "child_fields": ("products_name", "products_title", "quote_product_sku"),
+    },
+}
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+_SUBSTRING_RE = re.compile(r"[\d@.]")
+_EDGE_PUNCTUATION_RE = re.compile(r"^\W+|\W+$", re.UNICODE)
+
+
+def _compose(source: Dict, values, child_rows) -> Tuple[str, str]:
+    """Build (title, content) for a document from its field values and product rows."""
+    parts = [values.get(f) for f in source["fields"]]
+    for row in child_rows:
+        parts.extend(row.get(f) for f in source["child_fields"])
+    content = " ".join(str(p) for p in parts if p not in (None, ""))
+
+    title = " - ".join(str(values.get(f)) for f in source["title_fields"] if values.get(f))
+    return title[:140], content
+
+
+def _upsert(entries: List[Tuple[str, str, str, str]]) -> None:
+    """Insert or replace (reference_doctype, reference_name, title, content) rows."""
+    if not entries:
+        return
+
+    now = now_datetime()
+    user = frappe.session.user
+    frappe.db.sql(f"""
+        INSERT INTO `tab{SEARCH_DOCTYPE}`
+            (name, creation, modified, owner, modified_by, docstatus,
+             reference_doctype, reference_name, title, content)
+        VALUES {", ".join(["(%s, %s, %s, %s, %s, 0, %s, %s, %s, %s)"] * len(entries))}
+        ON DUPLICATE KEY UPDATE
+            title = VALUES(title), content = VALUES(content), modified = VALUES(modified)
+    """, [
+        value
+        for doctype, name, title, content in entries
+        for value in (frappe.generate_hash(length=10), now, now, user, user, doctype, name, title, content)
+    ])
+
+
+def index_document(doc) -> None:
+    """Index an in-memory OPS Order/OPS Quote (child rows are read from the document)."""
+    source = SEARCH_SOURCES.get(doc.doctype)
+    if not source:
+        return
+    title, content = _compose(source, doc, doc.get(source["child_table"]) or [])
+    _upsert([(doc.doctype, doc.name, title, content)])
+
+
+def handle_document_update(doc, method: Optional[str] = None) -> None:
+    """on_update hook for OPS Order and OPS Quote."""
+    index_document(doc)
+
+
+def handle_document_delete(doc, method: Optional[str] = None) -> None:
+    """after_delete hook for OPS Order and OPS Quote."""
+    frappe.db.delete(SEARCH_DOCTYPE, {"reference_doctype": doc.doctype, "reference_name": doc.name})
+
+
+def rebuild_search_index(doctype: Optional[str] = None) -> Dict[str, int]:
+    """Re-index every order/quote in chunks (two queries per chunk) and drop orphaned entries."""
+    stats = {}
+    for source_doctype, source in SEARCH_SOURCES.items():
+        if doctype and doctype != source_doctype:
+            continue
+
+        indexed = 0
+        last_name = ""
+        while True:
+            parents = frappe.db.sql(f"""
+                SELECT name, {", ".join(f"`{f}`" for f in source["fields"])}
+                FROM `tab{source_doctype}`
+                WHERE name > %(last_name)s
+                ORDER BY name
+                LIMIT %(limit)s
+            """, {"last_name": last_name, "limit": REBUILD_CHUNK}, as_dict=True)
+            if not parents:
+                break
+
+            names = [p.name for p in parents]
+            children = {}
+            for row in frappe.db.sql(f"""
+                SELECT parent, {", ".join(f"`{f}`" for f in source["child_fields"])}
+                FROM `tab{source["child_doctype"]}`
+                WHERE parent IN %(names)s AND parenttype = %(doctype)s
+                ORDER BY parent, idx
+            """, {"names": names, "doctype": source_doctype}, as_dict=True):
+                children.setdefault(row.parent, []).append(row)
+
+            _upsert([
+                (source_doctype, p.name, *_compose(source, p, children.get(p.name, [])))
+                for p in parents
+            ])
+            frappe.db.commit()
+
+            indexed += len(parents)
+            last_name = names[-1]
+
+        frappe.db.sql(f"""
+            DELETE e FROM `tab{SEARCH_DOCTYPE}` e
+            LEFT JOIN `tab{source_doctype}` d ON d.name = e.reference_name
+            WHERE e.reference_doctype = %s AND d.name IS NULL
+        """, (source_doctype,))
+        frappe.db.commit()
+        stats[source_doctype] = indexed
+
+    return stats
+
+
+def _parse_query(text: str) -> Tuple[str, List[str]]:
+    """Split user input into a boolean-mode MATCH expression and substring (LIKE) terms."""
+    match_terms = []
+    like_terms = []
+    for term in (text or "").lower().split():
+        term = _EDGE_PUNCTUATION_RE.sub("", term)
+        if _SUBSTRING_RE.search(term):
+            like_terms.append(term)
+            continue
+        for token in _TOKEN_RE.findall(term):
+            (match_terms if len(token) >= MIN_TOKEN_SIZE else like_terms).append(token)
+    return " ".join(f"+{t}*" for t in match_terms), like_terms
+
+
+def _like_pattern(term: str) -> str:
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def match_condition(doctype: str, text: str, column: str = "name") -> Tuple[str, Dict]:
+    """SQL condition restricting ``column`` to documents matching ``text``.
+
+    Returns:
+        (condition, values) to AND into a query over ``doctype``
+    """
+    match_expr, like_terms = _parse_query(text)
+    values = {"search_doctype": doctype}
+    conditions = ["e.reference_doctype = %(search_doctype)s"]
+
+    if match_expr:
+        conditions.append("MATCH(e.content) AGAINST (%(search_match)s IN BOOLEAN MODE)")
+        values["search_match"] = match_expr
+    for i, term in enumerate(like_terms):
+        conditions.append(f"e.content LIKE %(search_like_{i})s")
+        values[f"search_like_{i}"] = _like_pattern(term)
+    if not match_expr and not like_terms:
+        return "1=0", {}
+
+    return f"""{column} IN (
+        SELECT e.reference_name FROM `tab{SEARCH_DOCTYPE}` e
+        WHERE {" AND ".join(conditions)}
+    )""", values
+
+
+def search(text: str, doctype: Optional[str] = None, limit: Optional[int] = 20) -> List[Dict]:
+    """Ranked matches for ``text`` across indexed doctypes (all of them if ``limit`` is None).
+
+    Returns:
+        [{"doctype", "name", "title", "score"}, ...] best first
+    """
+    match_expr, like_terms = _parse_query(text)
+    if not match_expr and not like_terms:
+        return []
+
+    conditions = []
+    values = {}
+    if doctype:
+        conditions.append("reference_doctype = %(doctype)s")
+        values["doctype"] = doctype
+    if match_expr:
+        conditions.append("MATCH(content) AGAINST (%(match)s IN BOOLEAN MODE)")
+        values["match"] = match_expr
+        score = "MATCH(content) AGAINST (%(match)s IN BOOLEAN MODE)"
+    else:
+        score = "0"
+    for i, term in enumerate(like_terms):
+        conditions.append(f"content LIKE %(like_{i})s")
+        values[f"like_{i}"] = _like_pattern(term)
+    limit_clause = ""
+    if limit is not None:
+        limit_clause = "LIMIT %(limit)s"
+        values["limit"] = int(limit)
+
+    return frappe.db.sql(f"""
+        SELECT reference_doctype AS doctype, reference_name AS name, title, {score} AS score
+        FROM `tab{SEARCH_DOCTYPE}`
+        WHERE {" AND ".join(conditions)}
+        ORDER BY score DESC, modified DESC
+        {limit_clause}
+    """, values, as_dict=True)
+
+
+def search_names(doctype: str, text: str) -> List[str]:
+    """Names of every ``doctype`` document matching ``text``, best first.
+
+    Unbounded on purpose: callers use it as a list filter, and a cap would make
+    their totals and page counts wrong for broad queries.
+    """
+    return [row.name for row in search(text, doctype=doctype, limit=None)]
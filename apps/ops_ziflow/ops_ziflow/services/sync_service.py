@@ -11,6 +11,7 @@ import frappe
 from ops_ziflow.services.order_state import update_order_proof_summary
 from ops_ziflow.services.ziflow_client import ZiFlowClient
 from ops_ziflow.utils.config import load_settings, require_api_key
+from ops_ziflow.utils.dashboard_cache import invalidate_dashboards
 from ops_ziflow.utils.status_mapper import map_proof_to_product_status
 
 
@@ -225,6 +226,9 @@ def poll_pending_proofs() -> None:
                 auto_retry=True,
             )
 
+    # Proof statuses and order proof counts changed; applied when the scheduler commits
+    invalidate_dashboards("proofs", "orders")
+
 
 def handle_webhook(payload: Dict[str, Any]) -> Dict[str, Any]:
     """Process ZiFlow webhook events."""
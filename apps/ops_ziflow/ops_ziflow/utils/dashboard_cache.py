@@ -0,0 +1,120 @@
+"""Short-TTL shared result cache for the OPS dashboard endpoints.
+
+Cached results are keyed by endpoint, normalized arguments and the current
+version of every data domain (orders, quotes, proofs) the endpoint reads.
+Sync batches call ``invalidate_dashboards`` which bumps the domain versions once
+their transaction commits, so stale entries are simply never read again and
+expire on their own.
+
+Concurrent cold misses are coalesced: the first caller takes a short Redis lock
+and computes, the others wait briefly for its result instead of all hitting the
+database at once.
+"""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import inspect
+import json
+import time
+from typing import Any, Callable, Iterable
+
+import frappe
+
+DEFAULT_TTL = 120  # seconds
+LOCK_TTL = 30  # seconds; upper bound for one computation
+WAIT_TIMEOUT = 10.0  # seconds a coalesced caller waits before computing itself
+WAIT_INTERVAL = 0.1
+
+_VERSION_KEY = "ops_ziflow:dashboard_version:{}"
+_RESULT_KEY = "ops_ziflow:dashboard:{}:{}:{}"
+
+
+def _get_version(domain: str) -> int:
+    cache = frappe.cache()
+    return int(cache.get(cache.make_key(_VERSION_KEY.format(domain))) or 0)
+
+
+def _bump_versions(domains: Iterable[str]) -> None:
+    cache = frappe.cache()
+    for domain in domains:
+        cache.incr(cache.make_key(_VERSION_KEY.format(domain)))
+
+
+def invalidate_dashboards(*domains: str) -> None:
+    """Invalidate cached dashboard results for the given domains once the current transaction commits."""
+    frappe.db.after_commit.add(lambda: _bump_versions(domains))
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, str):
+        value = value.strip()
+    if value in (None, ""):
+        return None
+    return str(value)
+
+
+def _result_key(func_name: str, domains: Iterable[str], arguments: dict) -> str:
+    versions = ".".join(f"{d}{_get_version(d)}" for d in domains)
+    normalized = {k: _normalize(v) for k, v in arguments.items()}
+    digest = hashlib.md5(json.dumps(normalized, sort_keys=True).encode()).hexdigest()
+    return _RESULT_KEY.format(func_name, versions, digest)
+
+
+def _wait_for(key: str):
+    deadline = time.monotonic() + WAIT_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(WAIT_INTERVAL)
+        result = frappe.cache().get_value(key, use_local_cache=False)
+        if result is not None:
+            return result
+    return None
+
+
+def dashboard_cache(*domains: str, ttl: int = DEFAULT_TTL) -> Callable:
+    """Cache a dashboard endpoint's result, shared across users.
+
+    Only use on endpoints whose result does not depend on the session user.
+
+    Args:
+        domains: Data domains the endpoint reads ("orders", "quotes", "proofs")
+        ttl: Seconds a result may be served before it is recomputed
+    """
+
+    def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+        func_name = f"{func.__module__}.{func.__name__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            # Drop request noise (cache busters etc.) not accepted by the endpoint
+            kwargs = {k: v for k, v in kwargs.items() if k in signature.parameters}
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+
+            key = _result_key(func_name, domains, bound.arguments)
+            cache = frappe.cache()
+
+            result = cache.get_value(key, use_local_cache=False)
+            if result is not None:
+                return result
+
+            lock_key = cache.make_key(f"{key}:lock")
+            owns_lock = cache.set(lock_key, 1, nx=True, ex=LOCK_TTL)
+            if not owns_lock:
+                result = _wait_for(key)
+                if result is not None:
+                    return result
+
+            try:
+                result = func(*bound.args, **bound.kwargs)
+                cache.set_value(key, result, expires_in_sec=ttl)
+            finally:
+                if owns_lock:
+                    cache.delete(lock_key)
+            return result
+
+        return wrapper
+
+    return decorator
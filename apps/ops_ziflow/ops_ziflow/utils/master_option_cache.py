@@ -0,0 +1,76 @@
+"""In-process LRU cache of OPS Master Option Attribute metadata.
+
+Master option attributes are reference data that only change on product
+imports, yet the order form looks them up for every option row. Lookups go
+through ``get_master_options`` which serves hits from a bounded per-site LRU and
+loads all misses with one query. Entries expire after ``CACHE_TTL`` so other
+workers pick up edits; the local process is cleared immediately via doc events.
+"""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, Iterable, Optional
+
+import frappe
+
+MASTER_DOCTYPE = "OPS Master Option Attribute"
+MASTER_FIELDS = ("name", "option_name", "group_name", "display_order", "option_type")
+CACHE_SIZE = 4096
+CACHE_TTL = 300  # seconds
+
+_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+_lock = Lock()
+
+
+def _available_fields():
+    # Only select columns this site actually has (meta is cached, no query)
+    meta = frappe.get_meta(MASTER_DOCTYPE)
+    return [f for f in MASTER_FIELDS if f == "name" or meta.has_field(f)]
+
+
+def get_master_options(names: Iterable[str]) -> Dict[str, Optional[dict]]:
+    """Metadata for the given master option names; missing names map to None."""
+    site = frappe.local.site
+    now = time.monotonic()
+    result = {}
+    missing = []
+
+    with _lock:
+        for name in set(n for n in names if n):
+            entry = _cache.get((site, name))
+            if entry and entry[0] > now:
+                _cache.move_to_end((site, name))
+                result[name] = entry[1]
+            else:
+                missing.append(name)
+
+    if missing:
+        rows = frappe.get_all(
+            MASTER_DOCTYPE,
+            filters={"name": ["in", missing]},
+            fields=_available_fields(),
+        )
+        loaded = {row.name: row for row in rows}
+
+        with _lock:
+            for name in missing:
+                info = loaded.get(name)
+                result[name] = info
+                _cache[(site, name)] = (now + CACHE_TTL, info)
+                _cache.move_to_end((site, name))
+            while len(_cache) > CACHE_SIZE:
+                _cache.popitem(last=False)
+
+    return result
+
+
+def clear_master_option_cache(doc=None, method=None) -> None:
+    """Drop cached entries (doc event on OPS Master Option Attribute, or call with no args to clear all)."""
+    with _lock:
+        if doc is None:
+            _cache.clear()
+        else:
+            _cache.pop((frappe.local.site, doc.name), None)
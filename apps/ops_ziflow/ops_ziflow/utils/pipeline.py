@@ -0,0 +1,86 @@
+"""Single-query status pipelines for the OPS dashboards."""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List
+
+import frappe
+from frappe.utils import cint, flt
+
+
+def get_status_pipeline(
+    doctype: str,
+    status_field: str,
+    statuses: List[str],
+    fields: List[str] | None = None,
+    order_by: str | None = None,
+    value_field: str | None = None,
+    limit: int = 10,
+) -> Dict[str, Dict[str, Any]]:
+    """Count, total value and top-N rows per status in one query.
+
+    Uses ``ROW_NUMBER() OVER (PARTITION BY <status_field> ...)`` so the per-status
+    counts/sums and the first ``limit`` rows of every status come back together,
+    backed by a (status_field, order column) index.
+
+    Args:
+        doctype: DocType to read (e.g. "OPS Order")
+        status_field: Column holding the pipeline status
+        statuses: Pipeline statuses, in display order
+        fields: Columns returned for the top-N rows
+        order_by: Ordering of rows within a status, e.g. "production_due_date asc"
+        value_field: Column summed into "value" (omitted when None)
+        limit: Rows per status; 0 returns counts/values only
+
+    Returns:
+        {status: {"count": int, "value": float, "rows": [dict, ...]}} for every status
+    """
+    pipeline = {
+        status: {"count": 0, "rows": [], **({"value": 0} if value_field else {})}
+        for status in statuses
+    }
+    if not statuses:
+        return pipeline
+
+    table = f"`tab{doctype}`"
+    values = {"statuses": statuses, "limit": cint(limit)}
+
+    if not cint(limit):
+        value_sql = f"COALESCE(SUM(`{value_field}`), 0)" if value_field else "0"
+        rows = frappe.db.sql(f"""
+            SELECT `{status_field}` AS pipeline_status, COUNT(*) AS status_count, {value_sql} AS status_value
+            FROM {table}
+            WHERE `{status_field}` IN %(statuses)s
+            GROUP BY `{status_field}`
+        """, values, as_dict=True)
+    else:
+        columns = ", ".join(f"`{f}`" for f in fields or ["name"])
+        partition = f"OVER (PARTITION BY `{status_field}`)"
+        value_sql = f"COALESCE(SUM(`{value_field}`) {partition}, 0)" if value_field else "0"
+        rows = frappe.db.sql(f"""
+            SELECT * FROM (
+                SELECT
+                    {columns},
+                    `{status_field}` AS pipeline_status,
+                    ROW_NUMBER() OVER (
+                        PARTITION BY `{status_field}` ORDER BY {order_by or "name"}, name
+                    ) AS status_rank,
+                    COUNT(*) {partition} AS status_count,
+                    {value_sql} AS status_value
+                FROM {table}
+                WHERE `{status_field}` IN %(statuses)s
+            ) ranked
+            WHERE status_rank <= %(limit)s
+            ORDER BY pipeline_status, status_rank
+        """, values, as_dict=True)
+
+    for row in rows:
+        entry = pipeline[row.pop("pipeline_status")]
+        entry["count"] = cint(row.pop("status_count"))
+        status_value = row.pop("status_value")
+        if value_field:
+            entry["value"] = flt(status_value)
+        if row.pop("status_rank", None) is not None:
+            entry["rows"].append(row)
+
+    return pipeline
@@ -0,0 +1,47 @@
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from ops_ziflow.utils import dashboard_cache as dc
+
+
+class TestDashboardCache(FrappeTestCase):
+    def setUp(self):
+        self.domain = f"test-{frappe.generate_hash(length=8)}"
+        self.calls = []
+
+        @dc.dashboard_cache(self.domain)
+        def endpoint(status=None, limit=10):
+            self.calls.append((status, limit))
+            return {"status": status, "limit": limit}
+
+        self.endpoint = endpoint
+
+    def test_repeated_calls_are_served_from_cache(self):
+        self.assertEqual(self.endpoint(status="Open"), {"status": "Open", "limit": 10})
+        # Same normalized arguments (whitespace, defaults, request noise) hit the same entry
+        self.endpoint(status=" Open ", limit=10, _="1700000000")
+        self.endpoint(status="Closed")
+
+        self.assertEqual(self.calls, [("Open", 10), ("Closed", 10)])
+
+    def test_invalidation_applies_after_commit(self):
+        self.endpoint(status="Open")
+
+        with patch.object(frappe.db.after_commit, "add") as after_commit:
+            dc.invalidate_dashboards(self.domain)
+        self.endpoint(status="Open")
+        self.assertEqual(len(self.calls), 1)
+
+        # Run the callback the commit would run
+        after_commit.call_args[0][0]()
+        self.endpoint(status="Open")
+        self.assertEqual(len(self.calls), 2)
+
+    def test_other_domains_stay_cached(self):
+        self.endpoint(status="Open")
+        dc._bump_versions([f"{self.domain}-other"])
+        self.endpoint(status="Open")
+
+        self.assertEqual(len(self.calls), 1)
@@ -0,0 +1,59 @@
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from ops_ziflow.utils.pipeline import get_status_pipeline
+
+STATUSES = ["New Order", "In Production"]
+
+
+def _make_order(order_id, status, amount, due):
+    order = frappe.get_doc({
+        "doctype": "OPS Order",
+        "ops_order_id": order_id,
+        "order_status": status,
+        "orders_status_id": 1,
+        "order_amount": amount,
+        "production_due_date": due,
+        "sync_in_progress": 1,
+    })
+    order.flags.ignore_mandatory = True
+    order.flags.ignore_links = True
+    order.insert(ignore_permissions=True)
+
+
+class TestStatusPipeline(FrappeTestCase):
+    def setUp(self):
+        for i, due in enumerate(("1990-01-03", "1990-01-01", "1990-01-02")):
+            _make_order(f"995000{i}", "New Order", 10 * (i + 1), due)
+        _make_order("9950010", "In Production", 5, "1990-01-01")
+
+    def test_counts_values_and_top_rows_per_status(self):
+        pipeline = get_status_pipeline(
+            "OPS Order", "order_status", STATUSES + ["Reprint Order"],
+            fields=["name", "production_due_date"], order_by="production_due_date asc",
+            value_field="order_amount", limit=2,
+        )
+
+        for status in STATUSES:
+            entry = pipeline[status]
+            self.assertEqual(entry["count"], frappe.db.count("OPS Order", {"order_status": status}))
+            self.assertAlmostEqual(entry["value"], frappe.utils.flt(frappe.db.sql(
+                "SELECT SUM(order_amount) FROM `tabOPS Order` WHERE order_status = %s", status
+            )[0][0]))
+            self.assertLessEqual(len(entry["rows"]), 2)
+            due_dates = [row.production_due_date for row in entry["rows"]]
+            self.assertEqual(due_dates, sorted(due_dates))
+
+        # Our fixtures have the earliest due dates, so they lead their status
+        self.assertEqual([r.name for r in pipeline["New Order"]["rows"]], ["9950001", "9950002"])
+        self.assertIn("Reprint Order", pipeline)
+
+    def test_counts_only(self):
+        pipeline = get_status_pipeline("OPS Order", "order_status", STATUSES, limit=0)
+
+        self.assertEqual(pipeline["In Production"]["rows"], [])
+        self.assertEqual(
+            pipeline["In Production"]["count"],
+            frappe.db.count("OPS Order", {"order_status": "In Production"}),
+        )
+        self.assertNotIn("value", pipeline["New Order"])